@@ -0,0 +1,137 @@
+"""
+Kimlik Doğrulama Ölçüm Script'i
+Her istekte kullanıcı satırını e-posta ile okuyan önceki `mevcut_kullanici_al`
+ile token + kullanıcı durum önbelleğinden çözen `_kimligi_coz`u karşılaştırır.
+
+Üç yol ölçülür:
+- E-posta ile satır okuma (önceki davranış, istek başına bir sorgu)
+- Soğuk önbellek (her istekten önce önbellek temizlenir; birincil anahtarla
+  sadece aktif_mi, rol, token_versiyonu okunur)
+- Sıcak önbellek (veritabanına hiç sorgu gitmez)
+
+Üçünde de JWT aynı şekilde doğrulanır; farklar kimlik doğrulamanın
+veritabanı maliyetidir. Sıcak yolda sorgu görülürse script hata ile çıkar.
+
+Yerel veritabanında round trip neredeyse bedavadır; ağ üzerindeki bir
+veritabanını taklit etmek için --rtt-ms her sorguya bu kadar bekleme ekler.
+
+Kullanım:
+    python auth_olc.py --email a@b.com [--tekrar 2000] [--rtt-ms 1]
+"""
+import argparse
+import math
+import sys
+import time
+
+from sqlalchemy import event
+
+from sunucu.veritabani import SessionLocal, engine
+from sunucu.modeller.kullanici import Kullanicilar
+from sunucu.bagimliliklar.auth import _kimligi_coz
+from sunucu.servisler.auth_servisi import (
+    email_ile_kullanici_getir,
+    kullanici_onbellegi,
+    kullanici_tokeni_olustur,
+    token_dogrula,
+)
+
+# Ölçüme girmeyen ısınma çağrıları (bağlantı açılır, sorgu derleme önbelleği dolar)
+ISINMA = 100
+
+
+def yuzdelik(sirali: list, oran: float) -> float:
+    if not sirali:
+        return 0.0
+    return sirali[min(len(sirali) - 1, max(0, math.ceil(oran * len(sirali)) - 1))]
+
+
+def email_ile(db, token):
+    """Karşılaştırma için: önceki mevcut_kullanici_al'ın yaptığı iş."""
+    payload = token_dogrula(token)
+    kullanici = email_ile_kullanici_getir(db, email=payload.get("sub"))
+    if kullanici is None or not kullanici.aktif_mi:
+        raise RuntimeError("Kullanıcı doğrulanamadı")
+    # Önceki sürümde de her istek yeni bir session ile satırı baştan yüklerdi
+    db.expunge(kullanici)
+
+
+def soguk_onbellek(db, token):
+    kullanici_onbellegi.temizle()
+    _kimligi_coz(token, db)
+
+
+def sicak_onbellek(db, token):
+    _kimligi_coz(token, db)
+
+
+def olc(ad, fonksiyon, token, tekrar, rtt_ms) -> dict:
+    sorgu_sayisi = 0
+
+    def say(*_):
+        nonlocal sorgu_sayisi
+        sorgu_sayisi += 1
+        if rtt_ms:
+            time.sleep(rtt_ms / 1000)
+
+    sureler = []
+    db = SessionLocal()
+    try:
+        for _ in range(ISINMA):
+            fonksiyon(db, token)
+        event.listen(engine, "before_cursor_execute", say)
+        for _ in range(tekrar):
+            baslangic = time.perf_counter()
+            fonksiyon(db, token)
+            sureler.append(time.perf_counter() - baslangic)
+    finally:
+        event.remove(engine, "before_cursor_execute", say)
+        db.close()
+
+    sirali = sorted(sureler)
+    sonuc = {
+        "sorgu": sorgu_sayisi / tekrar,
+        "p50_us": yuzdelik(sirali, 0.50) * 1_000_000,
+        "p95_us": yuzdelik(sirali, 0.95) * 1_000_000,
+    }
+    print(f"{ad:<28} {sonuc['sorgu']:>6.1f} {sonuc['p50_us']:>10.1f} {sonuc['p95_us']:>10.1f}")
+    return sonuc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="E-posta ile kullanıcı okuma ile önbellekli kimlik çözme karşılaştırması")
+    parser.add_argument("--email", required=True, help="Ölçümün yapılacağı kullanıcı")
+    parser.add_argument("--tekrar", type=int, default=2000, help="Ölçüm başına çağrı sayısı")
+    parser.add_argument("--rtt-ms", type=float, default=0, help="Sorgu başına eklenecek ağ gecikmesi (ms)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        kullanici = db.query(Kullanicilar).filter(Kullanicilar.email == args.email).first()
+        if not kullanici:
+            print(f"❌ Kullanıcı bulunamadı: {args.email}")
+            sys.exit(1)
+        if not kullanici.aktif_mi:
+            print(f"❌ Kullanıcı aktif değil: {args.email}")
+            sys.exit(1)
+        token = kullanici_tokeni_olustur(kullanici)
+    finally:
+        db.close()
+
+    print(f"{'':<28} {'sorgu':>6} {'p50 µs':>10} {'p95 µs':>10}")
+    eski = olc("E-posta ile satır okuma", email_ile, token, args.tekrar, args.rtt_ms)
+    olc("Soğuk önbellek (PK, 3 sütun)", soguk_onbellek, token, args.tekrar, args.rtt_ms)
+    sicak = olc("Sıcak önbellek", sicak_onbellek, token, args.tekrar, args.rtt_ms)
+
+    if sicak["sorgu"] != 0:
+        print(f"\n❌ Sıcak yolda istek başına {sicak['sorgu']:.1f} sorgu çalıştı (beklenen: 0)")
+        sys.exit(1)
+
+    print(
+        f"\n📊 İstek başına kimlik doğrulama: {eski['sorgu']:.0f} sorgu → {sicak['sorgu']:.0f} sorgu, "
+        f"p50 {eski['p50_us']:.1f} µs → {sicak['p50_us']:.1f} µs "
+        f"({eski['p50_us'] - sicak['p50_us']:.1f} µs kazanç)"
+    )
+
+
+if __name__ == "__main__":
+    main()
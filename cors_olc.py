@@ -0,0 +1,184 @@
+"""
+CORS Ara Katmanı Ölçüm Script'i
+Önceki `ForceCorsMiddleware` (BaseHTTPMiddleware) ile saf ASGI
+`CorsAraKatmani`nı aynı küçük FastAPI uygulaması üzerinde karşılaştırır.
+Ara katmansız uygulama taban çizgisi olarak ölçülür; farklar ara
+katmanın istek başına maliyetidir.
+
+İstekler HTTP sunucusu ve istemci olmadan doğrudan ASGI çağrısıyla
+gönderilir (scope/receive/send); ağ ve soket maliyeti ölçüme karışmaz.
+Her ara katman için Origin header'lı GET ve OPTIONS (preflight) ayrı
+ölçülür. Yanıtların durum kodu ve CORS header'ları da kontrol edilir.
+
+Kullanım:
+    python cors_olc.py [--tekrar 20000] [--origin http://localhost:5173]
+"""
+import argparse
+import asyncio
+import math
+import sys
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from sunucu.ara_katmanlar.cors import CorsAraKatmani
+
+# Ölçüme girmeyen ısınma istekleri (kod yolları ve önbellekler ısınsın)
+ISINMA = 1000
+
+
+class ForceCorsMiddleware(BaseHTTPMiddleware):
+    """Karşılaştırma için: ana.py'deki önceki sürüm (değiştirilmeden)."""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method == "OPTIONS":
+            response = JSONResponse(content="OK")
+        else:
+            try:
+                response = await call_next(request)
+            except Exception as e:
+                print(f"Hata yakalandi: {e}")
+                response = JSONResponse(
+                    content={"detail": "Sunucu Hatasi"},
+                    status_code=500
+                )
+
+        origin = request.headers.get("origin")
+        if origin:
+            response.headers["Access-Control-Allow-Origin"] = origin
+        else:
+            response.headers["Access-Control-Allow-Origin"] = "*"
+
+        response.headers["Access-Control-Allow-Credentials"] = "true"
+        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS, PATCH"
+        response.headers["Access-Control-Allow-Headers"] = "Authorization, Content-Type, Accept, Origin, X-Requested-With"
+
+        return response
+
+
+def uygulama_olustur(ara_katman=None, **ayarlar) -> FastAPI:
+    uygulama = FastAPI()
+
+    @uygulama.get("/ping")
+    async def ping():
+        return {"durum": "ok"}
+
+    if ara_katman is not None:
+        uygulama.add_middleware(ara_katman, **ayarlar)
+    return uygulama
+
+
+def yuzdelik(sirali: list, oran: float) -> float:
+    if not sirali:
+        return 0.0
+    return sirali[min(len(sirali) - 1, max(0, math.ceil(oran * len(sirali)) - 1))]
+
+
+async def istek_gonder(uygulama, metod: str, origin: str) -> dict:
+    """Uygulamayı tek bir HTTP isteğiyle doğrudan ASGI üzerinden çağırır."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": metod,
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"origin", origin.encode("latin-1")),
+            (b"access-control-request-method", b"GET"),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 8000),
+    }
+    yanit = {}
+    istek_okundu = False
+    yanit_bitti = asyncio.Event()
+
+    async def receive():
+        # İstek gövdesi bir kez verilir; sonrası yanıt bitince bağlantı kapanır
+        nonlocal istek_okundu
+        if not istek_okundu:
+            istek_okundu = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await yanit_bitti.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(mesaj):
+        if mesaj["type"] == "http.response.start":
+            yanit["status"] = mesaj["status"]
+            yanit["headers"] = dict(mesaj.get("headers", []))
+        elif mesaj["type"] == "http.response.body" and not mesaj.get("more_body", False):
+            yanit_bitti.set()
+
+    await uygulama(scope, receive, send)
+    return yanit
+
+
+async def olc(ad: str, uygulama, metod: str, origin: str, tekrar: int, cors_bekleniyor: bool) -> float:
+    # İlk çağrı middleware stack'ini kurar; yanıt burada kontrol edilir
+    yanit = await istek_gonder(uygulama, metod, origin)
+    if yanit.get("status") != 200:
+        print(f"❌ {ad} {metod}: beklenmeyen durum kodu {yanit.get('status')}")
+        sys.exit(1)
+    if cors_bekleniyor and yanit["headers"].get(b"access-control-allow-origin") != origin.encode("latin-1"):
+        print(f"❌ {ad} {metod}: Access-Control-Allow-Origin eksik")
+        sys.exit(1)
+
+    for _ in range(ISINMA):
+        await istek_gonder(uygulama, metod, origin)
+
+    sureler = []
+    for _ in range(tekrar):
+        baslangic = time.perf_counter()
+        await istek_gonder(uygulama, metod, origin)
+        sureler.append(time.perf_counter() - baslangic)
+
+    sirali = sorted(sureler)
+    p50 = yuzdelik(sirali, 0.50) * 1_000_000
+    p95 = yuzdelik(sirali, 0.95) * 1_000_000
+    print(f"{ad:<22} {metod:<8} {p50:>9.1f} {p95:>9.1f} {tekrar / sum(sureler):>10.0f}")
+    return p50
+
+
+async def karsilastir(args) -> None:
+    uygulamalar = [
+        ("Ara katmansız", uygulama_olustur(), False),
+        ("ForceCorsMiddleware", uygulama_olustur(ForceCorsMiddleware), True),
+        ("CorsAraKatmani", uygulama_olustur(CorsAraKatmani, izinli_originler=["*"]), True),
+    ]
+
+    print(f"{'':<22} {'metod':<8} {'p50 µs':>9} {'p95 µs':>9} {'istek/sn':>10}")
+    sonuclar = {}
+    for metod in ("GET", "OPTIONS"):
+        for ad, uygulama, cors_bekleniyor in uygulamalar:
+            # Ara katmansız uygulamada /ping için OPTIONS route'u yok (405)
+            if metod == "OPTIONS" and not cors_bekleniyor:
+                continue
+            sonuclar[(ad, metod)] = await olc(ad, uygulama, metod, args.origin, args.tekrar, cors_bekleniyor)
+
+    taban = sonuclar[("Ara katmansız", "GET")]
+    eski = sonuclar[("ForceCorsMiddleware", "GET")] - taban
+    yeni = sonuclar[("CorsAraKatmani", "GET")] - taban
+    print(f"\n📊 GET başına ara katman maliyeti (p50): {eski:.1f} µs → {yeni:.1f} µs")
+    print(
+        f"📊 OPTIONS p50: {sonuclar[('ForceCorsMiddleware', 'OPTIONS')]:.1f} µs → "
+        f"{sonuclar[('CorsAraKatmani', 'OPTIONS')]:.1f} µs"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ForceCorsMiddleware ile CorsAraKatmani karşılaştırması")
+    parser.add_argument("--tekrar", type=int, default=20000, help="Ölçüm başına istek sayısı")
+    parser.add_argument("--origin", default="http://localhost:5173", help="İsteklerin Origin header'ı")
+    args = parser.parse_args()
+    asyncio.run(karsilastir(args))
+
+
+if __name__ == "__main__":
+    main()
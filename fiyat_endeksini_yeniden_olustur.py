@@ -0,0 +1,25 @@
+"""
+İstasyon Fiyat Endeksi Yeniden Oluşturma Script'i
+istasyon_fiyat_endeksi tablosunu (kullanıcı/istasyon/yakıt türü/hafta
+toplamları) ham yakıt kayıtlarından doldurur. Tablo ilk oluşturulduğunda
+veya endeks ham kayıtlarla tutarsız kaldığında çalıştırılır.
+
+Kullanım:
+    python fiyat_endeksini_yeniden_olustur.py
+"""
+from sunucu.veritabani import SessionLocal
+from sunucu.servisler.fiyat_endeksi_servisi import endeksi_yeniden_olustur
+
+
+def main():
+    db = SessionLocal()
+    try:
+        print("🔨 İstasyon fiyat endeksi yeniden oluşturuluyor...")
+        satir_sayisi = endeksi_yeniden_olustur(db)
+        print(f"✅ {satir_sayisi} endeks satırı yazıldı")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
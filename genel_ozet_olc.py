@@ -0,0 +1,109 @@
+"""
+Genel Özet Gecikme Ölçüm Script'i
+Gösterge panelinin dört ayrı istatistik çağrısını (aylık harcama, kategori
+dağılımı, araç karşılaştırması, araç sayısı) sırayla çalıştırmak ile tek
+sorguluk `genel_ozet`i karşılaştırır.
+
+Servisler doğrudan çağrılır; HTTP ve önbellek devre dışıdır, ölçülen süre
+sorgu sayısı ve veritabanı round trip'leridir. HTTP üzerinden her ayrı
+çağrı ayrıca kimlik doğrulama sorgusu ve istek maliyeti öder.
+
+Yerel veritabanında round trip neredeyse bedavadır; ağ üzerindeki bir
+veritabanını taklit etmek için --rtt-ms her sorguya bu kadar bekleme ekler.
+
+Kullanım:
+    python genel_ozet_olc.py --email a@b.com [--tekrar 200] [--ay-sayisi 6] [--rtt-ms 1]
+"""
+import argparse
+import math
+import sys
+import time
+
+from sqlalchemy import event
+
+from sunucu.veritabani import SessionLocal, engine
+from sunucu.modeller.kullanici import Kullanicilar
+from sunucu.servisler import arac_servisi, istatistik_servisi
+
+
+def yuzdelik(sirali: list, oran: float) -> float:
+    if not sirali:
+        return 0.0
+    return sirali[min(len(sirali) - 1, max(0, math.ceil(oran * len(sirali)) - 1))]
+
+
+def dort_cagri(db, kullanici, ay_sayisi):
+    istatistik_servisi.aylik_harcama_trendi(db, kullanici.id, None, ay_sayisi, kullanici.rol)
+    istatistik_servisi.kategori_dagilimi(db, kullanici.id, None, kullanici.rol)
+    istatistik_servisi.arac_karsilastirma(db, kullanici.id, kullanici.rol)
+    arac_servisi.arac_sayisi_getir(db, kullanici.id, True, kullanici.rol)
+
+
+def tek_cagri(db, kullanici, ay_sayisi):
+    istatistik_servisi.genel_ozet(db, kullanici.id, kullanici.rol, ay_sayisi)
+
+
+def olc(ad, fonksiyon, kullanici, tekrar, ay_sayisi, rtt_ms) -> dict:
+    sorgu_sayisi = 0
+
+    def say(*_):
+        nonlocal sorgu_sayisi
+        sorgu_sayisi += 1
+        if rtt_ms:
+            time.sleep(rtt_ms / 1000)
+
+    sureler = []
+    db = SessionLocal()
+    try:
+        # Isınma: bağlantı açılır, sorgu derleme önbelleği dolar
+        fonksiyon(db, kullanici, ay_sayisi)
+        event.listen(engine, "before_cursor_execute", say)
+        for _ in range(tekrar):
+            baslangic = time.perf_counter()
+            fonksiyon(db, kullanici, ay_sayisi)
+            sureler.append(time.perf_counter() - baslangic)
+    finally:
+        event.remove(engine, "before_cursor_execute", say)
+        db.close()
+
+    sirali = sorted(sureler)
+    sonuc = {
+        "sorgu": sorgu_sayisi / tekrar,
+        "p50_ms": round(yuzdelik(sirali, 0.50) * 1000, 2),
+        "p95_ms": round(yuzdelik(sirali, 0.95) * 1000, 2),
+    }
+    print(f"{ad:<25} {sonuc['sorgu']:>6.1f} {sonuc['p50_ms']:>9} {sonuc['p95_ms']:>9}")
+    return sonuc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genel özet ile dört ayrı çağrının gecikme karşılaştırması")
+    parser.add_argument("--email", required=True, help="Ölçümün yapılacağı kullanıcı")
+    parser.add_argument("--tekrar", type=int, default=200)
+    parser.add_argument("--ay-sayisi", type=int, default=6)
+    parser.add_argument("--rtt-ms", type=float, default=0, help="Sorgu başına eklenecek ağ gecikmesi (ms)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        kullanici = db.query(Kullanicilar).filter(Kullanicilar.email == args.email).first()
+    finally:
+        db.close()
+    if not kullanici:
+        print(f"❌ Kullanıcı bulunamadı: {args.email}")
+        sys.exit(1)
+
+    print(f"{'':<25} {'sorgu':>6} {'p50 ms':>9} {'p95 ms':>9}")
+    ayri = olc("Dört ayrı çağrı", dort_cagri, kullanici, args.tekrar, args.ay_sayisi, args.rtt_ms)
+    birlesik = olc("Genel özet (tek sorgu)", tek_cagri, kullanici, args.tekrar, args.ay_sayisi, args.rtt_ms)
+
+    if birlesik["p50_ms"]:
+        print(
+            f"\n📊 p50: {ayri['p50_ms']} ms → {birlesik['p50_ms']} ms "
+            f"({ayri['p50_ms'] / birlesik['p50_ms']:.2f}x), "
+            f"sorgu: {ayri['sorgu']:.0f} → {birlesik['sorgu']:.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Index Kullanımı Doğrulama Script'i
+Sık çalışan sorguların EXPLAIN planlarını alır ve beklenen kısmi/bileşik
+index'i kullandıklarını doğrular (PostgreSQL, MySQL, SQLite).
+
+PostgreSQL'de küçük tablolarda planlayıcı sıralı taramayı tercih edebileceği
+için kontrol `enable_seqscan = off` ile yapılır; amaç index'in sorgu için
+kullanılabilir olduğunu göstermektir.
+
+Kullanım:
+    python index_kullanimini_dogrula.py
+"""
+import json
+import re
+import sys
+from datetime import date
+
+from sqlalchemy import and_, func, text, tuple_
+from sunucu.veritabani import SessionLocal
+from sunucu.sayfalama import imlec_olustur, tarih_imleci_uygula, id_imleci_uygula
+from sunucu.zaman_dilimleri import DILIM_HAFTA, donem_araligi, dilim_baslangici_ifadesi
+from sunucu.modeller.arac import Araclar
+from sunucu.modeller.bakim import Bakimlar
+from sunucu.modeller.harcama import Harcamalar
+from sunucu.modeller.yakit_takibi import Yakit_Takibi
+
+ORNEK_ID = 1
+ORNEK_IMLEC = imlec_olustur(date(2024, 1, 1), 1000)
+ORNEK_DONEM = donem_araligi(DILIM_HAFTA, 6, date(2024, 6, 15))
+
+
+def sicak_sorgular(db):
+    """
+    (ad, sorgu, beklenen index'ler) üçlülerini döndürür. Sorgular servislerdekiyle aynıdır.
+    Beklenen index'lerden herhangi birinin kullanılması yeterlidir.
+    """
+    sorgular = []
+
+    for model, index_adi in (
+        (Bakimlar, "ix_bakimlar_aktif_arac_tarih_id"),
+        (Harcamalar, "ix_harcamalar_aktif_arac_tarih_id"),
+        (Yakit_Takibi, "ix_yakit_takibi_aktif_arac_tarih_id"),
+    ):
+        for imlec in (None, ORNEK_IMLEC):
+            sorgu = db.query(model).filter(
+                and_(
+                    model.arac_id == ORNEK_ID,
+                    model.silinmis_mi == False
+                )
+            )
+            sorgu = tarih_imleci_uygula(sorgu, model, imlec).limit(100)
+            sayfa = "imlecli sayfa" if imlec else "ilk sayfa"
+            sorgular.append((f"{model.__tablename__} listesi ({sayfa})", sorgu, {index_adi}))
+
+    # tuketim_servisi: segment sınırı (önceki tam depo) ve segment aralığı
+    sorgular.append((
+        "onceki tam depo",
+        db.query(Yakit_Takibi.km, Yakit_Takibi.id).filter(
+            and_(
+                Yakit_Takibi.arac_id == ORNEK_ID,
+                Yakit_Takibi.silinmis_mi == False,
+                Yakit_Takibi.tam_depo == True,
+                Yakit_Takibi.km <= 10 ** 9,
+                tuple_(Yakit_Takibi.km, Yakit_Takibi.id) < tuple_(10 ** 9, 1)
+            )
+        ).order_by(Yakit_Takibi.km.desc(), Yakit_Takibi.id.desc()).limit(1),
+        {"ix_yakit_takibi_aktif_arac_tam_depo_km"},
+    ))
+    sorgular.append((
+        "yakit segment araligi",
+        db.query(Yakit_Takibi.id, Yakit_Takibi.litre, Yakit_Takibi.tam_depo).filter(
+            and_(
+                Yakit_Takibi.arac_id == ORNEK_ID,
+                Yakit_Takibi.silinmis_mi == False,
+                Yakit_Takibi.km >= 1000,
+                Yakit_Takibi.km <= 2000
+            )
+        ).order_by(Yakit_Takibi.km, Yakit_Takibi.id),
+        {"ix_yakit_takibi_aktif_arac_km_id"},
+    ))
+
+    # bakim_servisi.son_bakim_getir
+    sorgular.append((
+        "son bakim",
+        db.query(Bakimlar).filter(
+            and_(
+                Bakimlar.arac_id == ORNEK_ID,
+                Bakimlar.silinmis_mi == False
+            )
+        ).order_by(Bakimlar.tarih.desc()).limit(1),
+        {"ix_bakimlar_aktif_arac_tarih_id"},
+    ))
+
+    # istatistik_servisi: gün/hafta dilimleri ham kayıtlardan, tarih aralığı kolonun kendisine uygulanır
+    for model, tutar, index_adi in (
+        (Harcamalar, Harcamalar.tutar, "ix_harcamalar_aktif_arac_tarih_id"),
+        (Yakit_Takibi, Yakit_Takibi.toplam_tutar, "ix_yakit_takibi_aktif_arac_tarih_id"),
+    ):
+        donem = dilim_baslangici_ifadesi(model.tarih, DILIM_HAFTA).label("donem")
+        sorgular.append((
+            f"{model.__tablename__} haftalık trend",
+            db.query(donem, func.sum(tutar)).filter(
+                and_(
+                    model.arac_id == ORNEK_ID,
+                    model.silinmis_mi == False,
+                    model.tarih >= ORNEK_DONEM[0],
+                    model.tarih < ORNEK_DONEM[1]
+                )
+            ).group_by(donem),
+            {index_adi},
+        ))
+
+    # arac_servisi.tum_araclari_getir (kullanıcı). SQLite ve MySQL'de ikincil
+    # index'ler satır kimliğini (id) de içerdiği için (kullanici_id) index'i
+    # (kullanici_id, id) ile denktir; PostgreSQL'de değildir.
+    arac_indexleri = {"ix_araclar_aktif_kullanici_id_id"}
+    if db.get_bind().dialect.name != "postgresql":
+        arac_indexleri.add("ix_araclar_kullanici_id")
+    sorgular.append((
+        "arac listesi",
+        id_imleci_uygula(
+            db.query(Araclar).filter(Araclar.silinmis_mi == False).filter(Araclar.kullanici_id == ORNEK_ID),
+            Araclar, None
+        ).limit(100),
+        arac_indexleri,
+    ))
+
+    return sorgular
+
+
+def _index_adlarini_topla(plan) -> set:
+    """PostgreSQL JSON planındaki tüm 'Index Name' değerlerini toplar."""
+    adlar = set()
+    if isinstance(plan, dict):
+        if "Index Name" in plan:
+            adlar.add(plan["Index Name"])
+        for deger in plan.values():
+            adlar |= _index_adlarini_topla(deger)
+    elif isinstance(plan, list):
+        for deger in plan:
+            adlar |= _index_adlarini_topla(deger)
+    return adlar
+
+
+def kullanilan_indexler(db, sorgu) -> set:
+    """Sorgunun EXPLAIN planında geçen index adlarını döndürür."""
+    baglanti = db.connection()
+    lehce = baglanti.dialect.name
+    derlenmis = sorgu.statement.compile(dialect=baglanti.dialect)
+    parametreler = derlenmis.params
+    if derlenmis.positional:
+        parametreler = tuple(parametreler[ad] for ad in derlenmis.positiontup)
+
+    if lehce == "postgresql":
+        sonuc = baglanti.exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(derlenmis), parametreler).scalar()
+        plan = json.loads(sonuc) if isinstance(sonuc, str) else sonuc
+        return _index_adlarini_topla(plan)
+    if lehce == "sqlite":
+        satirlar = baglanti.exec_driver_sql("EXPLAIN QUERY PLAN " + str(derlenmis), parametreler).all()
+        return {ad for satir in satirlar for ad in re.findall(r"INDEX (\w+)", satir[-1])}
+    satirlar = baglanti.exec_driver_sql("EXPLAIN " + str(derlenmis), parametreler).mappings().all()
+    return {satir["key"] for satir in satirlar if satir["key"]}
+
+
+def main():
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SET LOCAL enable_seqscan = off"))
+
+        hatalar = 0
+        for ad, sorgu, beklenen in sicak_sorgular(db):
+            indexler = kullanilan_indexler(db, sorgu)
+            kullanilan = beklenen & indexler
+            if kullanilan:
+                print(f"✅ {ad}: {', '.join(sorted(kullanilan))}")
+            else:
+                hatalar += 1
+                print(f"❌ {ad}: {', '.join(sorted(beklenen))} kullanılmıyor (plan: {', '.join(sorted(indexler)) or 'tam tarama'})")
+
+        if hatalar:
+            sys.exit(1)
+        print("✅ Tüm sıcak sorgular beklenen index'leri kullanıyor")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
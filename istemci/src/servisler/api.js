@@ -128,6 +128,17 @@ export const aracServisi = {
         return response.data;
     },
 
+    /**
+     * Kilometre çizelgesi: tarihlerdeki km ve km'lere ulaşılan tarihler
+     */
+    kilometreCizelgesi: async (id, tarihler = [], kmler = []) => {
+        const params = new URLSearchParams();
+        tarihler.forEach((tarih) => params.append('tarih', tarih));
+        kmler.forEach((km) => params.append('km', km));
+        const response = await api.get(`/araclar/${id}/kilometre-cizelgesi`, { params });
+        return response.data;
+    },
+
     /**
      * Araç sayısı
      */
@@ -191,6 +202,16 @@ export const yakitServisi = {
         return response.data;
     },
 
+    topluAktar: async (dosya) => {
+        const veri = new FormData();
+        veri.append('dosya', dosya);
+        const response = await api.post('/yakit/toplu-aktar', veri, {
+            headers: { 'Content-Type': 'multipart/form-data' },
+            timeout: 120000,
+        });
+        return response.data;
+    },
+
     tuketimAnalizi: async (aracId) => {
         const response = await api.get(`/yakit/arac/${aracId}/tuketim-analizi`);
         return response.data;
@@ -200,10 +221,47 @@ export const yakitServisi = {
         const response = await api.get(`/yakit/arac/${aracId}/istasyon-analizi`);
         return response.data;
     },
+
+    segmentAnalizi: async (aracId, pencere = 5) => {
+        const response = await api.get(`/yakit/arac/${aracId}/segment-analizi`, { params: { pencere } });
+        return response.data;
+    },
+
+    fiyatTrendi: async (aracId) => {
+        const response = await api.get(`/yakit/arac/${aracId}/fiyat-trendi`);
+        return response.data;
+    },
+
+    filoAnalizi: async (pencere = 5) => {
+        const response = await api.get('/yakit/filo/analiz', { params: { pencere } });
+        return response.data;
+    },
+
+    anomaliler: async (aracId, limit = 50) => {
+        const response = await api.get(`/yakit/arac/${aracId}/anomaliler`, { params: { limit } });
+        return response.data;
+    },
+
+    filoAnomalileri: async (limit = 100) => {
+        const response = await api.get('/yakit/filo/anomaliler', { params: { limit } });
+        return response.data;
+    },
+
+    filoFiyatEndeksi: async (yakitTuru = null, haftaSayisi = 12, limit = 10) => {
+        const params = { hafta_sayisi: haftaSayisi, limit };
+        if (yakitTuru) params.yakit_turu = yakitTuru;
+        const response = await api.get('/yakit/filo/fiyat-endeksi', { params });
+        return response.data;
+    },
 };
 
 // İstatistik servisleri
 export const istatistikServisi = {
+    ozet: async (aySayisi = 6) => {
+        const response = await api.get('/istatistikler/ozet', { params: { ay_sayisi: aySayisi } });
+        return response.data;
+    },
+
     aylikHarcama: async (aracId = null, aySayisi = 6) => {
         const params = { ay_sayisi: aySayisi };
         if (aracId) params.arac_id = aracId;
@@ -325,4 +383,12 @@ export const profilServisi = {
     }
 };
 
+// Toplu İstek: birden fazla GET isteği tek istekte (yollar '/api/v1/' ile başlar)
+export const topluServisi = {
+    calistir: async (istekler, eszamanli = false) => {
+        const response = await api.post('/batch', { istekler, eszamanli });
+        return response.data.yanitlar;
+    }
+};
+
 export default api;
@@ -0,0 +1,25 @@
+"""
+Kilometre Zaman Çizelgesi Yeniden Oluşturma Script'i
+km_cizelgeleri tablosunu (araç başına paketlenmiş (tarih, km) noktaları)
+ham bakım ve yakıt kayıtlarından doldurur. Tablo ilk oluşturulduğunda
+veya çizelgeler ham kayıtlarla tutarsız kaldığında çalıştırılır.
+
+Kullanım:
+    python km_cizelgelerini_yeniden_olustur.py
+"""
+from sunucu.veritabani import SessionLocal
+from sunucu.servisler.km_cizelgesi_servisi import cizelgeleri_yeniden_olustur
+
+
+def main():
+    db = SessionLocal()
+    try:
+        print("🔨 Kilometre zaman çizelgeleri yeniden oluşturuluyor...")
+        arac_sayisi = cizelgeleri_yeniden_olustur(db)
+        print(f"✅ {arac_sayisi} aracın çizelgesi yazıldı")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,62 @@
+import os
+import sys
 from sqlalchemy import text
-from sunucu.veritabani import SessionLocal
+from sunucu.veritabani import SessionLocal, engine
 
-def run_migration():
+VARSAYILAN_MIGRATION = "migrations/003_add_role_column.sql"
+
+
+def dialect_dosyasi(dosya: str) -> str:
+    """
+    Bağlı veritabanına uygun migration dosyasını döndürür.
+
+    PostgreSQL'e özgü söz dizimi kullanan migration'ların MySQL sürümleri
+    migrations/mysql/ altında aynı adla durur; varsa o dosya çalıştırılır.
+    """
+    if engine.dialect.name != "mysql":
+        return dosya
+    mysql_dosyasi = os.path.join(os.path.dirname(dosya), "mysql", os.path.basename(dosya))
+    return mysql_dosyasi if os.path.exists(mysql_dosyasi) else dosya
+
+
+def run_migration(dosya: str = VARSAYILAN_MIGRATION):
+    """
+    SQL migration dosyasını çalıştırır.
+
+    MySQL'de dosyanın migrations/mysql/ altındaki sürümü varsa o kullanılır.
+    CONCURRENTLY içeren komutlar (PostgreSQL) transaction içinde çalışamadığı
+    için her biri ayrı ayrı autocommit bağlantısında çalıştırılır.
+    """
+    dosya = dialect_dosyasi(dosya)
     db = SessionLocal()
     try:
-        print("Migration başlatılıyor (RBAC)...")
-        
+        print(f"Migration başlatılıyor ({dosya})...")
+
         # SQL dosyasını oku
-        with open("migrations/003_add_role_column.sql", "r", encoding="utf-8") as f:
+        with open(dosya, "r", encoding="utf-8") as f:
             sql_content = f.read()
-            
-        # Komutları ayır ve çalıştır
-        commands = sql_content.split(';')
-        for command in commands:
-            if command.strip():
-                print(f"Calistiriliyor: {command.strip()[:50]}...")
+
+        # Komutları ayır (yorum satırları atılır)
+        commands = []
+        for command in sql_content.split(';'):
+            satirlar = [s for s in command.splitlines() if not s.strip().startswith("--")]
+            command = "\n".join(satirlar).strip()
+            if command:
+                commands.append(command)
+
+        if any("CONCURRENTLY" in command.upper() for command in commands):
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as baglanti:
+                for command in commands:
+                    print(f"Calistiriliyor: {command[:50]}...")
+                    baglanti.execute(text(command))
+        else:
+            for command in commands:
+                print(f"Calistiriliyor: {command[:50]}...")
                 db.execute(text(command))
-                
-        db.commit()
-        print("✅ Migration başarıyla tamamlandı! Rol sistemi aktif.")
-        
+            db.commit()
+
+        print("✅ Migration başarıyla tamamlandı!")
+
     except Exception as e:
         print(f"❌ Hata: {str(e)}")
         db.rollback()
@@ -27,4 +64,4 @@ def run_migration():
         db.close()
 
 if __name__ == "__main__":
-    run_migration()
+    run_migration(sys.argv[1] if len(sys.argv) > 1 else VARSAYILAN_MIGRATION)
@@ -0,0 +1,19 @@
+-- Aylık Özet Tablosu Migration (PostgreSQL)
+-- İstatistik endpoint'leri için arac/ay/kategori bazlı toplamlar
+-- MySQL sürümü: migrations/mysql/004_aylik_ozetler.sql (migration_runner.py otomatik seçer)
+-- Tablo oluşturulduktan sonra doldurmak için: python ozetleri_yeniden_olustur.py
+
+CREATE TABLE IF NOT EXISTS aylik_ozetler (
+    id SERIAL PRIMARY KEY,
+    arac_id INT NOT NULL REFERENCES araclar(id) ON DELETE CASCADE,
+    ay DATE NOT NULL,
+    tur VARCHAR(20) NOT NULL,
+    kategori VARCHAR(100) NOT NULL DEFAULT '',
+    toplam_tutar NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    toplam_litre NUMERIC(12, 2) NOT NULL DEFAULT 0,
+    adet INT NOT NULL DEFAULT 0,
+    CONSTRAINT uq_aylik_ozet UNIQUE (arac_id, ay, tur, kategori)
+);
+
+CREATE INDEX IF NOT EXISTS ix_aylik_ozetler_arac_id ON aylik_ozetler (arac_id);
+CREATE INDEX IF NOT EXISTS ix_aylik_ozetler_ay ON aylik_ozetler (ay);
@@ -0,0 +1,6 @@
+-- Token Versiyonu Migration
+-- Şifre değişikliğinde eski JWT'leri geçersiz kılmak için sayaç
+-- PostgreSQL ve MySQL'de aynen çalışır; ayrı bir MySQL sürümü yoktur
+
+ALTER TABLE kullanicilar
+ADD COLUMN token_versiyonu INT NOT NULL DEFAULT 0;
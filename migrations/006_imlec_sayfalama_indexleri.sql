@@ -0,0 +1,9 @@
+-- İmleç (Keyset) Sayfalama Index'leri
+-- Liste endpoint'lerindeki (arac_id) + ORDER BY tarih DESC, id DESC ve
+-- (kullanici_id) + ORDER BY id erişimleri için bileşik index'ler
+-- PostgreSQL ve MySQL'de aynen çalışır; ayrı bir MySQL sürümü yoktur
+
+CREATE INDEX ix_bakimlar_arac_tarih_id ON bakimlar (arac_id, tarih, id);
+CREATE INDEX ix_harcamalar_arac_tarih_id ON harcamalar (arac_id, tarih, id);
+CREATE INDEX ix_yakit_takibi_arac_tarih_id ON yakit_takibi (arac_id, tarih, id);
+CREATE INDEX ix_araclar_kullanici_id_id ON araclar (kullanici_id, id);
@@ -0,0 +1,13 @@
+-- Araç Sayaçları Migration (PostgreSQL)
+-- Araç bazında maliyet toplamları ve son bakım/yakıt kilometresi
+-- MySQL sürümü: migrations/mysql/007_arac_sayaclari.sql (migration_runner.py otomatik seçer)
+-- Kolonlar eklendikten sonra doldurmak için: python sayaclari_dogrula.py
+
+ALTER TABLE araclar ADD COLUMN IF NOT EXISTS toplam_bakim_maliyeti NUMERIC(14, 2) NOT NULL DEFAULT 0;
+ALTER TABLE araclar ADD COLUMN IF NOT EXISTS toplam_harcama NUMERIC(14, 2) NOT NULL DEFAULT 0;
+ALTER TABLE araclar ADD COLUMN IF NOT EXISTS toplam_yakit_maliyeti NUMERIC(14, 2) NOT NULL DEFAULT 0;
+ALTER TABLE araclar ADD COLUMN IF NOT EXISTS toplam_yakit_litre NUMERIC(12, 2) NOT NULL DEFAULT 0;
+ALTER TABLE araclar ADD COLUMN IF NOT EXISTS son_bakim_km INT;
+ALTER TABLE araclar ADD COLUMN IF NOT EXISTS son_bakim_tarihi DATE;
+ALTER TABLE araclar ADD COLUMN IF NOT EXISTS sonraki_bakim_km INT;
+ALTER TABLE araclar ADD COLUMN IF NOT EXISTS son_yakit_km INT;
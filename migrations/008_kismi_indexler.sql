@@ -0,0 +1,34 @@
+-- Kısmi (Partial) ve Kapsayan (Covering) Index'ler (PostgreSQL)
+-- MySQL sürümü: migrations/mysql/008_kismi_indexler.sql (migration_runner.py otomatik seçer)
+-- Servislerin tamamı silinmis_mi = false ile filtreler; index'ler yalnızca
+-- silinmemiş satırları içerir. 006'daki bileşik index'lerin yerini alır.
+--
+-- CONCURRENTLY tablo kilitlemeden oluşturur, transaction içinde çalışamaz:
+--     python migration_runner.py migrations/008_kismi_indexler.sql
+-- Doğrulama: python index_kullanimini_dogrula.py
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bakimlar_aktif_arac_tarih_id
+    ON bakimlar (arac_id, tarih, id) INCLUDE (km, sonraki_bakim_km, tutar)
+    WHERE silinmis_mi = false;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_harcamalar_aktif_arac_tarih_id
+    ON harcamalar (arac_id, tarih, id) INCLUDE (kategori, tutar)
+    WHERE silinmis_mi = false;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_yakit_takibi_aktif_arac_tarih_id
+    ON yakit_takibi (arac_id, tarih, id) INCLUDE (km, litre, toplam_tutar)
+    WHERE silinmis_mi = false;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_yakit_takibi_aktif_arac_tam_depo_km
+    ON yakit_takibi (arac_id, tam_depo, km)
+    WHERE silinmis_mi = false;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_araclar_aktif_kullanici_id_id
+    ON araclar (kullanici_id, id)
+    WHERE silinmis_mi = false;
+
+-- Yeni index'ler hazır olduktan sonra 006'dakiler kaldırılır
+DROP INDEX CONCURRENTLY IF EXISTS ix_bakimlar_arac_tarih_id;
+DROP INDEX CONCURRENTLY IF EXISTS ix_harcamalar_arac_tarih_id;
+DROP INDEX CONCURRENTLY IF EXISTS ix_yakit_takibi_arac_tarih_id;
+DROP INDEX CONCURRENTLY IF EXISTS ix_araclar_kullanici_id_id;
@@ -0,0 +1,15 @@
+-- Yakıt Tüketim Segment Index'i (PostgreSQL)
+-- MySQL sürümü: migrations/mysql/009_yakit_segment_indexi.sql (migration_runner.py otomatik seçer)
+-- tuketim_servisi etkilenen segmenti (arac_id, km, id) aralığı olarak okur:
+--     WHERE arac_id = ? AND silinmis_mi = false AND km BETWEEN ? AND ? ORDER BY km, id
+-- Segment sınırları (önceki/sonraki tam depo) mevcut
+-- ix_yakit_takibi_aktif_arac_tam_depo_km ile bulunur.
+--
+-- CONCURRENTLY tablo kilitlemeden oluşturur, transaction içinde çalışamaz:
+--     python migration_runner.py migrations/009_yakit_segment_indexi.sql
+-- Mevcut kayıtların tüketimini yeni hesaplamayla doldurmak için:
+--     python tuketimleri_yeniden_hesapla.py
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_yakit_takibi_aktif_arac_km_id
+    ON yakit_takibi (arac_id, km, id) INCLUDE (litre, tam_depo, ortalama_tuketim)
+    WHERE silinmis_mi = false;
@@ -0,0 +1,40 @@
+-- Yakıt Anomalileri Migration (PostgreSQL)
+-- Araç başına birikimli yakıt istatistikleri (Welford), araç ve yakıt türü
+-- başına litre fiyatı istatistikleri ve eklenirken şüpheli bulunan yakıt kayıtları
+-- MySQL sürümü: migrations/mysql/010_yakit_anomalileri.sql (migration_runner.py otomatik seçer)
+-- Tablolar oluşturulduktan sonra istatistikleri doldurmak için:
+--     python yakit_istatistiklerini_yeniden_olustur.py
+
+CREATE TABLE IF NOT EXISTS yakit_istatistikleri (
+    arac_id INT PRIMARY KEY REFERENCES araclar(id) ON DELETE CASCADE,
+    dolum_adet INT NOT NULL DEFAULT 0,
+    tuketim_adet INT NOT NULL DEFAULT 0,
+    tuketim_ortalama DOUBLE PRECISION NOT NULL DEFAULT 0,
+    tuketim_m2 DOUBLE PRECISION NOT NULL DEFAULT 0,
+    en_buyuk_litre NUMERIC(8, 2),
+    guncellenme_tarihi TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS yakit_fiyat_istatistikleri (
+    arac_id INT NOT NULL REFERENCES araclar(id) ON DELETE CASCADE,
+    yakit_turu VARCHAR(20) NOT NULL,
+    adet INT NOT NULL DEFAULT 0,
+    ortalama DOUBLE PRECISION NOT NULL DEFAULT 0,
+    m2 DOUBLE PRECISION NOT NULL DEFAULT 0,
+    guncellenme_tarihi TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (arac_id, yakit_turu)
+);
+
+CREATE TABLE IF NOT EXISTS yakit_anomalileri (
+    id SERIAL PRIMARY KEY,
+    yakit_id INT NOT NULL REFERENCES yakit_takibi(id) ON DELETE CASCADE,
+    arac_id INT NOT NULL REFERENCES araclar(id) ON DELETE CASCADE,
+    tur VARCHAR(20) NOT NULL,
+    deger NUMERIC(10, 2) NOT NULL,
+    beklenen NUMERIC(10, 2) NOT NULL,
+    skor NUMERIC(6, 2) NOT NULL,
+    olusturulma_tarihi TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_yakit_anomalileri_yakit_id ON yakit_anomalileri (yakit_id);
+CREATE INDEX IF NOT EXISTS ix_yakit_anomalileri_arac_id_id ON yakit_anomalileri (arac_id, id);
@@ -0,0 +1,20 @@
+-- İstasyon Fiyat Endeksi Migration (PostgreSQL)
+-- Filo genelinde istasyon fiyat karşılaştırması için
+-- kullanıcı/istasyon/yakıt türü/hafta bazlı toplamlar
+-- MySQL sürümü: migrations/mysql/011_istasyon_fiyat_endeksi.sql (migration_runner.py otomatik seçer)
+-- Tablo oluşturulduktan sonra doldurmak için: python fiyat_endeksini_yeniden_olustur.py
+
+CREATE TABLE IF NOT EXISTS istasyon_fiyat_endeksi (
+    id SERIAL PRIMARY KEY,
+    kullanici_id INT NOT NULL REFERENCES kullanicilar(id) ON DELETE CASCADE,
+    istasyon VARCHAR(100) NOT NULL,
+    yakit_turu VARCHAR(20) NOT NULL,
+    hafta DATE NOT NULL,
+    toplam_litre NUMERIC(12, 2) NOT NULL DEFAULT 0,
+    fiyat_litre_toplami NUMERIC(16, 4) NOT NULL DEFAULT 0,
+    adet INT NOT NULL DEFAULT 0,
+    CONSTRAINT uq_istasyon_fiyat_endeksi UNIQUE (kullanici_id, istasyon, yakit_turu, hafta)
+);
+
+CREATE INDEX IF NOT EXISTS ix_istasyon_fiyat_endeksi_kullanici_hafta ON istasyon_fiyat_endeksi (kullanici_id, hafta);
+CREATE INDEX IF NOT EXISTS ix_istasyon_fiyat_endeksi_hafta ON istasyon_fiyat_endeksi (hafta);
@@ -0,0 +1,12 @@
+-- Kilometre Zaman Çizelgesi Migration (PostgreSQL)
+-- Araç başına bakım ve yakıt kayıtlarından birleştirilmiş (tarih, km)
+-- noktaları; sıralı int64 anahtarlar olarak paketlenir
+-- MySQL sürümü: migrations/mysql/012_km_cizelgeleri.sql (migration_runner.py otomatik seçer)
+-- Tablo oluşturulduktan sonra doldurmak için: python km_cizelgelerini_yeniden_olustur.py
+
+CREATE TABLE IF NOT EXISTS km_cizelgeleri (
+    arac_id INT PRIMARY KEY REFERENCES araclar(id) ON DELETE CASCADE,
+    nokta_sayisi INT NOT NULL DEFAULT 0,
+    noktalar BYTEA NOT NULL DEFAULT ''::bytea,
+    guncellenme_tarihi TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
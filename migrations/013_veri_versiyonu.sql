@@ -0,0 +1,7 @@
+-- Veri Versiyonu Migration
+-- İstatistik önbellek anahtarları için kullanıcı başına veri sayacı
+-- (tüm worker'lar aynı sayacı okur, bkz. onbellek_servisi)
+-- PostgreSQL ve MySQL'de aynen çalışır; ayrı bir MySQL sürümü yoktur
+
+ALTER TABLE kullanicilar
+ADD COLUMN veri_versiyonu INT NOT NULL DEFAULT 0;
@@ -0,0 +1,12 @@
+-- Yakıt En Büyük Dolum Index'i (PostgreSQL)
+-- MySQL sürümü: migrations/mysql/014_yakit_litre_indexi.sql (migration_runner.py otomatik seçer)
+-- Düzenlenen veya silinen dolum aracın en büyük dolumuysa anomali_servisi
+-- yenisini tek sorguyla okur:
+--     SELECT MAX(litre) WHERE arac_id = ? AND silinmis_mi = false AND id <> ?
+--
+-- CONCURRENTLY tablo kilitlemeden oluşturur, transaction içinde çalışamaz:
+--     python migration_runner.py migrations/014_yakit_litre_indexi.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_yakit_takibi_aktif_arac_litre
+    ON yakit_takibi (arac_id, litre)
+    WHERE silinmis_mi = false;
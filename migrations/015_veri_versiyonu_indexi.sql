@@ -0,0 +1,7 @@
+-- Veri Versiyonu Index'i
+-- Admin istatistik önbellek anahtarı filo versiyonunu (en büyük veri
+-- versiyonu) okur; MAX(veri_versiyonu) index'in son girdisinden gelir
+-- (bkz. onbellek_servisi)
+-- PostgreSQL ve MySQL'de aynen çalışır; ayrı bir MySQL sürümü yoktur
+
+CREATE INDEX ix_kullanicilar_veri_versiyonu ON kullanicilar (veri_versiyonu);
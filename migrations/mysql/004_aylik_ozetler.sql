@@ -0,0 +1,22 @@
+-- Aylık Özet Tablosu Migration (MySQL)
+-- İstatistik endpoint'leri için arac/ay/kategori bazlı toplamlar
+-- PostgreSQL sürümü: migrations/004_aylik_ozetler.sql
+-- Tablo oluşturulduktan sonra doldurmak için: python ozetleri_yeniden_olustur.py
+
+CREATE TABLE IF NOT EXISTS aylik_ozetler (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    arac_id INT NOT NULL,
+    ay DATE NOT NULL,
+    tur VARCHAR(20) NOT NULL,
+    kategori VARCHAR(100) NOT NULL DEFAULT '',
+    toplam_tutar DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    toplam_litre DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    adet INT NOT NULL DEFAULT 0,
+    CONSTRAINT uq_aylik_ozet UNIQUE (arac_id, ay, tur, kategori),
+    INDEX ix_aylik_ozetler_arac_id (arac_id),
+    INDEX ix_aylik_ozetler_ay (ay),
+    CONSTRAINT fk_aylik_ozetler_arac
+        FOREIGN KEY (arac_id)
+        REFERENCES araclar(id)
+        ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_turkish_ci;
@@ -0,0 +1,15 @@
+-- Araç Sayaçları Migration (MySQL)
+-- Araç bazında maliyet toplamları ve son bakım/yakıt kilometresi
+-- PostgreSQL sürümü: migrations/007_arac_sayaclari.sql
+-- Kolonlar eklendikten sonra doldurmak için: python sayaclari_dogrula.py
+
+-- MySQL'de ADD COLUMN IF NOT EXISTS yok; tek ALTER ile tablo bir kez yeniden yazılır
+ALTER TABLE araclar
+ADD COLUMN toplam_bakim_maliyeti DECIMAL(14, 2) NOT NULL DEFAULT 0,
+ADD COLUMN toplam_harcama DECIMAL(14, 2) NOT NULL DEFAULT 0,
+ADD COLUMN toplam_yakit_maliyeti DECIMAL(14, 2) NOT NULL DEFAULT 0,
+ADD COLUMN toplam_yakit_litre DECIMAL(12, 2) NOT NULL DEFAULT 0,
+ADD COLUMN son_bakim_km INT,
+ADD COLUMN son_bakim_tarihi DATE,
+ADD COLUMN sonraki_bakim_km INT,
+ADD COLUMN son_yakit_km INT;
@@ -0,0 +1,32 @@
+-- Bileşik (Kapsayan) Index'ler Migration (MySQL)
+-- PostgreSQL sürümü: migrations/008_kismi_indexler.sql
+-- MySQL'de kısmi (WHERE) ve INCLUDE index yoktur: silinmis_mi eşitlik
+-- kolonu olarak arac_id'nin hemen arkasına, kapsanan kolonlar index'in
+-- sonuna eklenir. 006'daki bileşik index'lerin yerini alır.
+--
+-- Her tablo için yeni index'in eklenmesi ve 006'daki index'in kaldırılması
+-- tek ALTER içindedir; yabancı anahtarın (arac_id) index'siz kaldığı bir ara
+-- durum oluşmaz. ALGORITHM=INPLACE, LOCK=NONE yazmaları bloklamadan oluşturur:
+--     python migration_runner.py migrations/008_kismi_indexler.sql
+-- Doğrulama: python index_kullanimini_dogrula.py
+
+ALTER TABLE bakimlar
+    ADD INDEX ix_bakimlar_aktif_arac_tarih_id (arac_id, silinmis_mi, tarih, id, km, sonraki_bakim_km, tutar),
+    DROP INDEX ix_bakimlar_arac_tarih_id,
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE harcamalar
+    ADD INDEX ix_harcamalar_aktif_arac_tarih_id (arac_id, silinmis_mi, tarih, id, kategori, tutar),
+    DROP INDEX ix_harcamalar_arac_tarih_id,
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE yakit_takibi
+    ADD INDEX ix_yakit_takibi_aktif_arac_tarih_id (arac_id, silinmis_mi, tarih, id, km, litre, toplam_tutar),
+    ADD INDEX ix_yakit_takibi_aktif_arac_tam_depo_km (arac_id, silinmis_mi, tam_depo, km),
+    DROP INDEX ix_yakit_takibi_arac_tarih_id,
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE araclar
+    ADD INDEX ix_araclar_aktif_kullanici_id_id (kullanici_id, silinmis_mi, id),
+    DROP INDEX ix_araclar_kullanici_id_id,
+    ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,16 @@
+-- Yakıt Tüketim Segment Index'i (MySQL)
+-- PostgreSQL sürümü: migrations/009_yakit_segment_indexi.sql
+-- tuketim_servisi etkilenen segmenti (arac_id, km, id) aralığı olarak okur:
+--     WHERE arac_id = ? AND silinmis_mi = false AND km BETWEEN ? AND ? ORDER BY km, id
+-- Kısmi index yerine silinmis_mi eşitlik kolonu olarak km'nin önüne gelir;
+-- böylece aralık taraması km, id sırasıyla ek sıralama yapmadan döner.
+-- litre, tam_depo ve ortalama_tuketim sorgunun tabloya dönmemesi için
+-- index'in sonuna eklenir (PostgreSQL'deki INCLUDE karşılığı).
+--
+--     python migration_runner.py migrations/009_yakit_segment_indexi.sql
+-- Mevcut kayıtların tüketimini yeni hesaplamayla doldurmak için:
+--     python tuketimleri_yeniden_hesapla.py
+
+ALTER TABLE yakit_takibi
+    ADD INDEX ix_yakit_takibi_aktif_arac_km_id (arac_id, silinmis_mi, km, id, litre, tam_depo, ortalama_tuketim),
+    ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,55 @@
+-- Yakıt Anomalileri Migration (MySQL)
+-- Araç başına birikimli yakıt istatistikleri (Welford), araç ve yakıt türü
+-- başına litre fiyatı istatistikleri ve eklenirken şüpheli bulunan yakıt kayıtları
+-- PostgreSQL sürümü: migrations/010_yakit_anomalileri.sql
+-- Tablolar oluşturulduktan sonra istatistikleri doldurmak için:
+--     python yakit_istatistiklerini_yeniden_olustur.py
+
+CREATE TABLE IF NOT EXISTS yakit_istatistikleri (
+    arac_id INT PRIMARY KEY,
+    dolum_adet INT NOT NULL DEFAULT 0,
+    tuketim_adet INT NOT NULL DEFAULT 0,
+    tuketim_ortalama DOUBLE NOT NULL DEFAULT 0,
+    tuketim_m2 DOUBLE NOT NULL DEFAULT 0,
+    en_buyuk_litre DECIMAL(8, 2),
+    guncellenme_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT fk_yakit_istatistikleri_arac
+        FOREIGN KEY (arac_id)
+        REFERENCES araclar(id)
+        ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_turkish_ci;
+
+CREATE TABLE IF NOT EXISTS yakit_fiyat_istatistikleri (
+    arac_id INT NOT NULL,
+    yakit_turu VARCHAR(20) NOT NULL,
+    adet INT NOT NULL DEFAULT 0,
+    ortalama DOUBLE NOT NULL DEFAULT 0,
+    m2 DOUBLE NOT NULL DEFAULT 0,
+    guncellenme_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (arac_id, yakit_turu),
+    CONSTRAINT fk_yakit_fiyat_istatistikleri_arac
+        FOREIGN KEY (arac_id)
+        REFERENCES araclar(id)
+        ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_turkish_ci;
+
+CREATE TABLE IF NOT EXISTS yakit_anomalileri (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    yakit_id INT NOT NULL,
+    arac_id INT NOT NULL,
+    tur VARCHAR(20) NOT NULL,
+    deger DECIMAL(10, 2) NOT NULL,
+    beklenen DECIMAL(10, 2) NOT NULL,
+    skor DECIMAL(6, 2) NOT NULL,
+    olusturulma_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX ix_yakit_anomalileri_yakit_id (yakit_id),
+    INDEX ix_yakit_anomalileri_arac_id_id (arac_id, id),
+    CONSTRAINT fk_yakit_anomalileri_yakit
+        FOREIGN KEY (yakit_id)
+        REFERENCES yakit_takibi(id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_yakit_anomalileri_arac
+        FOREIGN KEY (arac_id)
+        REFERENCES araclar(id)
+        ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_turkish_ci;
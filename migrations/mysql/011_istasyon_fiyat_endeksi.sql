@@ -0,0 +1,23 @@
+-- İstasyon Fiyat Endeksi Migration (MySQL)
+-- Filo genelinde istasyon fiyat karşılaştırması için
+-- kullanıcı/istasyon/yakıt türü/hafta bazlı toplamlar
+-- PostgreSQL sürümü: migrations/011_istasyon_fiyat_endeksi.sql
+-- Tablo oluşturulduktan sonra doldurmak için: python fiyat_endeksini_yeniden_olustur.py
+
+CREATE TABLE IF NOT EXISTS istasyon_fiyat_endeksi (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    kullanici_id INT NOT NULL,
+    istasyon VARCHAR(100) NOT NULL,
+    yakit_turu VARCHAR(20) NOT NULL,
+    hafta DATE NOT NULL,
+    toplam_litre DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    fiyat_litre_toplami DECIMAL(16, 4) NOT NULL DEFAULT 0,
+    adet INT NOT NULL DEFAULT 0,
+    CONSTRAINT uq_istasyon_fiyat_endeksi UNIQUE (kullanici_id, istasyon, yakit_turu, hafta),
+    INDEX ix_istasyon_fiyat_endeksi_kullanici_hafta (kullanici_id, hafta),
+    INDEX ix_istasyon_fiyat_endeksi_hafta (hafta),
+    CONSTRAINT fk_istasyon_fiyat_endeksi_kullanici
+        FOREIGN KEY (kullanici_id)
+        REFERENCES kullanicilar(id)
+        ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_turkish_ci;
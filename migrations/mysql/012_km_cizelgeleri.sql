@@ -0,0 +1,18 @@
+-- Kilometre Zaman Çizelgesi Migration (MySQL)
+-- Araç başına bakım ve yakıt kayıtlarından birleştirilmiş (tarih, km)
+-- noktaları; sıralı int64 anahtarlar olarak paketlenir
+-- PostgreSQL sürümü: migrations/012_km_cizelgeleri.sql
+-- Tablo oluşturulduktan sonra doldurmak için: python km_cizelgelerini_yeniden_olustur.py
+
+-- BLOB 64 KB ile sınırlı (~8000 nokta); MEDIUMBLOB 16 MB.
+-- MySQL'de BLOB kolonlarına DEFAULT verilemez, satırlar her zaman noktalarla eklenir.
+CREATE TABLE IF NOT EXISTS km_cizelgeleri (
+    arac_id INT PRIMARY KEY,
+    nokta_sayisi INT NOT NULL DEFAULT 0,
+    noktalar MEDIUMBLOB NOT NULL,
+    guncellenme_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT fk_km_cizelgeleri_arac
+        FOREIGN KEY (arac_id)
+        REFERENCES araclar(id)
+        ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_turkish_ci;
@@ -0,0 +1,10 @@
+-- Yakıt En Büyük Dolum Index'i (MySQL)
+-- PostgreSQL sürümü: migrations/014_yakit_litre_indexi.sql
+-- Kısmi index yerine silinmis_mi eşitlik kolonu olarak litre'nin önüne gelir;
+-- MAX(litre) index'in ilgili aralığının son girdisinden okunur.
+--
+--     python migration_runner.py migrations/014_yakit_litre_indexi.sql
+
+ALTER TABLE yakit_takibi
+    ADD INDEX ix_yakit_takibi_aktif_arac_litre (arac_id, silinmis_mi, litre),
+    ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,37 @@
+"""
+Aylık Özet Tablosu Yeniden Oluşturma Script'i
+aylik_ozetler tablosunu ham harcama/yakıt/bakım kayıtlarından doldurur
+ve/veya ham tablolarla tutarlılığını doğrular.
+
+Kullanım:
+    python ozetleri_yeniden_olustur.py            # Yeniden oluştur + doğrula
+    python ozetleri_yeniden_olustur.py --dogrula  # Sadece doğrula
+"""
+import sys
+from sunucu.veritabani import SessionLocal
+from sunucu.servisler.ozet_servisi import ozetleri_yeniden_olustur, ozetleri_dogrula
+
+
+def main():
+    sadece_dogrula = "--dogrula" in sys.argv
+    db = SessionLocal()
+    try:
+        if not sadece_dogrula:
+            print("🔨 Aylık özetler yeniden oluşturuluyor...")
+            satir_sayisi = ozetleri_yeniden_olustur(db)
+            print(f"✅ {satir_sayisi} özet satırı yazıldı")
+
+        print("🔍 Özetler ham tablolarla karşılaştırılıyor...")
+        farklar = ozetleri_dogrula(db)
+        if farklar:
+            print(f"❌ {len(farklar)} tutarsız özet bulundu:")
+            for fark in farklar[:20]:
+                print(f"   - {fark}")
+            sys.exit(1)
+        print("✅ Özetler tutarlı")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Araç Sayaçları Doğrulama Script'i
+Araç satırındaki maliyet toplamlarını ve son bakım/yakıt kilometresini
+ham kayıtlarla karşılaştırır, istenirse sapmaları onarır.
+
+Kullanım:
+    python sayaclari_dogrula.py          # Doğrula + onar
+    python sayaclari_dogrula.py --dogrula  # Sadece doğrula
+"""
+import sys
+from sunucu.veritabani import SessionLocal
+from sunucu.servisler.sayac_servisi import sayaclari_dogrula
+
+
+def main():
+    sadece_dogrula = "--dogrula" in sys.argv
+    db = SessionLocal()
+    try:
+        print("🔍 Araç sayaçları ham tablolarla karşılaştırılıyor...")
+        farklar = sayaclari_dogrula(db, onar=not sadece_dogrula)
+        if not farklar:
+            print("✅ Sayaçlar tutarlı")
+            return
+
+        print(f"{'❌' if sadece_dogrula else '🔨'} {len(farklar)} araçta tutarsız sayaç bulundu:")
+        for fark in farklar[:20]:
+            print(f"   - {fark}")
+        if sadece_dogrula:
+            sys.exit(1)
+        print("✅ Sayaçlar onarıldı")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
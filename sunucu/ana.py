@@ -2,12 +2,16 @@
 FastAPI Uygulama Giris Noktasi
 Ana uygulama ve temel endpoint'leri icerir.
 """
-from fastapi import FastAPI, Depends, Request
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import FastAPI, Depends
 from sqlalchemy.orm import Session
-from sunucu.veritabani import veritabani_baglantisi_al, engine, Base
+from anyio import to_thread
+from sunucu.veritabani import veritabani_baglantisi_al, engine, async_engine, Base, HAVUZ_AYARLARI, REPLIKA_ENGINELERI, havuz_durumu, havuz_butcesini_dogrula
 from sunucu.ayarlar import ayarlar
+from sunucu.ara_katmanlar.cors import CorsAraKatmani
+from sunucu.ara_katmanlar.son_yazma import SonYazmaAraKatmani
+from sunucu.servisler.auth_servisi import kullanici_onbellegi
+from sunucu.servisler.onbellek_servisi import istatistik_onbellegi
+from sunucu.servisler.telemetri_servisi import kilometre_tamponu, kilometre_yazici
 
 # FastAPI uygulama instance'i
 uygulama = FastAPI(
@@ -18,41 +22,17 @@ uygulama = FastAPI(
 )
 
 
-# ÖZEL CORS Middleware - OPTIONS İsteklerini Middleware Seviyesinde Yakala
-class ForceCorsMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # 1. OPTIONS İsteği mi? Direkt 200 OK Dön (Router'a gitme!)
-        if request.method == "OPTIONS":
-            response = JSONResponse(content="OK")
-        else:
-            # 2. Değilse normal işleyişe devam et
-            try:
-                response = await call_next(request)
-            except Exception as e:
-                print(f"Hata yakalandi: {e}")
-                response = JSONResponse(
-                    content={"detail": "Sunucu Hatasi"}, 
-                    status_code=500
-                )
-        
-        # 3. Headers'ı ZORLA Ekle (Her durumda)
-        origin = request.headers.get("origin")
-        
-        # Eğer Origin varsa onu geri yansıt (Regex yerine dinamik çözüm)
-        if origin:
-            response.headers["Access-Control-Allow-Origin"] = origin
-        else:
-            response.headers["Access-Control-Allow-Origin"] = "*"
-            
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS, PATCH"
-        response.headers["Access-Control-Allow-Headers"] = "Authorization, Content-Type, Accept, Origin, X-Requested-With"
-        
-        return response
-
-
-# Middleware'i ekle (En üstte!)
-uygulama.add_middleware(ForceCorsMiddleware)
+# Replika varsa yazma sonrası okumaları birincile sabitleyen imzalı cookie/header
+# (CORS'tan önce eklenir ki CORS en dışta kalsın)
+if REPLIKA_ENGINELERI:
+    uygulama.add_middleware(SonYazmaAraKatmani, yapiskanlik_suresi=ayarlar.VERITABANI_REPLIKA_YAPISKANLIK_SURESI)
+
+# CORS Middleware - OPTIONS isteklerini router'a gitmeden yakalar (saf ASGI)
+uygulama.add_middleware(
+    CorsAraKatmani,
+    izinli_originler=ayarlar.CORS_IZINLI_ORIGINLER.split(","),
+    onbellek_suresi=ayarlar.CORS_ONBELLEK_SURESI
+)
 
 # @uygulama.middleware("http")  <-- Manuel middleware devre dışı bırakıldı
 # async def log_requests(request: Request, call_next):
@@ -68,12 +48,27 @@ async def baslangic():
     print("🚀 Uygulama baslatiliyor...")
     print(f"📊 Hata ayiklama modu: {ayarlar.HATA_AYIKLAMA_MODU}")
     print(f"🗄️  Veritabani: {ayarlar.VERITABANI_ADI}")
+    
+    # Sync endpoint'ler AnyIO threadpool'unda çalışır; boyutu havuz ile birlikte ayarlanır
+    to_thread.current_default_thread_limiter().total_tokens = HAVUZ_AYARLARI.threadpool_boyutu
+    print(
+        f"🔌 Bağlantı havuzu: {HAVUZ_AYARLARI.havuz_boyutu}+{HAVUZ_AYARLARI.tasma}, "
+        f"threadpool: {HAVUZ_AYARLARI.threadpool_boyutu}, "
+        f"async havuz: {HAVUZ_AYARLARI.async_havuz_boyutu}+{HAVUZ_AYARLARI.async_tasma}"
+    )
+    await to_thread.run_sync(havuz_butcesini_dogrula)
+    
+    # Kilometre telemetrisi tamponunu aralıklarla yazan arka plan görevi
+    kilometre_yazici.baslat()
 
 
 @uygulama.on_event("shutdown")
 async def kapanis():
     """Uygulama kapatildiginda calisir."""
     print("👋 Uygulama kapatiliyor...")
+    # Tamponda kalan kilometre okumaları engine kapanmadan yazılır
+    await kilometre_yazici.durdur()
+    await async_engine.dispose()
 
 
 @uygulama.get("/")
@@ -96,7 +91,8 @@ async def ana_sayfa():
 async def saglik_kontrol(db: Session = Depends(veritabani_baglantisi_al)):
     """
     Sistem saglik kontrolu endpoint'i
-    Veritabani baglantisini test eder.
+    Veritabani baglantisini test eder, baglanti havuzu doluluk ve
+    bekleme surelerini dondurur (havuz doygunlugunu izlemek icin).
     
     Args:
         db: Veritabani session'i (dependency injection)
@@ -115,6 +111,12 @@ async def saglik_kontrol(db: Session = Depends(veritabani_baglantisi_al)):
     return {
         "durum": "Calisiyor",
         "veritabani": veritabani_durumu,
+        "veritabani_havuzu": havuz_durumu(),
+        "onbellekler": {
+            "kullanici": kullanici_onbellegi.istatistik(),
+            "istatistik": istatistik_onbellegi.istatistik(),
+        },
+        "kilometre_telemetrisi": kilometre_tamponu.istatistik(),
         "versiyon": "1.0.0"
     }
 
@@ -175,6 +177,14 @@ uygulama.include_router(
     prefix="/api/v1",
 )
 
+# Toplu İstek Router (birden fazla GET isteği tek istekte)
+from sunucu.yonlendiriciler import toplu_yonlendirici
+uygulama.include_router(
+    toplu_yonlendirici.router,
+    prefix="/api/v1",
+    tags=["Toplu İstek"]
+)
+
 # TEMPORARY: Admin Import Router (Veri yüklemesi için)
 from sunucu.yonlendiriciler import admin_import
 uygulama.include_router(
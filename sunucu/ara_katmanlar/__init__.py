@@ -0,0 +1,4 @@
+"""
+Ara Katmanlar Modülü
+Saf ASGI middleware'lerini içerir.
+"""
@@ -0,0 +1,117 @@
+"""
+CORS Ara Katmanı (Saf ASGI)
+BaseHTTPMiddleware yerine doğrudan ASGI seviyesinde çalışır;
+ekstra task ve memory-stream aktarımı olmadan CORS header'larını ekler.
+"""
+import re
+from typing import Iterable, List, Optional, Tuple
+
+IZINLI_METODLAR = "GET, POST, PUT, DELETE, OPTIONS, PATCH"
+IZINLI_HEADERLAR = "Authorization, Content-Type, Accept, Origin, X-Requested-With, X-Last-Write"
+DISA_ACIK_HEADERLAR = "X-Next-Cursor, X-Last-Write"  # Tarayıcıda JS'in okuyabileceği yanıt header'ları
+
+Baslik = Tuple[bytes, bytes]
+
+
+class CorsAraKatmani:
+    """
+    Origin allow-list'ini ve sabit header'ları başlangıçta bir kez derler.
+
+    - OPTIONS istekleri router'a gitmeden 200 OK ile cevaplanır
+      ve `Access-Control-Max-Age` ile tarayıcıda önbelleğe alınır.
+    - Origin header'ı yoksa `*` döner, izinli origin ise geri yansıtılır.
+    - Uygulamada yakalanmayan hata olursa 500 yanıtı da CORS header'ları ile döner.
+    """
+
+    def __init__(self, app, izinli_originler: Iterable[str] = ("*",), onbellek_suresi: int = 600):
+        self.app = app
+
+        originler = [o.strip().rstrip("/") for o in izinli_originler if o.strip()]
+        self.tum_originler = "*" in originler
+        self.sabit_originler = frozenset(o for o in originler if "*" not in o)
+
+        # "https://*.vercel.app" gibi joker karakterli originleri tek regex'e derle
+        desenler = [
+            re.escape(o).replace(r"\*", r"[^/]+")
+            for o in originler if "*" in o and o != "*"
+        ]
+        self.origin_deseni = re.compile("|".join(desenler)) if desenler else None
+
+        # Her istekte tekrar oluşturulmaması için header'lar bytes olarak hazır
+        self.ortak_basliklar: List[Baslik] = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-allow-methods", IZINLI_METODLAR.encode("latin-1")),
+            (b"access-control-allow-headers", IZINLI_HEADERLAR.encode("latin-1")),
+            (b"access-control-expose-headers", DISA_ACIK_HEADERLAR.encode("latin-1")),
+        ]
+        self.on_kontrol_govdesi = b'"OK"'
+        self.on_kontrol_basliklari: List[Baslik] = self.ortak_basliklar + [
+            (b"access-control-max-age", str(onbellek_suresi).encode("latin-1")),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self.on_kontrol_govdesi)).encode("latin-1")),
+        ]
+        self.hata_govdesi = b'{"detail":"Sunucu Hatasi"}'
+        self.hata_basliklari: List[Baslik] = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self.hata_govdesi)).encode("latin-1")),
+        ]
+
+    def origin_izinli_mi(self, origin: str) -> bool:
+        """Origin'in allow-list'te olup olmadığını kontrol eder."""
+        if self.tum_originler or origin in self.sabit_originler:
+            return True
+        return bool(self.origin_deseni and self.origin_deseni.fullmatch(origin))
+
+    def origin_basliklari(self, origin: Optional[bytes]) -> List[Baslik]:
+        """İsteğin origin'ine göre eklenecek header listesini döndürür."""
+        if origin is None:
+            return [(b"access-control-allow-origin", b"*")]
+        if self.origin_izinli_mi(origin.decode("latin-1")):
+            return [(b"access-control-allow-origin", origin), (b"vary", b"Origin")]
+        return []
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        for anahtar, deger in scope["headers"]:
+            if anahtar == b"origin":
+                origin = deger
+                break
+
+        ek_basliklar = self.origin_basliklari(origin)
+
+        # 1. OPTIONS isteği: router'a gitmeden önbelleğe alınabilir 200 OK dön
+        if scope["method"] == "OPTIONS":
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": ek_basliklar + self.on_kontrol_basliklari,
+            })
+            await send({"type": "http.response.body", "body": self.on_kontrol_govdesi})
+            return
+
+        # 2. Diğer istekler: yanıt başlatılırken header'ları ekle
+        yanit_basladi = False
+
+        async def basliklari_ekle(mesaj):
+            nonlocal yanit_basladi
+            if mesaj["type"] == "http.response.start":
+                yanit_basladi = True
+                mesaj["headers"] = list(mesaj.get("headers", [])) + ek_basliklar + self.ortak_basliklar
+            await send(mesaj)
+
+        try:
+            await self.app(scope, receive, basliklari_ekle)
+        except Exception as e:
+            if yanit_basladi:
+                raise
+            print(f"Hata yakalandi: {e}")
+            await send({
+                "type": "http.response.start",
+                "status": 500,
+                "headers": ek_basliklar + self.ortak_basliklar + self.hata_basliklari,
+            })
+            await send({"type": "http.response.body", "body": self.hata_govdesi})
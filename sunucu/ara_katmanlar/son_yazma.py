@@ -0,0 +1,55 @@
+"""
+Son Yazma Ara Katmanı (Saf ASGI)
+Replika okumalarında read-your-writes için istemcinin son yazma zamanını
+imzalı cookie/header ile taşır (bkz. sunucu.veritabani.SonYazmaIzi).
+"""
+import math
+from typing import Optional
+
+from starlette.requests import cookie_parser
+
+from sunucu.veritabani import SON_YAZMA_COOKIE, SON_YAZMA_HEADER, SON_YAZMA_KAPSAMI, SonYazmaIzi
+
+
+class SonYazmaAraKatmani:
+    """
+    Her HTTP isteğinin scope'una bir SonYazmaIzi koyar.
+
+    - İstekteki `X-Last-Write` header'ı, yoksa `son_yazma` cookie'si okunur.
+      Header, cookie göndermeyen (örn. farklı origin'deki) istemciler içindir.
+    - İstek sırasında yazma yapan bir session commit edilirse yanıt
+      başlatılırken yeni değer hem cookie hem header olarak eklenir.
+    """
+
+    def __init__(self, app, yapiskanlik_suresi: float):
+        self.app = app
+        self.header_adi = SON_YAZMA_HEADER.lower().encode("latin-1")
+        self.cookie_ozellikleri = f"; Max-Age={math.ceil(yapiskanlik_suresi)}; Path=/; HttpOnly; SameSite=Lax"
+
+    def istek_degeri(self, scope) -> Optional[str]:
+        """İstekteki imzalı son yazma değerini döndürür (header öncelikli)."""
+        cookie = None
+        for anahtar, deger in scope["headers"]:
+            if anahtar == self.header_adi:
+                return deger.decode("latin-1")
+            if anahtar == b"cookie":
+                cookie = deger.decode("latin-1")
+        return cookie_parser(cookie).get(SON_YAZMA_COOKIE) if cookie else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        iz = SonYazmaIzi(self.istek_degeri(scope))
+        scope[SON_YAZMA_KAPSAMI] = iz
+
+        async def basliklari_ekle(mesaj):
+            if mesaj["type"] == "http.response.start" and iz.yeni_deger is not None:
+                mesaj["headers"] = list(mesaj.get("headers", [])) + [
+                    (b"set-cookie", f"{SON_YAZMA_COOKIE}={iz.yeni_deger}{self.cookie_ozellikleri}".encode("latin-1")),
+                    (self.header_adi, iz.yeni_deger.encode("latin-1")),
+                ]
+            await send(mesaj)
+
+        await self.app(scope, receive, basliklari_ekle)
@@ -17,6 +17,22 @@ class Ayarlar(BaseSettings):
     VERITABANI_KULLANICI: str = "root"
     VERITABANI_SIFRE: str = ""
     
+    # Bağlantı Havuzu Ayarları (boş bırakılanlar otomatik hesaplanır, bkz. veritabani.havuz_ayarlarini_hesapla)
+    WORKER_SAYISI: int = 1  # uvicorn/gunicorn worker (süreç) sayısı
+    THREADPOOL_BOYUTU: Optional[int] = None  # Sync endpoint'leri çalıştıran thread sayısı (AnyIO varsayılanı: 40)
+    VERITABANI_HAVUZ_BOYUTU: Optional[int] = None  # Worker başına açık tutulan bağlantı sayısı
+    VERITABANI_HAVUZ_TASMA: Optional[int] = None  # Yoğunlukta havuz boyutunun üzerine açılabilecek bağlantı sayısı
+    VERITABANI_ASYNC_HAVUZ_BOYUTU: Optional[int] = None  # Async engine için worker başına açık bağlantı sayısı
+    VERITABANI_ASYNC_HAVUZ_TASMA: Optional[int] = None  # Async engine için taşma bağlantı sayısı
+    VERITABANI_HAVUZ_ZAMAN_ASIMI: int = 30  # Boş bağlantı için en fazla bekleme (saniye)
+    VERITABANI_MAKS_BAGLANTI: Optional[int] = None  # Sunucunun max_connections değeri (boşsa 100 varsayılır, başlangıçta sunucudaki değerle karşılaştırılır)
+    VERITABANI_YEDEK_BAGLANTI: int = 5  # Migration/yönetim araçları için ayrılan bağlantı sayısı
+    VERITABANI_HAVUZ_UYARI_ESIGI: float = 0.1  # Bu süreden (saniye) uzun havuz beklemeleri loglanır
+    
+    # Okuma Replikaları (boşsa tüm sorgular birincil veritabanına gider)
+    VERITABANI_REPLIKA_URLLERI: str = ""  # Virgülle ayrılmış sync SQLAlchemy URL'leri, örn: "postgresql+psycopg2://u:p@replika1:5432/arac_takip"
+    VERITABANI_REPLIKA_YAPISKANLIK_SURESI: float = 5.0  # Yazma sonrası kullanıcının okumalarının birincil veritabanından yapılacağı süre (saniye; worker'lar arasında imzalı son_yazma cookie'si / X-Last-Write header'ı ile taşınır)
+    
     # Uygulama Ayarlari
     HATA_AYIKLAMA_MODU: bool = True
     GUNLUK_SEVIYESI: str = "INFO"
@@ -25,6 +41,25 @@ class Ayarlar(BaseSettings):
     SECRET_KEY: str = None  # ZORUNLU: .env dosyasından okunmalı
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    KULLANICI_ONBELLEK_BOYUTU: int = 10000  # Süreç içi kullanıcı durum önbelleği (kayıt sayısı)
+    KULLANICI_ONBELLEK_SURESI: int = 60  # Önbellek kaydının geçerlilik süresi (saniye)
+    ISTATISTIK_ONBELLEK_BOYUTU: int = 10000  # İstatistik sonuç önbelleği (kayıt sayısı)
+    ISTATISTIK_ONBELLEK_SURESI: int = 300  # İstatistik sonucunun önbellekte kalma süresi (saniye)
+    
+    # CORS Ayarları
+    CORS_IZINLI_ORIGINLER: str = "*"  # Virgülle ayrılmış liste, örn: "https://app.vercel.app,https://*.vercel.app"
+    CORS_ONBELLEK_SURESI: int = 600  # Preflight (OPTIONS) yanıtının tarayıcıda önbellekte kalma süresi (saniye)
+    
+    # İçe Aktarma Ayarları
+    ICE_AKTARMA_PARCA_BOYUTU: int = 1000  # NDJSON import'ta tek INSERT ile yazılan satır sayısı
+    
+    # Toplu İstek Ayarları (POST /api/v1/batch)
+    TOPLU_ISTEK_LIMITI: int = 20  # Tek toplu istekteki en fazla alt istek sayısı
+    TOPLU_ISTEK_ESZAMANLILIGI: int = 4  # Eş zamanlı modda aynı anda çalışan alt istek sayısı
+    
+    # Kilometre Telemetrisi (POST /api/v1/araclar/kilometre/telemetri)
+    TELEMETRI_BOSALTMA_ARALIGI: float = 1.0  # Tampondaki okumaların veritabanına yazılma aralığı (saniye)
+    TELEMETRI_TAMPON_SINIRI: int = 50000  # Tampondaki araç sayısı bunu aşınca aralık beklenmeden yazılır
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
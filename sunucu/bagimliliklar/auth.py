@@ -2,50 +2,124 @@
 Authentication Dependencies
 JWT token doğrulama ve kullanıcı bilgisi çıkarma
 """
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from typing import NamedTuple
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sunucu.veritabani import veritabani_baglantisi_al
+from sunucu.veritabani import veritabani_baglantisi_al, async_veritabani_baglantisi_al, TOPLU_ISTEK_KAPSAMI
 from sunucu.modeller.kullanici import Kullanicilar
-from sunucu.servisler.auth_servisi import token_dogrula, email_ile_kullanici_getir
+from sunucu.servisler.auth_servisi import token_dogrula, email_ile_kullanici_getir, kullanici_durumu_getir
 
 # OAuth2 scheme - token URL
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/giris")
 
 
-async def mevcut_kullanici_al(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(veritabani_baglantisi_al)
-) -> Kullanicilar:
+class Kimlik(NamedTuple):
     """
-    Token'dan kullanıcı bilgisi çıkarır.
-    Korumalı endpoint'lerde dependency olarak kullanılır.
+    Token'dan çözülen kullanıcı kimliği.
+    Veritabanı satırı değildir; tam kayıt gerekiyorsa mevcut_kullanici_kaydi_al kullanılmalıdır.
     """
-    credentials_exception = HTTPException(
+    id: int
+    email: str
+    rol: str
+
+
+def _kimlik_hatasi() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Kimlik doğrulanamadı",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def _kimligi_coz(token: str, db: Session) -> Kimlik:
+    """
+    Token'ı doğrulayıp kullanıcı kimliğini döndürür.
+
+    Token kullanıcı id, rol ve token versiyonunu taşır; bunlar süreç içi
+    önbellekteki (aktif_mi, rol, token_versiyonu) ile doğrulanır. Önbellek
+    sıcakken veritabanına hiç sorgu gitmez.
+    """
     # Token doğrulama
     payload = token_dogrula(token)
     if payload is None:
-        raise credentials_exception
-    
+        raise _kimlik_hatasi()
+
     email: str = payload.get("sub")
     if email is None:
-        raise credentials_exception
-    
-    # Kullanıcıyı veritabanından getir
-    kullanici = email_ile_kullanici_getir(db, email=email)
-    if kullanici is None:
-        raise credentials_exception
-    
-    if not kullanici.aktif_mi:
+        raise _kimlik_hatasi()
+
+    kullanici_id = payload.get("uid")
+    if kullanici_id is None:
+        # Eski formattaki token (sadece e-posta içerir)
+        kullanici = email_ile_kullanici_getir(db, email=email)
+        if kullanici is None:
+            raise _kimlik_hatasi()
+        kullanici_id = kullanici.id
+
+    durum = kullanici_durumu_getir(db, kullanici_id)
+    if durum is None or durum.token_versiyonu != payload.get("tv", 0):
+        raise _kimlik_hatasi()
+
+    if not durum.aktif_mi:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Kullanıcı hesabı devre dışı"
         )
-    
+
+    # Replika yönlendirmesi kullanıcının yakın zamanda yazma yapıp yapmadığına bakar
+    db.info["kullanici_id"] = kullanici_id
+    return Kimlik(id=kullanici_id, email=email, rol=durum.rol)
+
+
+def _toplu_kimlik(request: Request, db: Session):
+    """Toplu isteğin alt isteğinde, toplu istek için bir kez çözülmüş kimlik."""
+    baglam = request.scope.get(TOPLU_ISTEK_KAPSAMI)
+    if baglam is None:
+        return None
+    db.info["kullanici_id"] = baglam.kimlik.id
+    return baglam.kimlik
+
+
+async def mevcut_kullanici_al(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(veritabani_baglantisi_al)
+) -> Kimlik:
+    """
+    Token'dan kullanıcı kimliği çıkarır.
+    Korumalı endpoint'lerde dependency olarak kullanılır.
+    """
+    return _toplu_kimlik(request, db) or _kimligi_coz(token, db)
+
+
+async def async_mevcut_kullanici_al(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(async_veritabani_baglantisi_al)
+) -> Kimlik:
+    """
+    mevcut_kullanici_al'ın async endpoint'ler için karşılığı.
+    Endpoint ile aynı AsyncSession'ı kullanır, sync session açmaz.
+    """
+    kimlik = _toplu_kimlik(request, db.sync_session)
+    if kimlik is not None:
+        return kimlik
+    return await db.run_sync(lambda oturum: _kimligi_coz(token, oturum))
+
+
+def mevcut_kullanici_kaydi_al(
+    kimlik: Kimlik = Depends(mevcut_kullanici_al),
+    db: Session = Depends(veritabani_baglantisi_al)
+) -> Kullanicilar:
+    """
+    Giriş yapmış kullanıcının tam veritabanı kaydını getirir.
+    Profil görüntüleme/güncelleme ve şifre değişikliği gibi satırın kendisine
+    ihtiyaç duyan endpoint'lerde kullanılır.
+    """
+    kullanici = db.get(Kullanicilar, kimlik.id)
+    if kullanici is None:
+        raise _kimlik_hatasi()
     return kullanici
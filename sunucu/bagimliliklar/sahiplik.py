@@ -3,20 +3,20 @@ Araç Sahiplik Kontrolü - Dependency Injection
 FastAPI dependency fonksiyonları ile temiz ve modüler sahiplik kontrolü
 """
 from fastapi import HTTPException, status, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sunucu.modeller.arac import Araclar
-from sunucu.modeller.kullanici import Kullanicilar
 from sunucu.modeller.bakim import Bakimlar
 from sunucu.modeller.harcama import Harcamalar
 from sunucu.modeller.yakit_takibi import Yakit_Takibi as YakitKayitlari
-from sunucu.veritabani import veritabani_baglantisi_al
-from sunucu.bagimliliklar.auth import mevcut_kullanici_al
+from sunucu.veritabani import veritabani_baglantisi_al, async_veritabani_baglantisi_al
+from sunucu.bagimliliklar.auth import mevcut_kullanici_al, async_mevcut_kullanici_al, Kimlik
 
 
 def arac_sahipligini_dogrula(
     arac_id: int,
     db: Session = Depends(veritabani_baglantisi_al),
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
+    kullanici: Kimlik = Depends(mevcut_kullanici_al)
 ) -> Araclar:
     """
     Araç sahipliğini doğrula
@@ -32,7 +32,8 @@ def arac_sahipligini_dogrula(
     Raises:
         HTTPException: 404 araç bulunamadı, 403 yetkisiz erişim
     """
-    arac = db.query(Araclar).filter(Araclar.id == arac_id).first()
+    # Aynı session'da (örn. toplu istek) daha önce yüklendiyse identity map'ten gelir, sorgu gitmez
+    arac = db.get(Araclar, arac_id)
     
     if not arac:
         raise HTTPException(
@@ -40,6 +41,9 @@ def arac_sahipligini_dogrula(
             detail="Araç bulunamadı"
         )
     
+    # Identity map zayıf referans tutar; araç session boyunca bellekte kalsın
+    db.info.setdefault("yuklenen_araclar", {})[arac_id] = arac
+    
     # Yönetici ise erişebilir
     if kullanici.rol == 'admin':
         return arac
@@ -53,97 +57,96 @@ def arac_sahipligini_dogrula(
     return arac
 
 
-def bakim_sahipligini_dogrula(
-    bakim_id: int,
-    db: Session = Depends(veritabani_baglantisi_al),
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
-) -> Bakimlar:
+async def async_arac_sahipligini_dogrula(
+    arac_id: int,
+    db: AsyncSession = Depends(async_veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(async_mevcut_kullanici_al)
+) -> Araclar:
     """
-    Bakım kaydı sahipliğini doğrula (araç üzerinden)
+    Araç sahipliğini async endpoint'ler için doğrula (bkz. arac_sahipligini_dogrula)
+    """
+    return await db.run_sync(lambda oturum: arac_sahipligini_dogrula(arac_id, oturum, kullanici))
+
+
+def _kayit_sahipligini_dogrula(
+    db: Session,
+    model,
+    kayit_id: int,
+    kullanici: Kimlik,
+    bulunamadi_mesaji: str,
+    yetkisiz_mesaji: str
+):
     """
-    bakim = db.query(Bakimlar).filter(Bakimlar.id == bakim_id).first()
+    Araca bağlı bir kaydın sahipliğini tek sorguda doğrular.
     
-    if not bakim:
+    Kayıt, aracın kullanici_id'si ile birlikte tek JOIN sorgusunda okunur.
+    Yönetici için araç tablosuna hiç gidilmez.
+    """
+    # Yönetici ise erişebilir, sahiplik bilgisine gerek yok
+    if kullanici.rol == 'admin':
+        kayit = db.query(model).filter(model.id == kayit_id).first()
+        sahip_id = None
+    else:
+        satir = db.query(model, Araclar.kullanici_id).outerjoin(
+            Araclar, Araclar.id == model.arac_id
+        ).filter(model.id == kayit_id).first()
+        kayit, sahip_id = satir if satir else (None, None)
+    
+    if not kayit:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Bakım kaydı bulunamadı"
+            detail=bulunamadi_mesaji
         )
     
-    # Bakımın ait olduğu aracı kontrol et
-    arac = db.query(Araclar).filter(Araclar.id == bakim.arac_id).first()
-    
-    # Yönetici ise erişebilir
-    if kullanici.rol == 'admin':
-        return bakim
-    
-    if not arac or arac.kullanici_id != kullanici.id:
+    if kullanici.rol != 'admin' and sahip_id != kullanici.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Bu bakım kaydına erişim yetkiniz yok"
+            detail=yetkisiz_mesaji
         )
     
-    return bakim
+    return kayit
+
+
+def bakim_sahipligini_dogrula(
+    bakim_id: int,
+    db: Session = Depends(veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(mevcut_kullanici_al)
+) -> Bakimlar:
+    """
+    Bakım kaydı sahipliğini doğrula (araç üzerinden)
+    """
+    return _kayit_sahipligini_dogrula(
+        db, Bakimlar, bakim_id, kullanici,
+        "Bakım kaydı bulunamadı",
+        "Bu bakım kaydına erişim yetkiniz yok"
+    )
 
 
 def harcama_sahipligini_dogrula(
     harcama_id: int,
     db: Session = Depends(veritabani_baglantisi_al),
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
+    kullanici: Kimlik = Depends(mevcut_kullanici_al)
 ) -> Harcamalar:
     """
     Harcama kaydı sahipliğini doğrula (araç üzerinden)
     """
-    harcama = db.query(Harcamalar).filter(Harcamalar.id == harcama_id).first()
-    
-    if not harcama:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Harcama kaydı bulunamadı"
-        )
-    
-    # Harcamanın ait olduğu aracı kontrol et
-    arac = db.query(Araclar).filter(Araclar.id == harcama.arac_id).first()
-    
-    # Yönetici ise erişebilir
-    if kullanici.rol == 'admin':
-        return harcama
-        
-    if not arac or arac.kullanici_id != kullanici.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Bu harcama kaydına erişim yetkiniz yok"
-        )
-    
-    return harcama
+    return _kayit_sahipligini_dogrula(
+        db, Harcamalar, harcama_id, kullanici,
+        "Harcama kaydı bulunamadı",
+        "Bu harcama kaydına erişim yetkiniz yok"
+    )
 
 
 def yakit_sahipligini_dogrula(
     yakit_id: int,
     db: Session = Depends(veritabani_baglantisi_al),
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
+    kullanici: Kimlik = Depends(mevcut_kullanici_al)
 ) -> YakitKayitlari:
     """
     Yakıt kaydı sahipliğini doğrula (araç üzerinden)
     """
-    yakit = db.query(YakitKayitlari).filter(YakitKayitlari.id == yakit_id).first()
-    
-    if not yakit:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Yakıt kaydı bulunamadı"
-        )
-    
-    # Yakıt kaydının ait olduğu aracı kontrol et
-    arac = db.query(Araclar).filter(Araclar.id == yakit.arac_id).first()
-    
-    # Yönetici ise erişebilir
-    if kullanici.rol == 'admin':
-        return yakit
-        
-    if not arac or arac.kullanici_id != kullanici.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Bu yakıt kaydına erişim yetkiniz yok"
-        )
-    
-    return yakit
+    return _kayit_sahipligini_dogrula(
+        db, YakitKayitlari, yakit_id, kullanici,
+        "Yakıt kaydı bulunamadı",
+        "Bu yakıt kaydına erişim yetkiniz yok"
+    )
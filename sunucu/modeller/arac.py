@@ -2,7 +2,7 @@
 Araclar Modeli
 Kullanicinin sahip oldugu araclarin bilgilerini tutar.
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Index, text, Column, Integer, String, Boolean, Date, DateTime, Numeric, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sunucu.veritabani import Base
@@ -12,6 +12,14 @@ class Araclar(Base):
     """Araclar tablosu - Arac bilgilerini saklar"""
     
     __tablename__ = "araclar"
+    __table_args__ = (
+        # Silinmemis araclar: WHERE kullanici_id = ? AND silinmis_mi = false ORDER BY id (imlec sayfalamasi)
+        Index(
+            "ix_araclar_aktif_kullanici_id_id", "kullanici_id", "id",
+            postgresql_where=text("silinmis_mi = false"),
+            sqlite_where=text("silinmis_mi = 0"),
+        ),
+    )
     
     # Primary Key
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -34,6 +42,16 @@ class Araclar(Base):
     aktif_mi = Column(Boolean, default=True, comment="Arac aktif mi?")
     silinmis_mi = Column(Boolean, default=False, index=True, comment="Soft delete bayragi")
     
+    # Sayaclar (yazma servisleri tarafindan guncellenir, bkz. sayac_servisi)
+    toplam_bakim_maliyeti = Column(Numeric(14, 2), nullable=False, default=0, comment="Silinmemis bakimlarin toplam tutari")
+    toplam_harcama = Column(Numeric(14, 2), nullable=False, default=0, comment="Silinmemis harcamalarin toplam tutari")
+    toplam_yakit_maliyeti = Column(Numeric(14, 2), nullable=False, default=0, comment="Silinmemis yakit kayitlarinin toplam tutari")
+    toplam_yakit_litre = Column(Numeric(12, 2), nullable=False, default=0, comment="Silinmemis yakit kayitlarinin toplam litresi")
+    son_bakim_km = Column(Integer, comment="En son bakimin kilometresi")
+    son_bakim_tarihi = Column(Date, comment="En son bakimin tarihi")
+    sonraki_bakim_km = Column(Integer, comment="En son bakimda belirlenen sonraki bakim kilometresi")
+    son_yakit_km = Column(Integer, comment="Yakit kayitlarindaki en yuksek kilometre")
+    
     # Zaman Damgalari
     olusturulma_tarihi = Column(DateTime(timezone=True), server_default=func.now(), comment="Olusturulma zamani")
     guncellenme_tarihi = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), comment="Guncellenme zamani")
@@ -0,0 +1,41 @@
+"""
+Aylik Ozetler Modeli
+Harcama, yakit ve bakim kayitlarinin arac/ay/kategori bazinda toplamlarini tutar.
+Yazma servisleri tarafindan ayni transaction icinde guncel tutulur.
+"""
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Numeric, UniqueConstraint
+from sunucu.veritabani import Base
+
+
+# Ozet turleri
+OZET_HARCAMA = "harcama"
+OZET_YAKIT = "yakit"
+OZET_BAKIM = "bakim"
+
+
+class AylikOzetler(Base):
+    """Aylik_ozetler tablosu - Istatistik endpoint'leri icin aylik toplamlar"""
+
+    __tablename__ = "aylik_ozetler"
+    __table_args__ = (
+        UniqueConstraint("arac_id", "ay", "tur", "kategori", name="uq_aylik_ozet"),
+    )
+
+    # Primary Key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Foreign Key
+    arac_id = Column(Integer, ForeignKey("araclar.id", ondelete="CASCADE"), nullable=False, index=True, comment="Arac ID")
+
+    # Ozet Anahtari
+    ay = Column(Date, nullable=False, index=True, comment="Ayin ilk gunu")
+    tur = Column(String(20), nullable=False, comment="Ozet turu (harcama, yakit, bakim)")
+    kategori = Column(String(100), nullable=False, default="", comment="Harcama kategorisi / yakit turu / bakim turu")
+
+    # Toplamlar
+    toplam_tutar = Column(Numeric(14, 2), nullable=False, default=0, comment="Toplam tutar")
+    toplam_litre = Column(Numeric(12, 2), nullable=False, default=0, comment="Toplam litre (sadece yakit)")
+    adet = Column(Integer, nullable=False, default=0, comment="Kayit sayisi")
+
+    def __repr__(self):
+        return f"<AylikOzet(arac_id={self.arac_id}, ay='{self.ay}', tur='{self.tur}', kategori='{self.kategori}')>"
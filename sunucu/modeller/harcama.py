@@ -2,7 +2,7 @@
 Harcamalar Modeli
 Aracla ilgili genel harcamalari tutar.
 """
-from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, ForeignKey, Numeric, Text
+from sqlalchemy import Index, text, Column, Integer, String, Date, DateTime, Boolean, ForeignKey, Numeric, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sunucu.veritabani import Base
@@ -12,6 +12,16 @@ class Harcamalar(Base):
     """Harcamalar tablosu - Genel harcama kayitlarini saklar"""
     
     __tablename__ = "harcamalar"
+    __table_args__ = (
+        # Silinmemis kayitlar: WHERE arac_id = ? AND silinmis_mi = false ORDER BY tarih DESC, id DESC
+        # (imlec sayfalamasi; PostgreSQL'de kategori bazli toplamlar index'ten okunur)
+        Index(
+            "ix_harcamalar_aktif_arac_tarih_id", "arac_id", "tarih", "id",
+            postgresql_where=text("silinmis_mi = false"),
+            sqlite_where=text("silinmis_mi = 0"),
+            postgresql_include=["kategori", "tutar"],
+        ),
+    )
     
     # Primary Key
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
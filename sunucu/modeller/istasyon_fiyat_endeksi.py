@@ -0,0 +1,36 @@
+"""
+Istasyon Fiyat Endeksi Modeli
+Yakit kayitlarinin kullanici/istasyon/yakit turu/hafta bazinda fiyat
+toplamlarini tutar. Yakit yazma servisleri tarafindan ayni transaction
+icinde guncel tutulur.
+"""
+from sqlalchemy import Index, Column, Integer, String, Date, ForeignKey, Numeric, UniqueConstraint
+from sunucu.veritabani import Base
+
+
+class IstasyonFiyatEndeksi(Base):
+    """Istasyon_fiyat_endeksi tablosu - Filo istasyon fiyat karsilastirmasi icin haftalik toplamlar"""
+
+    __tablename__ = "istasyon_fiyat_endeksi"
+    __table_args__ = (
+        UniqueConstraint("kullanici_id", "istasyon", "yakit_turu", "hafta", name="uq_istasyon_fiyat_endeksi"),
+        # Filo endeksi: WHERE kullanici_id = ? AND hafta >= ? [AND yakit_turu = ?]
+        Index("ix_istasyon_fiyat_endeksi_kullanici_hafta", "kullanici_id", "hafta"),
+    )
+
+    # Primary Key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Endeks Anahtari
+    kullanici_id = Column(Integer, ForeignKey("kullanicilar.id", ondelete="CASCADE"), nullable=False, comment="Arac sahibi kullanici")
+    istasyon = Column(String(100), nullable=False, comment="Yakit istasyonu")
+    yakit_turu = Column(String(20), nullable=False, comment="Yakit turu")
+    hafta = Column(Date, nullable=False, index=True, comment="Haftanin ilk gunu (pazartesi)")
+
+    # Toplamlar
+    toplam_litre = Column(Numeric(12, 2), nullable=False, default=0, comment="Toplam litre")
+    fiyat_litre_toplami = Column(Numeric(16, 4), nullable=False, default=0, comment="Litre fiyati x litre toplami (litre agirlikli ortalama icin)")
+    adet = Column(Integer, nullable=False, default=0, comment="Kayit sayisi")
+
+    def __repr__(self):
+        return f"<IstasyonFiyatEndeksi(kullanici_id={self.kullanici_id}, istasyon='{self.istasyon}', yakit_turu='{self.yakit_turu}', hafta='{self.hafta}')>"
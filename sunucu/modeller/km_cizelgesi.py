@@ -0,0 +1,33 @@
+"""
+Kilometre Zaman Cizelgesi Modeli
+Her arac icin bakim ve yakit kayitlarindaki (tarih, km) noktalarinin
+birlestirilmis, sirali ve paketlenmis dizisini tutar. Noktalar
+km_cizelgesi_servisi tarafindan kayit eklenip/guncellenip/silindikce
+artimli olarak guncellenir.
+"""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, LargeBinary
+from sqlalchemy.dialects import mysql
+from sqlalchemy.sql import func
+from sunucu.veritabani import Base
+
+
+class KmCizelgeleri(Base):
+    """Km_cizelgeleri tablosu - Arac basina tek satir"""
+
+    __tablename__ = "km_cizelgeleri"
+
+    # Primary Key / Foreign Key
+    arac_id = Column(Integer, ForeignKey("araclar.id", ondelete="CASCADE"), primary_key=True, comment="Arac ID")
+
+    # Sirali int64 (little-endian) anahtarlar: (tarih.toordinal() << 32) | km
+    nokta_sayisi = Column(Integer, nullable=False, default=0, comment="Cizelgedeki nokta sayisi")
+    # MySQL BLOB 64 KB (~8000 nokta) ile sinirli, MEDIUMBLOB kullanilir
+    noktalar = Column(
+        LargeBinary().with_variant(mysql.MEDIUMBLOB(), "mysql"),
+        nullable=False, default=b"", comment="Paketlenmis (tarih, km) anahtarlari"
+    )
+
+    guncellenme_tarihi = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), comment="Guncellenme zamani")
+
+    def __repr__(self):
+        return f"<KmCizelgeleri(arac_id={self.arac_id}, nokta_sayisi={self.nokta_sayisi})>"
@@ -20,6 +20,8 @@ class Kullanicilar(Base):
     olusturulma_tarihi = Column(DateTime, default=datetime.now)
     guncellenme_tarihi = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     rol = Column(String(20), default="kullanici", nullable=False)  # 'admin' veya 'kullanici'
+    token_versiyonu = Column(Integer, default=0, nullable=False)  # Artırılınca eski token'lar geçersiz olur
+    veri_versiyonu = Column(Integer, default=0, nullable=False, index=True)  # Verisi her değiştiğinde artar; en büyüğü admin önbellek anahtarı
     
     # İlişkiler
     araclar = relationship("Araclar", back_populates="kullanici", cascade="all, delete-orphan")
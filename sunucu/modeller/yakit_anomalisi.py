@@ -0,0 +1,42 @@
+"""
+Yakit Anomalileri Modeli
+Eklenirken aracin birikimli istatistiklerine gore supheli bulunan yakit
+kayitlarini tutar (olasi yakit hirsizligi, hatali giris, imkansiz dolum).
+"""
+from sqlalchemy import Index, Column, Integer, String, DateTime, ForeignKey, Numeric
+from sqlalchemy.sql import func
+from sunucu.veritabani import Base
+
+
+# Anomali turleri
+ANOMALI_TUKETIM = "tuketim"
+ANOMALI_FIYAT = "fiyat"
+ANOMALI_LITRE = "litre"
+
+
+class YakitAnomalileri(Base):
+    """Yakit_anomalileri tablosu - Supheli yakit kayitlari"""
+
+    __tablename__ = "yakit_anomalileri"
+    __table_args__ = (
+        # Arac anomalileri, en yeni once: WHERE arac_id = ? ORDER BY id DESC
+        Index("ix_yakit_anomalileri_arac_id_id", "arac_id", "id"),
+    )
+
+    # Primary Key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Foreign Key
+    yakit_id = Column(Integer, ForeignKey("yakit_takibi.id", ondelete="CASCADE"), nullable=False, index=True, comment="Yakit kaydi ID")
+    arac_id = Column(Integer, ForeignKey("araclar.id", ondelete="CASCADE"), nullable=False, comment="Arac ID")
+
+    # Bulgu
+    tur = Column(String(20), nullable=False, comment="Anomali turu (tuketim, fiyat, litre)")
+    deger = Column(Numeric(10, 2), nullable=False, comment="Kayittaki deger")
+    beklenen = Column(Numeric(10, 2), nullable=False, comment="Ortalama (tuketim, fiyat) veya en buyuk dolum (litre)")
+    skor = Column(Numeric(6, 2), nullable=False, comment="z-skoru (tuketim, fiyat) veya en buyuk doluma orani (litre)")
+
+    olusturulma_tarihi = Column(DateTime(timezone=True), server_default=func.now(), comment="Olusturulma zamani")
+
+    def __repr__(self):
+        return f"<YakitAnomalisi(yakit_id={self.yakit_id}, tur='{self.tur}', skor={self.skor})>"
@@ -0,0 +1,55 @@
+"""
+Yakit Istatistikleri Modeli
+Her arac icin yakit kayitlarinin birikimli istatistiklerini tutar
+(Welford ortalama/varyans, en buyuk dolum). Litre fiyati yakit turune gore
+degistigi icin fiyat istatistikleri arac ve yakit turu basina ayri tutulur.
+Anomali servisi her yeni yakit kaydinda satirlari O(1) gunceller.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Double, ForeignKey, Numeric
+from sqlalchemy.sql import func
+from sunucu.veritabani import Base
+
+
+class YakitIstatistikleri(Base):
+    """Yakit_istatistikleri tablosu - Arac basina tek satir"""
+
+    __tablename__ = "yakit_istatistikleri"
+
+    # Primary Key / Foreign Key
+    arac_id = Column(Integer, ForeignKey("araclar.id", ondelete="CASCADE"), primary_key=True, comment="Arac ID")
+
+    # Dolum sayisi (en buyuk dolum kontrolu icin)
+    dolum_adet = Column(Integer, nullable=False, default=0, comment="Istatistige eklenen dolum sayisi")
+
+    # Tuketim (tuketimi hesaplanan tam depo kayitlari)
+    tuketim_adet = Column(Integer, nullable=False, default=0, comment="Istatistige eklenen tuketim degeri sayisi")
+    tuketim_ortalama = Column(Double, nullable=False, default=0, comment="Tuketim ortalamasi (L/100km)")
+    tuketim_m2 = Column(Double, nullable=False, default=0, comment="Tuketim kare sapmalar toplami (Welford M2)")
+
+    # En buyuk dolum (litre anomalisi olarak isaretlenenler haric)
+    en_buyuk_litre = Column(Numeric(8, 2), comment="Gorulen en buyuk dolum")
+
+    guncellenme_tarihi = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), comment="Guncellenme zamani")
+
+    def __repr__(self):
+        return f"<YakitIstatistikleri(arac_id={self.arac_id}, dolum_adet={self.dolum_adet}, tuketim_adet={self.tuketim_adet})>"
+
+
+class YakitFiyatIstatistikleri(Base):
+    """Yakit_fiyat_istatistikleri tablosu - Arac ve yakit turu basina tek satir"""
+
+    __tablename__ = "yakit_fiyat_istatistikleri"
+
+    # Primary Key / Foreign Key
+    arac_id = Column(Integer, ForeignKey("araclar.id", ondelete="CASCADE"), primary_key=True, comment="Arac ID")
+    yakit_turu = Column(String(20), primary_key=True, comment="Yakit turu (Benzin, Dizel, LPG, Elektrik)")
+
+    # Litre fiyati (her dolum)
+    adet = Column(Integer, nullable=False, default=0, comment="Istatistige eklenen dolum sayisi")
+    ortalama = Column(Double, nullable=False, default=0, comment="Litre fiyati ortalamasi")
+    m2 = Column(Double, nullable=False, default=0, comment="Litre fiyati kare sapmalar toplami (Welford M2)")
+
+    guncellenme_tarihi = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), comment="Guncellenme zamani")
+
+    def __repr__(self):
+        return f"<YakitFiyatIstatistikleri(arac_id={self.arac_id}, yakit_turu='{self.yakit_turu}', adet={self.adet})>"
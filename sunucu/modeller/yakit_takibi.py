@@ -2,7 +2,7 @@
 Yakit Takibi Modeli
 Yakit alma kayitlarini ve tuketim verilerini tutar.
 """
-from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, ForeignKey, Numeric, Text
+from sqlalchemy import Index, text, Column, Integer, String, Date, DateTime, Boolean, ForeignKey, Numeric, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sunucu.veritabani import Base
@@ -12,6 +12,36 @@ class Yakit_Takibi(Base):
     """Yakit_Takibi tablosu - Yakit tuketim kayitlarini saklar"""
     
     __tablename__ = "yakit_takibi"
+    __table_args__ = (
+        # Silinmemis kayitlar: WHERE arac_id = ? AND silinmis_mi = false ORDER BY tarih DESC, id DESC
+        # (imlec sayfalamasi; PostgreSQL'de tuketim/maliyet alanlari index'ten okunur)
+        Index(
+            "ix_yakit_takibi_aktif_arac_tarih_id", "arac_id", "tarih", "id",
+            postgresql_where=text("silinmis_mi = false"),
+            sqlite_where=text("silinmis_mi = 0"),
+            postgresql_include=["km", "litre", "toplam_tutar"],
+        ),
+        # Segment sinirlari: WHERE arac_id = ? AND tam_depo = true AND km <= ? ORDER BY km DESC, id DESC
+        Index(
+            "ix_yakit_takibi_aktif_arac_tam_depo_km", "arac_id", "tam_depo", "km",
+            postgresql_where=text("silinmis_mi = false"),
+            sqlite_where=text("silinmis_mi = 0"),
+        ),
+        # Segment araligi: WHERE arac_id = ? AND km BETWEEN ? AND ? ORDER BY km, id
+        # (tuketim_servisi; PostgreSQL'de pencere sorgusu sadece index'ten okur)
+        Index(
+            "ix_yakit_takibi_aktif_arac_km_id", "arac_id", "km", "id",
+            postgresql_where=text("silinmis_mi = false"),
+            sqlite_where=text("silinmis_mi = 0"),
+            postgresql_include=["litre", "tam_depo", "ortalama_tuketim"],
+        ),
+        # En buyuk dolum: SELECT MAX(litre) WHERE arac_id = ? (anomali_servisi, kayit duzenleme/silme)
+        Index(
+            "ix_yakit_takibi_aktif_arac_litre", "arac_id", "litre",
+            postgresql_where=text("silinmis_mi = false"),
+            sqlite_where=text("silinmis_mi = 0"),
+        ),
+    )
     
     # Primary Key
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
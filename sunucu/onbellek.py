@@ -0,0 +1,68 @@
+"""
+Süreç İçi Önbellek
+Boyut sınırlı (LRU) ve süre sınırlı (TTL) thread-safe anahtar/değer önbelleği.
+Threadpool'da çalışan sync endpoint'ler ile async dependency'ler arasında paylaşılır.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLLRUOnbellek:
+    """
+    En fazla `boyut` kayıt tutar; dolunca en uzun süredir kullanılmayan kayıt atılır.
+    Her kayıt `sure` saniye sonra geçersiz sayılır.
+    """
+
+    def __init__(self, boyut: int = 10000, sure: float = 60.0):
+        self.boyut = boyut
+        self.sure = sure
+        self._veri: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._kilit = threading.Lock()
+        self.isabet = 0
+        self.iskalama = 0
+
+    def getir(self, anahtar: Hashable) -> Optional[Any]:
+        """Kayıt varsa ve süresi dolmamışsa değeri döndürür, yoksa None."""
+        with self._kilit:
+            kayit = self._veri.get(anahtar)
+            if kayit is None:
+                self.iskalama += 1
+                return None
+            deger, son_gecerlilik = kayit
+            if son_gecerlilik < time.monotonic():
+                del self._veri[anahtar]
+                self.iskalama += 1
+                return None
+            self._veri.move_to_end(anahtar)
+            self.isabet += 1
+            return deger
+
+    def koy(self, anahtar: Hashable, deger: Any) -> None:
+        """Değeri önbelleğe yazar, gerekirse en eski kaydı atar."""
+        with self._kilit:
+            self._veri[anahtar] = (deger, time.monotonic() + self.sure)
+            self._veri.move_to_end(anahtar)
+            while len(self._veri) > self.boyut:
+                self._veri.popitem(last=False)
+
+    def sil(self, anahtar: Hashable) -> None:
+        """Kaydı önbellekten çıkarır (yoksa bir şey yapmaz)."""
+        with self._kilit:
+            self._veri.pop(anahtar, None)
+
+    def temizle(self) -> None:
+        """Tüm kayıtları siler."""
+        with self._kilit:
+            self._veri.clear()
+
+    def istatistik(self) -> dict:
+        """Boyut ve isabet/ıskalama sayaçlarını döndürür."""
+        with self._kilit:
+            return {
+                "kayit_sayisi": len(self._veri),
+                "boyut": self.boyut,
+                "isabet": self.isabet,
+                "iskalama": self.iskalama,
+            }
@@ -0,0 +1,89 @@
+"""
+İmleç (Keyset) Sayfalama
+Liste endpoint'leri için opak imleç üretme/çözme yardımcıları.
+OFFSET yerine son görülen (tarih, id) / (id) değerinden devam edilir;
+sayfa maliyeti geçmişin uzunluğundan bağımsızdır.
+"""
+import base64
+import json
+from datetime import date
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+
+# Sonraki sayfanın imlecini taşıyan yanıt header'ı
+SONRAKI_IMLEC_HEADER = "X-Next-Cursor"
+
+
+def imlec_olustur(*degerler) -> str:
+    """Değerleri URL-güvenli opak bir imlece dönüştürür."""
+    ham = [d.isoformat() if isinstance(d, date) else d for d in degerler]
+    return base64.urlsafe_b64encode(json.dumps(ham, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def imlec_coz(imlec: str, uzunluk: int) -> List:
+    """
+    İmleci değer listesine çözer.
+
+    Raises:
+        HTTPException: İmleç bozuksa 400
+    """
+    try:
+        dolgu = "=" * (-len(imlec) % 4)
+        degerler = json.loads(base64.urlsafe_b64decode(imlec + dolgu))
+        if not isinstance(degerler, list) or len(degerler) != uzunluk:
+            raise ValueError
+        return degerler
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Geçersiz sayfalama imleci"
+        )
+
+
+def tarih_imleci_uygula(sorgu, model, imlec: Optional[str]):
+    """
+    (tarih DESC, id DESC) sıralı sorguya imleç filtresini uygular.
+    (arac_id, tarih, id) bileşik index'i ile doğrudan index taraması yapılır.
+    """
+    sorgu = sorgu.order_by(model.tarih.desc(), model.id.desc())
+    if imlec:
+        tarih, kayit_id = imlec_coz(imlec, 2)
+        try:
+            tarih, kayit_id = date.fromisoformat(tarih), int(kayit_id)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Geçersiz sayfalama imleci"
+            )
+        sorgu = sorgu.filter(tuple_(model.tarih, model.id) < tuple_(tarih, kayit_id))
+    return sorgu
+
+
+def id_imleci_uygula(sorgu, model, imlec: Optional[str]):
+    """(id ASC) sıralı sorguya imleç filtresini uygular."""
+    sorgu = sorgu.order_by(model.id)
+    if imlec:
+        (kayit_id,) = imlec_coz(imlec, 1)
+        if not isinstance(kayit_id, int):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Geçersiz sayfalama imleci"
+            )
+        sorgu = sorgu.filter(model.id > kayit_id)
+    return sorgu
+
+
+def sonraki_imleci_ekle(yanit: Response, kayitlar: Sequence, limit: int, tarihli: bool = True) -> None:
+    """
+    Sayfa doluysa sonraki sayfanın imlecini yanıt header'ına yazar.
+    Sayfa limitten kısaysa son sayfadır ve header eklenmez.
+    """
+    if len(kayitlar) < limit or not kayitlar:
+        return
+    son = kayitlar[-1]
+    if tarihli:
+        yanit.headers[SONRAKI_IMLEC_HEADER] = imlec_olustur(son.tarih, son.id)
+    else:
+        yanit.headers[SONRAKI_IMLEC_HEADER] = imlec_olustur(son.id)
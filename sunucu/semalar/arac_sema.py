@@ -85,6 +85,36 @@ class AracYanit(AracTemel):
 class KilometreGuncelle(BaseModel):
     yeni_km: int = Field(..., ge=0)
 
+class KilometreOkumasi(BaseModel):
+    arac_id: int = Field(..., gt=0)
+    km: int = Field(..., ge=0)
+
+class KilometreTelemetrisi(BaseModel):
+    """Takip cihazlarından gelen kilometre okumaları (aynı araçtan birden fazla olabilir)"""
+    okumalar: List[KilometreOkumasi] = Field(..., min_length=1, max_length=10000)
+
+class TelemetriSonucu(BaseModel):
+    kabul_edilen: int = Field(..., description="Tampona alınan okuma sayısı")
+    tampondaki_arac: int = Field(..., description="Bir sonraki yazmayı bekleyen araç sayısı")
+
+class TarihtekiKm(BaseModel):
+    tarih: date
+    km: Optional[int] = Field(None, description="İlk kayıttan önceki tarihler için boş")
+
+class KmdekiTarih(BaseModel):
+    km: int
+    tarih: Optional[date] = Field(None, description="Henüz ulaşılmamış kilometreler için boş")
+
+class KmCizelgesiYanit(BaseModel):
+    """Bakım, yakıt ve güncel kilometreden birleştirilmiş (tarih, km) çizelgesi"""
+    arac_id: int
+    nokta_sayisi: int
+    ilk_tarih: Optional[date] = None
+    son_tarih: Optional[date] = None
+    son_km: Optional[int] = None
+    tarihteki_km: List[TarihtekiKm] = []
+    kmdeki_tarih: List[KmdekiTarih] = []
+
 class AracOzet(BaseModel):
     id: int
     plaka: str
@@ -96,7 +126,19 @@ class AracOzet(BaseModel):
 
 # DÜZELTME: Pydantic modellerini kullanıyoruz.
 # from_attributes=True sayesinde SQLAlchemy objeleri bu modellere otomatik map edilecek.
+class KoleksiyonOzeti(BaseModel):
+    """Bir koleksiyonun (bakım/harcama/yakıt) tamamı için adet ve toplam tutar"""
+    adet: int = 0
+    toplam_tutar: float = 0.0
+
+class AracDetayOzeti(BaseModel):
+    bakimlar: KoleksiyonOzeti = KoleksiyonOzeti()
+    harcamalar: KoleksiyonOzeti = KoleksiyonOzeti()
+    yakitlar: KoleksiyonOzeti = KoleksiyonOzeti()
+
 class AracDetayliYanit(AracYanit):
     bakimlar: List[BakimBasit] = []
     harcamalar: List[HarcamaBasit] = []
     yakitlar: List[YakitBasit] = []
+    # Listeler sınırlandırılmış olsa bile tüm kayıtlar üzerinden hesaplanır
+    ozet: Optional[AracDetayOzeti] = None
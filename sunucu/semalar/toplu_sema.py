@@ -0,0 +1,35 @@
+"""
+Toplu İstek Şemaları
+POST /api/v1/batch için request ve response şemalarını içerir.
+"""
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+
+class AltIstek(BaseModel):
+    """Toplu istekteki tek bir GET isteği"""
+    id: Optional[str] = Field(None, max_length=100, description="Yanıtı eşleştirmek için istemci tarafı etiket")
+    yol: str = Field(..., min_length=1, description="Sorgu parametreleriyle birlikte yol, örn: /api/v1/yakit/arac/1?limit=20")
+
+
+class TopluIstek(BaseModel):
+    """Toplu istek gövdesi"""
+    istekler: List[AltIstek] = Field(..., min_length=1, description="Çalıştırılacak GET istekleri")
+    eszamanli: bool = Field(
+        False,
+        description="True ise birbirinden bağımsız alt istekler eş zamanlı çalışır (her biri kendi session'ı ile)"
+    )
+
+
+class AltYanit(BaseModel):
+    """Tek bir alt isteğin sonucu"""
+    id: Optional[str] = None
+    yol: str
+    durum: int = Field(..., description="HTTP durum kodu")
+    govde: Any = Field(None, description="Yanıt gövdesi (JSON ise ayrıştırılmış)")
+    basliklar: Optional[Dict[str, str]] = Field(None, description="İstemciye açık yanıt header'ları (örn. x-next-cursor)")
+
+
+class TopluYanit(BaseModel):
+    """Toplu istek yanıtı; sonuçlar isteklerle aynı sıradadır"""
+    yanitlar: List[AltYanit]
@@ -3,7 +3,7 @@ Yakıt Takip Şemaları
 Yakıt takip modeli için request ve response şemalarını içerir.
 """
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 from decimal import Decimal
 
@@ -72,3 +72,135 @@ class IstasyonAnalizi(BaseModel):
     ortalama_fiyat: Decimal
     toplam_litre: Decimal
     islem_sayisi: int
+
+
+# Segment bazlı tüketim analizi
+class SegmentTuketimi(BaseModel):
+    """İki tam depo arasındaki segmentin tüketimi"""
+    kayit_id: int = Field(..., description="Segmenti kapatan tam depo kaydı")
+    tarih: date
+    baslangic_km: int
+    bitis_km: int
+    mesafe: int
+    litre: float = Field(..., description="Segmentte alınan toplam yakıt (kısmi dolumlar dahil)")
+    tuketim: float = Field(..., description="Segment tüketimi (L/100km)")
+    hareketli_ortalama: float = Field(..., description="Son `pencere` segmentin ortalama tüketimi")
+    z_skoru: Optional[float] = Field(None, description="Aracın segmentlerine göre modifiye z-skoru (MAD)")
+    aykiri: bool
+
+
+class SegmentAnalizi(BaseModel):
+    """Aracın tüm segmentlerinin tüketim analizi"""
+    segmentler: List[SegmentTuketimi]
+    ortalama_tuketim: Optional[float] = Field(None, description="Mesafe ağırlıklı ortalama tüketim (L/100km)")
+    medyan_tuketim: Optional[float] = None
+    aykiri_sayisi: int
+
+
+# Fiyat trendi
+class FiyatDonemi(BaseModel):
+    """Bir aydaki litre ağırlıklı ortalama fiyat"""
+    donem: str = Field(..., description="YYYY-MM")
+    ortalama_fiyat: float
+    toplam_litre: float
+    islem_sayisi: int
+
+
+class AykiriAlim(BaseModel):
+    """Fiyatı aynı ay ve yakıt türündeki alımlardan belirgin şekilde farklı alım"""
+    kayit_id: int
+    tarih: date
+    fiyat: float
+    z_skoru: float
+
+
+class FiyatTrendi(BaseModel):
+    """Yakıt türü bazında aylık fiyat trendi"""
+    yakit_turu: str
+    aylik_degisim: Optional[float] = Field(None, description="Aylık ortalama fiyat değişimi (TL/L/ay, doğrusal eğim)")
+    donemler: List[FiyatDonemi]
+    aykiri_alimlar: List[AykiriAlim]
+
+
+# Filo tüketim analizi
+class FiloAracAnalizi(BaseModel):
+    """Filodaki bir aracın tüketim özeti"""
+    arac_id: int
+    plaka: Optional[str] = None
+    kayit_sayisi: int
+    toplam_litre: float
+    toplam_harcama: float
+    segment_sayisi: int
+    ortalama_tuketim: Optional[float] = None
+    medyan_tuketim: Optional[float] = None
+    son_hareketli_ortalama: Optional[float] = None
+    aykiri_segment_sayisi: int
+
+
+# Şüpheli yakıt kaydı
+class YakitAnomalisi(BaseModel):
+    """Eklenirken aracın yakıt istatistiklerine göre şüpheli bulunan kayıt"""
+    id: int
+    yakit_id: int
+    arac_id: int
+    tur: str = Field(..., description="tuketim, fiyat veya litre")
+    deger: Decimal = Field(..., description="Kayıttaki değer")
+    beklenen: Decimal = Field(..., description="Ortalama (tuketim, fiyat) veya en büyük dolum (litre)")
+    skor: Decimal = Field(..., description="z-skoru (tuketim, fiyat) veya en büyük doluma oranı (litre)")
+    tarih: date = Field(..., description="Yakıt alma tarihi")
+    km: int
+    olusturulma_tarihi: Optional[datetime] = None
+
+
+# Filo istasyon fiyat endeksi
+class IstasyonFiyati(BaseModel):
+    """Bir istasyonun dönemdeki litre ağırlıklı ortalama fiyatı"""
+    istasyon: str
+    yakit_turu: str
+    ortalama_fiyat: Decimal
+    filo_ortalamasina_fark: Decimal = Field(..., description="Aynı yakıt türünün filo ortalamasına göre fark (%)")
+    toplam_litre: Decimal
+    islem_sayisi: int
+    son_hafta: date = Field(..., description="İstasyondan en son alım yapılan hafta")
+
+
+class HaftalikFiyat(BaseModel):
+    """Filonun bir haftadaki litre ağırlıklı ortalama fiyatı"""
+    hafta: date = Field(..., description="Haftanın ilk günü (pazartesi)")
+    yakit_turu: str
+    ortalama_fiyat: Decimal
+    toplam_litre: Decimal
+    islem_sayisi: int
+
+
+class FiyatEndeksi(BaseModel):
+    """Filo genelinde en ucuz istasyonlar ve haftalık fiyat trendi"""
+    baslangic: date = Field(..., description="Dönemin ilk haftası")
+    en_ucuz_istasyonlar: List[IstasyonFiyati] = Field(..., description="Yakıt türü bazında en ucuzdan pahalıya")
+    haftalik_trend: List[HaftalikFiyat]
+
+
+# Yakıt kartı toplu aktarımı
+class YakitKartIslemi(BaseModel):
+    """Yakıt kartı dökümünde tek bir işlem (araç plaka ile belirtilir)"""
+    plaka: str = Field(..., min_length=1, max_length=20, description="Araç plakası")
+    tarih: date
+    km: int = Field(..., ge=0)
+    litre: Decimal = Field(..., gt=0)
+    fiyat: Decimal = Field(..., gt=0)
+    toplam_tutar: Optional[Decimal] = Field(None, gt=0, description="Verilmezse litre x fiyat")
+    yakit_turu: str = Field(..., min_length=1, max_length=20)
+    istasyon: Optional[str] = Field(None, max_length=100)
+    tam_depo: Optional[bool] = False
+    notlar: Optional[str] = None
+
+
+class YakitAktarimSonucu(BaseModel):
+    """Yakıt kartı toplu aktarım sonucu"""
+    eklenen: int
+    tekrar_eden: int = Field(..., description="Aynı (araç, tarih, km, litre) ile zaten kayıtlı olduğu için atlanan")
+    arac_sayisi: int
+    tuketim_guncellenen: int
+    anomali_sayisi: int
+    hata_sayisi: int
+    hatalar: List[str] = Field(..., description="İlk hatalı satırlar (satır no ile)")
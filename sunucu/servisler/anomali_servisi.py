@@ -0,0 +1,437 @@
+"""
+Yakıt Anomali Servisi
+Yeni yakıt kayıtlarını aracın birikimli istatistiklerine göre puanlar.
+
+Her araç için yakit_istatistikleri tablosunda tek satır tutulur: tüketim
+için Welford ortalama/varyans (adet, ortalama, M2) ve görülen en büyük
+dolum. Litre fiyatı yakıt türüne göre değiştiği için (Benzin, LPG...) fiyat
+istatistiği yakit_fiyat_istatistikleri tablosunda araç ve yakıt türü başına
+ayrı tutulur. Yeni kayıt önce mevcut istatistiklere göre puanlanır, sonra
+istatistiklere eklenir; geçmiş yeniden taranmaz, kayıt başına maliyet
+sabittir. Şüpheli bulunan kayıtlar yakit_anomalileri
+tablosuna yazılır.
+
+Düzenlenen kaydın eski değerleri Welford'un tersiyle istatistikten çıkarılır,
+kaydın anomalileri silinir ve kayıt yeni değerleriyle yeniden puanlanır;
+silinen kayıt sadece çıkarılır. Eklenirken eşiğe kırpılan değerin kırpılmış
+hali kaydın anomalisinden geri hesaplanır. Çıkarılan dolum en büyük dolumsa en büyük
+dolum tek bir MAX(litre) sorgusuyla (ix_yakit_takibi_aktif_arac_litre)
+yeniden okunur. Kayıt eklenirken olduğu gibi sadece kaydın kendi tüketimi
+hesaba katılır; komşu segmentin değişen tüketimi istatistiğe yansımaz.
+Geçmişten yeniden hesaplamak için `istatistikleri_yeniden_olustur`
+(yakit_istatistiklerini_yeniden_olustur.py).
+"""
+import math
+from decimal import Decimal
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from sunucu.modeller.arac import Araclar
+from sunucu.modeller.yakit_anomalisi import YakitAnomalileri, ANOMALI_TUKETIM, ANOMALI_FIYAT, ANOMALI_LITRE
+from sunucu.modeller.yakit_istatistigi import YakitIstatistikleri, YakitFiyatIstatistikleri
+from sunucu.modeller.yakit_takibi import Yakit_Takibi
+from sunucu.veritabani import satir_yoksa_ekle
+
+# Bu kadar örnekten önce istatistik güvenilir değildir, puanlama yapılmaz
+EN_AZ_ORNEK = 5
+# |z| bu değeri aşarsa tüketim/fiyat şüphelidir
+Z_ESIGI = 3.5
+# En büyük dolumun bu katından fazlası şüphelidir
+LITRE_ORANI = 1.5
+# Değerler hep aynıyken (std = 0) küçük farkların sonsuz z-skoru üretmemesi için
+# standart sapma en az ortalamanın bu oranı kabul edilir
+EN_AZ_BAGIL_SAPMA = 0.02
+# yakit_anomalileri.skor Numeric(6, 2)
+SKOR_SINIRI = 9999.99
+
+YIGIN_BOYUTU = 1000
+
+KURUS = Decimal("0.01")
+
+
+class KayitDegerleri(NamedTuple):
+    """Kaydın istatistiklere eklenmiş değerleri; düzenlemeden önce alınır"""
+    yakit_turu: str
+    litre: float
+    fiyat: float
+    tuketim: Optional[float]
+
+
+def kayit_degerleri(kayit: Yakit_Takibi) -> KayitDegerleri:
+    """Kaydın şu anki (veritabanındaki) istatistik değerleri."""
+    return KayitDegerleri(
+        kayit.yakit_turu, float(kayit.litre), float(kayit.fiyat),
+        float(kayit.ortalama_tuketim) if kayit.ortalama_tuketim is not None else None
+    )
+
+
+def _welford_ekle(adet: int, ortalama: float, m2: float, deger: float) -> Tuple[int, float, float]:
+    """Welford: yeni değeri (adet, ortalama, M2) üçlüsüne ekler."""
+    adet += 1
+    fark = deger - ortalama
+    ortalama += fark / adet
+    m2 += fark * (deger - ortalama)
+    return adet, ortalama, m2
+
+
+def _welford_cikar(adet: int, ortalama: float, m2: float, deger: float) -> Tuple[int, float, float]:
+    """Welford'un tersi: daha önce eklenmiş değeri (adet, ortalama, M2) üçlüsünden çıkarır."""
+    if adet <= 1:
+        return 0, 0.0, 0.0
+    adet -= 1
+    fark = deger - ortalama
+    ortalama -= fark / adet
+    m2 -= fark * (deger - ortalama)
+    # Kayan nokta hatası M2'yi sıfırın altına düşürmesin
+    return adet, ortalama, max(m2, 0.0)
+
+
+def _degeri_puanla(adet: int, ortalama: float, m2: float, deger: float) -> Tuple[Optional[float], Tuple[int, float, float]]:
+    """
+    Değerin birikimli dağılıma göre z-skorunu hesaplar (yeterli örnek yoksa
+    None) ve değeri istatistiğe ekler.
+
+    Eşiği aşan değer istatistiğe eşik sınırına (ortalama ± Z_ESIGI * sapma)
+    kırpılarak eklenir: tek bir hatalı giriş varyansı şişirip sonraki
+    anomalileri gizlemez, kalıcı bir değişim ise ortalamayı yavaş yavaş kaydırır.
+    """
+    z = None
+    if adet >= EN_AZ_ORNEK:
+        sapma = max(math.sqrt(m2 / (adet - 1)), abs(ortalama) * EN_AZ_BAGIL_SAPMA)
+        if sapma > 0:
+            z = (deger - ortalama) / sapma
+            if abs(z) > Z_ESIGI:
+                deger = ortalama + math.copysign(Z_ESIGI * sapma, z)
+    return z, _welford_ekle(adet, ortalama, m2, deger)
+
+
+def _eklenen_deger(deger: float, anomali: Optional[YakitAnomalileri]) -> float:
+    """
+    Değerin istatistiğe eklendiği hali. Eşiği aşan değer eklenirken eşik
+    sınırına kırpıldığı için (bkz. `_degeri_puanla`) kırpılan değer kaydın
+    anomalisindeki beklenen değer ve z-skorundan geri hesaplanır; anomalisi
+    olmayan değer olduğu gibi eklenmiştir.
+    """
+    if anomali is None or not anomali.skor:
+        return deger
+    beklenen = float(anomali.beklenen)
+    return beklenen + Z_ESIGI * (float(anomali.deger) - beklenen) / abs(float(anomali.skor))
+
+
+def _kilitli_satir(db: Session, model, anahtar: Dict[str, Any], varsayilanlar: Dict[str, Any]):
+    """
+    İstatistik satırını kilitleyerek getirir; yoksa oluşturur.
+    Eş zamanlı ilk kayıtlarda çakışma olmaması için satır insert-or-ignore
+    ile eklenir.
+    """
+    birincil_anahtar = tuple(anahtar.values())
+    satir = db.get(model, birincil_anahtar, with_for_update=True)
+    if satir is not None:
+        return satir
+
+    satir_yoksa_ekle(db, model, {**anahtar, **varsayilanlar}, list(anahtar))
+    return db.get(model, birincil_anahtar, with_for_update=True)
+
+
+def _istatistik_satiri(db: Session, arac_id: int) -> YakitIstatistikleri:
+    return _kilitli_satir(db, YakitIstatistikleri, {"arac_id": arac_id}, {
+        "dolum_adet": 0, "tuketim_adet": 0, "tuketim_ortalama": 0.0, "tuketim_m2": 0.0,
+    })
+
+
+def _fiyat_istatistigi_satiri(db: Session, arac_id: int, yakit_turu: str) -> YakitFiyatIstatistikleri:
+    return _kilitli_satir(
+        db, YakitFiyatIstatistikleri, {"arac_id": arac_id, "yakit_turu": yakit_turu},
+        {"adet": 0, "ortalama": 0.0, "m2": 0.0}
+    )
+
+
+def _puanla(
+    istatistik: YakitIstatistikleri,
+    fiyat_istatistigi: YakitFiyatIstatistikleri,
+    litre: float,
+    fiyat: float,
+    tuketim: Optional[float]
+) -> List[Tuple[str, float, float, float]]:
+    """
+    Kaydı mevcut istatistiklere göre puanlar, sonra istatistiklere ekler.
+    Fiyat, kaydın yakıt türünün fiyat istatistiğine göre puanlanır.
+    En büyük dolum, litre anomalisi olan kayıtla güncellenmez; tek bir
+    hatalı giriş kontrolü kalıcı olarak devre dışı bırakmasın.
+
+    Returns:
+        List: (tür, değer, beklenen, skor) bulguları
+    """
+    bulgular = []
+    onceki_fiyat = fiyat_istatistigi.ortalama
+
+    en_buyuk = float(istatistik.en_buyuk_litre) if istatistik.en_buyuk_litre is not None else None
+    litre_asiri = (
+        istatistik.dolum_adet >= EN_AZ_ORNEK and en_buyuk is not None and litre > en_buyuk * LITRE_ORANI
+    )
+    if litre_asiri:
+        bulgular.append((ANOMALI_LITRE, litre, en_buyuk, litre / en_buyuk))
+    elif en_buyuk is None or litre > en_buyuk:
+        istatistik.en_buyuk_litre = Decimal(str(litre)).quantize(KURUS)
+    istatistik.dolum_adet += 1
+
+    z, (fiyat_istatistigi.adet, fiyat_istatistigi.ortalama, fiyat_istatistigi.m2) = _degeri_puanla(
+        fiyat_istatistigi.adet, fiyat_istatistigi.ortalama, fiyat_istatistigi.m2, fiyat
+    )
+    if z is not None and abs(z) > Z_ESIGI:
+        bulgular.append((ANOMALI_FIYAT, fiyat, onceki_fiyat, z))
+
+    if tuketim is not None:
+        onceki_tuketim = istatistik.tuketim_ortalama
+        z, (istatistik.tuketim_adet, istatistik.tuketim_ortalama, istatistik.tuketim_m2) = _degeri_puanla(
+            istatistik.tuketim_adet, istatistik.tuketim_ortalama, istatistik.tuketim_m2, tuketim
+        )
+        if z is not None and abs(z) > Z_ESIGI:
+            bulgular.append((ANOMALI_TUKETIM, tuketim, onceki_tuketim, z))
+
+    return bulgular
+
+
+def _cikar(
+    db: Session,
+    istatistik: YakitIstatistikleri,
+    fiyat_istatistigi: YakitFiyatIstatistikleri,
+    kayit_id: int,
+    degerler: KayitDegerleri
+) -> None:
+    """
+    Kaydın eski değerlerini istatistiklerden çıkarır (`_puanla`nın tersi).
+    Çıkarılan dolum en büyük dolumsa, kayıt hariç silinmemiş kayıtların en
+    büyüğü tek sorguyla okunur.
+    """
+    anomaliler = {
+        anomali.tur: anomali
+        for anomali in db.query(YakitAnomalileri).filter(YakitAnomalileri.yakit_id == kayit_id)
+    }
+    istatistik.dolum_adet = max(istatistik.dolum_adet - 1, 0)
+    en_buyuk = istatistik.en_buyuk_litre
+    if en_buyuk is not None and Decimal(str(degerler.litre)).quantize(KURUS) >= en_buyuk:
+        istatistik.en_buyuk_litre = db.execute(
+            select(func.max(Yakit_Takibi.litre)).where(
+                Yakit_Takibi.arac_id == istatistik.arac_id,
+                Yakit_Takibi.silinmis_mi == False,
+                Yakit_Takibi.id != kayit_id
+            )
+        ).scalar()
+
+    fiyat_istatistigi.adet, fiyat_istatistigi.ortalama, fiyat_istatistigi.m2 = _welford_cikar(
+        fiyat_istatistigi.adet, fiyat_istatistigi.ortalama, fiyat_istatistigi.m2,
+        _eklenen_deger(degerler.fiyat, anomaliler.get(ANOMALI_FIYAT))
+    )
+    if degerler.tuketim is not None:
+        istatistik.tuketim_adet, istatistik.tuketim_ortalama, istatistik.tuketim_m2 = _welford_cikar(
+            istatistik.tuketim_adet, istatistik.tuketim_ortalama, istatistik.tuketim_m2,
+            _eklenen_deger(degerler.tuketim, anomaliler.get(ANOMALI_TUKETIM))
+        )
+
+
+def yakit_kaydini_puanla(db: Session, kayit: Yakit_Takibi) -> List[YakitAnomalileri]:
+    """
+    Yeni yakıt kaydını aracın istatistiklerine göre puanlar, istatistikleri
+    günceller ve şüpheli bulguları kaydeder. Segment tüketimi hesaplandıktan
+    sonra (tuketim_servisi.segmentleri_guncelle), commit'ten önce çağrılmalıdır.
+
+    Returns:
+        List[YakitAnomalileri]: Kayıt için oluşturulan anomaliler (boş = normal)
+    """
+    return yakit_kayitlarini_puanla(db, kayit.arac_id, [kayit])
+
+
+def yakit_kayitlarini_puanla(db: Session, arac_id: int, kayitlar: List[Yakit_Takibi]) -> List[YakitAnomalileri]:
+    """
+    Aynı araca ait yeni yakıt kayıtlarını verilen sırayla puanlar (bkz.
+    `yakit_kaydini_puanla`). İstatistik satırı ve kayıtlardaki her yakıt
+    türünün fiyat satırı bir kez kilitlenir, tam depo kayıtlarının tüketimi
+    tek sorguyla okunur.
+
+    Returns:
+        List[YakitAnomalileri]: Kayıtlar için oluşturulan anomaliler
+    """
+    istatistik = _istatistik_satiri(db, arac_id)
+    # Kilitler her transaction'da aynı (yakıt türü) sırayla alınır
+    fiyat_istatistikleri = {
+        yakit_turu: _fiyat_istatistigi_satiri(db, arac_id, yakit_turu)
+        for yakit_turu in sorted({kayit.yakit_turu for kayit in kayitlar})
+    }
+    return _kayitlari_puanla(db, arac_id, kayitlar, istatistik, fiyat_istatistikleri)
+
+
+def yakit_kaydini_yeniden_puanla(db: Session, kayit: Yakit_Takibi, eski: KayitDegerleri) -> List[YakitAnomalileri]:
+    """
+    Düzenlenen yakıt kaydının eski değerlerini istatistiklerden çıkarır,
+    kaydın anomalilerini siler ve kaydı yeni değerleriyle yeniden puanlar.
+    Segment tüketimi güncellendikten sonra, commit'ten önce çağrılmalıdır.
+
+    Args:
+        db: Veritabanı session'ı
+        kayit: Yeni değerleri atanmış kayıt
+        eski: Düzenlemeden önce alınan `kayit_degerleri(kayit)`
+
+    Returns:
+        List[YakitAnomalileri]: Kayıt için oluşturulan anomaliler (boş = normal)
+    """
+    istatistik = _istatistik_satiri(db, kayit.arac_id)
+    fiyat_istatistikleri = {
+        yakit_turu: _fiyat_istatistigi_satiri(db, kayit.arac_id, yakit_turu)
+        for yakit_turu in sorted({eski.yakit_turu, kayit.yakit_turu})
+    }
+    _cikar(db, istatistik, fiyat_istatistikleri[eski.yakit_turu], kayit.id, eski)
+    db.execute(delete(YakitAnomalileri).where(YakitAnomalileri.yakit_id == kayit.id))
+    return _kayitlari_puanla(db, kayit.arac_id, [kayit], istatistik, fiyat_istatistikleri)
+
+
+def yakit_kaydini_cikar(db: Session, kayit: Yakit_Takibi, eski: KayitDegerleri) -> None:
+    """
+    Silinen yakıt kaydının değerlerini aracın istatistiklerinden çıkarır.
+    Commit'ten önce çağrılmalıdır.
+    """
+    istatistik = _istatistik_satiri(db, kayit.arac_id)
+    fiyat_istatistigi = _fiyat_istatistigi_satiri(db, kayit.arac_id, eski.yakit_turu)
+    _cikar(db, istatistik, fiyat_istatistigi, kayit.id, eski)
+
+
+def _kayitlari_puanla(
+    db: Session,
+    arac_id: int,
+    kayitlar: List[Yakit_Takibi],
+    istatistik: YakitIstatistikleri,
+    fiyat_istatistikleri: Dict[str, YakitFiyatIstatistikleri]
+) -> List[YakitAnomalileri]:
+    """Kilitlenmiş istatistik satırlarıyla kayıtları puanlar ve anomalileri ekler."""
+    # Tüketim segment güncellemesiyle (toplu UPDATE) yazıldı, nesnelerde yok
+    tam_depo_idleri = [kayit.id for kayit in kayitlar if kayit.tam_depo]
+    tuketimler = {}
+    for i in range(0, len(tam_depo_idleri), YIGIN_BOYUTU):
+        tuketimler.update(db.execute(
+            select(Yakit_Takibi.id, Yakit_Takibi.ortalama_tuketim)
+            .where(Yakit_Takibi.id.in_(tam_depo_idleri[i:i + YIGIN_BOYUTU]))
+        ).all())
+
+    anomaliler = []
+    for kayit in kayitlar:
+        tuketim = tuketimler.get(kayit.id)
+        bulgular = _puanla(
+            istatistik, fiyat_istatistikleri[kayit.yakit_turu],
+            float(kayit.litre), float(kayit.fiyat), float(tuketim) if tuketim is not None else None
+        )
+        anomaliler += [
+            YakitAnomalileri(
+                yakit_id=kayit.id,
+                arac_id=arac_id,
+                tur=tur,
+                deger=Decimal(str(deger)).quantize(KURUS),
+                beklenen=Decimal(str(beklenen)).quantize(KURUS),
+                skor=Decimal(str(max(-SKOR_SINIRI, min(SKOR_SINIRI, skor)))).quantize(KURUS),
+            )
+            for tur, deger, beklenen, skor in bulgular
+        ]
+    if anomaliler:
+        db.add_all(anomaliler)
+    return anomaliler
+
+
+def anomalileri_getir(
+    db: Session,
+    arac_id: Optional[int] = None,
+    kullanici_id: Optional[int] = None,
+    kullanici_rol: str = "kullanici",
+    limit: int = 50
+) -> List[Dict[str, Any]]:
+    """
+    Silinmemiş yakıt kayıtlarının anomalilerini en yeniden eskiye listeler.
+    `arac_id` verilmezse kullanıcının filosu (admin ise tüm filo).
+    """
+    sorgu = select(
+        YakitAnomalileri.id,
+        YakitAnomalileri.yakit_id,
+        YakitAnomalileri.arac_id,
+        YakitAnomalileri.tur,
+        YakitAnomalileri.deger,
+        YakitAnomalileri.beklenen,
+        YakitAnomalileri.skor,
+        YakitAnomalileri.olusturulma_tarihi,
+        Yakit_Takibi.tarih,
+        Yakit_Takibi.km
+    ).join(Yakit_Takibi, YakitAnomalileri.yakit_id == Yakit_Takibi.id).where(Yakit_Takibi.silinmis_mi == False)
+
+    if arac_id is not None:
+        sorgu = sorgu.where(YakitAnomalileri.arac_id == arac_id)
+    else:
+        sorgu = sorgu.join(Araclar, YakitAnomalileri.arac_id == Araclar.id).where(Araclar.silinmis_mi == False)
+        if kullanici_rol != 'admin':
+            sorgu = sorgu.where(Araclar.kullanici_id == kullanici_id)
+
+    satirlar = db.execute(sorgu.order_by(YakitAnomalileri.id.desc()).limit(limit)).all()
+    return [dict(satir._mapping) for satir in satirlar]
+
+
+def istatistikleri_yeniden_olustur(db: Session) -> int:
+    """
+    Tüm araçların yakıt ve fiyat istatistiklerini silinmemiş kayıtlardan,
+    kayıtların eklenme (id) sırasıyla yeniden hesaplar. Anomali kayıtlarına
+    dokunmaz.
+
+    Returns:
+        int: İstatistiği yazılan araç sayısı
+    """
+    kayitlar = db.execute(
+        select(
+            Yakit_Takibi.arac_id,
+            Yakit_Takibi.yakit_turu,
+            Yakit_Takibi.litre,
+            Yakit_Takibi.fiyat,
+            Yakit_Takibi.ortalama_tuketim
+        ).where(Yakit_Takibi.silinmis_mi == False).order_by(Yakit_Takibi.arac_id, Yakit_Takibi.id)
+        .execution_options(yield_per=YIGIN_BOYUTU)
+    )
+
+    istatistikler: Dict[int, YakitIstatistikleri] = {}
+    fiyat_istatistikleri: Dict[Tuple[int, str], YakitFiyatIstatistikleri] = {}
+    for arac_id, yakit_turu, litre, fiyat, tuketim in kayitlar:
+        istatistik = istatistikler.get(arac_id)
+        if istatistik is None:
+            istatistik = istatistikler[arac_id] = YakitIstatistikleri(
+                arac_id=arac_id, dolum_adet=0, tuketim_adet=0, tuketim_ortalama=0.0, tuketim_m2=0.0
+            )
+        fiyat_istatistigi = fiyat_istatistikleri.get((arac_id, yakit_turu))
+        if fiyat_istatistigi is None:
+            fiyat_istatistigi = fiyat_istatistikleri[(arac_id, yakit_turu)] = YakitFiyatIstatistikleri(
+                arac_id=arac_id, yakit_turu=yakit_turu, adet=0, ortalama=0.0, m2=0.0
+            )
+        _puanla(
+            istatistik, fiyat_istatistigi,
+            float(litre), float(fiyat), float(tuketim) if tuketim is not None else None
+        )
+
+    db.query(YakitFiyatIstatistikleri).delete(synchronize_session=False)
+    db.query(YakitIstatistikleri).delete(synchronize_session=False)
+    satirlar = [
+        {
+            "arac_id": i.arac_id,
+            "dolum_adet": i.dolum_adet,
+            "tuketim_adet": i.tuketim_adet,
+            "tuketim_ortalama": i.tuketim_ortalama,
+            "tuketim_m2": i.tuketim_m2,
+            "en_buyuk_litre": i.en_buyuk_litre,
+        }
+        for i in istatistikler.values()
+    ]
+    for i in range(0, len(satirlar), YIGIN_BOYUTU):
+        db.execute(insert(YakitIstatistikleri), satirlar[i:i + YIGIN_BOYUTU])
+
+    fiyat_satirlari = [
+        {"arac_id": f.arac_id, "yakit_turu": f.yakit_turu, "adet": f.adet, "ortalama": f.ortalama, "m2": f.m2}
+        for f in fiyat_istatistikleri.values()
+    ]
+    for i in range(0, len(fiyat_satirlari), YIGIN_BOYUTU):
+        db.execute(insert(YakitFiyatIstatistikleri), fiyat_satirlari[i:i + YIGIN_BOYUTU])
+
+    db.commit()
+    return len(satirlar)
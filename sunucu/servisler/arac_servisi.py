@@ -3,7 +3,7 @@ Araç Servisi
 Araç ile ilgili iş mantığı fonksiyonlarını içerir.
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func, select, union_all, literal, cast, null, Integer, Numeric, Text, Boolean, String
 from fastapi import HTTPException, status
 from typing import List, Optional
 
@@ -12,7 +12,12 @@ from sunucu.modeller.arac import Araclar
 from sunucu.modeller.bakim import Bakimlar
 from sunucu.modeller.harcama import Harcamalar
 from sunucu.modeller.yakit_takibi import Yakit_Takibi as YakitTakibi
-from sunucu.semalar.arac_sema import AracOlustur, AracGuncelle
+from sunucu.semalar.arac_sema import (
+    AracOlustur, AracGuncelle, AracYanit, AracDetayliYanit, AracDetayOzeti, KoleksiyonOzeti,
+    BakimBasit, HarcamaBasit, YakitBasit
+)
+from sunucu.sayfalama import id_imleci_uygula
+from sunucu.servisler import onbellek_servisi
 
 def arac_olustur(db: Session, arac_bilgileri: AracOlustur, kullanici_id: int) -> Araclar:
     """
@@ -36,6 +41,7 @@ def arac_olustur(db: Session, arac_bilgileri: AracOlustur, kullanici_id: int) ->
     # Yeni araç oluştur (kullanici_id ile)
     yeni_arac = Araclar(**arac_bilgileri.model_dump(), kullanici_id=kullanici_id)
     db.add(yeni_arac)
+    onbellek_servisi.degisiklik_kaydet(db, kullanici_id=kullanici_id)
     db.commit()
     db.refresh(yeni_arac)
     
@@ -67,11 +73,14 @@ def tum_araclari_getir(
     atlama: int = 0, 
     limit: int = 100,
     sadece_aktifler: bool = True,
-    kullanici_rol: str = "kullanici"
+    kullanici_rol: str = "kullanici",
+    imlec: Optional[str] = None
 ) -> List[Araclar]:
     """
     Kullanıcının tüm araçlarını listeler.
     Admin ise tüm araçları listeler.
+    
+    İmleç verilirse id sırasıyla son görülen araçtan devam edilir (atlama yok sayılır).
     """
     sorgu = db.query(Araclar).filter(Araclar.silinmis_mi == False)
     
@@ -82,7 +91,12 @@ def tum_araclari_getir(
     if sadece_aktifler:
         sorgu = sorgu.filter(Araclar.aktif_mi == True)
     
-    return sorgu.offset(atlama).limit(limit).all()
+    sorgu = id_imleci_uygula(sorgu, Araclar, imlec)
+    
+    if not imlec:
+        sorgu = sorgu.offset(atlama)
+    
+    return sorgu.limit(limit).all()
 
 def arac_guncelle(db: Session, arac_id: int, arac_bilgileri: AracGuncelle) -> Araclar:
     """
@@ -114,6 +128,7 @@ def arac_guncelle(db: Session, arac_id: int, arac_bilgileri: AracGuncelle) -> Ar
     for alan, deger in guncelleme_verisi.items():
         setattr(arac, alan, deger)
     
+    onbellek_servisi.degisiklik_kaydet(db, kullanici_id=arac.kullanici_id)
     db.commit()
     db.refresh(arac)
     
@@ -133,6 +148,7 @@ def arac_kilometre_guncelle(db: Session, arac_id: int, yeni_km: int) -> Araclar:
         )
     
     arac.km = yeni_km
+    onbellek_servisi.degisiklik_kaydet(db, kullanici_id=arac.kullanici_id)
     db.commit()
     db.refresh(arac)
     
@@ -146,6 +162,7 @@ def arac_sil(db: Session, arac_id: int) -> dict:
     
     arac.silinmis_mi = True
     arac.aktif_mi = False
+    onbellek_servisi.degisiklik_kaydet(db, kullanici_id=arac.kullanici_id)
     db.commit()
     
     return {"mesaj": f"'{arac.plaka}' plakalı araç başarıyla silindi"}
@@ -166,22 +183,131 @@ def arac_sayisi_getir(db: Session, kullanici_id: int, sadece_aktifler: bool = Tr
     
     return sorgu.count()
 
-def arac_detay_getir(db: Session, arac_id: int):
+# Detay endpoint'inde genişletilebilecek koleksiyonlar
+DETAY_KOLEKSIYONLARI = ("bakimlar", "harcamalar", "yakitlar")
+
+# Detay yanıtında koleksiyon başına varsayılan kayıt sayısı (liste endpoint'lerinin limit'i ile aynı)
+VARSAYILAN_KOLEKSIYON_LIMITI = 100
+
+
+def _detay_alt_sorgusu(db: Session, koleksiyon: str, arac_id: int, limit: Optional[int]):
     """
-    Aracı ve ilişkili tüm kayıtları getirir.
+    Bir koleksiyonun en yeni `limit` kaydını, koleksiyonun toplam adedi ve
+    tutarı ile birlikte döndüren pencereli (window) alt sorgu oluşturur.
+    Üç koleksiyon UNION ALL ile birleşebilsin diye sütunlar ortaktır.
     """
-    arac = arac_getir(db, arac_id)
+    if koleksiyon == "bakimlar":
+        model, etiket, tutar = Bakimlar, Bakimlar.bakim_turu, Bakimlar.tutar
+        km, aciklama = Bakimlar.km, Bakimlar.aciklama
+        litre = fiyat = tam_depo = istasyon = None
+    elif koleksiyon == "harcamalar":
+        model, etiket, tutar = Harcamalar, Harcamalar.kategori, Harcamalar.tutar
+        km, aciklama = None, Harcamalar.aciklama
+        litre = fiyat = tam_depo = istasyon = None
+    else:
+        model, etiket, tutar = YakitTakibi, YakitTakibi.yakit_turu, YakitTakibi.toplam_tutar
+        km, aciklama = YakitTakibi.km, None
+        litre, fiyat = YakitTakibi.litre, YakitTakibi.fiyat
+        tam_depo, istasyon = YakitTakibi.tam_depo, YakitTakibi.istasyon
+
+    def bos(tip):
+        return cast(null(), tip)
+
+    pencereli = db.query(
+        literal(koleksiyon).label("koleksiyon"),
+        model.id.label("id"),
+        model.tarih.label("tarih"),
+        (km if km is not None else bos(Integer)).label("km"),
+        tutar.label("tutar"),
+        etiket.label("etiket"),
+        (aciklama if aciklama is not None else bos(Text)).label("aciklama"),
+        (litre if litre is not None else bos(Numeric(8, 2))).label("litre"),
+        (fiyat if fiyat is not None else bos(Numeric(8, 2))).label("fiyat"),
+        (tam_depo if tam_depo is not None else bos(Boolean)).label("tam_depo"),
+        (istasyon if istasyon is not None else bos(String(100))).label("istasyon"),
+        func.row_number().over(order_by=(model.tarih.desc(), model.id.desc())).label("sira"),
+        func.count().over().label("adet"),
+        func.sum(tutar).over().label("toplam_tutar")
+    ).filter(
+        and_(
+            model.arac_id == arac_id,
+            model.silinmis_mi == False
+        )
+    ).subquery()
+
+    sorgu = select(pencereli)
+    if limit is not None:
+        sorgu = sorgu.where(pencereli.c.sira <= limit)
+    return sorgu
+
+
+def arac_detay_getir(
+    db: Session,
+    arac: Araclar,
+    genislet: Optional[List[str]] = None,
+    koleksiyon_limiti: int = VARSAYILAN_KOLEKSIYON_LIMITI
+):
+    """
+    Aracı ve ilişkili kayıtlarını getirir.
     
-    # İlişkili verileri manuel çek
-    bakimlar = db.query(Bakimlar).filter(Bakimlar.arac_id == arac_id).order_by(Bakimlar.tarih.desc()).all()
-    harcamalar = db.query(Harcamalar).filter(Harcamalar.arac_id == arac_id).order_by(Harcamalar.tarih.desc()).all()
-    yakitlar = db.query(YakitTakibi).filter(YakitTakibi.arac_id == arac_id).order_by(YakitTakibi.tarih.desc()).all()
+    Üç koleksiyon tek bir UNION ALL sorgusuyla (tek round trip) okunur. Her
+    koleksiyon için en yeni `koleksiyon_limiti` kayıt döner; adet ve toplam
+    tutar ise tüm kayıtlar üzerinden hesaplanıp `ozet` alanında gelir.
+    Kalan kayıtlar `/bakimlar/arac/{id}`, `/harcamalar/arac/{id}` ve
+    `/yakit/arac/{id}` liste endpoint'lerinden `X-Next-Cursor` imleciyle
+    sayfalanarak okunur.
     
-    # Araca dinamik olarak bu listeleri ekle
-    # SQLAlchemy objesine attribute eklemek kalıcı olmaz ama bu scope'da iş görür
-    # Pydantic v2 from_attributes bu dinamik property'leri de okuyacaktır
-    arac.bakimlar = bakimlar
-    arac.harcamalar = harcamalar
-    arac.yakitlar = yakitlar
+    Args:
+        db: Veritabanı session'ı
+        arac: Sahipliği doğrulanmış araç
+        genislet: Listesi döndürülecek koleksiyonlar (None = hepsi).
+            Genişletilmeyen koleksiyonların sadece özeti döner.
+        koleksiyon_limiti: Koleksiyon başına en fazla kaç kayıt
+    """
+    if genislet is None:
+        genislet = list(DETAY_KOLEKSIYONLARI)
     
-    return arac
+    # Genişletilmeyen koleksiyondan sadece özet için tek satır okunur
+    alt_sorgular = [
+        _detay_alt_sorgusu(db, koleksiyon, arac.id, koleksiyon_limiti if koleksiyon in genislet else 1)
+        for koleksiyon in DETAY_KOLEKSIYONLARI
+    ]
+    satirlar = db.execute(union_all(*alt_sorgular)).all()
+    
+    listeler = {koleksiyon: [] for koleksiyon in DETAY_KOLEKSIYONLARI}
+    ozet = {koleksiyon: KoleksiyonOzeti() for koleksiyon in DETAY_KOLEKSIYONLARI}
+    
+    for satir in sorted(satirlar, key=lambda s: s.sira):
+        # Pencere toplamları koleksiyonun her satırında aynıdır
+        if satir.sira == 1:
+            ozet[satir.koleksiyon] = KoleksiyonOzeti(
+                adet=satir.adet,
+                toplam_tutar=float(satir.toplam_tutar or 0)
+            )
+        if satir.koleksiyon not in genislet:
+            continue
+        
+        if satir.koleksiyon == "bakimlar":
+            kayit = BakimBasit(
+                id=satir.id, bakim_turu=satir.etiket, tarih=satir.tarih,
+                km=satir.km, tutar=float(satir.tutar or 0), aciklama=satir.aciklama
+            )
+        elif satir.koleksiyon == "harcamalar":
+            kayit = HarcamaBasit(
+                id=satir.id, kategori=satir.etiket, tarih=satir.tarih,
+                tutar=float(satir.tutar or 0), aciklama=satir.aciklama
+            )
+        else:
+            kayit = YakitBasit(
+                id=satir.id, tarih=satir.tarih, km=satir.km,
+                litre=float(satir.litre), fiyat=float(satir.fiyat),
+                tam_depo=bool(satir.tam_depo), yakit_turu=satir.etiket, istasyon=satir.istasyon
+            )
+        listeler[satir.koleksiyon].append(kayit)
+    
+    # AracYanit üzerinden kurulur; ORM ilişkileri (lazy load) hiç tetiklenmez
+    return AracDetayliYanit(
+        **AracYanit.model_validate(arac).model_dump(),
+        **listeler,
+        ozet=AracDetayOzeti(**ozet)
+    )
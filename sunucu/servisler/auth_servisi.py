@@ -6,8 +6,24 @@ import bcrypt
 import jwt
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
+from typing import NamedTuple
 from sunucu.modeller.kullanici import Kullanicilar
 from sunucu.ayarlar import ayarlar
+from sunucu.onbellek import TTLLRUOnbellek
+
+
+class KullaniciDurumu(NamedTuple):
+    """Kimlik doğrulama için önbelleğe alınan kullanıcı durumu"""
+    aktif_mi: bool
+    rol: str
+    token_versiyonu: int
+
+
+# Süreç içi kullanıcı durum önbelleği (kullanici_id -> KullaniciDurumu)
+kullanici_onbellegi = TTLLRUOnbellek(
+    boyut=ayarlar.KULLANICI_ONBELLEK_BOYUTU,
+    sure=ayarlar.KULLANICI_ONBELLEK_SURESI
+)
 
 
 def sifre_hashle(sifre: str) -> str:
@@ -41,6 +57,16 @@ def token_olustur(data: dict) -> str:
     return encoded_jwt
 
 
+def kullanici_tokeni_olustur(kullanici: Kullanicilar) -> str:
+    """Kullanıcı id, rol ve token versiyonunu taşıyan access token oluşturur"""
+    return token_olustur({
+        "sub": kullanici.email,
+        "uid": kullanici.id,
+        "rol": kullanici.rol,
+        "tv": kullanici.token_versiyonu or 0
+    })
+
+
 def token_dogrula(token: str) -> dict:
     """JWT token doğrulama ve payload çıkarma"""
     try:
@@ -81,6 +107,36 @@ def email_ile_kullanici_getir(db: Session, email: str) -> Kullanicilar | None:
     return db.query(Kullanicilar).filter(Kullanicilar.email == email).first()
 
 
+def kullanici_durumu_getir(db: Session, kullanici_id: int) -> KullaniciDurumu | None:
+    """
+    Kullanıcının (aktif_mi, rol, token_versiyonu) bilgisini döndürür.
+    Önbellekte varsa veritabanına gidilmez; yoksa sadece bu üç sütun okunur.
+    """
+    durum = kullanici_onbellegi.getir(kullanici_id)
+    if durum is not None:
+        return durum
+    
+    satir = db.query(
+        Kullanicilar.aktif_mi,
+        Kullanicilar.rol,
+        Kullanicilar.token_versiyonu
+    ).filter(Kullanicilar.id == kullanici_id).first()
+    if satir is None:
+        return None
+    
+    durum = KullaniciDurumu(bool(satir.aktif_mi), satir.rol, satir.token_versiyonu or 0)
+    kullanici_onbellegi.koy(kullanici_id, durum)
+    return durum
+
+
+def kullanici_onbellegini_temizle(kullanici_id: int) -> None:
+    """
+    Kullanıcının önbellekteki durumunu siler.
+    Silme, şifre değişikliği, rol veya aktiflik değişikliğinden sonra çağrılmalıdır.
+    """
+    kullanici_onbellegi.sil(kullanici_id)
+
+
 def kullanici_guncelle(db: Session, db_kullanici: Kullanicilar, ad_soyad: str) -> Kullanicilar:
     """Kullanıcı bilgilerini günceller"""
     db_kullanici.ad_soyad = ad_soyad
@@ -90,6 +146,8 @@ def kullanici_guncelle(db: Session, db_kullanici: Kullanicilar, ad_soyad: str) -
 
 
 def sifre_degistir(db: Session, db_kullanici: Kullanicilar, yeni_sifre: str) -> None:
-    """Kullanıcı şifresini günceller"""
+    """Kullanıcı şifresini günceller ve eski token'ları geçersiz kılar"""
     db_kullanici.sifre_hash = sifre_hashle(yeni_sifre)
+    db_kullanici.token_versiyonu = (db_kullanici.token_versiyonu or 0) + 1
     db.commit()
+    kullanici_onbellegini_temizle(db_kullanici.id)
@@ -3,12 +3,15 @@ Bakım Servisi
 Bakım kayıtları ile ilgili iş mantığı fonksiyonlarını içerir.
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_
 from fastapi import HTTPException, status
 from sunucu.modeller.bakim import Bakimlar
 from sunucu.modeller.arac import Araclar
 from sunucu.semalar.bakim_sema import BakimOlustur, BakimGuncelle
-from typing import List
+from sunucu.modeller.aylik_ozet import OZET_BAKIM
+from sunucu.servisler import ozet_servisi, sayac_servisi, onbellek_servisi, km_cizelgesi_servisi
+from sunucu.sayfalama import tarih_imleci_uygula
+from typing import List, Optional
 from datetime import date
 
 
@@ -43,6 +46,10 @@ def bakim_olustur(db: Session, bakim_bilgileri: BakimOlustur) -> Bakimlar:
     # Yeni bakım kaydı oluştur
     yeni_bakim = Bakimlar(**bakim_bilgileri.model_dump())
     db.add(yeni_bakim)
+    ozet_servisi.ozete_ekle(db, OZET_BAKIM, yeni_bakim)
+    sayac_servisi.sayaclara_ekle(db, OZET_BAKIM, yeni_bakim)
+    km_cizelgesi_servisi.cizelgeyi_guncelle(db, yeni_bakim.arac_id, eklenenler=[(yeni_bakim.tarih, yeni_bakim.km)])
+    onbellek_servisi.degisiklik_kaydet(db, arac_id=yeni_bakim.arac_id)
     db.commit()
     db.refresh(yeni_bakim)
     
@@ -83,7 +90,8 @@ def arac_bakimlari_getir(
     db: Session,
     arac_id: int,
     atlama: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    imlec: Optional[str] = None
 ) -> List[Bakimlar]:
     """
     Belirli bir aracın tüm bakım kayıtlarını getirir.
@@ -91,18 +99,25 @@ def arac_bakimlari_getir(
     Args:
         db: Veritabanı session'ı
         arac_id: Araç ID
-        atlama: Kaç kay kayıt atlanacak
+        atlama: Kaç kay kayıt atlanacak (imleç verilirse yok sayılır)
         limit: Maksimum kaç kayıt getirilecek
+        imlec: Önceki sayfanın döndürdüğü opak imleç
         
     Returns:
         List[Bakimlar]: Bakım kayıtları listesi
     """
-    return db.query(Bakimlar).filter(
+    sorgu = db.query(Bakimlar).filter(
         and_(
             Bakimlar.arac_id == arac_id,
             Bakimlar.silinmis_mi == False
         )
-    ).order_by(Bakimlar.tarih.desc()).offset(atlama).limit(limit).all()
+    )
+    sorgu = tarih_imleci_uygula(sorgu, Bakimlar, imlec)
+    
+    if not imlec:
+        sorgu = sorgu.offset(atlama)
+    
+    return sorgu.limit(limit).all()
 
 
 def bakim_guncelle(db: Session, bakim_id: int, bakim_bilgileri: BakimGuncelle) -> Bakimlar:
@@ -122,10 +137,21 @@ def bakim_guncelle(db: Session, bakim_id: int, bakim_bilgileri: BakimGuncelle) -
     # Güncellenecek verileri al
     guncelleme_verisi = bakim_bilgileri.model_dump(exclude_unset=True)
     
-    # Güncelle
+    # Güncelle (aylık özet ve araç sayaçlarından eski değerler çıkarılıp yeni değerler eklenir)
+    eski_nokta = (bakim.tarih, bakim.km)
+    ozet_servisi.ozetten_cikar(db, OZET_BAKIM, bakim)
+    sayac_servisi.sayaclardan_cikar(db, OZET_BAKIM, bakim)
     for alan, deger in guncelleme_verisi.items():
         setattr(bakim, alan, deger)
+    ozet_servisi.ozete_ekle(db, OZET_BAKIM, bakim)
+    sayac_servisi.sayaclara_ekle(db, OZET_BAKIM, bakim)
+    # Tarih veya kilometre değiştiyse kilometre çizelgesindeki nokta
+    if guncelleme_verisi.keys() & {"tarih", "km"}:
+        km_cizelgesi_servisi.cizelgeyi_guncelle(
+            db, bakim.arac_id, eklenenler=[(bakim.tarih, bakim.km)], cikarilanlar=[eski_nokta]
+        )
     
+    onbellek_servisi.degisiklik_kaydet(db, arac_id=bakim.arac_id)
     db.commit()
     db.refresh(bakim)
     
@@ -145,7 +171,11 @@ def bakim_sil(db: Session, bakim_id: int) -> dict:
     """
     bakim = bakim_getir(db, bakim_id)
     
+    ozet_servisi.ozetten_cikar(db, OZET_BAKIM, bakim)
+    sayac_servisi.sayaclardan_cikar(db, OZET_BAKIM, bakim)
     bakim.silinmis_mi = True
+    km_cizelgesi_servisi.cizelgeyi_guncelle(db, bakim.arac_id, cikarilanlar=[(bakim.tarih, bakim.km)])
+    onbellek_servisi.degisiklik_kaydet(db, arac_id=bakim.arac_id)
     db.commit()
     
     return {"mesaj": f"Bakım kaydı başarıyla silindi"}
@@ -181,11 +211,7 @@ def toplam_bakim_maliyeti(db: Session, arac_id: int) -> float:
     Returns:
         float: Toplam bakım maliyeti
     """
-    toplam = db.query(func.sum(Bakimlar.tutar)).filter(
-        and_(
-            Bakimlar.arac_id == arac_id,
-            Bakimlar.silinmis_mi == False
-        )
-    ).scalar()
+    # Araç sayacından birincil anahtar ile okunur (bkz. sayac_servisi)
+    toplam = db.query(Araclar.toplam_bakim_maliyeti).filter(Araclar.id == arac_id).scalar()
     
     return float(toplam) if toplam else 0.0
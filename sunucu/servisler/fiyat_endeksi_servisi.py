@@ -0,0 +1,267 @@
+"""
+Fiyat Endeksi Servisi
+Filo genelinde istasyon fiyat endeksini (istasyon_fiyat_endeksi) yönetir.
+
+Endeks, kullanıcı/istasyon/yakıt türü/hafta bazında litre ve litre
+fiyatı x litre toplamlarını tutar. Yakıt yazma servisleri commit'ten önce
+`endekse_ekle` / `endeksten_cikar` çağırır; endeks ham kayıtlarla aynı
+transaction içinde güncellenir (bkz. ozet_servisi). Endeks sorguları
+kayıt sayısından bağımsızdır: okunan satır sayısı istasyon x hafta ile
+sınırlıdır.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Numeric, and_, func, insert, select, type_coerce
+from sqlalchemy.orm import Session
+
+from sunucu.modeller.arac import Araclar
+from sunucu.modeller.istasyon_fiyat_endeksi import IstasyonFiyatEndeksi
+from sunucu.modeller.yakit_takibi import Yakit_Takibi
+from sunucu.veritabani import toplamlari_artir
+
+# (kullanici_id, istasyon, yakit_turu, hafta)
+EndeksAnahtari = Tuple[int, str, str, date]
+
+YIGIN_BOYUTU = 1000
+
+KURUS = Decimal("0.01")
+
+
+def hafta_baslangici(tarih: date) -> date:
+    """Verilen tarihin ait olduğu haftanın pazartesisini döndürür."""
+    return tarih - timedelta(days=tarih.weekday())
+
+
+def _endeks_degistir(db: Session, anahtar: EndeksAnahtari, litre: Decimal, fiyat_litre: Decimal, adet: int) -> None:
+    """
+    Endeks satırına fark (delta) uygular; satır yoksa oluşturur.
+    PostgreSQL, MySQL ve SQLite'ta tek bir atomik upsert ifadesi çalışır
+    (bkz. toplamlari_artir).
+    """
+    kullanici_id, istasyon, yakit_turu, hafta = anahtar
+    toplamlari_artir(
+        db, IstasyonFiyatEndeksi,
+        {"kullanici_id": kullanici_id, "istasyon": istasyon, "yakit_turu": yakit_turu, "hafta": hafta},
+        {"toplam_litre": litre, "fiyat_litre_toplami": fiyat_litre, "adet": adet}
+    )
+
+    # Son kaydı da silinen endeks satırını temizle
+    if adet < 0:
+        db.query(IstasyonFiyatEndeksi).filter(
+            and_(
+                IstasyonFiyatEndeksi.kullanici_id == kullanici_id,
+                IstasyonFiyatEndeksi.istasyon == istasyon,
+                IstasyonFiyatEndeksi.yakit_turu == yakit_turu,
+                IstasyonFiyatEndeksi.hafta == hafta,
+                IstasyonFiyatEndeksi.adet <= 0
+            )
+        ).delete(synchronize_session=False)
+
+
+def _kayit_anahtari(db: Session, kayit, kullanici_id: Optional[int]) -> Optional[EndeksAnahtari]:
+    """Kaydın endeks anahtarı; istasyonu olmayan veya silinmiş kayıt endekse girmez."""
+    if kayit.silinmis_mi or not kayit.istasyon:
+        return None
+    if kullanici_id is None:
+        kullanici_id = db.get(Araclar, kayit.arac_id).kullanici_id
+    return (kullanici_id, kayit.istasyon, kayit.yakit_turu, hafta_baslangici(kayit.tarih))
+
+
+def endekse_ekle(db: Session, kayit: Yakit_Takibi, kullanici_id: Optional[int] = None) -> None:
+    """
+    Yakıt kaydını fiyat endeksine ekler.
+
+    Args:
+        db: Veritabanı session'ı
+        kayit: Yakit_Takibi nesnesi
+        kullanici_id: Araç sahibi (biliniyorsa; verilmezse araçtan okunur)
+    """
+    anahtar = _kayit_anahtari(db, kayit, kullanici_id)
+    if anahtar is not None:
+        litre = Decimal(kayit.litre)
+        _endeks_degistir(db, anahtar, litre, Decimal(kayit.fiyat) * litre, 1)
+
+
+def endekse_toplu_ekle(db: Session, kayitlar, kullanici_idleri: Dict[int, int]) -> None:
+    """
+    Yakıt kayıtlarını fiyat endeksine ekler. Kayıtlar endeks anahtarı
+    bazında toplanır; her endeks satırı için tek bir upsert çalışır.
+
+    Args:
+        db: Veritabanı session'ı
+        kayitlar: Yakit_Takibi nesneleri
+        kullanici_idleri: Araç ID → araç sahibi
+    """
+    toplamlar: Dict[EndeksAnahtari, List] = {}
+    for kayit in kayitlar:
+        anahtar = _kayit_anahtari(db, kayit, kullanici_idleri.get(kayit.arac_id))
+        if anahtar is None:
+            continue
+        litre = Decimal(kayit.litre)
+        toplam = toplamlar.setdefault(anahtar, [Decimal("0"), Decimal("0"), 0])
+        toplam[0] += litre
+        toplam[1] += Decimal(kayit.fiyat) * litre
+        toplam[2] += 1
+
+    for anahtar, (litre, fiyat_litre, adet) in toplamlar.items():
+        _endeks_degistir(db, anahtar, litre, fiyat_litre, adet)
+
+
+def endeksten_cikar(db: Session, kayit: Yakit_Takibi, kullanici_id: Optional[int] = None) -> None:
+    """
+    Kaydın mevcut değerlerini fiyat endeksinden çıkarır.
+    Güncellemeden önce (eski değerler) veya silmeden önce çağrılmalıdır.
+    """
+    anahtar = _kayit_anahtari(db, kayit, kullanici_id)
+    if anahtar is not None:
+        litre = Decimal(kayit.litre)
+        _endeks_degistir(db, anahtar, -litre, -Decimal(kayit.fiyat) * litre, -1)
+
+
+def endeksi_yeniden_olustur(db: Session) -> int:
+    """
+    Fiyat endeksini ham yakıt kayıtlarından yeniden oluşturur (backfill).
+    Veritabanında gün bazında gruplanır, haftaya katlama Python'da yapılır
+    (lehçeye özel tarih fonksiyonu gerekmez).
+
+    Returns:
+        int: Yazılan endeks satırı sayısı
+    """
+    sorgu = db.query(
+        Araclar.kullanici_id,
+        Yakit_Takibi.istasyon,
+        Yakit_Takibi.yakit_turu,
+        Yakit_Takibi.tarih,
+        func.sum(Yakit_Takibi.litre),
+        # Çarpım 4 ondalıklıdır; sonuç 2 ondalığa yuvarlanmasın
+        type_coerce(func.sum(Yakit_Takibi.fiyat * Yakit_Takibi.litre), Numeric(16, 4)),
+        func.count(Yakit_Takibi.id)
+    ).join(Araclar, Yakit_Takibi.arac_id == Araclar.id).filter(
+        and_(
+            Yakit_Takibi.silinmis_mi == False,
+            Yakit_Takibi.istasyon.isnot(None),
+            Yakit_Takibi.istasyon != ""
+        )
+    ).group_by(Araclar.kullanici_id, Yakit_Takibi.istasyon, Yakit_Takibi.yakit_turu, Yakit_Takibi.tarih)
+
+    endeks: Dict[EndeksAnahtari, List] = {}
+    for kullanici_id, istasyon, yakit_turu, tarih, litre, fiyat_litre, adet in sorgu.yield_per(YIGIN_BOYUTU):
+        toplam = endeks.setdefault((kullanici_id, istasyon, yakit_turu, hafta_baslangici(tarih)), [Decimal("0"), Decimal("0"), 0])
+        toplam[0] += Decimal(str(litre))
+        toplam[1] += Decimal(str(fiyat_litre))
+        toplam[2] += adet
+
+    db.query(IstasyonFiyatEndeksi).delete(synchronize_session=False)
+
+    satirlar = [
+        {
+            "kullanici_id": kullanici_id,
+            "istasyon": istasyon,
+            "yakit_turu": yakit_turu,
+            "hafta": hafta,
+            "toplam_litre": litre,
+            "fiyat_litre_toplami": fiyat_litre,
+            "adet": adet,
+        }
+        for (kullanici_id, istasyon, yakit_turu, hafta), (litre, fiyat_litre, adet) in endeks.items()
+    ]
+    for i in range(0, len(satirlar), YIGIN_BOYUTU):
+        db.execute(insert(IstasyonFiyatEndeksi), satirlar[i:i + YIGIN_BOYUTU])
+
+    db.commit()
+    return len(satirlar)
+
+
+def _ortalama(fiyat_litre, litre) -> Decimal:
+    return (Decimal(str(fiyat_litre)) / Decimal(str(litre))).quantize(KURUS) if litre else Decimal("0")
+
+
+def fiyat_endeksi(
+    db: Session,
+    kullanici_id: int,
+    kullanici_rol: str = "kullanici",
+    yakit_turu: Optional[str] = None,
+    hafta_sayisi: int = 12,
+    limit: int = 10
+) -> Dict[str, Any]:
+    """
+    Kullanıcının filosunda (admin ise tüm filoda) son `hafta_sayisi`
+    haftanın en ucuz istasyonlarını ve haftalık fiyat trendini döndürür.
+    Ortalamalar litre ağırlıklıdır; istasyonlar yakıt türü içinde sıralanır.
+
+    Returns:
+        Dict: baslangic, en_ucuz_istasyonlar, haftalik_trend
+    """
+    baslangic = hafta_baslangici(date.today()) - timedelta(weeks=hafta_sayisi - 1)
+
+    kosullar = [IstasyonFiyatEndeksi.hafta >= baslangic]
+    if kullanici_rol != 'admin':
+        kosullar.append(IstasyonFiyatEndeksi.kullanici_id == kullanici_id)
+    if yakit_turu:
+        kosullar.append(IstasyonFiyatEndeksi.yakit_turu == yakit_turu)
+
+    litre = func.sum(IstasyonFiyatEndeksi.toplam_litre).label("litre")
+    fiyat_litre = func.sum(IstasyonFiyatEndeksi.fiyat_litre_toplami).label("fiyat_litre")
+    adet = func.sum(IstasyonFiyatEndeksi.adet).label("adet")
+
+    istasyonlar = db.execute(
+        select(
+            IstasyonFiyatEndeksi.istasyon,
+            IstasyonFiyatEndeksi.yakit_turu,
+            litre, fiyat_litre, adet,
+            func.max(IstasyonFiyatEndeksi.hafta).label("son_hafta")
+        ).where(and_(*kosullar)).group_by(IstasyonFiyatEndeksi.istasyon, IstasyonFiyatEndeksi.yakit_turu)
+    ).all()
+
+    haftalar = db.execute(
+        select(IstasyonFiyatEndeksi.hafta, IstasyonFiyatEndeksi.yakit_turu, litre, fiyat_litre, adet)
+        .where(and_(*kosullar))
+        .group_by(IstasyonFiyatEndeksi.hafta, IstasyonFiyatEndeksi.yakit_turu)
+        .order_by(IstasyonFiyatEndeksi.hafta, IstasyonFiyatEndeksi.yakit_turu)
+    ).all()
+
+    # Yakıt türü bazında filo ortalaması (istasyonlara göre fark için)
+    tur_toplamlari: Dict[str, List] = {}
+    for satir in istasyonlar:
+        toplam = tur_toplamlari.setdefault(satir.yakit_turu, [0, 0])
+        toplam[0] += satir.fiyat_litre
+        toplam[1] += satir.litre
+    tur_ortalamalari = {tur: _ortalama(fl, l) for tur, (fl, l) in tur_toplamlari.items()}
+
+    en_ucuzlar = []
+    for tur in sorted(tur_ortalamalari):
+        sirali = sorted(
+            (s for s in istasyonlar if s.yakit_turu == tur),
+            key=lambda s: (_ortalama(s.fiyat_litre, s.litre), s.istasyon)
+        )
+        for satir in sirali[:limit]:
+            ortalama = _ortalama(satir.fiyat_litre, satir.litre)
+            filo_ortalamasi = tur_ortalamalari[tur]
+            en_ucuzlar.append({
+                "istasyon": satir.istasyon,
+                "yakit_turu": tur,
+                "ortalama_fiyat": ortalama,
+                "filo_ortalamasina_fark": (
+                    ((ortalama - filo_ortalamasi) * 100 / filo_ortalamasi).quantize(KURUS) if filo_ortalamasi else Decimal("0")
+                ),
+                "toplam_litre": Decimal(str(satir.litre)).quantize(KURUS),
+                "islem_sayisi": int(satir.adet),
+                "son_hafta": satir.son_hafta,
+            })
+
+    return {
+        "baslangic": baslangic,
+        "en_ucuz_istasyonlar": en_ucuzlar,
+        "haftalik_trend": [
+            {
+                "hafta": satir.hafta,
+                "yakit_turu": satir.yakit_turu,
+                "ortalama_fiyat": _ortalama(satir.fiyat_litre, satir.litre),
+                "toplam_litre": Decimal(str(satir.litre)).quantize(KURUS),
+                "islem_sayisi": int(satir.adet),
+            }
+            for satir in haftalar
+        ],
+    }
@@ -8,7 +8,10 @@ from fastapi import HTTPException, status
 from sunucu.modeller.harcama import Harcamalar
 from sunucu.modeller.arac import Araclar
 from sunucu.semalar.harcama_sema import HarcamaOlustur, HarcamaGuncelle, KategoriHarcama, HarcamaOzet
-from typing import List
+from sunucu.modeller.aylik_ozet import OZET_HARCAMA
+from sunucu.servisler import ozet_servisi, sayac_servisi, onbellek_servisi
+from sunucu.sayfalama import tarih_imleci_uygula
+from typing import List, Optional
 from decimal import Decimal
 
 
@@ -43,6 +46,9 @@ def harcama_olustur(db: Session, harcama_bilgileri: HarcamaOlustur) -> Harcamala
     # Yeni harcama kaydı oluştur
     yeni_harcama = Harcamalar(**harcama_bilgileri.model_dump())
     db.add(yeni_harcama)
+    ozet_servisi.ozete_ekle(db, OZET_HARCAMA, yeni_harcama)
+    sayac_servisi.sayaclara_ekle(db, OZET_HARCAMA, yeni_harcama)
+    onbellek_servisi.degisiklik_kaydet(db, arac_id=yeni_harcama.arac_id)
     db.commit()
     db.refresh(yeni_harcama)
     
@@ -84,7 +90,8 @@ def arac_harcamalari_getir(
     arac_id: int,
     kategori: str = None,
     atlama: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    imlec: Optional[str] = None
 ) -> List[Harcamalar]:
     """
     Belirli bir aracın harcama kayıtlarını getirir.
@@ -93,8 +100,9 @@ def arac_harcamalari_getir(
         db: Veritabanı session'ı
         arac_id: Araç ID
         kategori: Opsiyonel kategori filtresi
-        atlama: Kaç kayıt atlanacak
+        atlama: Kaç kayıt atlanacak (imleç verilirse yok sayılır)
         limit: Maksimum kaç kayıt getirilecek
+        imlec: Önceki sayfanın döndürdüğü opak imleç
         
     Returns:
         List[Harcamalar]: Harcama kayıtları listesi
@@ -109,7 +117,12 @@ def arac_harcamalari_getir(
     if kategori:
         sorgu = sorgu.filter(Harcamalar.kategori == kategori)
     
-    return sorgu.order_by(Harcamalar.tarih.desc()).offset(atlama).limit(limit).all()
+    sorgu = tarih_imleci_uygula(sorgu, Harcamalar, imlec)
+    
+    if not imlec:
+        sorgu = sorgu.offset(atlama)
+    
+    return sorgu.limit(limit).all()
 
 
 def harcama_guncelle(db: Session, harcama_id: int, harcama_bilgileri: HarcamaGuncelle) -> Harcamalar:
@@ -129,10 +142,15 @@ def harcama_guncelle(db: Session, harcama_id: int, harcama_bilgileri: HarcamaGun
     # Güncellenecek verileri al
     guncelleme_verisi = harcama_bilgileri.model_dump(exclude_unset=True)
     
-    # Güncelle
+    # Güncelle (aylık özet ve araç sayaçlarından eski değerler çıkarılıp yeni değerler eklenir)
+    ozet_servisi.ozetten_cikar(db, OZET_HARCAMA, harcama)
+    sayac_servisi.sayaclardan_cikar(db, OZET_HARCAMA, harcama)
     for alan, deger in guncelleme_verisi.items():
         setattr(harcama, alan, deger)
+    ozet_servisi.ozete_ekle(db, OZET_HARCAMA, harcama)
+    sayac_servisi.sayaclara_ekle(db, OZET_HARCAMA, harcama)
     
+    onbellek_servisi.degisiklik_kaydet(db, arac_id=harcama.arac_id)
     db.commit()
     db.refresh(harcama)
     
@@ -152,7 +170,10 @@ def harcama_sil(db: Session, harcama_id: int) -> dict:
     """
     harcama = harcama_getir(db, harcama_id)
     
+    ozet_servisi.ozetten_cikar(db, OZET_HARCAMA, harcama)
+    sayac_servisi.sayaclardan_cikar(db, OZET_HARCAMA, harcama)
     harcama.silinmis_mi = True
+    onbellek_servisi.degisiklik_kaydet(db, arac_id=harcama.arac_id)
     db.commit()
     
     return {"mesaj": "Harcama kaydı başarıyla silindi"}
@@ -169,12 +190,8 @@ def toplam_harcama_hesapla(db: Session, arac_id: int) -> Decimal:
     Returns:
         Decimal: Toplam harcama
     """
-    toplam = db.query(func.sum(Harcamalar.tutar)).filter(
-        and_(
-            Harcamalar.arac_id == arac_id,
-            Harcamalar.silinmis_mi == False
-        )
-    ).scalar()
+    # Araç sayacından birincil anahtar ile okunur (bkz. sayac_servisi)
+    toplam = db.query(Araclar.toplam_harcama).filter(Araclar.id == arac_id).scalar()
     
     return Decimal(str(toplam)) if toplam else Decimal("0")
 
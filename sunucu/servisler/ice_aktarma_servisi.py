@@ -0,0 +1,255 @@
+"""
+İçe Aktarma Servisi
+NDJSON (isteğe bağlı gzip) veri dökümünü satır satır okuyup parçalar halinde yazar.
+
+Dosya hiçbir zaman tamamen belleğe alınmaz: bellekte sadece yazılmayı bekleyen
+tek bir parça ve üst tabloların (kullanıcı, araç) eski→yeni id eşlemesi tutulur.
+
+Döküm formatı, her satırda bir kayıt:
+    {"tablo": "araclar", "id": 7, "kullanici_id": 2, "plaka": "34ABC123", ...}
+Üst tablo kayıtları, kendilerine referans veren kayıtlardan önce gelmelidir
+(kullanicilar → araclar → bakimlar/harcamalar/yakit_takibi/hatirlaticilar).
+"""
+import gzip
+import json
+from datetime import datetime
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Boolean, Date, DateTime, insert
+from sqlalchemy.orm import Session
+
+from sunucu.modeller.kullanici import Kullanicilar
+from sunucu.modeller.arac import Araclar
+from sunucu.modeller.bakim import Bakimlar
+from sunucu.modeller.harcama import Harcamalar
+from sunucu.modeller.yakit_takibi import Yakit_Takibi
+from sunucu.modeller.hatirlatici import Hatirlaticilar
+from sunucu.modeller.yakit_anomalisi import YakitAnomalileri
+from sunucu.servisler.ozet_servisi import ozetleri_yeniden_olustur
+from sunucu.servisler.sayac_servisi import sayaclari_dogrula
+from sunucu.servisler.tuketim_servisi import tum_tuketimleri_yeniden_hesapla
+from sunucu.servisler.anomali_servisi import istatistikleri_yeniden_olustur
+from sunucu.servisler.fiyat_endeksi_servisi import endeksi_yeniden_olustur
+from sunucu.servisler.km_cizelgesi_servisi import cizelgeleri_yeniden_olustur
+from sunucu.servisler.onbellek_servisi import en_buyuk_veri_versiyonu, tum_istatistikleri_gecersiz_kil
+
+# tablo adı → (model, (yabancı anahtar kolonu, referans verilen tablo))
+TABLOLAR = {
+    "kullanicilar": (Kullanicilar, None),
+    "araclar": (Araclar, ("kullanici_id", "kullanicilar")),
+    "bakimlar": (Bakimlar, ("arac_id", "araclar")),
+    "harcamalar": (Harcamalar, ("arac_id", "araclar")),
+    "yakit_takibi": (Yakit_Takibi, ("arac_id", "araclar")),
+    "hatirlaticilar": (Hatirlaticilar, ("arac_id", "araclar")),
+}
+
+# Yeni id'leri başka tablolar tarafından referans edilen tablolar
+ESLENEN_TABLOLAR = frozenset(yabanci[1] for _, yabanci in TABLOLAR.values() if yabanci)
+
+GZIP_IMZASI = b"\x1f\x8b"
+
+# Yanıtta döndürülecek en fazla hata mesajı (geri kalanlar sadece sayılır)
+EN_FAZLA_HATA = 100
+
+
+def akisi_ac(akis: BinaryIO) -> BinaryIO:
+    """gzip imzası ile başlayan akışı okunurken açılan bir akışa sarar, diğerlerini başa sarar."""
+    if akis.read(2) == GZIP_IMZASI:
+        akis.seek(0)
+        return gzip.GzipFile(fileobj=akis, mode="rb")
+    akis.seek(0)
+    return akis
+
+
+def ndjson_satirlari(akis: BinaryIO) -> Iterator[Tuple[int, bytes]]:
+    """
+    Akıştan boş olmayan satırları (satır no, ham satır) olarak okur.
+    gzip imzası ile başlayan akışlar okunurken açılır.
+    """
+    akis = akisi_ac(akis)
+    for satir_no, satir in enumerate(akis, 1):
+        satir = satir.strip()
+        if satir:
+            yield satir_no, satir
+
+
+def _tarih_saat(deger):
+    return datetime.fromisoformat(deger) if isinstance(deger, str) else deger
+
+
+def _tarih(deger):
+    if isinstance(deger, str):
+        return datetime.fromisoformat(deger).date()
+    return deger.date() if isinstance(deger, datetime) else deger
+
+
+def _donusturuculer(model) -> Dict[str, Optional[Callable]]:
+    """Kolon adı → JSON değerini kolon tipine çeviren fonksiyon (gerekmiyorsa None)."""
+    donusturuculer = {}
+    for kolon in model.__table__.columns:
+        if isinstance(kolon.type, DateTime):
+            donusturuculer[kolon.name] = _tarih_saat
+        elif isinstance(kolon.type, Date):
+            donusturuculer[kolon.name] = _tarih
+        elif isinstance(kolon.type, Boolean):
+            donusturuculer[kolon.name] = bool
+        else:
+            donusturuculer[kolon.name] = None
+    return donusturuculer
+
+
+class IceAktarici:
+    """
+    Kayıtları tablo bazında tamponlayıp `parca_boyutu` satırlık çok satırlı
+    INSERT'lerle yazar. Tablo değiştiğinde tampon boşaltılır; böylece üst
+    tablonun id eşlemesi, ona referans veren ilk satırdan önce tamamlanır.
+    Eşleme sadece üst tablolar için tutulur, bellek kullanımı kayıt
+    sayısıyla değil araç/kullanıcı sayısıyla büyür.
+    """
+
+    def __init__(self, db: Session, parca_boyutu: int = 1000):
+        self.db = db
+        self.parca_boyutu = parca_boyutu
+        self.donusturuculer = {tablo: _donusturuculer(model) for tablo, (model, _) in TABLOLAR.items()}
+        self.eslemeler: Dict[str, Dict[int, int]] = {tablo: {} for tablo in ESLENEN_TABLOLAR}
+
+        lehce = db.get_bind().dialect
+        self.returning_destekli = lehce.insert_executemany_returning_sort_by_parameter_order
+
+        self.tampon_tablo: Optional[str] = None
+        self.tampon_alanlari: frozenset = frozenset()
+        self.tampon: List[dict] = []
+        self.tampon_eski_idler: List[Optional[int]] = []
+
+        self.istatistik: Dict[str, int] = {tablo: 0 for tablo in TABLOLAR}
+        self.hata_sayisi = 0
+        self.hatalar: List[str] = []
+
+    def _hata(self, satir_no: int, mesaj: str) -> None:
+        self.hata_sayisi += 1
+        if len(self.hatalar) < EN_FAZLA_HATA:
+            self.hatalar.append(f"Satır {satir_no}: {mesaj}")
+
+    def satir_ekle(self, satir_no: int, ham_satir: bytes) -> None:
+        """Tek bir NDJSON satırını doğrulayıp tampona ekler."""
+        try:
+            kayit = json.loads(ham_satir)
+            tablo = kayit.pop("tablo")
+        except (ValueError, KeyError, AttributeError, TypeError):
+            self._hata(satir_no, "Geçersiz satır (JSON nesnesi ve 'tablo' alanı bekleniyor)")
+            return
+
+        if tablo not in TABLOLAR:
+            self._hata(satir_no, f"Bilinmeyen tablo: {tablo}")
+            return
+
+        _, yabanci = TABLOLAR[tablo]
+        donusturuculer = self.donusturuculer[tablo]
+        eski_id = kayit.pop("id", None)
+
+        bilinmeyenler = kayit.keys() - donusturuculer.keys()
+        if bilinmeyenler:
+            self._hata(satir_no, f"{tablo}: bilinmeyen alan(lar) {', '.join(sorted(bilinmeyenler))}")
+            return
+
+        # Tablo değiştiyse önceki tablo yazılır (üst tablonun id eşlemesi tamamlanır).
+        # Çok satırlı INSERT'te tüm satırlar aynı kolonları taşımalıdır.
+        alanlar = frozenset(kayit)
+        if tablo != self.tampon_tablo or alanlar != self.tampon_alanlari:
+            self.bosalt()
+            self.tampon_tablo = tablo
+            self.tampon_alanlari = alanlar
+
+        if yabanci:
+            kolon, ust_tablo = yabanci
+            yeni_ust_id = self.eslemeler[ust_tablo].get(kayit.get(kolon))
+            if yeni_ust_id is None:
+                self._hata(satir_no, f"{tablo}: {ust_tablo} içinde {kolon}={kayit.get(kolon)} bulunamadı")
+                return
+            kayit[kolon] = yeni_ust_id
+
+        try:
+            for alan, deger in kayit.items():
+                donustur = donusturuculer[alan]
+                if donustur is not None and deger is not None:
+                    kayit[alan] = donustur(deger)
+        except (ValueError, TypeError) as e:
+            self._hata(satir_no, f"{tablo}: {e}")
+            return
+
+        self.tampon.append(kayit)
+        self.tampon_eski_idler.append(eski_id)
+        if len(self.tampon) >= self.parca_boyutu:
+            self.bosalt()
+
+    def bosalt(self) -> None:
+        """Tampondaki satırları tek seferde yazar, gerekiyorsa yeni id'leri eşler."""
+        if not self.tampon:
+            return
+
+        tablo = self.tampon_tablo
+        model, _ = TABLOLAR[tablo]
+        tablo_nesnesi = model.__table__
+
+        if tablo in ESLENEN_TABLOLAR:
+            if self.returning_destekli:
+                # Çok satırlı INSERT ... RETURNING id; id'ler parametre sırasıyla döner
+                yeni_idler = self.db.execute(
+                    insert(tablo_nesnesi).returning(tablo_nesnesi.c.id, sort_by_parameter_order=True),
+                    self.tampon
+                ).scalars().all()
+            else:
+                yeni_idler = [
+                    self.db.execute(insert(tablo_nesnesi), kayit).inserted_primary_key[0]
+                    for kayit in self.tampon
+                ]
+            esleme = self.eslemeler[tablo]
+            for eski_id, yeni_id in zip(self.tampon_eski_idler, yeni_idler):
+                if eski_id is not None:
+                    esleme[eski_id] = yeni_id
+        else:
+            self.db.execute(insert(tablo_nesnesi), self.tampon)
+
+        self.istatistik[tablo] += len(self.tampon)
+        self.tampon = []
+        self.tampon_eski_idler = []
+
+
+def ndjson_ice_aktar(db: Session, akis: BinaryIO, parca_boyutu: int = 1000) -> dict:
+    """
+    Mevcut verileri silip NDJSON dökümünü tek transaction içinde içe aktarır.
+    Aylık özetler, araç sayaçları ve yakıt tüketimleri ham kayıtlardan
+    yeniden oluşturulur, önbellekteki istatistik sonuçları geçersiz kılınır.
+
+    Args:
+        db: Veritabanı session'ı
+        akis: NDJSON veya gzip'li NDJSON içeren ikili akış
+        parca_boyutu: Tek INSERT ile yazılacak en fazla satır sayısı
+
+    Returns:
+        dict: Tablo bazında yazılan kayıt sayıları ve hatalar
+    """
+    eski_veri_versiyonu = en_buyuk_veri_versiyonu(db)
+
+    # Foreign key sırasına göre tersten sil
+    for model in (YakitAnomalileri, Hatirlaticilar, Yakit_Takibi, Harcamalar, Bakimlar, Araclar, Kullanicilar):
+        db.query(model).delete(synchronize_session=False)
+
+    aktarici = IceAktarici(db, parca_boyutu)
+    for satir_no, satir in ndjson_satirlari(akis):
+        aktarici.satir_ekle(satir_no, satir)
+    aktarici.bosalt()
+    db.commit()
+
+    istatistik = dict(aktarici.istatistik)
+    istatistik["aylik_ozetler"] = ozetleri_yeniden_olustur(db)
+    istatistik["arac_sayaclari"] = len(sayaclari_dogrula(db, onar=True))
+    istatistik["yakit_tuketimleri"] = tum_tuketimleri_yeniden_hesapla(db)
+    istatistik["yakit_istatistikleri"] = istatistikleri_yeniden_olustur(db)
+    istatistik["istasyon_fiyat_endeksi"] = endeksi_yeniden_olustur(db)
+    istatistik["km_cizelgeleri"] = cizelgeleri_yeniden_olustur(db)
+    tum_istatistikleri_gecersiz_kil(db, eski_veri_versiyonu)
+    db.commit()
+    istatistik["hata_sayisi"] = aktarici.hata_sayisi
+    istatistik["errors"] = aktarici.hatalar
+    return istatistik
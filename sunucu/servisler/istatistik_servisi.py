@@ -3,45 +3,74 @@
 Grafik ve raporlar için veri sağlar
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, extract
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from sqlalchemy import Date, Integer, Numeric, String, and_, case, cast, func, literal, null, select, union_all
+from typing import List, Dict, Any, Optional
 
 from sunucu.modeller.harcama import Harcamalar
 from sunucu.modeller.yakit_takibi import Yakit_Takibi
-from sunucu.modeller.bakim import Bakimlar
 from sunucu.modeller.arac import Araclar
+from sunucu.modeller.aylik_ozet import AylikOzetler, OZET_HARCAMA, OZET_YAKIT
+from sunucu.zaman_dilimleri import (
+    DILIM_AY, AY_KATI_DILIMLER, donem_araligi, bos_dilimleri_doldur, dilim_baslangici_ifadesi
+)
 
 
-def aylik_harcama_trendi(db: Session, kullanici_id: int, arac_id: int = None, ay_sayisi: int = 6, kullanici_rol: str = "kullanici") -> List[Dict[str, Any]]:
+def _dilim_kolonu(kolon, dilim: str):
+    """Gruplama ifadesi; aylık özetin `ay` kolonu zaten ay başlangıcıdır."""
+    if dilim == DILIM_AY and kolon is AylikOzetler.ay:
+        return kolon
+    return dilim_baslangici_ifadesi(kolon, dilim)
+
+
+def aylik_harcama_trendi(
+    db: Session,
+    kullanici_id: int,
+    arac_id: int = None,
+    ay_sayisi: int = 6,
+    kullanici_rol: str = "kullanici",
+    dilim: str = DILIM_AY
+) -> List[Dict[str, Any]]:
     """
-    Son N ayın aylık toplam harcamalarını döndürür (kullanıcıya özel)
+    Son N ayın harcamalarını dilim (gün/hafta/ay/çeyrek/yıl) bazında döndürür (kullanıcıya özel)
     Admin ise tüm harcamaları görebilir.
+    
+    Ay, çeyrek ve yıl dilimleri aylık özet tablosundan (O(ay) satır), gün ve
+    hafta dilimleri ham harcama kayıtlarından okunur. Harcaması olmayan
+    dilimler sıfır tutarla döner.
     """
-    # Başlangıç ayını hesapla
-    bugun = datetime.now()
-    baslangic_tarihi = bugun - timedelta(days=ay_sayisi * 30)
+    baslangic, bitis = donem_araligi(dilim, ay_sayisi)
     
-    # PostgreSQL için TO_CHAR, MySQL için DATE_FORMAT
-    # SQLAlchemy'de cross-database için extract kullanıyoruz
-    sorgu = db.query(
-        func.to_char(Harcamalar.tarih, 'YYYY-MM').label('ay'),  # PostgreSQL
-        func.sum(Harcamalar.tutar).label('tutar')
-    ).join(Araclar, Harcamalar.arac_id == Araclar.id)
+    if dilim in AY_KATI_DILIMLER:
+        tarih, tutar, arac_kolonu = AylikOzetler.ay, AylikOzetler.toplam_tutar, AylikOzetler.arac_id
+        kosul = AylikOzetler.tur == OZET_HARCAMA
+    else:
+        tarih, tutar, arac_kolonu = Harcamalar.tarih, Harcamalar.tutar, Harcamalar.arac_id
+        kosul = Harcamalar.silinmis_mi == False
     
-    # Tarih filtresi
-    sorgu = sorgu.filter(Harcamalar.tarih >= baslangic_tarihi)
+    donem = _dilim_kolonu(tarih, dilim).label('donem')
+    sorgu = db.query(
+        donem,
+        func.sum(tutar).label('tutar')
+    ).filter(
+        and_(
+            kosul,
+            tarih >= baslangic,
+            tarih < bitis
+        )
+    )
     
     # Admin değilse kullanıcı filtresi ekle
     if kullanici_rol != 'admin':
-        sorgu = sorgu.filter(Araclar.kullanici_id == kullanici_id)
+        sorgu = sorgu.join(Araclar, arac_kolonu == Araclar.id).filter(Araclar.kullanici_id == kullanici_id)
     
     if arac_id:
-        sorgu = sorgu.filter(Harcamalar.arac_id == arac_id)
+        sorgu = sorgu.filter(arac_kolonu == arac_id)
     
-    sonuclar = sorgu.group_by('ay').order_by('ay').all()
-    
-    return [{'ay': sonuc.ay, 'tutar': float(sonuc.tutar or 0)} for sonuc in sonuclar]
+    degerler = {
+        sonuc.donem: {'tutar': float(sonuc.tutar or 0)}
+        for sonuc in sorgu.group_by(donem).all()
+    }
+    return bos_dilimleri_doldur(degerler, baslangic, bitis, dilim, lambda: {'tutar': 0.0})
 
 
 
@@ -51,18 +80,18 @@ def kategori_dagilimi(db: Session, kullanici_id: int, arac_id: int = None, kulla
     Admin hepsini görür.
     """
     sorgu = db.query(
-        Harcamalar.kategori,
-        func.sum(Harcamalar.tutar).label('tutar')
-    ).join(Araclar, Harcamalar.arac_id == Araclar.id)
+        AylikOzetler.kategori,
+        func.sum(AylikOzetler.toplam_tutar).label('tutar')
+    ).filter(AylikOzetler.tur == OZET_HARCAMA)
     
     # Admin değilse filtrele
     if kullanici_rol != 'admin':
-        sorgu = sorgu.filter(Araclar.kullanici_id == kullanici_id)
+        sorgu = sorgu.join(Araclar, AylikOzetler.arac_id == Araclar.id).filter(Araclar.kullanici_id == kullanici_id)
     
     if arac_id:
-        sorgu = sorgu.filter(Harcamalar.arac_id == arac_id)
+        sorgu = sorgu.filter(AylikOzetler.arac_id == arac_id)
     
-    sonuclar = sorgu.group_by(Harcamalar.kategori).all()
+    sonuclar = sorgu.group_by(AylikOzetler.kategori).all()
     
     toplam = sum(float(s.tutar or 0) for s in sonuclar)
     
@@ -73,77 +102,110 @@ def kategori_dagilimi(db: Session, kullanici_id: int, arac_id: int = None, kulla
     } for sonuc in sonuclar]
 
 
-def yakit_tuketim_analizi(db: Session, arac_id: int, ay_sayisi: int = 12) -> List[Dict[str, Any]]:
+def yakit_tuketim_analizi(db: Session, arac_id: int, ay_sayisi: int = 12, dilim: str = DILIM_AY) -> List[Dict[str, Any]]:
     """
-    Aylık yakıt tüketimi ve ortalama hesaplar
+    Dilim (gün/hafta/ay/çeyrek/yıl) bazında yakıt tüketimi ve ortalama hesaplar
+    
+    Ay, çeyrek ve yıl dilimleri aylık özet tablosundan, gün ve hafta dilimleri
+    ham yakıt kayıtlarından okunur. Kaydı olmayan dilimler sıfırla döner.
     """
-    bugun = datetime.now()
-    baslangic_tarihi = bugun - timedelta(days=ay_sayisi * 30)
-    
-    sonuclar = db.query(
-        func.to_char(Yakit_Takibi.tarih, 'YYYY-MM').label('ay'),  # PostgreSQL
-        func.sum(Yakit_Takibi.litre).label('toplam_litre'),
-        func.sum(Yakit_Takibi.tutar).label('toplam_tutar'),  # tutar field kullan
-        func.count(Yakit_Takibi.id).label('adet')
-    ).filter(
+    baslangic, bitis = donem_araligi(dilim, ay_sayisi)
+    
+    # Tutar, yakıt kayıtlarının toplam_tutar alanından özetlenir
+    if dilim in AY_KATI_DILIMLER:
+        tarih = AylikOzetler.ay
+        secimler = (
+            func.sum(AylikOzetler.toplam_litre).label('toplam_litre'),
+            func.sum(AylikOzetler.toplam_tutar).label('toplam_tutar'),
+            func.sum(AylikOzetler.adet).label('adet')
+        )
+        kosul = and_(AylikOzetler.arac_id == arac_id, AylikOzetler.tur == OZET_YAKIT)
+    else:
+        tarih = Yakit_Takibi.tarih
+        secimler = (
+            func.sum(Yakit_Takibi.litre).label('toplam_litre'),
+            func.sum(Yakit_Takibi.toplam_tutar).label('toplam_tutar'),
+            func.count(Yakit_Takibi.id).label('adet')
+        )
+        kosul = and_(Yakit_Takibi.arac_id == arac_id, Yakit_Takibi.silinmis_mi == False)
+    
+    donem = _dilim_kolonu(tarih, dilim).label('donem')
+    sonuclar = db.query(donem, *secimler).filter(
         and_(
-            Yakit_Takibi.arac_id == arac_id,
-            Yakit_Takibi.tarih >= baslangic_tarihi
+            kosul,
+            tarih >= baslangic,
+            tarih < bitis
         )
-    ).group_by('ay').order_by('ay').all()
+    ).group_by(donem).all()
     
-    return [{
-        'ay': sonuc.ay,
-        'litre': float(sonuc.toplam_litre or 0),
-        'tutar': float(sonuc.toplam_tutar or 0),
-        'adet': sonuc.adet,
-        'ortalama_fiyat': round(float(sonuc.toplam_tutar or 0) / float(sonuc.toplam_litre or 1), 2)
-    } for sonuc in sonuclar]
+    degerler = {
+        sonuc.donem: {
+            'litre': float(sonuc.toplam_litre or 0),
+            'tutar': float(sonuc.toplam_tutar or 0),
+            'adet': int(sonuc.adet or 0),
+            'ortalama_fiyat': round(float(sonuc.toplam_tutar or 0) / float(sonuc.toplam_litre or 1), 2)
+        }
+        for sonuc in sonuclar
+    }
+    return bos_dilimleri_doldur(
+        degerler, baslangic, bitis, dilim,
+        lambda: {'litre': 0.0, 'tutar': 0.0, 'adet': 0, 'ortalama_fiyat': 0.0}
+    )
 
 
 
-def arac_karsilastirma(db: Session, kullanici_id: int, kullanici_rol: str = "kullanici") -> List[Dict[str, Any]]:
+def arac_karsilastirma(
+    db: Session,
+    kullanici_id: int,
+    kullanici_rol: str = "kullanici",
+    limit: Optional[int] = None,
+    atlama: int = 0
+) -> List[Dict[str, Any]]:
     """
     Kullanıcının tüm araçlarını karşılaştırır.
     Admin ise tüm filoyu karşılaştırır.
+    
+    Toplamlar araç satırındaki sayaçlardan okunur (bkz. sayac_servisi); ham
+    kayıt tabloları hiç taranmaz. Sıralama ve sayfalama veritabanında yapılır.
     """
-    sorgu = db.query(Araclar).filter(Araclar.silinmis_mi == False)
+    genel_toplam = Araclar.toplam_harcama + Araclar.toplam_yakit_maliyeti + Araclar.toplam_bakim_maliyeti
+    
+    sorgu = db.query(
+        Araclar.plaka,
+        Araclar.marka,
+        Araclar.model,
+        Araclar.toplam_harcama.label('harcama'),
+        Araclar.toplam_yakit_maliyeti.label('yakit'),
+        Araclar.toplam_bakim_maliyeti.label('bakim')
+    ).filter(Araclar.silinmis_mi == False)
     
     # Admin değilse filtre
     if kullanici_rol != 'admin':
         sorgu = sorgu.filter(Araclar.kullanici_id == kullanici_id)
-        
-    araclar = sorgu.all()
+    
+    sorgu = sorgu.order_by(genel_toplam.desc(), Araclar.id)
+    
+    if atlama:
+        sorgu = sorgu.offset(atlama)
+    if limit:
+        sorgu = sorgu.limit(limit)
     
     sonuclar = []
-    for arac in araclar:
-        # Harcamalar
-        harcama_toplam = db.query(func.sum(Harcamalar.tutar)).filter(
-            Harcamalar.arac_id == arac.id
-        ).scalar() or 0
-        
-        # Yakıt
-        yakit_toplam = db.query(
-            func.sum(Yakit_Takibi.litre * Yakit_Takibi.fiyat)
-        ).filter(Yakit_Takibi.arac_id == arac.id).scalar() or 0
-        
-        # Bakım
-        bakim_toplam = db.query(func.sum(Bakimlar.tutar)).filter(
-            Bakimlar.arac_id == arac.id
-        ).scalar() or 0
-        
-        toplam = float(harcama_toplam) + float(yakit_toplam) + float(bakim_toplam)
+    for satir in sorgu.all():
+        harcama = float(satir.harcama or 0)
+        yakit = float(satir.yakit or 0)
+        bakim = float(satir.bakim or 0)
         
         sonuclar.append({
-            'arac': f"{arac.plaka} ({arac.marka} {arac.model})",
-            'plaka': arac.plaka,
-            'harcama': float(harcama_toplam),
-            'yakit': float(yakit_toplam),
-            'bakim': float(bakim_toplam),
-            'toplam': toplam
+            'arac': f"{satir.plaka} ({satir.marka} {satir.model})",
+            'plaka': satir.plaka,
+            'harcama': harcama,
+            'yakit': yakit,
+            'bakim': bakim,
+            'toplam': harcama + yakit + bakim
         })
     
-    return sorted(sonuclar, key=lambda x: x['toplam'], reverse=True)
+    return sonuclar
 
 
 def bakim_takip_gostergesi(db: Session, arac_id: int) -> Dict[str, Any]:
@@ -154,14 +216,10 @@ def bakim_takip_gostergesi(db: Session, arac_id: int) -> Dict[str, Any]:
     if not arac:
         return {'hata': 'Araç bulunamadı'}
     
-    # Son bakımı bul
-    son_bakim = db.query(Bakimlar).filter(
-        Bakimlar.arac_id == arac_id
-    ).order_by(Bakimlar.tarih.desc()).first()
-    
+    # Son bakım bilgisi araç sayaçlarından okunur (bkz. sayac_servisi)
     mevcut_km = arac.km or 0
-    son_bakim_km = son_bakim.km if son_bakim else 0
-    sonraki_bakim_km = son_bakim.sonraki_bakim_km if (son_bakim and son_bakim.sonraki_bakim_km) else (mevcut_km + 10000)
+    son_bakim_km = arac.son_bakim_km or 0
+    sonraki_bakim_km = arac.sonraki_bakim_km or (mevcut_km + 10000)
     
     kalan_km = max(0, sonraki_bakim_km - mevcut_km)
     oran = min(100, max(0, ((mevcut_km - son_bakim_km) / (sonraki_bakim_km - son_bakim_km) * 100) if sonraki_bakim_km > son_bakim_km else 0))
@@ -174,3 +232,145 @@ def bakim_takip_gostergesi(db: Session, arac_id: int) -> Dict[str, Any]:
         'oran': round(oran, 1),
         'durum': 'tehlike' if kalan_km < 1000 else ('uyari' if kalan_km < 3000 else 'normal')
     }
+
+
+# Genel özet sorgusunda bölüm ayırıcıları
+OZET_TREND = "trend"
+OZET_KATEGORI = "kategori"
+OZET_KARSILASTIRMA = "karsilastirma"
+OZET_SAYIM = "sayim"
+
+
+def genel_ozet(
+    db: Session,
+    kullanici_id: int,
+    kullanici_rol: str = "kullanici",
+    ay_sayisi: int = 6,
+    dilim: str = DILIM_AY,
+    limit: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Gösterge paneli widget'larını (harcama trendi, kategori dağılımı, araç
+    karşılaştırması, araç sayısı) tek sorguda, tek round trip ile hesaplar.
+    
+    Kullanıcının araçları ve harcama özetleri birer CTE olarak bir kez
+    tanımlanır; her widget bu CTE'lerden beslenen bir alt sorgudur ve
+    alt sorgular ortak sütunlarla UNION ALL ile birleştirilir (`bolum`
+    sütunu satırın hangi widget'a ait olduğunu belirtir). Sonuçlar ayrı
+    endpoint'lerin döndürdüğü yapıyla aynıdır.
+    
+    Gün ve hafta dilimleri ham kayıt gerektirdiğinden trend için sadece
+    ay, çeyrek ve yıl dilimleri desteklenir.
+    """
+    if dilim not in AY_KATI_DILIMLER:
+        raise ValueError(f"Genel özet sadece {', '.join(AY_KATI_DILIMLER)} dilimlerini destekler")
+    baslangic, bitis = donem_araligi(dilim, ay_sayisi)
+    
+    araclar = select(
+        Araclar.id, Araclar.plaka, Araclar.marka, Araclar.model,
+        Araclar.aktif_mi, Araclar.silinmis_mi,
+        Araclar.toplam_harcama, Araclar.toplam_yakit_maliyeti, Araclar.toplam_bakim_maliyeti
+    )
+    if kullanici_rol != 'admin':
+        araclar = araclar.where(Araclar.kullanici_id == kullanici_id)
+    araclar = araclar.cte("kullanici_araclari")
+    
+    harcama_ozetleri = select(
+        AylikOzetler.ay, AylikOzetler.kategori, AylikOzetler.toplam_tutar
+    ).join(araclar, AylikOzetler.arac_id == araclar.c.id).where(
+        AylikOzetler.tur == OZET_HARCAMA
+    ).cte("harcama_ozetleri")
+    
+    def bos(tip):
+        return cast(null(), tip)
+    
+    def bolum(ad, etiket=None, plaka=None, marka=None, model=None, tarih=None,
+              deger1=None, deger2=None, deger3=None, sira=None):
+        return (
+            literal(ad).label("bolum"),
+            (etiket if etiket is not None else bos(String(100))).label("etiket"),
+            (plaka if plaka is not None else bos(String(20))).label("plaka"),
+            (marka if marka is not None else bos(String(50))).label("marka"),
+            (model if model is not None else bos(String(50))).label("model"),
+            (tarih if tarih is not None else bos(Date)).label("tarih"),
+            (deger1 if deger1 is not None else bos(Numeric(12, 2))).label("deger1"),
+            (deger2 if deger2 is not None else bos(Numeric(12, 2))).label("deger2"),
+            (deger3 if deger3 is not None else bos(Numeric(12, 2))).label("deger3"),
+            (sira if sira is not None else bos(Integer)).label("sira"),
+        )
+    
+    donem = _dilim_kolonu(harcama_ozetleri.c.ay, dilim)
+    trend = select(*bolum(
+        OZET_TREND, tarih=donem, deger1=func.sum(harcama_ozetleri.c.toplam_tutar)
+    )).where(
+        and_(harcama_ozetleri.c.ay >= baslangic, harcama_ozetleri.c.ay < bitis)
+    ).group_by(donem)
+    
+    kategoriler = select(*bolum(
+        OZET_KATEGORI, etiket=harcama_ozetleri.c.kategori,
+        deger1=func.sum(harcama_ozetleri.c.toplam_tutar)
+    )).group_by(harcama_ozetleri.c.kategori)
+    
+    genel_toplam = (
+        araclar.c.toplam_harcama + araclar.c.toplam_yakit_maliyeti + araclar.c.toplam_bakim_maliyeti
+    )
+    siralama = select(*bolum(
+        OZET_KARSILASTIRMA, plaka=araclar.c.plaka, marka=araclar.c.marka, model=araclar.c.model,
+        deger1=araclar.c.toplam_harcama, deger2=araclar.c.toplam_yakit_maliyeti,
+        deger3=araclar.c.toplam_bakim_maliyeti,
+        sira=func.row_number().over(order_by=(genel_toplam.desc(), araclar.c.id))
+    )).where(araclar.c.silinmis_mi == False).subquery()
+    karsilastirma = select(siralama)
+    if limit:
+        karsilastirma = karsilastirma.where(siralama.c.sira <= limit)
+    
+    # deger1: aktif araç sayısı, deger2: tüm (silinmemiş) araç sayısı
+    sayim = select(*bolum(
+        OZET_SAYIM,
+        deger1=func.count(case((araclar.c.aktif_mi == True, 1))),
+        deger2=func.count(araclar.c.id)
+    )).where(araclar.c.silinmis_mi == False)
+    
+    satirlar = db.execute(union_all(trend, kategoriler, karsilastirma, sayim)).all()
+    
+    trend_degerleri = {}
+    kategori_satirlari = []
+    karsilastirma_satirlari = []
+    aktif_arac = toplam_arac = 0
+    for satir in satirlar:
+        if satir.bolum == OZET_TREND:
+            trend_degerleri[satir.tarih] = {'tutar': float(satir.deger1 or 0)}
+        elif satir.bolum == OZET_KATEGORI:
+            kategori_satirlari.append(satir)
+        elif satir.bolum == OZET_KARSILASTIRMA:
+            karsilastirma_satirlari.append(satir)
+        else:
+            aktif_arac, toplam_arac = int(satir.deger1 or 0), int(satir.deger2 or 0)
+    
+    kategori_toplami = sum(float(s.deger1 or 0) for s in kategori_satirlari)
+    karsilastirma_listesi = []
+    for satir in sorted(karsilastirma_satirlari, key=lambda s: s.sira):
+        harcama = float(satir.deger1 or 0)
+        yakit = float(satir.deger2 or 0)
+        bakim = float(satir.deger3 or 0)
+        karsilastirma_listesi.append({
+            'arac': f"{satir.plaka} ({satir.marka} {satir.model})",
+            'plaka': satir.plaka,
+            'harcama': harcama,
+            'yakit': yakit,
+            'bakim': bakim,
+            'toplam': harcama + yakit + bakim
+        })
+    
+    return {
+        'aylik_harcama': bos_dilimleri_doldur(
+            trend_degerleri, baslangic, bitis, dilim, lambda: {'tutar': 0.0}
+        ),
+        'kategori_dagilim': [{
+            'kategori': satir.etiket,
+            'tutar': float(satir.deger1 or 0),
+            'oran': round((float(satir.deger1 or 0) / kategori_toplami * 100) if kategori_toplami > 0 else 0, 1)
+        } for satir in kategori_satirlari],
+        'arac_karsilastirma': karsilastirma_listesi,
+        'arac_sayisi': {'toplam_arac': toplam_arac, 'aktif_arac': aktif_arac}
+    }
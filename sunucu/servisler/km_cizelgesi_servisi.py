@@ -0,0 +1,267 @@
+"""
+Kilometre Zaman Çizelgesi Servisi
+Araç başına bakım ve yakıt kayıtlarındaki (tarih, km) noktalarını tek
+bir sıralı dizide birleştirir; "X tarihinde km kaçtı" ve "km Y'ye hangi
+tarihte ulaşıldı" sorularını ikili arama ile yanıtlar.
+
+Her nokta tek bir int64 anahtara paketlenir:
+
+    anahtar = (tarih.toordinal() << 32) | km
+
+Anahtar sırası (tarih, km) sırasıyla aynıdır. Araç başına sıralı anahtar
+dizisi km_cizelgeleri tablosunda ikili (little-endian int64) olarak
+tutulur; okurken `np.frombuffer` ile kopyasız çözülür. Kayıt eklenip
+güncellenip silindikçe sadece değişen noktalar diziye eklenir/çıkarılır
+(`np.searchsorted` + `np.insert`/`np.delete`); araç geçmişi yeniden
+sorgulanmaz.
+
+Araclar.km (telemetri ile sık değişir) diziye yazılmaz; okurken son
+noktadan büyükse bugünün noktası olarak eklenir. Kilometre geriye
+gitmediği için aramalar noktaların birikimli en büyüğü üzerinde yapılır;
+hatalı girilmiş düşük bir km sonraki tarihlerin sonucunu düşürmez.
+"""
+from datetime import date
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import insert, select, union_all
+from sqlalchemy.orm import Session
+
+from sunucu.modeller.arac import Araclar
+from sunucu.modeller.bakim import Bakimlar
+from sunucu.modeller.km_cizelgesi import KmCizelgeleri
+from sunucu.modeller.yakit_takibi import Yakit_Takibi
+from sunucu.veritabani import satir_yoksa_ekle
+
+# Yeniden oluştururken tek INSERT'e giden en fazla araç
+YIGIN_BOYUTU = 1000
+
+KM_BITI = 32
+KM_MASKESI = (1 << KM_BITI) - 1
+ANAHTAR_TIPI = np.dtype("<i8")
+
+# (tarih, km)
+Nokta = Tuple[date, int]
+
+
+class KmCizelgesi(NamedTuple):
+    """Aracın çizelgesi: artan gün dizisi ve o güne kadarki en yüksek km."""
+    gun: np.ndarray
+    km: np.ndarray
+
+
+def _anahtarlar(noktalar: Iterable[Nokta]) -> np.ndarray:
+    """(tarih, km) noktalarını sıralı anahtar dizisine çevirir; km'si olmayanlar atlanır."""
+    anahtarlar = np.fromiter(
+        ((tarih.toordinal() << KM_BITI) | km for tarih, km in noktalar if tarih is not None and km is not None),
+        dtype=np.int64
+    )
+    anahtarlar.sort()
+    return anahtarlar
+
+
+def _coz(veri: Optional[bytes]) -> np.ndarray:
+    return np.frombuffer(veri or b"", dtype=ANAHTAR_TIPI)
+
+
+def _cikar(dizi: np.ndarray, cikarilanlar: np.ndarray) -> np.ndarray:
+    """
+    Sıralı diziden anahtarları çıkarır (çoklu küme: her anahtar bir kez).
+    Aynı anahtar birden fazla çıkarılıyorsa ardışık kopyaları silinir;
+    dizide olmayan anahtarlar yok sayılır.
+    """
+    if not len(dizi) or not len(cikarilanlar):
+        return dizi
+    # Aynı anahtarın k. tekrarı, dizideki ilk konumundan k sonrasını siler
+    tekrar = np.arange(len(cikarilanlar)) - np.searchsorted(cikarilanlar, cikarilanlar, side="left")
+    konumlar = np.searchsorted(dizi, cikarilanlar, side="left") + tekrar
+    gecerli = konumlar < len(dizi)
+    konumlar, cikarilanlar = konumlar[gecerli], cikarilanlar[gecerli]
+    return np.delete(dizi, konumlar[dizi[konumlar] == cikarilanlar])
+
+
+def _cizelge_satiri(db: Session, arac_id: int) -> KmCizelgeleri:
+    """
+    Aracın çizelge satırını kilitleyerek getirir; yoksa oluşturur.
+    Eş zamanlı ilk kayıtlarda çakışma olmaması için satır insert-or-ignore
+    ile eklenir.
+    """
+    satir = db.get(KmCizelgeleri, arac_id, with_for_update=True)
+    if satir is not None:
+        return satir
+
+    satir_yoksa_ekle(db, KmCizelgeleri, {"arac_id": arac_id, "nokta_sayisi": 0, "noktalar": b""}, ["arac_id"])
+    return db.get(KmCizelgeleri, arac_id, with_for_update=True)
+
+
+def cizelgeyi_guncelle(
+    db: Session,
+    arac_id: int,
+    eklenenler: Iterable[Nokta] = (),
+    cikarilanlar: Iterable[Nokta] = ()
+) -> int:
+    """
+    Aracın çizelgesinden noktaları çıkarıp yenilerini ekler. Commit
+    çağıranın transaction'ında yapılır; güncellemede eski nokta
+    `cikarilanlar`, yeni nokta `eklenenler` olarak verilir.
+
+    Returns:
+        int: Güncelleme sonrası nokta sayısı
+    """
+    eklenecek = _anahtarlar(eklenenler)
+    cikarilacak = _anahtarlar(cikarilanlar)
+    if not len(eklenecek) and not len(cikarilacak):
+        return 0
+
+    satir = _cizelge_satiri(db, arac_id)
+    dizi = _cikar(_coz(satir.noktalar), cikarilacak)
+    if len(eklenecek):
+        dizi = np.insert(dizi, np.searchsorted(dizi, eklenecek), eklenecek)
+
+    satir.noktalar = dizi.astype(ANAHTAR_TIPI, copy=False).tobytes()
+    satir.nokta_sayisi = len(dizi)
+    return len(dizi)
+
+
+def _nokta_sorgusu():
+    """Silinmemiş bakım ve yakıt kayıtlarının (arac_id, tarih, km) birleşimi."""
+    return union_all(
+        select(Bakimlar.arac_id, Bakimlar.tarih, Bakimlar.km).where(Bakimlar.silinmis_mi == False),
+        select(Yakit_Takibi.arac_id, Yakit_Takibi.tarih, Yakit_Takibi.km).where(Yakit_Takibi.silinmis_mi == False)
+    ).subquery()
+
+
+def cizelgeleri_yeniden_olustur(db: Session) -> int:
+    """
+    Tüm araçların çizelgelerini ham bakım ve yakıt kayıtlarından yeniden
+    oluşturur (backfill). Noktalar tek sorguyla yüklenir; araç bazında
+    gruplama sıralı dizide sınır indeksleriyle yapılır.
+
+    Returns:
+        int: Çizelgesi yazılan araç sayısı
+    """
+    noktalar = _nokta_sorgusu()
+    arac_idleri, anahtarlar = [], []
+    for arac_id, tarih, km in db.execute(
+        select(noktalar.c.arac_id, noktalar.c.tarih, noktalar.c.km).execution_options(yield_per=YIGIN_BOYUTU)
+    ):
+        if km is None:
+            continue
+        arac_idleri.append(arac_id)
+        anahtarlar.append((tarih.toordinal() << KM_BITI) | km)
+
+    arac = np.array(arac_idleri, dtype=np.int64)
+    anahtar = np.array(anahtarlar, dtype=np.int64)
+    sira = np.lexsort((anahtar, arac))
+    arac, anahtar = arac[sira], anahtar[sira]
+    sinirlar = np.flatnonzero(np.diff(arac)) + 1
+    baslangiclar = np.concatenate(([0], sinirlar)) if len(arac) else np.array([], dtype=np.int64)
+    bitisler = np.concatenate((sinirlar, [len(arac)])) if len(arac) else np.array([], dtype=np.int64)
+
+    db.query(KmCizelgeleri).delete(synchronize_session=False)
+    satirlar = [
+        {
+            "arac_id": int(arac[bas]),
+            "nokta_sayisi": int(bit - bas),
+            "noktalar": anahtar[bas:bit].astype(ANAHTAR_TIPI, copy=False).tobytes(),
+        }
+        for bas, bit in zip(baslangiclar, bitisler)
+    ]
+    for i in range(0, len(satirlar), YIGIN_BOYUTU):
+        db.execute(insert(KmCizelgeleri), satirlar[i:i + YIGIN_BOYUTU])
+
+    db.commit()
+    return len(satirlar)
+
+
+def cizelge_getir(db: Session, arac: Araclar) -> KmCizelgesi:
+    """
+    Aracın çizelgesini okur. Satır henüz oluşturulmadıysa (tablo
+    doldurulmadan önce eklenmiş araç) noktalar ham kayıtlardan okunur,
+    tabloya yazılmaz. Araclar.km son noktadan büyükse bugünün noktası
+    olarak eklenir.
+    """
+    satir = db.get(KmCizelgeleri, arac.id)
+    if satir is not None:
+        anahtar = _coz(satir.noktalar)
+    else:
+        noktalar = _nokta_sorgusu()
+        anahtar = _anahtarlar(db.execute(
+            select(noktalar.c.tarih, noktalar.c.km).where(noktalar.c.arac_id == arac.id)
+        ))
+
+    gun = anahtar >> KM_BITI
+    km = np.maximum.accumulate(anahtar & KM_MASKESI) if len(anahtar) else anahtar
+
+    bugun = date.today().toordinal()
+    if arac.km is not None and (not len(km) or (arac.km > km[-1] and bugun >= gun[-1])):
+        gun = np.append(gun, bugun)
+        km = np.append(km, arac.km)
+    return KmCizelgesi(gun=gun, km=km)
+
+
+def tarihteki_km(cizelge: KmCizelgesi, tarihler: Sequence[date]) -> List[Optional[int]]:
+    """
+    Her tarih için aracın kilometresi. İki nokta arasındaki tarihlerde
+    doğrusal interpolasyon yapılır; son noktadan sonrası son km'dir,
+    ilk noktadan öncesi bilinmez (None).
+    """
+    if not len(cizelge.gun):
+        return [None] * len(tarihler)
+    gun, km = cizelge.gun, cizelge.km.astype(np.float64)
+    sorgu = np.array([t.toordinal() for t in tarihler], dtype=np.int64)
+
+    # Sorgu gününe kadarki (dahil) son nokta
+    sag = np.searchsorted(gun, sorgu, side="right")
+    once = np.clip(sag - 1, 0, len(gun) - 1)
+    sonra = np.clip(sag, 0, len(gun) - 1)
+    aralik = gun[sonra] - gun[once]
+    oran = np.divide(sorgu - gun[once], aralik, out=np.zeros(len(sorgu)), where=aralik > 0)
+    sonuc = np.rint(km[once] + (km[sonra] - km[once]) * oran).astype(np.int64)
+    return [int(k) if s > 0 else None for k, s in zip(sonuc, sag)]
+
+
+def kmdeki_tarih(cizelge: KmCizelgesi, kmler: Sequence[int]) -> List[Optional[date]]:
+    """
+    Her kilometreye ulaşılan (tahmini) tarih. İki nokta arasında doğrusal
+    interpolasyon yapılır ve gün yukarı yuvarlanır; henüz ulaşılmamış veya
+    ilk noktadan önceki kilometreler için None döner.
+    """
+    if not len(cizelge.gun):
+        return [None] * len(kmler)
+    gun, km = cizelge.gun, cizelge.km
+    sorgu = np.array(kmler, dtype=np.int64)
+
+    # km'ye ulaşılan ya da geçilen ilk nokta
+    sol = np.searchsorted(km, sorgu, side="left")
+    sonra = np.clip(sol, 0, len(km) - 1)
+    once = np.clip(sol - 1, 0, len(km) - 1)
+    aralik = (km[sonra] - km[once]).astype(np.float64)
+    oran = np.divide(sorgu - km[once], aralik, out=np.zeros(len(sorgu)), where=aralik > 0)
+    sonuc = gun[once] + np.ceil((gun[sonra] - gun[once]) * oran).astype(np.int64)
+    # Tam ilk noktanın km'si ise o gün; daha küçükse bilinmez
+    sonuc = np.where(sol == 0, gun[0], sonuc)
+    bilinir = (sol < len(km)) & ((sol > 0) | (sorgu == km[0]))
+    return [date.fromordinal(int(g)) if b else None for g, b in zip(sonuc, bilinir)]
+
+
+def cizelge_sorgula(db: Session, arac: Araclar, tarihler: Sequence[date] = (), kmler: Sequence[int] = ()) -> dict:
+    """
+    Aracın çizelge özetini ve istenen tarih/km aramalarının sonuçlarını
+    döndürür (bkz. tarihteki_km, kmdeki_tarih).
+    """
+    cizelge = cizelge_getir(db, arac)
+    bos = not len(cizelge.gun)
+    return {
+        "arac_id": arac.id,
+        "nokta_sayisi": len(cizelge.gun),
+        "ilk_tarih": None if bos else date.fromordinal(int(cizelge.gun[0])),
+        "son_tarih": None if bos else date.fromordinal(int(cizelge.gun[-1])),
+        "son_km": None if bos else int(cizelge.km[-1]),
+        "tarihteki_km": [
+            {"tarih": tarih, "km": km} for tarih, km in zip(tarihler, tarihteki_km(cizelge, tarihler))
+        ],
+        "kmdeki_tarih": [
+            {"km": km, "tarih": tarih} for km, tarih in zip(kmler, kmdeki_tarih(cizelge, kmler))
+        ],
+    }
@@ -0,0 +1,155 @@
+"""
+Önbellek Servisi
+İstatistik sonuçlarını (kullanıcı, endpoint, parametreler, veri versiyonu)
+anahtarıyla süreç içi önbellekte tutar.
+
+Veri versiyonu kullanıcı satırındaki `veri_versiyonu` sayacıdır. Araç, bakım,
+harcama ve yakıt yazma servisleri commit'ten önce `degisiklik_kaydet`
+çağırır; etkilenen araç sahiplerinin sayacı aynı transaction içinde
+artırılır. Okumada sayaç tek bir primary key sorgusuyla ve GET istekleri
+replikaya yönlense de birincil veritabanından alınır; replikadan okunan
+gecikmiş bir versiyon, o versiyonun anahtarına eski sonucu yazardı. Sayaç
+veritabanında tutulduğu için bir worker'daki yazma diğer worker'ların
+anahtarlarını da değiştirir; yeni versiyonla oluşan anahtar önbellekte
+olmadığından yazma sonrası okumalar eski sonucu görmez, eski anahtarlar
+LRU/TTL ile düşer.
+
+Admin tüm filoyu gördüğü için anahtarına kendi sayacı yerine en büyük veri
+versiyonu (filo versiyonu) girer; başkalarının yazmaları admin satırlarına
+dokunmaz. Artırılan sayaç `max(sayaç + 1, filo versiyonu + 1)` yapılır,
+böylece hangi kullanıcı yazarsa yazsın filo versiyonu ilerler ve
+ix_kullanicilar_veri_versiyonu index'inden tek sorguyla okunur. Yazan
+transaction'lar sadece kendi sahiplerinin satırını kilitler. Aynı anda
+commit eden iki transaction aynı filo versiyonunu yazabilir; araya giren
+admin okuması bir sonraki yazmaya ya da önbellek süresinin dolmasına kadar
+eski sonucu görebilir.
+"""
+from datetime import date
+from typing import Hashable, Optional
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from sunucu.ayarlar import ayarlar
+from sunucu.onbellek import TTLLRUOnbellek
+from sunucu.modeller.arac import Araclar
+from sunucu.modeller.kullanici import Kullanicilar
+
+# İstatistik endpoint sonuçları
+istatistik_onbellegi = TTLLRUOnbellek(
+    boyut=ayarlar.ISTATISTIK_ONBELLEK_BOYUTU,
+    sure=ayarlar.ISTATISTIK_ONBELLEK_SURESI
+)
+
+
+def veri_versiyonu(db: Session, kullanici_id: int) -> int:
+    """Kullanıcının veri versiyonunu birincil veritabanından tek primary key sorgusuyla okur."""
+    return db.query(Kullanicilar.veri_versiyonu).filter(
+        Kullanicilar.id == kullanici_id
+    ).execution_options(birincil=True).scalar() or 0
+
+
+def en_buyuk_veri_versiyonu(db: Session) -> int:
+    """Filo versiyonu: tüm kullanıcıların en büyük veri versiyonu (birincilden, index'ten tek sorgu)."""
+    return db.query(func.max(Kullanicilar.veri_versiyonu)).execution_options(birincil=True).scalar() or 0
+
+
+def istatistik_anahtari(db: Session, kullanici_id: int, rol: str, uc_nokta: str, *parametreler: Hashable) -> tuple:
+    """
+    Önbellek anahtarı: (kullanıcı, rol, endpoint, parametreler, veri versiyonu).
+    Admin için veri versiyonu filo versiyonudur (bkz. modül açıklaması).
+    Dönem aralıkları bugünün tarihine bağlı olduğu için tarih de anahtara girer.
+    """
+    versiyon = en_buyuk_veri_versiyonu(db) if rol == "admin" else veri_versiyonu(db, kullanici_id)
+    return (kullanici_id, rol, uc_nokta, parametreler, versiyon, date.today())
+
+
+def degisiklik_kaydet(db: Session, arac_id: Optional[int] = None, kullanici_id: Optional[int] = None) -> None:
+    """
+    Transaction'da bir aracın veya kullanıcının verisinin değiştiğini işaretler.
+    Versiyonlar commit sırasında aynı transaction içinde artırılır; rollback'te
+    hiçbir şey değişmez.
+
+    Args:
+        db: Veritabanı session'ı
+        arac_id: Kaydı değişen araç (sahibi commit sırasında bulunur)
+        kullanici_id: Verisi değişen kullanıcı (biliniyorsa)
+    """
+    if arac_id is not None:
+        db.info.setdefault("degisen_araclar", set()).add(arac_id)
+    if kullanici_id is not None:
+        db.info.setdefault("degisen_kullanicilar", set()).add(kullanici_id)
+
+
+def tum_istatistikleri_gecersiz_kil(db: Session, eski_en_buyuk: int) -> None:
+    """
+    Toplu veri değişikliklerinden (içe aktarma) sonra tüm sonuçları geçersiz kılar.
+
+    Kullanıcılar silinip yeniden oluşturulduğunda id'ler tekrar kullanılabilir;
+    tüm sayaçlar değişiklikten önceki en büyük versiyonun ötesine taşınır ki
+    yeni anahtarlar eski anahtarlarla çakışmasın. Commit çağırana bırakılır.
+
+    Args:
+        db: Veritabanı session'ı
+        eski_en_buyuk: Değişiklikten önce okunan `en_buyuk_veri_versiyonu`
+    """
+    db.query(Kullanicilar).update(
+        {
+            Kullanicilar.veri_versiyonu: Kullanicilar.veri_versiyonu + eski_en_buyuk + 1,
+            Kullanicilar.guncellenme_tarihi: Kullanicilar.guncellenme_tarihi,
+        },
+        synchronize_session=False
+    )
+    istatistik_onbellegi.temizle()
+
+
+def _versiyonlari_artir(db: Session, kullanici_idleri) -> None:
+    """Kullanıcıların sayacını filo versiyonunun ötesine taşır."""
+    en_buyuk = func.max if db.get_bind().dialect.name == "sqlite" else func.greatest
+    filo_versiyonu = en_buyuk_veri_versiyonu(db)
+    # guncellenme_tarihi'nin onupdate'i tetiklenmesin; veri versiyonu profil değişikliği değildir
+    db.query(Kullanicilar).filter(Kullanicilar.id.in_(kullanici_idleri)).update(
+        {
+            # Satır kilidi beklenirse sayaç, önceki transaction'ın yazdığı değerden artırılır
+            Kullanicilar.veri_versiyonu: en_buyuk(Kullanicilar.veri_versiyonu + 1, filo_versiyonu + 1),
+            Kullanicilar.guncellenme_tarihi: Kullanicilar.guncellenme_tarihi,
+        },
+        synchronize_session=False
+    )
+
+
+@event.listens_for(Session, "before_commit")
+def _veri_versiyonlarini_artir(db):
+    """
+    Değişen araçların sahiplerini bulup veri versiyonlarını commit'ten önce,
+    aynı transaction içinde artırır. Sadece sahiplerin satırları güncellenir.
+    """
+    arac_idleri = db.info.pop("degisen_araclar", None)
+    kullanicilar = db.info.pop("degisen_kullanicilar", None) or set()
+    if not arac_idleri and not kullanicilar:
+        return
+
+    bilinmeyenler = []
+    for arac_id in arac_idleri or ():
+        # Servis aracı zaten yüklediyse sorguya gerek yok
+        arac = db.identity_map.get(identity_key(Araclar, arac_id))
+        if arac is not None and "kullanici_id" in arac.__dict__:
+            kullanicilar.add(arac.kullanici_id)
+        else:
+            bilinmeyenler.append(arac_id)
+
+    if bilinmeyenler:
+        kullanicilar.update(
+            kullanici_id for (kullanici_id,) in
+            db.query(Araclar.kullanici_id).filter(Araclar.id.in_(bilinmeyenler)).distinct()
+        )
+
+    if kullanicilar:
+        _versiyonlari_artir(db, kullanicilar)
+
+
+@event.listens_for(Session, "after_rollback")
+def _degisiklikleri_unut(db):
+    db.info.pop("degisen_araclar", None)
+    db.info.pop("degisen_kullanicilar", None)
@@ -0,0 +1,209 @@
+"""
+Özet Servisi
+Harcama, yakıt ve bakım kayıtlarının aylık toplamlarını (aylik_ozetler) yönetir.
+Yazma servisleri bu fonksiyonları commit'ten önce çağırır; böylece özetler
+ham kayıtlarla aynı transaction içinde güncellenir.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, insert, literal
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from sunucu.modeller.aylik_ozet import AylikOzetler, OZET_HARCAMA, OZET_YAKIT, OZET_BAKIM
+from sunucu.modeller.harcama import Harcamalar
+from sunucu.modeller.yakit_takibi import Yakit_Takibi
+from sunucu.modeller.bakim import Bakimlar
+from sunucu.veritabani import toplamlari_artir
+
+OzetAnahtari = Tuple[int, date, str, str]
+
+# Yeniden oluşturma sırasında tek seferde yazılacak satır sayısı
+YIGIN_BOYUTU = 1000
+
+
+def ay_baslangici(tarih: date) -> date:
+    """Verilen tarihin ait olduğu ayın ilk gününü döndürür."""
+    return date(tarih.year, tarih.month, 1)
+
+
+def _kayit_degerleri(tur: str, kayit) -> Tuple[str, Decimal, Decimal]:
+    """Kayıttan (kategori, tutar, litre) üçlüsünü çıkarır."""
+    if tur == OZET_HARCAMA:
+        return kayit.kategori, Decimal(kayit.tutar or 0), Decimal("0")
+    if tur == OZET_YAKIT:
+        return kayit.yakit_turu, Decimal(kayit.toplam_tutar or 0), Decimal(kayit.litre or 0)
+    return kayit.bakim_turu, Decimal(kayit.tutar or 0), Decimal("0")
+
+
+def _ozet_degistir(
+    db: Session,
+    anahtar: OzetAnahtari,
+    tutar: Decimal,
+    litre: Decimal,
+    adet: int
+) -> None:
+    """
+    Özet satırına fark (delta) uygular; satır yoksa oluşturur.
+    PostgreSQL, MySQL ve SQLite'ta tek bir atomik upsert ifadesi çalışır
+    (bkz. toplamlari_artir).
+    """
+    arac_id, ay, tur, kategori = anahtar
+    toplamlari_artir(
+        db, AylikOzetler,
+        {"arac_id": arac_id, "ay": ay, "tur": tur, "kategori": kategori},
+        {"toplam_tutar": tutar, "toplam_litre": litre, "adet": adet}
+    )
+
+    # Son kaydı da silinen özet satırını temizle
+    if adet < 0:
+        db.query(AylikOzetler).filter(
+            and_(
+                AylikOzetler.arac_id == arac_id,
+                AylikOzetler.ay == ay,
+                AylikOzetler.tur == tur,
+                AylikOzetler.kategori == kategori,
+                AylikOzetler.adet <= 0
+            )
+        ).delete(synchronize_session=False)
+
+
+def ozete_ekle(db: Session, tur: str, kayit) -> None:
+    """
+    Kaydı aylık özete ekler. Silinmiş kayıtlar özete dahil edilmez.
+
+    Args:
+        db: Veritabanı session'ı
+        tur: Özet türü (harcama, yakit, bakim)
+        kayit: Harcamalar / Yakit_Takibi / Bakimlar nesnesi
+    """
+    if kayit.silinmis_mi:
+        return
+    kategori, tutar, litre = _kayit_degerleri(tur, kayit)
+    _ozet_degistir(db, (kayit.arac_id, ay_baslangici(kayit.tarih), tur, kategori), tutar, litre, 1)
+
+
+def ozete_toplu_ekle(db: Session, tur: str, kayitlar) -> None:
+    """
+    Kayıtları aylık özete ekler. Kayıtlar önce özet anahtarı bazında
+    toplanır; her özet satırı için tek bir upsert çalışır (toplu aktarım).
+    """
+    toplamlar: Dict[OzetAnahtari, List] = {}
+    for kayit in kayitlar:
+        if kayit.silinmis_mi:
+            continue
+        kategori, tutar, litre = _kayit_degerleri(tur, kayit)
+        toplam = toplamlar.setdefault(
+            (kayit.arac_id, ay_baslangici(kayit.tarih), tur, kategori), [Decimal("0"), Decimal("0"), 0]
+        )
+        toplam[0] += tutar
+        toplam[1] += litre
+        toplam[2] += 1
+
+    for anahtar, (tutar, litre, adet) in toplamlar.items():
+        _ozet_degistir(db, anahtar, tutar, litre, adet)
+
+
+def ozetten_cikar(db: Session, tur: str, kayit) -> None:
+    """
+    Kaydın mevcut değerlerini aylık özetten çıkarır.
+    Güncellemeden önce (eski değerler) veya silmeden önce çağrılmalıdır.
+    """
+    if kayit.silinmis_mi:
+        return
+    kategori, tutar, litre = _kayit_degerleri(tur, kayit)
+    _ozet_degistir(db, (kayit.arac_id, ay_baslangici(kayit.tarih), tur, kategori), -tutar, -litre, -1)
+
+
+def _ham_ozetleri_hesapla(db: Session) -> Dict[OzetAnahtari, List]:
+    """
+    Ham tablolardan beklenen özetleri hesaplar.
+    Veritabanında gün bazında gruplanır, ay'a katlama Python'da yapılır
+    (lehçeye özel tarih fonksiyonu gerekmez).
+    """
+    kaynaklar = [
+        (OZET_HARCAMA, Harcamalar, Harcamalar.kategori, Harcamalar.tutar, None),
+        (OZET_YAKIT, Yakit_Takibi, Yakit_Takibi.yakit_turu, Yakit_Takibi.toplam_tutar, Yakit_Takibi.litre),
+        (OZET_BAKIM, Bakimlar, Bakimlar.bakim_turu, Bakimlar.tutar, None),
+    ]
+
+    ozetler: Dict[OzetAnahtari, List] = {}
+    for tur, model, kategori_kolonu, tutar_kolonu, litre_kolonu in kaynaklar:
+        sorgu = db.query(
+            model.arac_id,
+            model.tarih,
+            kategori_kolonu,
+            func.coalesce(func.sum(tutar_kolonu), 0),
+            func.coalesce(func.sum(litre_kolonu), 0) if litre_kolonu is not None else literal(0),
+            func.count(model.id)
+        ).filter(model.silinmis_mi == False).group_by(model.arac_id, model.tarih, kategori_kolonu)
+
+        for arac_id, tarih, kategori, tutar, litre, adet in sorgu.yield_per(YIGIN_BOYUTU):
+            anahtar = (arac_id, ay_baslangici(tarih), tur, kategori)
+            toplam = ozetler.setdefault(anahtar, [Decimal("0"), Decimal("0"), 0])
+            toplam[0] += Decimal(str(tutar))
+            toplam[1] += Decimal(str(litre))
+            toplam[2] += adet
+
+    return ozetler
+
+
+def ozetleri_yeniden_olustur(db: Session) -> int:
+    """
+    Tüm aylık özetleri ham tablolardan yeniden oluşturur (backfill).
+
+    Returns:
+        int: Yazılan özet satırı sayısı
+    """
+    ozetler = _ham_ozetleri_hesapla(db)
+
+    db.query(AylikOzetler).delete(synchronize_session=False)
+
+    satirlar = [
+        {
+            "arac_id": arac_id,
+            "ay": ay,
+            "tur": tur,
+            "kategori": kategori,
+            "toplam_tutar": tutar,
+            "toplam_litre": litre,
+            "adet": adet,
+        }
+        for (arac_id, ay, tur, kategori), (tutar, litre, adet) in ozetler.items()
+    ]
+    for i in range(0, len(satirlar), YIGIN_BOYUTU):
+        db.execute(insert(AylikOzetler), satirlar[i:i + YIGIN_BOYUTU])
+
+    db.commit()
+    return len(satirlar)
+
+
+def ozetleri_dogrula(db: Session) -> List[Dict]:
+    """
+    Aylık özet tablosunu ham tablolarla karşılaştırır.
+
+    Returns:
+        List[Dict]: Uyuşmayan anahtarlar (boş liste = özetler tutarlı)
+    """
+    beklenen = _ham_ozetleri_hesapla(db)
+    mevcut = {
+        (s.arac_id, s.ay, s.tur, s.kategori): [Decimal(s.toplam_tutar), Decimal(s.toplam_litre), s.adet]
+        for s in db.query(AylikOzetler).yield_per(YIGIN_BOYUTU)
+    }
+
+    farklar = []
+    for anahtar in beklenen.keys() | mevcut.keys():
+        b = beklenen.get(anahtar, [Decimal("0"), Decimal("0"), 0])
+        m = mevcut.get(anahtar, [Decimal("0"), Decimal("0"), 0])
+        if b != m:
+            arac_id, ay, tur, kategori = anahtar
+            farklar.append({
+                "arac_id": arac_id,
+                "ay": ay.isoformat(),
+                "tur": tur,
+                "kategori": kategori,
+                "beklenen": {"tutar": b[0], "litre": b[1], "adet": b[2]},
+                "mevcut": {"tutar": m[0], "litre": m[1], "adet": m[2]},
+            })
+
+    return farklar
@@ -0,0 +1,252 @@
+"""
+Araç Sayaç Servisi
+Araç satırındaki maliyet toplamlarını ve son bakım/yakıt kilometresini yönetir.
+Yazma servisleri bu fonksiyonları aylık özetlerle birlikte, commit'ten önce
+çağırır. Her değişiklik araç satırına tek bir `UPDATE ... SET x = x + :fark`
+ifadesi olarak gider; okuma tarafı birincil anahtar ile tek satır okur.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, or_, select, update
+from decimal import Decimal
+from typing import Dict, List
+
+from sunucu.modeller.arac import Araclar
+from sunucu.modeller.aylik_ozet import OZET_HARCAMA, OZET_YAKIT
+from sunucu.modeller.harcama import Harcamalar
+from sunucu.modeller.yakit_takibi import Yakit_Takibi
+from sunucu.modeller.bakim import Bakimlar
+
+# Toplam sayaçları (tutarlılık kontrolünde Decimal olarak karşılaştırılır)
+TOPLAM_SAYACLARI = ("toplam_bakim_maliyeti", "toplam_harcama", "toplam_yakit_maliyeti", "toplam_yakit_litre")
+# Son kayıt sayaçları
+SON_KAYIT_SAYACLARI = ("son_bakim_km", "son_bakim_tarihi", "sonraki_bakim_km", "son_yakit_km")
+
+
+def _sayac_guncelle(db: Session, arac_id: int, degerler: List) -> None:
+    """
+    Araç satırına tek bir UPDATE uygular.
+
+    `degerler` (kolon, ifade) çiftlerinin sıralı listesidir. MySQL SET
+    ifadelerini soldan sağa değerlendirdiği için, başka ifadelerin koşulunda
+    kullanılan kolon (son_bakim_tarihi) her zaman en sona yazılır.
+    """
+    db.execute(
+        update(Araclar)
+        .where(Araclar.id == arac_id)
+        .ordered_values(*degerler)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _son_bakim_alt_sorgusu(db: Session, arac_id: int, haric_id: int, kolon):
+    """Belirtilen kayıt hariç aracın en son bakımından tek bir kolonu okuyan skaler alt sorgu."""
+    return select(kolon).where(
+        and_(
+            Bakimlar.arac_id == arac_id,
+            Bakimlar.silinmis_mi == False,
+            Bakimlar.id != haric_id
+        )
+    ).order_by(Bakimlar.tarih.desc(), Bakimlar.id.desc()).limit(1).scalar_subquery()
+
+
+def _yakit_sayaclarini_artir(db: Session, arac_id: int, tutar: Decimal, litre: Decimal, km: int) -> None:
+    """Yakıt toplamlarını artırır; son_yakit_km'yi km daha büyükse günceller."""
+    _sayac_guncelle(db, arac_id, [
+        (Araclar.toplam_yakit_maliyeti, Araclar.toplam_yakit_maliyeti + tutar),
+        (Araclar.toplam_yakit_litre, Araclar.toplam_yakit_litre + litre),
+        (Araclar.son_yakit_km, case(
+            (or_(Araclar.son_yakit_km.is_(None), Araclar.son_yakit_km < km), km),
+            else_=Araclar.son_yakit_km
+        )),
+    ])
+
+
+def yakit_sayaclarina_toplu_ekle(db: Session, kayitlar) -> None:
+    """
+    Yakıt kayıtlarını araç sayaçlarına ekler. Kayıtlar araç bazında
+    toplanır; her araç için tek bir UPDATE çalışır (toplu aktarım).
+    """
+    toplamlar: Dict[int, List] = {}
+    for kayit in kayitlar:
+        if kayit.silinmis_mi:
+            continue
+        toplam = toplamlar.setdefault(kayit.arac_id, [Decimal("0"), Decimal("0"), kayit.km])
+        toplam[0] += Decimal(kayit.toplam_tutar or 0)
+        toplam[1] += Decimal(kayit.litre or 0)
+        toplam[2] = max(toplam[2], kayit.km)
+
+    for arac_id, (tutar, litre, en_yuksek_km) in toplamlar.items():
+        _yakit_sayaclarini_artir(db, arac_id, tutar, litre, en_yuksek_km)
+
+
+def sayaclara_ekle(db: Session, tur: str, kayit) -> None:
+    """
+    Kaydı aracın sayaçlarına ekler. Silinmiş kayıtlar sayaçlara dahil edilmez.
+
+    Args:
+        db: Veritabanı session'ı
+        tur: Özet türü (harcama, yakit, bakim)
+        kayit: Harcamalar / Yakit_Takibi / Bakimlar nesnesi
+    """
+    if kayit.silinmis_mi:
+        return
+
+    if tur == OZET_HARCAMA:
+        _sayac_guncelle(db, kayit.arac_id, [
+            (Araclar.toplam_harcama, Araclar.toplam_harcama + Decimal(kayit.tutar or 0)),
+        ])
+    elif tur == OZET_YAKIT:
+        _yakit_sayaclarini_artir(db, kayit.arac_id, Decimal(kayit.toplam_tutar or 0), Decimal(kayit.litre or 0), kayit.km)
+    else:
+        # Aynı tarihli kayıtlarda yeni eklenen (daha büyük id) en son sayılır
+        en_son_mu = or_(Araclar.son_bakim_tarihi.is_(None), Araclar.son_bakim_tarihi <= kayit.tarih)
+        _sayac_guncelle(db, kayit.arac_id, [
+            (Araclar.toplam_bakim_maliyeti, Araclar.toplam_bakim_maliyeti + Decimal(kayit.tutar or 0)),
+            (Araclar.son_bakim_km, case((en_son_mu, kayit.km), else_=Araclar.son_bakim_km)),
+            (Araclar.sonraki_bakim_km, case((en_son_mu, kayit.sonraki_bakim_km), else_=Araclar.sonraki_bakim_km)),
+            (Araclar.son_bakim_tarihi, case((en_son_mu, kayit.tarih), else_=Araclar.son_bakim_tarihi)),
+        ])
+
+
+def sayaclardan_cikar(db: Session, tur: str, kayit) -> None:
+    """
+    Kaydın mevcut değerlerini aracın sayaçlarından çıkarır.
+    Güncellemeden önce (eski değerler) veya silmeden önce çağrılmalıdır.
+
+    Kayıt aracın en son bakımı / en yüksek kilometreli yakıt kaydıysa ilgili
+    sayaç, aynı UPDATE içinde kayıt hariç tutularak yeniden hesaplanır.
+    """
+    if kayit.silinmis_mi:
+        return
+
+    if tur == OZET_HARCAMA:
+        _sayac_guncelle(db, kayit.arac_id, [
+            (Araclar.toplam_harcama, Araclar.toplam_harcama - Decimal(kayit.tutar or 0)),
+        ])
+    elif tur == OZET_YAKIT:
+        kalan_en_yuksek_km = select(func.max(Yakit_Takibi.km)).where(
+            and_(
+                Yakit_Takibi.arac_id == kayit.arac_id,
+                Yakit_Takibi.silinmis_mi == False,
+                Yakit_Takibi.id != kayit.id
+            )
+        ).scalar_subquery()
+        _sayac_guncelle(db, kayit.arac_id, [
+            (Araclar.toplam_yakit_maliyeti, Araclar.toplam_yakit_maliyeti - Decimal(kayit.toplam_tutar or 0)),
+            (Araclar.toplam_yakit_litre, Araclar.toplam_yakit_litre - Decimal(kayit.litre or 0)),
+            (Araclar.son_yakit_km, case(
+                (Araclar.son_yakit_km <= kayit.km, kalan_en_yuksek_km),
+                else_=Araclar.son_yakit_km
+            )),
+        ])
+    else:
+        en_son_mu = Araclar.son_bakim_tarihi <= kayit.tarih
+        _sayac_guncelle(db, kayit.arac_id, [
+            (Araclar.toplam_bakim_maliyeti, Araclar.toplam_bakim_maliyeti - Decimal(kayit.tutar or 0)),
+            (Araclar.son_bakim_km, case(
+                (en_son_mu, _son_bakim_alt_sorgusu(db, kayit.arac_id, kayit.id, Bakimlar.km)),
+                else_=Araclar.son_bakim_km
+            )),
+            (Araclar.sonraki_bakim_km, case(
+                (en_son_mu, _son_bakim_alt_sorgusu(db, kayit.arac_id, kayit.id, Bakimlar.sonraki_bakim_km)),
+                else_=Araclar.sonraki_bakim_km
+            )),
+            (Araclar.son_bakim_tarihi, case(
+                (en_son_mu, _son_bakim_alt_sorgusu(db, kayit.arac_id, kayit.id, Bakimlar.tarih)),
+                else_=Araclar.son_bakim_tarihi
+            )),
+        ])
+
+
+def _beklenen_sayaclari_hesapla(db: Session) -> Dict[int, Dict]:
+    """Ham tablolardan araç bazında beklenen sayaç değerlerini hesaplar."""
+    beklenen: Dict[int, Dict] = {}
+
+    def arac_sayaclari(arac_id: int) -> Dict:
+        return beklenen.setdefault(arac_id, {
+            "toplam_bakim_maliyeti": Decimal("0"),
+            "toplam_harcama": Decimal("0"),
+            "toplam_yakit_maliyeti": Decimal("0"),
+            "toplam_yakit_litre": Decimal("0"),
+            "son_bakim_km": None,
+            "son_bakim_tarihi": None,
+            "sonraki_bakim_km": None,
+            "son_yakit_km": None,
+        })
+
+    for (arac_id,) in db.query(Araclar.id):
+        arac_sayaclari(arac_id)
+
+    for arac_id, toplam in db.query(Harcamalar.arac_id, func.sum(Harcamalar.tutar)).filter(
+        Harcamalar.silinmis_mi == False
+    ).group_by(Harcamalar.arac_id):
+        arac_sayaclari(arac_id)["toplam_harcama"] = Decimal(str(toplam or 0))
+
+    for arac_id, tutar, litre, en_yuksek_km in db.query(
+        Yakit_Takibi.arac_id,
+        func.sum(Yakit_Takibi.toplam_tutar),
+        func.sum(Yakit_Takibi.litre),
+        func.max(Yakit_Takibi.km)
+    ).filter(Yakit_Takibi.silinmis_mi == False).group_by(Yakit_Takibi.arac_id):
+        sayaclar = arac_sayaclari(arac_id)
+        sayaclar["toplam_yakit_maliyeti"] = Decimal(str(tutar or 0))
+        sayaclar["toplam_yakit_litre"] = Decimal(str(litre or 0))
+        sayaclar["son_yakit_km"] = en_yuksek_km
+
+    for arac_id, toplam in db.query(Bakimlar.arac_id, func.sum(Bakimlar.tutar)).filter(
+        Bakimlar.silinmis_mi == False
+    ).group_by(Bakimlar.arac_id):
+        arac_sayaclari(arac_id)["toplam_bakim_maliyeti"] = Decimal(str(toplam or 0))
+
+    # Araç başına en son bakım (tarih DESC, id DESC)
+    sirali = db.query(
+        Bakimlar.arac_id,
+        Bakimlar.km,
+        Bakimlar.tarih,
+        Bakimlar.sonraki_bakim_km,
+        func.row_number().over(
+            partition_by=Bakimlar.arac_id,
+            order_by=(Bakimlar.tarih.desc(), Bakimlar.id.desc())
+        ).label("sira")
+    ).filter(Bakimlar.silinmis_mi == False).subquery()
+
+    for satir in db.query(sirali).filter(sirali.c.sira == 1):
+        sayaclar = arac_sayaclari(satir.arac_id)
+        sayaclar["son_bakim_km"] = satir.km
+        sayaclar["son_bakim_tarihi"] = satir.tarih
+        sayaclar["sonraki_bakim_km"] = satir.sonraki_bakim_km
+
+    return beklenen
+
+
+def sayaclari_dogrula(db: Session, onar: bool = False) -> List[Dict]:
+    """
+    Araç sayaçlarını ham tablolarla karşılaştırır.
+
+    Args:
+        db: Veritabanı session'ı
+        onar: True ise sapan sayaçlar beklenen değerlerle güncellenir ve commit edilir
+
+    Returns:
+        List[Dict]: Uyuşmayan araçlar (boş liste = sayaçlar tutarlı)
+    """
+    beklenen = _beklenen_sayaclari_hesapla(db)
+    kolonlar = [getattr(Araclar, ad) for ad in TOPLAM_SAYACLARI + SON_KAYIT_SAYACLARI]
+
+    farklar = []
+    for satir in db.query(Araclar.id, *kolonlar):
+        b = beklenen[satir.id]
+        m = {ad: getattr(satir, ad) for ad in SON_KAYIT_SAYACLARI}
+        m.update({ad: Decimal(str(getattr(satir, ad) or 0)) for ad in TOPLAM_SAYACLARI})
+        farkli = {ad: {"beklenen": b[ad], "mevcut": m[ad]} for ad in b if b[ad] != m[ad]}
+        if farkli:
+            farklar.append({"arac_id": satir.id, "farklar": farkli})
+
+    if onar and farklar:
+        for fark in farklar:
+            db.query(Araclar).filter(Araclar.id == fark["arac_id"]).update(
+                beklenen[fark["arac_id"]], synchronize_session=False
+            )
+        db.commit()
+
+    return farklar
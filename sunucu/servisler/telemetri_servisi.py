@@ -0,0 +1,276 @@
+"""
+Kilometre Telemetri Servisi
+Araç takip cihazlarından gelen yüksek frekanslı kilometre okumalarını
+süreç içinde tamponlayıp aralıklarla toplu olarak yazar.
+
+Kilometre geriye gitmediği için tampon araç başına sadece en büyük okumayı
+tutar; bir boşaltma aralığında aynı araçtan gelen okumalar tek değere
+iner. Arka plan görevi (KilometreYazici) her TELEMETRI_BOSALTMA_ARALIGI
+saniyede tamponu tek bir set tabanlı UPDATE ile yazar:
+
+    UPDATE araclar SET km = GREATEST(COALESCE(araclar.km, 0), okumalar.km)
+    FROM (VALUES (:arac_id, :km), ...) AS okumalar (arac_id, km)
+    WHERE araclar.id = okumalar.arac_id AND (araclar.km IS NULL OR araclar.km < okumalar.km)
+
+(MySQL ve SQLite'ta aynı tek ifade VALUES yerine CASE ile kurulur.)
+
+Monotonluk SQL'de sağlanır: birden fazla worker'ın tamponları ve
+PATCH /araclar/{id}/kilometre aynı anda yazsa da kilometre geriye gitmez.
+Tampon süreç içidir; süreç boşaltmadan önce çökerse son aralığın
+okumaları kaybolur (cihazın bir sonraki okuması telafi eder).
+"""
+import asyncio
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, and_, case, column, func, or_, select, update, values
+from sqlalchemy.orm import Session
+
+from sunucu.ayarlar import ayarlar
+from sunucu.modeller.arac import Araclar
+from sunucu.onbellek import TTLLRUOnbellek
+from sunucu.servisler import onbellek_servisi
+from sunucu.veritabani import AsyncSessionLocal
+
+# Tek UPDATE'e giden en fazla okuma (araç başına 2-4 bind parametresi)
+YIGIN_BOYUTU = 5000
+
+# Araç ID → sahibi; her istekte sahiplik için sorgu atılmasın
+arac_sahipleri = TTLLRUOnbellek(
+    boyut=ayarlar.KULLANICI_ONBELLEK_BOYUTU,
+    sure=ayarlar.KULLANICI_ONBELLEK_SURESI
+)
+
+
+class KilometreTamponu:
+    """Araç başına en büyük kilometreyi ve sahibini tutan thread-safe tampon."""
+
+    def __init__(self):
+        self._okumalar: Dict[int, Tuple[int, int]] = {}
+        self._kilit = threading.Lock()
+        self.alinan = 0
+        self.yazilan = 0
+        self.bosaltma_sayisi = 0
+
+    def ekle(self, okumalar: Iterable[Tuple[int, int, int]]) -> int:
+        """
+        (arac_id, km, kullanici_id) okumalarını tampona ekler.
+
+        Returns:
+            int: Tampondaki araç sayısı
+        """
+        with self._kilit:
+            tampon = self._okumalar
+            for arac_id, km, kullanici_id in okumalar:
+                self.alinan += 1
+                mevcut = tampon.get(arac_id)
+                if mevcut is None or km > mevcut[0]:
+                    tampon[arac_id] = (km, kullanici_id)
+            return len(tampon)
+
+    def al(self) -> Dict[int, Tuple[int, int]]:
+        """Tampondaki okumaları alır ve tamponu boşaltır."""
+        with self._kilit:
+            okumalar, self._okumalar = self._okumalar, {}
+            return okumalar
+
+    def geri_koy(self, okumalar: Dict[int, Tuple[int, int]]) -> None:
+        """Yazılamayan okumaları, bu arada gelenlerle birleştirerek tampona geri koyar."""
+        with self._kilit:
+            for arac_id, (km, kullanici_id) in okumalar.items():
+                mevcut = self._okumalar.get(arac_id)
+                if mevcut is None or km > mevcut[0]:
+                    self._okumalar[arac_id] = (km, kullanici_id)
+
+    def yazildi(self, guncellenen: int) -> None:
+        with self._kilit:
+            self.yazilan += guncellenen
+            self.bosaltma_sayisi += 1
+
+    def istatistik(self) -> dict:
+        with self._kilit:
+            return {
+                "tampondaki_arac": len(self._okumalar),
+                "alinan_okuma": self.alinan,
+                "yazilan_arac": self.yazilan,
+                "bosaltma_sayisi": self.bosaltma_sayisi,
+            }
+
+
+kilometre_tamponu = KilometreTamponu()
+
+
+def okumalari_tamponla(
+    db: Session,
+    okumalar: List[Tuple[int, int]],
+    kullanici_id: int,
+    kullanici_rol: str = "kullanici"
+) -> int:
+    """
+    Okumaların araçlarının sahipliğini doğrulayıp tampona ekler. Sahipler
+    önbellekten okunur; önbellekte olmayan araçlar tek sorguyla yüklenir.
+
+    Args:
+        db: Veritabanı session'ı
+        okumalar: (arac_id, km) çiftleri
+        kullanici_id: İsteği yapan kullanıcı
+        kullanici_rol: Kullanıcı rolü (admin tüm araçlara yazabilir)
+
+    Returns:
+        int: Tampondaki araç sayısı
+
+    Raises:
+        HTTPException: 404 araç bulunamadı, 403 yetkisiz erişim
+    """
+    sahipler: Dict[int, int] = {}
+    eksikler = set()
+    for arac_id, _ in okumalar:
+        if arac_id in sahipler or arac_id in eksikler:
+            continue
+        sahibi = arac_sahipleri.getir(arac_id)
+        if sahibi is None:
+            eksikler.add(arac_id)
+        else:
+            sahipler[arac_id] = sahibi
+
+    if eksikler:
+        for arac_id, sahibi in db.execute(
+            select(Araclar.id, Araclar.kullanici_id).where(
+                and_(Araclar.id.in_(eksikler), Araclar.silinmis_mi == False)
+            )
+        ):
+            sahipler[arac_id] = sahibi
+            arac_sahipleri.koy(arac_id, sahibi)
+
+        bulunamayanlar = eksikler - sahipler.keys()
+        if bulunamayanlar:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Araç bulunamadı: {', '.join(map(str, sorted(bulunamayanlar)))}"
+            )
+
+    if kullanici_rol != 'admin' and any(sahibi != kullanici_id for sahibi in sahipler.values()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Bu araca erişim yetkiniz yok"
+        )
+
+    return kilometre_tamponu.ekle((arac_id, km, sahipler[arac_id]) for arac_id, km in okumalar)
+
+
+def _kilometre_guncelleme_ifadesi(lehce: str, parca: List[Tuple[int, int]]):
+    """Parçadaki araçların kilometresini tek ifadede ileri alan UPDATE."""
+    # SQLite'ta GREATEST yok; çok argümanlı max() aynı işi yapar
+    en_buyuk = func.max if lehce == "sqlite" else func.greatest
+
+    if lehce == "postgresql":
+        okumalar = values(column("arac_id", Integer), column("km", Integer), name="okumalar").data(parca)
+        return update(Araclar).where(
+            and_(
+                Araclar.id == okumalar.c.arac_id,
+                Araclar.silinmis_mi == False,
+                or_(Araclar.km.is_(None), Araclar.km < okumalar.c.km)
+            )
+        ).values(km=en_buyuk(func.coalesce(Araclar.km, 0), okumalar.c.km))
+
+    # MySQL (VALUES ROW(...) ister) ve SQLite (VALUES kolonları adlandırılamaz)
+    # türetilmiş tabloyu desteklemez; aynı tek ifade CASE ile kurulur
+    yeni_km = case({arac_id: km for arac_id, km in parca}, value=Araclar.id)
+    return update(Araclar).where(
+        and_(
+            Araclar.id.in_([arac_id for arac_id, _ in parca]),
+            Araclar.silinmis_mi == False,
+            or_(Araclar.km.is_(None), Araclar.km < yeni_km)
+        )
+    ).values(km=en_buyuk(func.coalesce(Araclar.km, 0), yeni_km))
+
+
+def kilometreleri_yaz(db: Session, okumalar: Dict[int, Tuple[int, int]]) -> int:
+    """
+    Tamponlanmış okumaları set tabanlı UPDATE ile yazar ve commit eder.
+    Sadece kilometresi ileri giden araçlar güncellenir.
+
+    Args:
+        db: Veritabanı session'ı
+        okumalar: Araç ID → (km, kullanici_id)
+
+    Returns:
+        int: Kilometresi güncellenen araç sayısı
+    """
+    lehce = db.get_bind().dialect.name
+    satirlar = [(arac_id, km) for arac_id, (km, _) in okumalar.items()]
+    guncellenen = 0
+    for i in range(0, len(satirlar), YIGIN_BOYUTU):
+        guncellenen += db.execute(
+            _kilometre_guncelleme_ifadesi(lehce, satirlar[i:i + YIGIN_BOYUTU]),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+
+    for kullanici_id in {kullanici_id for _, kullanici_id in okumalar.values()}:
+        onbellek_servisi.degisiklik_kaydet(db, kullanici_id=kullanici_id)
+    db.commit()
+    return guncellenen
+
+
+class KilometreYazici:
+    """
+    Tamponu her `aralik` saniyede bir (tampon `sinir` aracı aşarsa hemen)
+    yazan arka plan görevi. Uygulama başlarken `baslat`, kapanırken
+    `durdur` çağrılır; durdururken tamponda kalanlar yazılır.
+    """
+
+    def __init__(self, tampon: KilometreTamponu, aralik: float, sinir: int):
+        self.tampon = tampon
+        self.aralik = aralik
+        self.sinir = sinir
+        self._uyandir: Optional[asyncio.Event] = None
+        self._gorev: Optional[asyncio.Task] = None
+
+    def baslat(self) -> None:
+        self._uyandir = asyncio.Event()
+        self._gorev = asyncio.create_task(self._dongu())
+
+    async def durdur(self) -> None:
+        if self._gorev is not None:
+            self._gorev.cancel()
+            try:
+                await self._gorev
+            except asyncio.CancelledError:
+                pass
+            self._gorev = None
+        await self.bosalt()
+
+    def tampon_doldu_mu(self, tampondaki_arac: int) -> None:
+        """Tampon sınırı aştıysa aralığı beklemeden yazdırır."""
+        if tampondaki_arac >= self.sinir and self._uyandir is not None:
+            self._uyandir.set()
+
+    async def _dongu(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._uyandir.wait(), timeout=self.aralik)
+            except asyncio.TimeoutError:
+                pass
+            self._uyandir.clear()
+            await self.bosalt()
+
+    async def bosalt(self) -> int:
+        """Tampondakileri yazar; hata olursa okumalar sonraki aralık için tampona döner."""
+        okumalar = self.tampon.al()
+        if not okumalar:
+            return 0
+        try:
+            async with AsyncSessionLocal() as db:
+                guncellenen = await db.run_sync(kilometreleri_yaz, okumalar)
+        except Exception as e:
+            self.tampon.geri_koy(okumalar)
+            print(f"❌ Kilometre telemetrisi yazılamadı ({len(okumalar)} araç tekrar denenecek): {e}")
+            return 0
+        self.tampon.yazildi(guncellenen)
+        return guncellenen
+
+
+kilometre_yazici = KilometreYazici(
+    kilometre_tamponu, ayarlar.TELEMETRI_BOSALTMA_ARALIGI, ayarlar.TELEMETRI_TAMPON_SINIRI
+)
@@ -0,0 +1,183 @@
+"""
+Yakıt Tüketim Servisi
+Tam depo kayıtlarının ortalama tüketimini (L/100km) segment bazında hesaplar.
+
+Segment, bir tam depo kaydından sonraki tam depo kaydına kadar olan
+kayıtlardır (km, id sırasıyla). Segmentin tüketimi, aradaki kısmi dolumlar
+dahil segmentte alınan tüm yakıtın iki tam depo arasındaki mesafeye
+oranıdır. Değer segmenti kapatan tam depo kaydına yazılır; kısmi dolumlarda
+ve aracın ilk tam deposunda NULL'dır.
+
+Bir kaydın eklenmesi, değişmesi veya silinmesi yalnızca kaydın konumunu
+içeren segmenti ve kayıt tam depoysa bir sonrakini etkiler. Etkilenen aralık
+iki index seek ile bulunur (öncesindeki son ve sonrasındaki ilk tam depo),
+tek pencereli sorguyla okunup yeniden hesaplanır; bir düzenlemenin maliyeti
+geçmişin uzunluğuna bağlı değildir. Yazma servisleri commit'ten önce
+`segmentleri_guncelle` çağırır.
+"""
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, bindparam, case, func, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from sunucu.modeller.yakit_takibi import Yakit_Takibi
+
+# Kayıt konumu: (km, id)
+Konum = Tuple[int, int]
+
+KURUS = Decimal("0.01")
+# ortalama_tuketim Numeric(5, 2); bu sınırı aşan değerler hatalı km girişidir, NULL yazılır
+EN_FAZLA_TUKETIM = Decimal("1000")
+
+
+def _aktif_kayitlar(arac_id: int):
+    return and_(Yakit_Takibi.arac_id == arac_id, Yakit_Takibi.silinmis_mi == False)
+
+
+def _onceki_tam_depo(db: Session, arac_id: int, konum: Konum) -> Optional[Konum]:
+    """Konumdan önceki son tam depo kaydının konumu."""
+    km, kayit_id = konum
+    return db.execute(
+        select(Yakit_Takibi.km, Yakit_Takibi.id).where(
+            and_(
+                _aktif_kayitlar(arac_id),
+                Yakit_Takibi.tam_depo == True,
+                Yakit_Takibi.km <= km,
+                tuple_(Yakit_Takibi.km, Yakit_Takibi.id) < tuple_(km, kayit_id)
+            )
+        ).order_by(Yakit_Takibi.km.desc(), Yakit_Takibi.id.desc()).limit(1)
+    ).first()
+
+
+def _sonraki_tam_depo(db: Session, arac_id: int, konum: Konum) -> Optional[Konum]:
+    """Konumdan sonraki ilk tam depo kaydının konumu."""
+    km, kayit_id = konum
+    return db.execute(
+        select(Yakit_Takibi.km, Yakit_Takibi.id).where(
+            and_(
+                _aktif_kayitlar(arac_id),
+                Yakit_Takibi.tam_depo == True,
+                Yakit_Takibi.km >= km,
+                tuple_(Yakit_Takibi.km, Yakit_Takibi.id) > tuple_(km, kayit_id)
+            )
+        ).order_by(Yakit_Takibi.km, Yakit_Takibi.id).limit(1)
+    ).first()
+
+
+def _araligi_hesapla(db: Session, arac_id: int, alt: Optional[Konum], ust: Optional[Konum]) -> int:
+    """
+    (alt, ust] aralığındaki kayıtların tüketimini yeniden hesaplar.
+
+    `alt` bir tam depo kaydıdır (aralıktaki ilk segmentin başlangıcı) veya
+    None (aracın ilk kaydından itibaren); `ust` aralığı kapatan tam depo
+    kaydıdır veya None (son kayda kadar). Sadece değeri değişen satırlar
+    yazılır.
+
+    Returns:
+        int: Güncellenen kayıt sayısı
+    """
+    kosullar = [_aktif_kayitlar(arac_id)]
+    if alt is not None:
+        kosullar += [Yakit_Takibi.km >= alt[0], tuple_(Yakit_Takibi.km, Yakit_Takibi.id) > tuple_(*alt)]
+    if ust is not None:
+        kosullar += [Yakit_Takibi.km <= ust[0], tuple_(Yakit_Takibi.km, Yakit_Takibi.id) <= tuple_(*ust)]
+
+    # segment: satırdan önceki tam depo sayısı; segmenti kapatan tam depo ve
+    # ondan önceki kısmi dolumlar aynı segment numarasını alır
+    sirali = select(
+        Yakit_Takibi.id,
+        Yakit_Takibi.km,
+        Yakit_Takibi.litre,
+        Yakit_Takibi.tam_depo,
+        Yakit_Takibi.ortalama_tuketim,
+        func.coalesce(
+            func.sum(case((Yakit_Takibi.tam_depo == True, 1), else_=0)).over(
+                order_by=(Yakit_Takibi.km, Yakit_Takibi.id), rows=(None, -1)
+            ),
+            0
+        ).label("segment")
+    ).where(and_(*kosullar)).subquery()
+
+    satirlar = db.execute(
+        select(
+            sirali.c.id,
+            sirali.c.km,
+            sirali.c.tam_depo,
+            sirali.c.ortalama_tuketim,
+            func.sum(sirali.c.litre).over(partition_by=sirali.c.segment).label("segment_litre")
+        ).order_by(sirali.c.km, sirali.c.id)
+    ).all()
+
+    onceki_km = alt[0] if alt is not None else None
+    degisenler = []
+    for satir in satirlar:
+        tuketim = None
+        if satir.tam_depo:
+            if onceki_km is not None and satir.km > onceki_km:
+                tuketim = (Decimal(str(satir.segment_litre)) * 100 / (satir.km - onceki_km)).quantize(KURUS)
+                if tuketim >= EN_FAZLA_TUKETIM:
+                    tuketim = None
+            onceki_km = satir.km
+
+        mevcut = Decimal(str(satir.ortalama_tuketim)).quantize(KURUS) if satir.ortalama_tuketim is not None else None
+        if tuketim != mevcut:
+            degisenler.append({"b_id": satir.id, "b_tuketim": tuketim})
+
+    if degisenler:
+        tablo = Yakit_Takibi.__table__
+        db.execute(
+            update(tablo).where(tablo.c.id == bindparam("b_id")).values(ortalama_tuketim=bindparam("b_tuketim")),
+            degisenler
+        )
+    return len(degisenler)
+
+
+def segmentleri_guncelle(db: Session, arac_id: int, *konumlar: Konum) -> int:
+    """
+    Verilen konumlardaki değişikliklerden etkilenen segmentleri yeniden hesaplar.
+    Kayıt eklendikten, değiştirildikten veya silindikten sonra, commit'ten
+    önce çağrılmalıdır. Konum değişen (km) kayıt için eski ve yeni konum
+    birlikte verilir.
+
+    Args:
+        db: Veritabanı session'ı
+        arac_id: Araç ID
+        konumlar: Değişen kayıtların (km, id) konumları
+
+    Returns:
+        int: Tüketimi güncellenen kayıt sayısı
+    """
+    # Yeni/değişen kaydın sorgularda görünmesi için
+    db.flush()
+
+    alt = _onceki_tam_depo(db, arac_id, min(konumlar))
+    ust = _sonraki_tam_depo(db, arac_id, max(konumlar))
+    return _araligi_hesapla(db, arac_id, alt, ust)
+
+
+def arac_tuketimlerini_yeniden_hesapla(db: Session, arac_id: int) -> int:
+    """
+    Aracın tüm yakıt kayıtlarının tüketimini tek pencereli sorguyla yeniden
+    hesaplar (onarım). Commit etmez.
+
+    Returns:
+        int: Tüketimi güncellenen kayıt sayısı
+    """
+    return _araligi_hesapla(db, arac_id, None, None)
+
+
+def tum_tuketimleri_yeniden_hesapla(db: Session) -> int:
+    """
+    Yakıt kaydı olan tüm araçların tüketimini yeniden hesaplar; her araç
+    ayrı commit edilir.
+
+    Returns:
+        int: Tüketimi güncellenen kayıt sayısı
+    """
+    arac_idleri = db.execute(select(Yakit_Takibi.arac_id).distinct()).scalars().all()
+    toplam = 0
+    for arac_id in arac_idleri:
+        toplam += arac_tuketimlerini_yeniden_hesapla(db, arac_id)
+        db.commit()
+    return toplam
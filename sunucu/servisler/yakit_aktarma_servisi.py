@@ -0,0 +1,306 @@
+"""
+Yakıt Kartı Aktarma Servisi
+Yakıt kartı sağlayıcısının işlem dökümünü (CSV veya NDJSON, isteğe bağlı
+gzip) tek transaction içinde yakıt kayıtlarına yazar.
+
+Her işlem için ayrı API çağrısı (yetki, sahiplik kontrolü, commit) yerine:
+plakalar tek sorguyla yüklenen bir eşlemeyle araca çevrilir, daha önce
+kayıtlı işlemler (araç, tarih, km, litre) tek sorguyla ayıklanır ve kayıtlar
+araç bazında km sırasıyla parçalar halinde INSERT edilir. Özetler, sayaçlar
+ve fiyat endeksi anahtar bazında toplanarak yazılır; segment tüketimi,
+anomali puanlaması ve kilometre çizelgesi araç başına bir kez güncellenir.
+
+Dosya satır satır okunur; km sıralaması için doğrulanmış işlemler (ham
+satırlar değil) bellekte tutulur.
+
+CSV formatı (ayraç "," veya ";", ilk satır başlık, bilinmeyen kolonlar yok sayılır):
+    plaka,tarih,km,litre,fiyat,toplam_tutar,yakit_turu,istasyon,tam_depo,notlar
+    34ABC123,2024-03-01,45210,42.5,43.9,,Benzin,Shell Kadıköy,1,
+NDJSON formatı, her satırda aynı alanlara sahip bir nesne:
+    {"plaka": "34ABC123", "tarih": "2024-03-01", "km": 45210, "litre": 42.5, ...}
+"""
+import codecs
+import csv
+import json
+from datetime import date
+from decimal import Decimal
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import and_, insert, select
+from sqlalchemy.orm import Session
+
+from sunucu.modeller.arac import Araclar
+from sunucu.modeller.aylik_ozet import OZET_YAKIT
+from sunucu.modeller.yakit_takibi import Yakit_Takibi
+from sunucu.semalar.yakit_sema import YakitKartIslemi
+from sunucu.servisler import (
+    ozet_servisi, sayac_servisi, fiyat_endeksi_servisi, tuketim_servisi, anomali_servisi, onbellek_servisi,
+    km_cizelgesi_servisi
+)
+from sunucu.servisler.ice_aktarma_servisi import EN_FAZLA_HATA, akisi_ac, ndjson_satirlari
+
+# (arac_id, tarih, km, litre)
+TekrarAnahtari = Tuple[int, date, int, Decimal]
+
+KURUS = Decimal("0.01")
+UTF8_BOM = codecs.BOM_UTF8
+
+
+def plaka_normallestir(plaka: str) -> str:
+    """Plakayı araç şemasındaki biçime getirir (büyük harf, boşluksuz)."""
+    return plaka.upper().replace(" ", "")
+
+
+def _ondalik(deger: Any) -> Any:
+    """CSV'de ondalık virgülle yazılmış sayıları ("42,50") noktaya çevirir."""
+    if isinstance(deger, str) and "," in deger and "." not in deger:
+        return deger.replace(",", ".")
+    return deger
+
+
+def _csv_satirlari(akis: BinaryIO) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """Başlık satırına göre CSV satırlarını (satır no, alanlar) olarak okur."""
+    metin = codecs.iterdecode(akis, "utf-8-sig")
+    baslik = next(metin, "")
+    ayrac = ";" if baslik.count(";") > baslik.count(",") else ","
+    alanlar = [alan.strip().lower() for alan in next(csv.reader([baslik], delimiter=ayrac), [])]
+
+    okuyucu = csv.reader(metin, delimiter=ayrac)
+    for degerler in okuyucu:
+        if not any(deger.strip() for deger in degerler):
+            continue
+        # Boş hücreler alanın verilmediği anlamına gelir
+        yield okuyucu.line_num + 1, {
+            alan: _ondalik(deger.strip()) for alan, deger in zip(alanlar, degerler) if deger.strip()
+        }
+
+
+def islem_satirlari(akis: BinaryIO) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """
+    Dökümü (satır no, alanlar) olarak okur; JSON olarak çözülemeyen satırda
+    alanlar None'dır. İlk dolu satır "{" ile başlıyorsa NDJSON, değilse CSV.
+    """
+    akis = akisi_ac(akis)
+    ilk_satir = b""
+    for ilk_satir in akis:
+        if ilk_satir.strip():
+            break
+    akis.seek(0)
+
+    if not ilk_satir.lstrip().removeprefix(UTF8_BOM).startswith(b"{"):
+        yield from _csv_satirlari(akis)
+        return
+
+    for satir_no, satir in ndjson_satirlari(akis):
+        try:
+            alanlar = json.loads(satir)
+        except ValueError:
+            alanlar = None
+        yield satir_no, alanlar if isinstance(alanlar, dict) else None
+
+
+class YakitKartiAktarici:
+    """
+    İşlemleri doğrulayıp araç bazında tamponlar, `yaz` ile tek seferde
+    yazar. Plaka eşlemesi sadece kullanıcının (admin ise tüm filonun)
+    silinmemiş araçlarını içerir; başka kullanıcının aracına kayıt eklenemez.
+    """
+
+    def __init__(self, db: Session, kullanici_id: int, kullanici_rol: str = "kullanici", parca_boyutu: int = 1000):
+        self.db = db
+        self.parca_boyutu = parca_boyutu
+
+        sorgu = select(Araclar.id, Araclar.plaka, Araclar.kullanici_id).where(Araclar.silinmis_mi == False)
+        if kullanici_rol != 'admin':
+            sorgu = sorgu.where(Araclar.kullanici_id == kullanici_id)
+        self.araclar: Dict[str, Tuple[int, int]] = {
+            plaka_normallestir(plaka): (arac_id, sahibi) for arac_id, plaka, sahibi in db.execute(sorgu)
+        }
+        self.kullanici_idleri: Dict[int, int] = {}
+
+        self.islemler: Dict[int, List[dict]] = {}
+        self.anahtarlar: set = set()
+        self.en_eski: Optional[date] = None
+        self.en_yeni: Optional[date] = None
+
+        self.tekrar_eden = 0
+        self.hata_sayisi = 0
+        self.hatalar: List[str] = []
+
+    def _hata(self, satir_no: int, mesaj: str) -> None:
+        self.hata_sayisi += 1
+        if len(self.hatalar) < EN_FAZLA_HATA:
+            self.hatalar.append(f"Satır {satir_no}: {mesaj}")
+
+    def satir_ekle(self, satir_no: int, alanlar: Optional[Dict[str, Any]]) -> None:
+        """Tek bir işlemi doğrulayıp aracının tamponuna ekler; dosya içi tekrarları atlar."""
+        if alanlar is None:
+            self._hata(satir_no, "Geçersiz satır (JSON nesnesi bekleniyor)")
+            return
+
+        try:
+            islem = YakitKartIslemi.model_validate(alanlar)
+        except ValidationError as e:
+            hata = e.errors()[0]
+            alan = ".".join(str(parca) for parca in hata["loc"])
+            self._hata(satir_no, f"{alan}: {hata['msg']}" if alan else hata["msg"])
+            return
+
+        arac = self.araclar.get(plaka_normallestir(islem.plaka))
+        if arac is None:
+            self._hata(satir_no, f"{islem.plaka} plakalı araç bulunamadı")
+            return
+        arac_id, sahibi = arac
+
+        litre = islem.litre.quantize(KURUS)
+        fiyat = islem.fiyat.quantize(KURUS)
+        anahtar = (arac_id, islem.tarih, islem.km, litre)
+        if anahtar in self.anahtarlar:
+            self.tekrar_eden += 1
+            return
+        self.anahtarlar.add(anahtar)
+
+        self.kullanici_idleri[arac_id] = sahibi
+        self.islemler.setdefault(arac_id, []).append({
+            "arac_id": arac_id,
+            "tarih": islem.tarih,
+            "km": islem.km,
+            "litre": litre,
+            "fiyat": fiyat,
+            "toplam_tutar": (islem.toplam_tutar or litre * fiyat).quantize(KURUS),
+            "yakit_turu": islem.yakit_turu,
+            "istasyon": islem.istasyon,
+            "tam_depo": bool(islem.tam_depo),
+            "notlar": islem.notlar,
+            "silinmis_mi": False,
+        })
+        if self.en_eski is None or islem.tarih < self.en_eski:
+            self.en_eski = islem.tarih
+        if self.en_yeni is None or islem.tarih > self.en_yeni:
+            self.en_yeni = islem.tarih
+
+    def _parcalar(self, liste: List) -> Iterator[List]:
+        for i in range(0, len(liste), self.parca_boyutu):
+            yield liste[i:i + self.parca_boyutu]
+
+    def _kayitli_anahtarlar(self, arac_idleri: List[int]) -> set:
+        """Tampondaki araç ve tarih aralığında zaten kayıtlı işlemlerin anahtarları."""
+        kayitli = set()
+        for parca in self._parcalar(arac_idleri):
+            satirlar = self.db.execute(
+                select(Yakit_Takibi.arac_id, Yakit_Takibi.tarih, Yakit_Takibi.km, Yakit_Takibi.litre).where(
+                    and_(
+                        Yakit_Takibi.arac_id.in_(parca),
+                        Yakit_Takibi.silinmis_mi == False,
+                        Yakit_Takibi.tarih >= self.en_eski,
+                        Yakit_Takibi.tarih <= self.en_yeni
+                    )
+                )
+            )
+            kayitli.update(
+                (arac_id, tarih, km, Decimal(str(litre)).quantize(KURUS)) for arac_id, tarih, km, litre in satirlar
+            )
+        return kayitli
+
+    def _ekle(self, satirlar: List[dict]) -> List[int]:
+        """Satırları parçalar halinde yazar, yeni id'leri satır sırasıyla döndürür."""
+        tablo = Yakit_Takibi.__table__
+        idler = []
+        for parca in self._parcalar(satirlar):
+            if self.db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+                idler += self.db.execute(
+                    insert(tablo).returning(tablo.c.id, sort_by_parameter_order=True), parca
+                ).scalars().all()
+            else:
+                idler += [self.db.execute(insert(tablo), satir).inserted_primary_key[0] for satir in parca]
+        return idler
+
+    def yaz(self) -> Dict[str, int]:
+        """
+        Tampondaki işlemleri yazar ve türetilmiş verileri günceller. Commit etmez.
+
+        Returns:
+            Dict: eklenen, arac_sayisi, tuketim_guncellenen, anomali_sayisi
+        """
+        sonuc = {"eklenen": 0, "arac_sayisi": 0, "tuketim_guncellenen": 0, "anomali_sayisi": 0}
+        if not self.islemler:
+            return sonuc
+
+        # Eş zamanlı tekil kayıt eklemeleriyle tekrar kontrolü yarışmasın
+        arac_idleri = sorted(self.islemler)
+        for parca in self._parcalar(arac_idleri):
+            self.db.execute(select(Araclar.id).where(Araclar.id.in_(parca)).with_for_update())
+
+        kayitli = self._kayitli_anahtarlar(arac_idleri)
+        satirlar = []
+        for arac_id in arac_idleri:
+            for satir in self.islemler[arac_id]:
+                if (arac_id, satir["tarih"], satir["km"], satir["litre"]) in kayitli:
+                    self.tekrar_eden += 1
+                else:
+                    satirlar.append(satir)
+        # Araç içinde km sırası: segmentler ve anomali istatistikleri bu sırayla ilerler
+        satirlar.sort(key=lambda satir: (satir["arac_id"], satir["km"], satir["tarih"]))
+        if not satirlar:
+            return sonuc
+
+        kayitlar = [Yakit_Takibi(id=yeni_id, **satir) for yeni_id, satir in zip(self._ekle(satirlar), satirlar)]
+
+        ozet_servisi.ozete_toplu_ekle(self.db, OZET_YAKIT, kayitlar)
+        sayac_servisi.yakit_sayaclarina_toplu_ekle(self.db, kayitlar)
+        fiyat_endeksi_servisi.endekse_toplu_ekle(self.db, kayitlar, self.kullanici_idleri)
+
+        arac_kayitlari: Dict[int, List[Yakit_Takibi]] = {}
+        for kayit in kayitlar:
+            arac_kayitlari.setdefault(kayit.arac_id, []).append(kayit)
+
+        for arac_id, araca_ait in arac_kayitlari.items():
+            # Eklenen en düşük ve en yüksek konum arasındaki segmentler tek geçişte hesaplanır
+            sonuc["tuketim_guncellenen"] += tuketim_servisi.segmentleri_guncelle(
+                self.db, arac_id, (araca_ait[0].km, araca_ait[0].id), (araca_ait[-1].km, araca_ait[-1].id)
+            )
+            sonuc["anomali_sayisi"] += len(anomali_servisi.yakit_kayitlarini_puanla(self.db, arac_id, araca_ait))
+            km_cizelgesi_servisi.cizelgeyi_guncelle(
+                self.db, arac_id, eklenenler=[(kayit.tarih, kayit.km) for kayit in araca_ait]
+            )
+            onbellek_servisi.degisiklik_kaydet(self.db, arac_id=arac_id)
+
+        sonuc["eklenen"] = len(kayitlar)
+        sonuc["arac_sayisi"] = len(arac_kayitlari)
+        return sonuc
+
+
+def yakit_kartlarini_aktar(
+    db: Session,
+    akis: BinaryIO,
+    kullanici_id: int,
+    kullanici_rol: str = "kullanici",
+    parca_boyutu: int = 1000
+) -> Dict[str, Any]:
+    """
+    Yakıt kartı dökümünü tek transaction içinde yakıt kayıtlarına aktarır.
+    Hatalı satırlar atlanır ve raporlanır; aynı (araç, tarih, km, litre)
+    ile kayıtlı işlemler tekrar eklenmez, dosya yeniden gönderilebilir.
+
+    Args:
+        db: Veritabanı session'ı
+        akis: CSV veya NDJSON (isteğe bağlı gzip) içeren ikili akış
+        kullanici_id: İşlemi yapan kullanıcı
+        kullanici_rol: Kullanıcı rolü (admin tüm araçlara aktarabilir)
+        parca_boyutu: Tek INSERT ile yazılacak en fazla satır sayısı
+
+    Returns:
+        Dict: eklenen, tekrar_eden, arac_sayisi, tuketim_guncellenen,
+        anomali_sayisi, hata_sayisi, hatalar
+    """
+    aktarici = YakitKartiAktarici(db, kullanici_id, kullanici_rol, parca_boyutu)
+    for satir_no, alanlar in islem_satirlari(akis):
+        aktarici.satir_ekle(satir_no, alanlar)
+    sonuc = aktarici.yaz()
+    db.commit()
+
+    sonuc["tekrar_eden"] = aktarici.tekrar_eden
+    sonuc["hata_sayisi"] = aktarici.hata_sayisi
+    sonuc["hatalar"] = aktarici.hatalar
+    return sonuc
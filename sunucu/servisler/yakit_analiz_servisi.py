@@ -0,0 +1,364 @@
+"""
+Yakıt Analiz Servisi
+Bir aracın veya filonun tüm yakıt geçmişi üzerinde vektörel (NumPy)
+analizler: segment tüketimi, hareketli ortalama, fiyat trendi ve aykırı
+değerler.
+
+Geçmiş tek sorguyla (arac_id, km, id sırasıyla) sütun dizileri olarak
+yüklenir; hesaplamalar satır satır döngü yerine dizi işlemleriyle yapılır.
+Gruplama (araç, yakıt türü, ay) sıralı dizilerde sınır indeksleri ve
+`np.bincount` ile yapılır; çok yıllık filo geçmişi de tek geçişte işlenir.
+
+Segment tanımı tuketim_servisi ile aynıdır: bir tam depodan sonraki tam
+depoya kadar alınan tüm yakıtın (kısmi dolumlar dahil) aradaki mesafeye
+oranı.
+"""
+from datetime import date
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import Float, cast, select
+from sqlalchemy.orm import Session
+
+from sunucu.modeller.arac import Araclar
+from sunucu.modeller.yakit_takibi import Yakit_Takibi
+from sunucu.servisler.tuketim_servisi import EN_FAZLA_TUKETIM
+
+# MAD tabanlı (modifiye) z-skoru için ölçek ve eşik (Iglewicz-Hoaglin)
+MAD_OLCEGI = 0.6745
+AYKIRI_ESIGI = 3.5
+# Daha az örneği olan grupta medyan/MAD anlamlı değildir, z-skoru hesaplanmaz
+EN_AZ_ORNEK = 5
+
+EPOCH_GUNU = date(1970, 1, 1).toordinal()
+
+
+class YakitGecmisi(NamedTuple):
+    """Yakıt kayıtlarının sütun dizileri; satırlar (arac_id, km, id) sıralıdır."""
+    arac_id: np.ndarray
+    kayit_id: np.ndarray
+    tarih: np.ndarray
+    km: np.ndarray
+    litre: np.ndarray
+    fiyat: np.ndarray
+    toplam_tutar: np.ndarray
+    tam_depo: np.ndarray
+    yakit_turu: np.ndarray
+
+
+def gecmisi_yukle(
+    db: Session,
+    arac_id: Optional[int] = None,
+    kullanici_id: Optional[int] = None,
+    kullanici_rol: str = "kullanici"
+) -> YakitGecmisi:
+    """
+    Yakıt geçmişini tek sorguyla sütun dizileri olarak yükler.
+
+    `arac_id` verilirse sadece o aracın kayıtları, verilmezse kullanıcının
+    filosu (admin ise tüm filo) yüklenir. Sayısal sütunlar veritabanında
+    float'a çevrilir; satır başına Decimal nesnesi oluşturulmaz.
+    """
+    sorgu = select(
+        Yakit_Takibi.arac_id,
+        Yakit_Takibi.id,
+        Yakit_Takibi.tarih,
+        Yakit_Takibi.km,
+        cast(Yakit_Takibi.litre, Float),
+        cast(Yakit_Takibi.fiyat, Float),
+        cast(Yakit_Takibi.toplam_tutar, Float),
+        Yakit_Takibi.tam_depo,
+        Yakit_Takibi.yakit_turu
+    ).where(Yakit_Takibi.silinmis_mi == False)
+
+    if arac_id is not None:
+        sorgu = sorgu.where(Yakit_Takibi.arac_id == arac_id)
+    else:
+        sorgu = sorgu.join(Araclar, Yakit_Takibi.arac_id == Araclar.id).where(Araclar.silinmis_mi == False)
+        if kullanici_rol != 'admin':
+            sorgu = sorgu.where(Araclar.kullanici_id == kullanici_id)
+
+    # Sadece sütun okunur; ORM satır işleme katmanı atlanır
+    satirlar = db.connection().execute(sorgu.order_by(Yakit_Takibi.arac_id, Yakit_Takibi.km, Yakit_Takibi.id)).all()
+    adet = len(satirlar)
+    sutunlar = list(zip(*satirlar)) or [()] * 9
+
+    def dizi(sutun, tip, donustur=None):
+        return np.fromiter(map(donustur, sutun) if donustur else sutun, dtype=tip, count=adet)
+
+    # date nesnelerinden doğrudan datetime64 oluşturmak çok yavaştır; gün sayısı üzerinden çevrilir
+    return YakitGecmisi(
+        arac_id=dizi(sutunlar[0], np.int64),
+        kayit_id=dizi(sutunlar[1], np.int64),
+        tarih=(dizi(sutunlar[2], np.int64, date.toordinal) - EPOCH_GUNU).astype("datetime64[D]"),
+        km=dizi(sutunlar[3], np.int64),
+        litre=dizi(sutunlar[4], np.float64),
+        fiyat=dizi(sutunlar[5], np.float64),
+        toplam_tutar=dizi(sutunlar[6], np.float64),
+        tam_depo=dizi(sutunlar[7], bool, bool),
+        yakit_turu=np.array(sutunlar[8], dtype=object),
+    )
+
+
+def _grup_baslari(gruplar: np.ndarray) -> np.ndarray:
+    """Sıralı dizide her grubun ilk elemanında True olan maske."""
+    baslar = np.ones(len(gruplar), dtype=bool)
+    baslar[1:] = gruplar[1:] != gruplar[:-1]
+    return baslar
+
+
+def _grup_medyani(degerler: np.ndarray, gruplar: np.ndarray) -> np.ndarray:
+    """
+    Grup medyanlarını eleman başına döndürür. Değerler (grup, değer) ile
+    sıralanır; her grubun medyanı grup sınırlarından indekslenir.
+    """
+    sira = np.lexsort((degerler, gruplar))
+    sirali, sirali_grup = degerler[sira], gruplar[sira]
+    baslar = np.flatnonzero(_grup_baslari(sirali_grup))
+    adetler = np.diff(np.append(baslar, len(sirali)))
+    medyanlar = (sirali[baslar + (adetler - 1) // 2] + sirali[baslar + adetler // 2]) / 2
+    return medyanlar[np.cumsum(_grup_baslari(sirali_grup))[np.argsort(sira)] - 1]
+
+
+def _robust_z(degerler: np.ndarray, gruplar: np.ndarray) -> np.ndarray:
+    """
+    Grup içi modifiye z-skoru: 0.6745 * (x - medyan) / MAD.
+
+    MAD sıfırsa (değerlerin yarıdan fazlası aynı) standart z-skoruna
+    düşülür; o da tanımsızsa 0'dır. EN_AZ_ORNEK'ten küçük gruplarda NaN.
+    """
+    if len(degerler) == 0:
+        return np.empty(0)
+
+    _, kod, adet = np.unique(gruplar, return_inverse=True, return_counts=True)
+    medyan = _grup_medyani(degerler, gruplar)
+    sapma = np.abs(degerler - medyan)
+    mad = _grup_medyani(sapma, gruplar)
+
+    ortalama = np.bincount(kod, weights=degerler) / adet
+    std = np.sqrt(np.bincount(kod, weights=(degerler - ortalama[kod]) ** 2) / adet)[kod]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(
+            mad > 0,
+            MAD_OLCEGI * (degerler - medyan) / mad,
+            np.where(std > 0, (degerler - ortalama[kod]) / std, 0.0)
+        )
+    z[adet[kod] < EN_AZ_ORNEK] = np.nan
+    return z
+
+
+def _hareketli_ortalama(degerler: np.ndarray, gruplar: np.ndarray, pencere: int) -> np.ndarray:
+    """Grup içinde son `pencere` değerin ortalaması (grubun başında daha az değerle)."""
+    indeks = np.arange(len(degerler))
+    kumulatif = np.concatenate(([0.0], np.cumsum(degerler)))
+    grup_basi = np.maximum.accumulate(np.where(_grup_baslari(gruplar), indeks, 0))
+    baslangic = np.maximum(indeks - pencere + 1, grup_basi)
+    return (kumulatif[indeks + 1] - kumulatif[baslangic]) / (indeks + 1 - baslangic)
+
+
+def segmentleri_hesapla(gecmis: YakitGecmisi, pencere: int = 5) -> Dict[str, np.ndarray]:
+    """
+    Tüketimi hesaplanabilen segmentleri ve her birinin hareketli ortalama ve
+    aykırılık değerlerini döndürür (araç, km sıralı).
+
+    Segment bir tam depodan veya aracın ilk kaydından sonra başlar ve bir tam
+    depo ile kapanır. Önceki tam deposu olmayan, mesafesi sıfır olan veya
+    tüketimi EN_FAZLA_TUKETIM'i aşan (hatalı km) segmentler atlanır.
+    """
+    arac, km, tam = gecmis.arac_id, gecmis.km, gecmis.tam_depo
+
+    yeni_arac = _grup_baslari(arac)
+    baslar = yeni_arac.copy()
+    baslar[1:] |= tam[:-1]
+    segment = np.cumsum(baslar) - 1
+    segment_litre = np.bincount(segment, weights=gecmis.litre) if len(segment) else np.empty(0)
+
+    # Aynı araçta önceki kayıt tam depoysa segmentin başlangıç km'si odur
+    bas_indeksi = np.flatnonzero(baslar)
+    onceki_tam_var = ~yeni_arac[bas_indeksi]
+    baslangic_km = km[bas_indeksi - 1] if len(bas_indeksi) else np.empty(0, dtype=np.int64)
+
+    kapanis = np.flatnonzero(tam)
+    seg = segment[kapanis]
+    mesafe = km[kapanis] - baslangic_km[seg]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tuketim = segment_litre[seg] * 100 / mesafe
+    gecerli = onceki_tam_var[seg] & (mesafe > 0) & (np.round(tuketim, 2) < float(EN_FAZLA_TUKETIM))
+
+    kapanis, seg = kapanis[gecerli], seg[gecerli]
+    tuketim = tuketim[gecerli]
+    segment_arac = arac[kapanis]
+
+    return {
+        "arac_id": segment_arac,
+        "kayit_id": gecmis.kayit_id[kapanis],
+        "tarih": gecmis.tarih[kapanis],
+        "baslangic_km": baslangic_km[seg],
+        "bitis_km": km[kapanis],
+        "mesafe": mesafe[gecerli],
+        "litre": segment_litre[seg],
+        "tuketim": tuketim,
+        "hareketli_ortalama": _hareketli_ortalama(tuketim, segment_arac, pencere),
+        "z_skoru": _robust_z(tuketim, segment_arac),
+    }
+
+
+def _sayi(deger, basamak: int = 2) -> Optional[float]:
+    deger = float(deger)
+    return None if np.isnan(deger) else round(deger, basamak)
+
+
+def segment_analizi(db: Session, arac_id: int, pencere: int = 5) -> Dict[str, Any]:
+    """
+    Aracın segment bazlı tüketim analizi.
+
+    Returns:
+        Dict: segmentler (tüketim, hareketli ortalama, z-skoru, aykırı mı),
+        mesafe ağırlıklı ortalama ve medyan tüketim, aykırı segment sayısı
+    """
+    s = segmentleri_hesapla(gecmisi_yukle(db, arac_id=arac_id), pencere)
+    aykiri = np.abs(s["z_skoru"]) > AYKIRI_ESIGI
+
+    segmentler = [
+        {
+            "kayit_id": kayit_id,
+            "tarih": tarih,
+            "baslangic_km": baslangic_km,
+            "bitis_km": bitis_km,
+            "mesafe": mesafe,
+            "litre": round(litre, 2),
+            "tuketim": round(tuketim, 2),
+            "hareketli_ortalama": round(hareketli, 2),
+            "z_skoru": _sayi(z),
+            "aykiri": bool(a),
+        }
+        for kayit_id, tarih, baslangic_km, bitis_km, mesafe, litre, tuketim, hareketli, z, a in zip(
+            s["kayit_id"].tolist(), s["tarih"].tolist(), s["baslangic_km"].tolist(), s["bitis_km"].tolist(),
+            s["mesafe"].tolist(), s["litre"].tolist(), s["tuketim"].tolist(), s["hareketli_ortalama"].tolist(),
+            s["z_skoru"].tolist(), aykiri.tolist()
+        )
+    ]
+
+    toplam_mesafe = int(s["mesafe"].sum())
+    return {
+        "segmentler": segmentler,
+        "ortalama_tuketim": round(float(s["litre"].sum()) * 100 / toplam_mesafe, 2) if toplam_mesafe else None,
+        "medyan_tuketim": round(float(np.median(s["tuketim"])), 2) if len(s["tuketim"]) else None,
+        "aykiri_sayisi": int(aykiri.sum()),
+    }
+
+
+def fiyat_trendi(db: Session, arac_id: int) -> List[Dict[str, Any]]:
+    """
+    Yakıt türü bazında aylık ortalama litre fiyatı (litre ağırlıklı), aylık
+    fiyat değişimi (en küçük kareler eğimi, TL/L/ay) ve aynı ay ile yakıt
+    türündeki alımlara göre fiyatı aykırı olan alımlar.
+    """
+    g = gecmisi_yukle(db, arac_id=arac_id)
+    if len(g.kayit_id) == 0:
+        return []
+
+    turler, tur_kodu = np.unique(g.yakit_turu.astype(str), return_inverse=True)
+    ay = g.tarih.astype("datetime64[M]").astype(np.int64)
+    ay_araligi = int(ay.max() - ay.min()) + 1
+    anahtarlar, donem_kodu = np.unique(tur_kodu * ay_araligi + (ay - ay.min()), return_inverse=True)
+
+    donem_litre = np.bincount(donem_kodu, weights=g.litre)
+    donem_fiyat = np.bincount(donem_kodu, weights=g.fiyat * g.litre) / donem_litre
+    donem_adet = np.bincount(donem_kodu)
+    donem_turu = anahtarlar // ay_araligi
+    donem_ayi = (anahtarlar % ay_araligi + ay.min()).astype("datetime64[M]")
+
+    # Tür başına eğim: x = ay numarası, y = aylık ortalama fiyat
+    x = (anahtarlar % ay_araligi).astype(np.float64)
+    n = np.bincount(donem_turu).astype(np.float64)
+    sx = np.bincount(donem_turu, weights=x)
+    sy = np.bincount(donem_turu, weights=donem_fiyat)
+    sxy = np.bincount(donem_turu, weights=x * donem_fiyat)
+    sxx = np.bincount(donem_turu, weights=x * x)
+    payda = n * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        egim = np.where(payda > 0, (n * sxy - sx * sy) / payda, np.nan)
+
+    z = _robust_z(g.fiyat, donem_kodu)
+
+    sonuclar = []
+    for tur in range(len(turler)):
+        donemler = np.flatnonzero(donem_turu == tur)
+        aykirilar = np.flatnonzero((tur_kodu == tur) & (np.abs(z) > AYKIRI_ESIGI))
+        sonuclar.append({
+            "yakit_turu": str(turler[tur]),
+            "aylik_degisim": _sayi(egim[tur], 4),
+            "donemler": [
+                {
+                    "donem": str(donem_ayi[i]),
+                    "ortalama_fiyat": round(float(donem_fiyat[i]), 2),
+                    "toplam_litre": round(float(donem_litre[i]), 2),
+                    "islem_sayisi": int(donem_adet[i]),
+                }
+                for i in donemler
+            ],
+            "aykiri_alimlar": [
+                {
+                    "kayit_id": int(g.kayit_id[i]),
+                    "tarih": g.tarih[i].item(),
+                    "fiyat": round(float(g.fiyat[i]), 2),
+                    "z_skoru": round(float(z[i]), 2),
+                }
+                for i in aykirilar
+            ],
+        })
+    return sonuclar
+
+
+def filo_analizi(db: Session, kullanici_id: int, kullanici_rol: str = "kullanici", pencere: int = 5) -> List[Dict[str, Any]]:
+    """
+    Kullanıcının filosundaki (admin ise tüm filo) her aracın tüketim özeti.
+    Tüm filo geçmişi tek sorguyla yüklenir ve araç bazında tek geçişte
+    toplanır.
+    """
+    g = gecmisi_yukle(db, kullanici_id=kullanici_id, kullanici_rol=kullanici_rol)
+    if len(g.kayit_id) == 0:
+        return []
+
+    araclar, arac_kodu = np.unique(g.arac_id, return_inverse=True)
+    toplam_litre = np.bincount(arac_kodu, weights=g.litre)
+    toplam_harcama = np.bincount(arac_kodu, weights=g.toplam_tutar)
+    kayit_sayisi = np.bincount(arac_kodu)
+
+    s = segmentleri_hesapla(g, pencere)
+    seg_kodu = np.searchsorted(araclar, s["arac_id"])
+    adet = len(araclar)
+    segment_sayisi = np.bincount(seg_kodu, minlength=adet)
+    segment_litre = np.bincount(seg_kodu, weights=s["litre"], minlength=adet)
+    segment_mesafe = np.bincount(seg_kodu, weights=s["mesafe"], minlength=adet)
+    aykiri_sayisi = np.bincount(seg_kodu, weights=np.abs(s["z_skoru"]) > AYKIRI_ESIGI, minlength=adet)
+
+    medyan = np.full(adet, np.nan)
+    son_ortalama = np.full(adet, np.nan)
+    if len(seg_kodu):
+        medyan[seg_kodu] = _grup_medyani(s["tuketim"], seg_kodu)
+        # Sıralı dizide her aracın son segmenti en son yazılan değerdir
+        son_ortalama[seg_kodu] = s["hareketli_ortalama"]
+
+    plakalar = dict(db.execute(select(Araclar.id, Araclar.plaka).where(Araclar.id.in_(araclar.tolist()))).all())
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ortalama = segment_litre * 100 / segment_mesafe
+
+    return [
+        {
+            "arac_id": int(araclar[i]),
+            "plaka": plakalar.get(int(araclar[i])),
+            "kayit_sayisi": int(kayit_sayisi[i]),
+            "toplam_litre": round(float(toplam_litre[i]), 2),
+            "toplam_harcama": round(float(toplam_harcama[i]), 2),
+            "segment_sayisi": int(segment_sayisi[i]),
+            "ortalama_tuketim": _sayi(ortalama[i]),
+            "medyan_tuketim": _sayi(medyan[i]),
+            "son_hareketli_ortalama": _sayi(son_ortalama[i]),
+            "aykiri_segment_sayisi": int(aykiri_sayisi[i]),
+        }
+        for i in range(adet)
+    ]
@@ -8,13 +8,18 @@ from fastapi import HTTPException, status
 from sunucu.modeller.yakit_takibi import Yakit_Takibi
 from sunucu.modeller.arac import Araclar
 from sunucu.semalar.yakit_sema import YakitOlustur, YakitGuncelle, TuketimAnalizi, IstasyonAnalizi
-from typing import List
+from sunucu.modeller.aylik_ozet import OZET_YAKIT
+from sunucu.servisler import ozet_servisi, sayac_servisi, onbellek_servisi, tuketim_servisi, anomali_servisi, fiyat_endeksi_servisi, km_cizelgesi_servisi
+from sunucu.sayfalama import tarih_imleci_uygula
+from typing import List, Optional
 from decimal import Decimal
 
 
 def yakit_kaydi_olustur(db: Session, yakit_bilgileri: YakitOlustur) -> Yakit_Takibi:
     """
-    Yeni bir yakıt kaydı oluşturur ve ortalama tüketimi hesaplar.
+    Yeni bir yakıt kaydı oluşturur, etkilenen segmentlerin ortalama
+    tüketimini hesaplar (bkz. tuketim_servisi) ve kaydı aracın yakıt
+    istatistiklerine göre puanlar (bkz. anomali_servisi).
     
     Args:
         db: Veritabanı session'ı
@@ -43,26 +48,17 @@ def yakit_kaydi_olustur(db: Session, yakit_bilgileri: YakitOlustur) -> Yakit_Tak
     # Yeni yakıt kaydı oluştur
     yeni_kayit = Yakit_Takibi(**yakit_bilgileri.model_dump())
     
-    # Ortalama tüketim hesapla (tam depo ise)
-    if yakit_bilgileri.tam_depo:
-        # Bir önceki tam depo kaydını bul
-        onceki_kayit = db.query(Yakit_Takibi).filter(
-            and_(
-                Yakit_Takibi.arac_id == yakit_bilgileri.arac_id,
-                Yakit_Takibi.tam_depo == True,
-                Yakit_Takibi.km < yakit_bilgileri.km,
-                Yakit_Takibi.silinmis_mi == False
-            )
-        ).order_by(Yakit_Takibi.km.desc()).first()
-        
-        if onceki_kayit:
-            # Gidilen mesafe
-            mesafe = yakit_bilgileri.km - onceki_kayit.km
-            if mesafe > 0:
-                # Ortalama tüketim = (Alınan yakıt * 100) / Mesafe
-                yeni_kayit.ortalama_tuketim = (yakit_bilgileri.litre * 100) / mesafe
-    
     db.add(yeni_kayit)
+    ozet_servisi.ozete_ekle(db, OZET_YAKIT, yeni_kayit)
+    sayac_servisi.sayaclara_ekle(db, OZET_YAKIT, yeni_kayit)
+    fiyat_endeksi_servisi.endekse_ekle(db, yeni_kayit, arac.kullanici_id)
+    km_cizelgesi_servisi.cizelgeyi_guncelle(db, yeni_kayit.arac_id, eklenenler=[(yeni_kayit.tarih, yeni_kayit.km)])
+    db.flush()
+    # Kaydın girdiği segmentin (ve tam depoysa sonrakinin) ortalama tüketimi
+    tuketim_servisi.segmentleri_guncelle(db, yeni_kayit.arac_id, (yeni_kayit.km, yeni_kayit.id))
+    # Aracın birikimli istatistiklerine göre şüpheli dolum kontrolü (bkz. anomali_servisi)
+    anomali_servisi.yakit_kaydini_puanla(db, yeni_kayit)
+    onbellek_servisi.degisiklik_kaydet(db, arac_id=yeni_kayit.arac_id)
     db.commit()
     db.refresh(yeni_kayit)
     
@@ -103,7 +99,8 @@ def arac_yakit_kayitlari_getir(
     db: Session,
     arac_id: int,
     atlama: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    imlec: Optional[str] = None
 ) -> List[Yakit_Takibi]:
     """
     Belirli bir aracın yakıt kayıtlarını getirir.
@@ -111,23 +108,31 @@ def arac_yakit_kayitlari_getir(
     Args:
         db: Veritabanı session'ı
         arac_id: Araç ID
-        atlama: Kaç kayıt atlanacak
+        atlama: Kaç kayıt atlanacak (imleç verilirse yok sayılır)
         limit: Maksimum kaç kayıt getirilecek
+        imlec: Önceki sayfanın döndürdüğü opak imleç
         
     Returns:
         List[Yakit_Takibi]: Yakıt kayıtları listesi
     """
-    return db.query(Yakit_Takibi).filter(
+    sorgu = db.query(Yakit_Takibi).filter(
         and_(
             Yakit_Takibi.arac_id == arac_id,
             Yakit_Takibi.silinmis_mi == False
         )
-    ).order_by(Yakit_Takibi.tarih.desc()).offset(atlama).limit(limit).all()
+    )
+    sorgu = tarih_imleci_uygula(sorgu, Yakit_Takibi, imlec)
+    
+    if not imlec:
+        sorgu = sorgu.offset(atlama)
+    
+    return sorgu.limit(limit).all()
 
 
 def yakit_kaydi_guncelle(db: Session, yakit_id: int, yakit_bilgileri: YakitGuncelle) -> Yakit_Takibi:
     """
-    Yakıt kaydını günceller.
+    Yakıt kaydını günceller. Puanlamayı etkileyen bir alan değiştiyse kayıt
+    anomali istatistiklerinden çıkarılıp yeniden puanlanır (bkz. anomali_servisi).
     
     Args:
         db: Veritabanı session'ı
@@ -142,10 +147,32 @@ def yakit_kaydi_guncelle(db: Session, yakit_id: int, yakit_bilgileri: YakitGunce
     # Güncellenecek verileri al
     guncelleme_verisi = yakit_bilgileri.model_dump(exclude_unset=True)
     
-    # Güncelle
+    # Güncelle (aylık özet, araç sayaçları ve fiyat endeksinden eski değerler çıkarılıp yeni değerler eklenir)
+    eski_konum = (kayit.km, kayit.id)
+    eski_nokta = (kayit.tarih, kayit.km)
+    eski_degerler = anomali_servisi.kayit_degerleri(kayit)
+    ozet_servisi.ozetten_cikar(db, OZET_YAKIT, kayit)
+    sayac_servisi.sayaclardan_cikar(db, OZET_YAKIT, kayit)
+    fiyat_endeksi_servisi.endeksten_cikar(db, kayit)
     for alan, deger in guncelleme_verisi.items():
         setattr(kayit, alan, deger)
+    ozet_servisi.ozete_ekle(db, OZET_YAKIT, kayit)
+    sayac_servisi.sayaclara_ekle(db, OZET_YAKIT, kayit)
+    fiyat_endeksi_servisi.endekse_ekle(db, kayit)
     
+    # Kilometre, litre veya tam depo değiştiyse eski ve yeni konumun segmentleri
+    if guncelleme_verisi.keys() & {"km", "litre", "tam_depo"}:
+        tuketim_servisi.segmentleri_guncelle(db, kayit.arac_id, eski_konum, (kayit.km, kayit.id))
+    # Tarih veya kilometre değiştiyse kilometre çizelgesindeki nokta
+    if guncelleme_verisi.keys() & {"tarih", "km"}:
+        km_cizelgesi_servisi.cizelgeyi_guncelle(
+            db, kayit.arac_id, eklenenler=[(kayit.tarih, kayit.km)], cikarilanlar=[eski_nokta]
+        )
+    # Düzeltilen hatalı giriş istatistikte kalmasın, eski anomalileri silinsin
+    if guncelleme_verisi.keys() & {"litre", "fiyat", "yakit_turu", "km", "tam_depo"}:
+        anomali_servisi.yakit_kaydini_yeniden_puanla(db, kayit, eski_degerler)
+    
+    onbellek_servisi.degisiklik_kaydet(db, arac_id=kayit.arac_id)
     db.commit()
     db.refresh(kayit)
     
@@ -164,8 +191,16 @@ def yakit_kaydi_sil(db: Session, yakit_id: int) -> dict:
         dict: Başarı mesajı
     """
     kayit = yakit_kaydi_getir(db, yakit_id)
+    eski_degerler = anomali_servisi.kayit_degerleri(kayit)
     
+    ozet_servisi.ozetten_cikar(db, OZET_YAKIT, kayit)
+    sayac_servisi.sayaclardan_cikar(db, OZET_YAKIT, kayit)
+    fiyat_endeksi_servisi.endeksten_cikar(db, kayit)
     kayit.silinmis_mi = True
+    tuketim_servisi.segmentleri_guncelle(db, kayit.arac_id, (kayit.km, kayit.id))
+    km_cizelgesi_servisi.cizelgeyi_guncelle(db, kayit.arac_id, cikarilanlar=[(kayit.tarih, kayit.km)])
+    anomali_servisi.yakit_kaydini_cikar(db, kayit, eski_degerler)
+    onbellek_servisi.degisiklik_kaydet(db, arac_id=kayit.arac_id)
     db.commit()
     
     return {"mesaj": "Yakıt kaydı başarıyla silindi"}
@@ -175,6 +210,11 @@ def ortalama_tuketim_hesapla(db: Session, arac_id: int) -> TuketimAnalizi:
     """
     Aracın genel yakıt tüketim analizini yapar.
     
+    Toplamlar tek satır dönen bir aggregate sorguyla veritabanında
+    hesaplanır; kayıtlar belleğe yüklenmez. PostgreSQL'de sorgu
+    ix_yakit_takibi_aktif_arac_tarih_id index'inden (km, litre ve
+    toplam_tutar INCLUDE) okunur.
+    
     Args:
         db: Veritabanı session'ı
         arac_id: Araç ID
@@ -182,15 +222,20 @@ def ortalama_tuketim_hesapla(db: Session, arac_id: int) -> TuketimAnalizi:
     Returns:
         TuketimAnalizi: Yakıt tüketim analizi sonucu
     """
-    # Tüm kayıtları al
-    kayitlar = db.query(Yakit_Takibi).filter(
+    sonuc = db.query(
+        func.count(Yakit_Takibi.id).label('kayit_sayisi'),
+        func.sum(Yakit_Takibi.litre).label('toplam_yakit'),
+        func.sum(Yakit_Takibi.toplam_tutar).label('toplam_harcama'),
+        func.min(Yakit_Takibi.km).label('ilk_km'),
+        func.max(Yakit_Takibi.km).label('son_km')
+    ).filter(
         and_(
             Yakit_Takibi.arac_id == arac_id,
             Yakit_Takibi.silinmis_mi == False
         )
-    ).order_by(Yakit_Takibi.km).all()
+    ).one()
     
-    if not kayitlar:
+    if not sonuc.kayit_sayisi:
         return TuketimAnalizi(
             ortalama_tuketim=Decimal("0"),
             toplam_yakit=Decimal("0"),
@@ -199,15 +244,11 @@ def ortalama_tuketim_hesapla(db: Session, arac_id: int) -> TuketimAnalizi:
             kayit_sayisi=0
         )
     
-    # Toplamları hesapla
-    toplam_yakit = sum(k.litre for k in kayitlar)
-    toplam_harcama = sum(k.toplam_tutar for k in kayitlar)
-    kayit_sayisi = len(kayitlar)
+    toplam_yakit = Decimal(str(sonuc.toplam_yakit))
+    toplam_harcama = Decimal(str(sonuc.toplam_harcama))
     
     # İlk ve son kayıt arası mesafe
-    ilk_kayit = kayitlar[0]
-    son_kayit = kayitlar[-1]
-    toplam_mesafe = son_kayit.km - ilk_kayit.km
+    toplam_mesafe = sonuc.son_km - sonuc.ilk_km
     
     # Ortalama tüketim hesapla
     if toplam_mesafe > 0:
@@ -217,10 +258,10 @@ def ortalama_tuketim_hesapla(db: Session, arac_id: int) -> TuketimAnalizi:
     
     return TuketimAnalizi(
         ortalama_tuketim=Decimal(str(round(ortalama_tuketim, 2))),
-        toplam_yakit=Decimal(str(toplam_yakit)),
-        toplam_harcama=Decimal(str(toplam_harcama)),
+        toplam_yakit=toplam_yakit,
+        toplam_harcama=toplam_harcama,
         toplam_mesafe=toplam_mesafe,
-        kayit_sayisi=kayit_sayisi
+        kayit_sayisi=sonuc.kayit_sayisi
     )
 
 
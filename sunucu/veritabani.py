@@ -2,63 +2,586 @@
 Veritabani Baglanti Yonetimi
 MySQL baglantisini kurar ve SQLAlchemy session yonetimini saglar.
 """
-from sqlalchemy import create_engine, event
+import hashlib
+import hmac
+import math
+import random
+import threading
+import time
+from typing import Mapping, NamedTuple, Optional, Sequence
+
+from fastapi import Request
+from sqlalchemy import Select, and_, create_engine, event, exc, insert, make_url
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from sqlalchemy.sql.dml import UpdateBase
 from sunucu.ayarlar import ayarlar
 
+# AnyIO'nun sync endpoint'ler için varsayılan thread sayısı
+ANYIO_VARSAYILAN_THREAD = 40
+# VERITABANI_MAKS_BAGLANTI verilmemişse varsayılır (PostgreSQL varsayılanı; MySQL'de 151)
+VARSAYILAN_MAKS_BAGLANTI = 100
+
+
+# Replika okumalarina izin verilen HTTP metodlari
+OKUMA_METODLARI = frozenset({"GET", "HEAD"})
+
+# Son yazma zamanının istemcide taşındığı cookie ve header (bkz. SonYazmaIzi)
+SON_YAZMA_COOKIE = "son_yazma"
+SON_YAZMA_HEADER = "X-Last-Write"
+# SonYazmaIzi'nin ASGI scope'undaki anahtarı
+SON_YAZMA_KAPSAMI = "son_yazma"
+
+# Async engine'ler ayni veritabanina asyncio surucusu ile baglanir
+ASYNC_SURUCULERI = {
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
 
 # Veritabani baglanti URL'i olustur (MySQL veya PostgreSQL)
 if ayarlar.VERITABANI_TIP.lower() == "postgresql":
-    VERITABANI_URL = (
-        f"postgresql+psycopg2://{ayarlar.VERITABANI_KULLANICI}:"
-        f"{ayarlar.VERITABANI_SIFRE}@{ayarlar.VERITABANI_SUNUCU}:"
-        f"{ayarlar.VERITABANI_PORT}/{ayarlar.VERITABANI_ADI}"
-    )
+    _SYNC_SURUCU, _ASYNC_SURUCU = "postgresql+psycopg2", ASYNC_SURUCULERI["postgresql"]
 else:  # MySQL
-    VERITABANI_URL = (
-        f"mysql+pymysql://{ayarlar.VERITABANI_KULLANICI}:"
-        f"{ayarlar.VERITABANI_SIFRE}@{ayarlar.VERITABANI_SUNUCU}:"
-        f"{ayarlar.VERITABANI_PORT}/{ayarlar.VERITABANI_ADI}"
+    _SYNC_SURUCU, _ASYNC_SURUCU = "mysql+pymysql", ASYNC_SURUCULERI["mysql"]
+
+_BAGLANTI_BILGISI = (
+    f"{ayarlar.VERITABANI_KULLANICI}:"
+    f"{ayarlar.VERITABANI_SIFRE}@{ayarlar.VERITABANI_SUNUCU}:"
+    f"{ayarlar.VERITABANI_PORT}/{ayarlar.VERITABANI_ADI}"
+)
+VERITABANI_URL = f"{_SYNC_SURUCU}://{_BAGLANTI_BILGISI}"
+ASYNC_VERITABANI_URL = f"{_ASYNC_SURUCU}://{_BAGLANTI_BILGISI}"
+
+
+
+class HavuzAyarlari(NamedTuple):
+    """Worker başına bağlantı havuzu ve threadpool boyutları"""
+    havuz_boyutu: int
+    tasma: int
+    threadpool_boyutu: int
+    async_havuz_boyutu: int
+    async_tasma: int
+
+
+def sunucu_maks_baglanti() -> int:
+    """
+    Havuz hesabında kullanılan max_connections değerini döndürür.
+    Import sırasında veritabanına bağlanılmaz: ayarlarda verilmemişse
+    VARSAYILAN_MAKS_BAGLANTI kullanılır; gerçek değer uygulama başlangıcında
+    `havuz_butcesini_dogrula` ile kontrol edilir.
+    """
+    return ayarlar.VERITABANI_MAKS_BAGLANTI or VARSAYILAN_MAKS_BAGLANTI
+
+
+def sunucu_maks_baglanti_oku() -> Optional[int]:
+    """Sunucunun max_connections değerini tek seferlik bir bağlantı ile okur (okunamazsa None)."""
+    sorgu = "SHOW max_connections" if VERITABANI_URL.startswith("postgresql") else "SELECT @@max_connections"
+    try:
+        gecici_engine = create_engine(VERITABANI_URL, poolclass=NullPool, connect_args={"connect_timeout": 5})
+        try:
+            with gecici_engine.connect() as baglanti:
+                return int(baglanti.exec_driver_sql(sorgu).scalar())
+        finally:
+            gecici_engine.dispose()
+    except Exception as e:
+        print(f"⚠️ max_connections okunamadı ({e})")
+        return None
+
+
+def havuz_ayarlarini_hesapla() -> HavuzAyarlari:
+    """
+    Havuz ve threadpool boyutlarını ayarlardan okur, boş olanları hesaplar.
+
+    Tüm worker'ların toplam bağlantısı sunucunun max_connections değerini
+    (yedek bağlantılar hariç) aşmamalıdır ve worker bütçesi sync ile async
+    engine arasında paylaşılır. Bir worker'da aynı anda en fazla threadpool
+    kadar sync istek veritabanı kullanabileceği için sync hedef, threadpool
+    ile bütçenin yarısının küçüğüdür. Async endpoint'ler thread beklemediği
+    için kalan bütçenin tamamı async engine'e verilir. Her iki havuzda da
+    hedefin yarısı sürekli açık tutulur, kalanı taşma olarak sadece
+    yoğunlukta açılır.
+    """
+    threadpool_boyutu = ayarlar.THREADPOOL_BOYUTU or ANYIO_VARSAYILAN_THREAD
+    havuz_boyutu = ayarlar.VERITABANI_HAVUZ_BOYUTU
+    tasma = ayarlar.VERITABANI_HAVUZ_TASMA
+    async_havuz_boyutu = ayarlar.VERITABANI_ASYNC_HAVUZ_BOYUTU
+    async_tasma = ayarlar.VERITABANI_ASYNC_HAVUZ_TASMA
+
+    if None in (havuz_boyutu, tasma, async_havuz_boyutu, async_tasma):
+        kullanilabilir = sunucu_maks_baglanti() - ayarlar.VERITABANI_YEDEK_BAGLANTI
+        worker_butcesi = max(2, kullanilabilir // max(1, ayarlar.WORKER_SAYISI))
+        hedef = min(threadpool_boyutu, worker_butcesi // 2)
+        if havuz_boyutu is None:
+            havuz_boyutu = max(1, math.ceil(hedef / 2))
+        if tasma is None:
+            tasma = max(0, hedef - havuz_boyutu)
+
+        async_hedef = max(1, worker_butcesi - havuz_boyutu - tasma)
+        if async_havuz_boyutu is None:
+            async_havuz_boyutu = max(1, math.ceil(async_hedef / 2))
+        if async_tasma is None:
+            async_tasma = max(0, async_hedef - async_havuz_boyutu)
+
+    if havuz_boyutu + tasma < threadpool_boyutu:
+        print(
+            f"⚠️ Bağlantı havuzu ({havuz_boyutu}+{tasma}) threadpool'dan ({threadpool_boyutu}) küçük; "
+            f"yoğunlukta istekler bağlantı bekleyecek"
+        )
+
+    return HavuzAyarlari(havuz_boyutu, tasma, threadpool_boyutu, async_havuz_boyutu, async_tasma)
+
+
+class HavuzIstatistigi:
+    """Havuzdan bağlantı alma sürelerini toplar (thread-safe)."""
+
+    # Yavaş bekleme uyarıları en fazla bu sıklıkta (saniye) yazdırılır
+    UYARI_ARALIGI = 10.0
+
+    def __init__(self, ad: str, uyari_esigi: float):
+        self.ad = ad
+        self.uyari_esigi = uyari_esigi
+        self._kilit = threading.Lock()
+        self.alma_sayisi = 0
+        self.toplam_bekleme = 0.0
+        self.en_uzun_bekleme = 0.0
+        self.yavas_alma_sayisi = 0
+        self.zaman_asimi_sayisi = 0
+        self._son_uyari = 0.0
+
+    def kaydet(self, sure: float, zaman_asimi: bool = False) -> None:
+        uyar = False
+        with self._kilit:
+            self.alma_sayisi += 1
+            self.toplam_bekleme += sure
+            self.en_uzun_bekleme = max(self.en_uzun_bekleme, sure)
+            if zaman_asimi:
+                self.zaman_asimi_sayisi += 1
+            if sure >= self.uyari_esigi:
+                self.yavas_alma_sayisi += 1
+                simdi = time.monotonic()
+                if simdi - self._son_uyari >= self.UYARI_ARALIGI:
+                    self._son_uyari = simdi
+                    uyar = True
+        if uyar:
+            print(
+                f"⚠️ Veritabanı havuzu ({self.ad}) doygun: bağlantı {sure * 1000:.0f} ms beklendi "
+                f"(toplam {self.yavas_alma_sayisi} yavaş alma, {self.zaman_asimi_sayisi} zaman aşımı)"
+            )
+
+    def ozet(self) -> dict:
+        with self._kilit:
+            return {
+                "alma_sayisi": self.alma_sayisi,
+                "ortalama_bekleme_ms": round(self.toplam_bekleme / self.alma_sayisi * 1000, 2) if self.alma_sayisi else 0.0,
+                "en_uzun_bekleme_ms": round(self.en_uzun_bekleme * 1000, 2),
+                "yavas_alma_sayisi": self.yavas_alma_sayisi,
+                "zaman_asimi_sayisi": self.zaman_asimi_sayisi,
+            }
+
+
+havuz_istatistigi = HavuzIstatistigi("sync", ayarlar.VERITABANI_HAVUZ_UYARI_ESIGI)
+async_havuz_istatistigi = HavuzIstatistigi("async", ayarlar.VERITABANI_HAVUZ_UYARI_ESIGI)
+
+
+class OlculenHavuz(QueuePool):
+    """Bağlantı almak için beklenen süreyi `istatistik`'e yazan QueuePool."""
+
+    istatistik = havuz_istatistigi
+
+    def _do_get(self):
+        baslangic = time.perf_counter()
+        zaman_asimi = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            zaman_asimi = True
+            raise
+        finally:
+            self.istatistik.kaydet(time.perf_counter() - baslangic, zaman_asimi)
+
+
+class OlculenAsyncHavuz(OlculenHavuz, AsyncAdaptedQueuePool):
+    """Async engine için ölçülen havuz (istatistikler ayrı tutulur)."""
+
+    istatistik = async_havuz_istatistigi
+
+
+HAVUZ_AYARLARI = havuz_ayarlarini_hesapla()
+
+
+def havuz_butcesini_dogrula() -> None:
+    """
+    Tüm worker'ların havuzlarının sunucunun gerçek max_connections değerine
+    sığdığını kontrol eder, sığmıyorsa uyarır. Uygulama başlangıcında
+    (veritabanı zaten gerekliyken) çağrılır.
+    """
+    gercek = sunucu_maks_baglanti_oku()
+    if gercek is None:
+        return
+    worker_basina = (
+        HAVUZ_AYARLARI.havuz_boyutu + HAVUZ_AYARLARI.tasma
+        + HAVUZ_AYARLARI.async_havuz_boyutu + HAVUZ_AYARLARI.async_tasma
     )
+    toplam = worker_basina * max(1, ayarlar.WORKER_SAYISI) + ayarlar.VERITABANI_YEDEK_BAGLANTI
+    if toplam > gercek:
+        print(
+            f"⚠️ Havuzlar en fazla {toplam} bağlantı açabilir, sunucunun max_connections değeri {gercek}; "
+            f"VERITABANI_MAKS_BAGLANTI={gercek} ayarlayın"
+        )
 
 # SQLAlchemy engine olustur
 engine = create_engine(
     VERITABANI_URL,
+    poolclass=OlculenHavuz,
+    pool_size=HAVUZ_AYARLARI.havuz_boyutu,
+    max_overflow=HAVUZ_AYARLARI.tasma,
+    pool_timeout=ayarlar.VERITABANI_HAVUZ_ZAMAN_ASIMI,
     pool_pre_ping=True,  # Baglanti sagligini kontrol et
     pool_recycle=3600,   # Her 1 saatte bir baglantilari yenile
     echo=ayarlar.HATA_AYIKLAMA_MODU  # SQL sorgularini logla
 )
 
+# Async endpoint'ler icin engine (havuz butcesi sync engine ile paylasilir)
+async_engine = create_async_engine(
+    ASYNC_VERITABANI_URL,
+    poolclass=OlculenAsyncHavuz,
+    pool_size=HAVUZ_AYARLARI.async_havuz_boyutu,
+    max_overflow=HAVUZ_AYARLARI.async_tasma,
+    pool_timeout=ayarlar.VERITABANI_HAVUZ_ZAMAN_ASIMI,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    echo=ayarlar.HATA_AYIKLAMA_MODU
+)
+
+
+
+def _replika_engineleri_olustur():
+    """
+    VERITABANI_REPLIKA_URLLERI'ndeki her replika için (sync, async) engine
+    çifti oluşturur. Havuz boyutları birincil veritabanı ile aynıdır.
+    """
+    engineler = []
+    for url in filter(None, (u.strip() for u in ayarlar.VERITABANI_REPLIKA_URLLERI.split(","))):
+        sync_url = make_url(url)
+        async_url = sync_url.set(drivername=ASYNC_SURUCULERI[sync_url.get_backend_name()])
+        ortak = dict(pool_pre_ping=True, pool_recycle=3600, echo=ayarlar.HATA_AYIKLAMA_MODU)
+        engineler.append((
+            create_engine(
+                sync_url,
+                pool_size=HAVUZ_AYARLARI.havuz_boyutu,
+                max_overflow=HAVUZ_AYARLARI.tasma,
+                pool_timeout=ayarlar.VERITABANI_HAVUZ_ZAMAN_ASIMI,
+                **ortak
+            ),
+            create_async_engine(
+                async_url,
+                pool_size=HAVUZ_AYARLARI.async_havuz_boyutu,
+                max_overflow=HAVUZ_AYARLARI.async_tasma,
+                pool_timeout=ayarlar.VERITABANI_HAVUZ_ZAMAN_ASIMI,
+                **ortak
+            ),
+        ))
+    return engineler
+
+
+REPLIKA_ENGINELERI = _replika_engineleri_olustur()
+
+
+def _son_yazma_imzasi(mesaj: str) -> str:
+    return hmac.new(ayarlar.SECRET_KEY.encode(), mesaj.encode(), hashlib.sha256).hexdigest()
+
+
+def son_yazma_imzala(kullanici_id: int, zaman: float) -> str:
+    """Kullanıcının yazma zamanını "<kullanici_id>.<zaman_ms>.<imza>" olarak imzalar."""
+    mesaj = f"{kullanici_id}.{int(zaman * 1000)}"
+    return f"{mesaj}.{_son_yazma_imzasi(mesaj)}"
+
+
+def son_yazma_coz(deger: Optional[str]) -> Optional[tuple]:
+    """İmzalı değerden (kullanici_id, zaman) döndürür; değer yoksa veya imza geçersizse None."""
+    if not deger:
+        return None
+    mesaj, _, imza = deger.rpartition(".")
+    if not hmac.compare_digest(imza, _son_yazma_imzasi(mesaj)):
+        return None
+    kullanici_id, _, zaman_ms = mesaj.partition(".")
+    try:
+        return int(kullanici_id), int(zaman_ms) / 1000
+    except ValueError:
+        return None
+
+
+class SonYazmaIzi:
+    """
+    İstemcinin son yazma zamanı (read-your-writes).
+
+    Birden fazla worker'da yazma bir worker'a, sonraki okuma başka bir
+    worker'a düşebildiği için zaman süreç belleğinde değil istemcide taşınır:
+    yazma yapan isteğin yanıtına imzalı `son_yazma` cookie'si ve
+    `X-Last-Write` header'ı eklenir, istemci sonraki isteklerde birini geri
+    gönderir. İmza SECRET_KEY ile HMAC'tir; istemci zamanı veya kullanıcıyı
+    değiştiremez. Header/cookie okuma ve yazma SonYazmaAraKatmani'ndadır.
+    """
+
+    def __init__(self, deger: Optional[str] = None):
+        self.okunan = son_yazma_coz(deger)
+        self.yeni_deger: Optional[str] = None
+
+    def yapiskan_mi(self, kullanici_id: int) -> bool:
+        """Kullanıcı yapışkanlık süresi içinde yazma yaptıysa True."""
+        if self.okunan is None:
+            return False
+        yazan, zaman = self.okunan
+        return yazan == kullanici_id and time.time() - zaman < ayarlar.VERITABANI_REPLIKA_YAPISKANLIK_SURESI
+
+    def yazildi(self, kullanici_id: int) -> None:
+        self.yeni_deger = son_yazma_imzala(kullanici_id, time.time())
+
+
+class YonlendirmeliSession(Session):
+    """
+    Okuma sorgularını replikaya, diğer her şeyi birincil veritabanına gönderen session.
+
+    Replika sadece session'a `replika_sec` ile atanmışsa (okuma istekleri)
+    ve kullanıcı belli olduktan sonra kullanılır. Şu durumlarda sorgular
+    birincil veritabanına gider:
+      - flush, INSERT/UPDATE/DELETE ve SELECT dışındaki ifadeler
+      - session'da yazma yapıldıktan sonraki tüm okumalar
+      - kullanıcı yakın zamanda yazma yaptıysa (SonYazmaIzi) o kullanıcının
+        tüm okumaları, böylece yeni kayıtlar replika gecikmesine takılmadan
+        görünür
+      - `execution_options(birincil=True)` ile işaretlenmiş okumalar
+
+    Session.info anahtarları: "replika" (engine), "kullanici_id" (auth
+    dependency tarafından yazılır), "son_yazma" (SonYazmaIzi), "yazildi",
+    "yapiskan".
+    """
+
+    def _okuma_bagi(self):
+        replika = self.info.get("replika")
+        kullanici_id = self.info.get("kullanici_id")
+        if replika is None or kullanici_id is None or self.info.get("yazildi"):
+            return None
+        if "yapiskan" not in self.info:
+            son_yazma = self.info.get("son_yazma")
+            self.info["yapiskan"] = son_yazma is not None and son_yazma.yapiskan_mi(kullanici_id)
+        return None if self.info["yapiskan"] else replika
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["yazildi"] = True
+        elif isinstance(clause, Select) and not clause.get_execution_options().get("birincil"):
+            replika = self._okuma_bagi()
+            if replika is not None:
+                return replika
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+@event.listens_for(YonlendirmeliSession, "after_commit")
+def _yazan_kullaniciyi_yapistir(db):
+    """Yazma yapan kullanıcının sonraki okumalarını birincil veritabanına sabitler."""
+    son_yazma = db.info.get("son_yazma")
+    if son_yazma is not None and db.info.get("yazildi") and db.info.get("kullanici_id") is not None:
+        son_yazma.yazildi(db.info["kullanici_id"])
+
+
+def replika_sec(db: Session, async_mi: bool = False) -> None:
+    """Replika tanımlıysa session'ın okumaları için rastgele bir replika seçer."""
+    if REPLIKA_ENGINELERI:
+        sync_replika, async_replika = random.choice(REPLIKA_ENGINELERI)
+        db.info["replika"] = async_replika.sync_engine if async_mi else sync_replika
+
+
 # Session factory olustur
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=YonlendirmeliSession)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False, sync_session_class=YonlendirmeliSession
+)
 
 # Base model sinifi
 Base = declarative_base()
 
 
-def veritabani_baglantisi_al():
+def satir_yoksa_ekle(db: Session, model, degerler: Mapping, anahtar_kolonlari: Sequence[str]) -> None:
+    """
+    Satırı ekler; aynı anahtarla satır zaten varsa hiçbir şey yapmaz
+    (insert-or-ignore). Eş zamanlı ilk yazmalar benzersizlik hatası almaz.
+    PostgreSQL, MySQL ve SQLite'ta tek ifade; diğerlerinde düz INSERT çalışır.
+    """
+    tablo = model.__table__
+    lehce = db.get_bind().dialect.name
+    if lehce in ("postgresql", "sqlite"):
+        ifade = (pg_insert if lehce == "postgresql" else sqlite_insert)(tablo).values(**degerler)
+        db.execute(ifade.on_conflict_do_nothing(index_elements=list(anahtar_kolonlari)))
+    elif lehce == "mysql":
+        db.execute(mysql_insert(tablo).values(**degerler).prefix_with("IGNORE"))
+    else:
+        db.execute(insert(tablo).values(**degerler))
+
+
+def toplamlari_artir(db: Session, model, anahtar: Mapping, farklar: Mapping) -> None:
+    """
+    Anahtarla bulunan satırın kolonlarına fark (delta) ekler; satır yoksa
+    farklarla oluşturur. PostgreSQL, MySQL ve SQLite'ta tek bir atomik upsert
+    ifadesi çalışır; diğerlerinde satır kilitlenerek güncellenir.
+
+    Args:
+        db: Veritabanı session'ı
+        model: Anahtar kolonlarında benzersizlik kısıtı olan model
+        anahtar: Kolon adı → değer (benzersiz anahtar)
+        farklar: Kolon adı → eklenecek fark
+    """
+    tablo = model.__table__
+    degerler = {**anahtar, **farklar}
+    lehce = db.get_bind().dialect.name
+
+    if lehce in ("postgresql", "sqlite"):
+        ifade = (pg_insert if lehce == "postgresql" else sqlite_insert)(tablo).values(**degerler)
+        db.execute(ifade.on_conflict_do_update(
+            index_elements=list(anahtar),
+            set_={kolon: tablo.c[kolon] + ifade.excluded[kolon] for kolon in farklar}
+        ))
+    elif lehce == "mysql":
+        ifade = mysql_insert(tablo).values(**degerler)
+        db.execute(ifade.on_duplicate_key_update(
+            {kolon: tablo.c[kolon] + ifade.inserted[kolon] for kolon in farklar}
+        ))
+    else:
+        satir = db.query(model).filter(
+            and_(*(getattr(model, kolon) == deger for kolon, deger in anahtar.items()))
+        ).with_for_update().first()
+        if satir:
+            for kolon, fark in farklar.items():
+                setattr(satir, kolon, getattr(satir, kolon) + fark)
+        else:
+            db.add(model(**degerler))
+        db.flush()
+
+
+# Toplu istek bağlamının alt isteklerin ASGI scope'undaki anahtarı
+TOPLU_ISTEK_KAPSAMI = "toplu_istek"
+
+
+class TopluIstekBaglami:
+    """
+    Toplu istekteki (POST /api/v1/batch) alt isteklerin ortak kullandığı
+    kimlik ve session'lar. Alt isteklerin ASGI scope'una konur; session ve
+    kimlik bağımlılıkları yenisini oluşturmak yerine buradakini döndürür.
+    
+    Session eş zamanlı kullanılamadığı için session'lar sadece sıralı modda
+    (`paylasimli=True`) paylaşılır; eş zamanlı modda sadece kimlik ortaktır.
+    Sync session ilk sync endpoint'te açılır ve `kapat` ile kapatılır.
+    """
+
+    def __init__(self, kimlik, paylasimli: bool, async_db=None):
+        self.kimlik = kimlik
+        self.paylasimli = paylasimli
+        self.async_db = async_db
+        self.sync_db = None
+
+    def sync_session(self) -> Session:
+        if self.sync_db is None:
+            self.sync_db = SessionLocal(info={"son_yazma": self.async_db.sync_session.info.get("son_yazma")})
+            replika_sec(self.sync_db)
+            self.sync_db.info["kullanici_id"] = self.kimlik.id
+        return self.sync_db
+
+    def kapat(self) -> None:
+        if self.sync_db is not None:
+            self.sync_db.close()
+            self.sync_db = None
+
+
+def _toplu_baglam(request: Request) -> Optional[TopluIstekBaglami]:
+    """İstek toplu isteğin paylaşımlı bir alt isteğiyse bağlamını döndürür."""
+    baglam = request.scope.get(TOPLU_ISTEK_KAPSAMI)
+    return baglam if baglam is not None and baglam.paylasimli else None
+
+
+def veritabani_baglantisi_al(request: Request):
     """
     Veritabani baglantisi (session) olusturur ve yield ile dondurur.
-    FastAPI dependency olarak kullanilir.
+    FastAPI dependency olarak kullanilir. GET isteklerinde okumalar
+    replikaya yonlendirilebilir (bkz. YonlendirmeliSession).
+    Toplu isteğin alt isteklerinde ortak session döner (bkz. TopluIstekBaglami).
     
     Yields:
         Session: SQLAlchemy veritabani session'i
     """
-    db = SessionLocal()
+    toplu = _toplu_baglam(request)
+    if toplu is not None:
+        yield toplu.sync_session()
+        return
+    
+    db = SessionLocal(info={"son_yazma": request.scope.get(SON_YAZMA_KAPSAMI)})
+    if request.method in OKUMA_METODLARI:
+        replika_sec(db)
     try:
         yield db
     finally:
         db.close()
 
 
+async def async_veritabani_baglantisi_al(request: Request):
+    """
+    Async endpoint'ler icin AsyncSession olusturur ve yield ile dondurur.
+
+    Mevcut sync servis fonksiyonlari `await db.run_sync(fonksiyon, ...)` ile
+    cagrilir; sorgular thread yerine event loop uzerinde bekler.
+
+    Yields:
+        AsyncSession: SQLAlchemy async veritabani session'i
+    """
+    toplu = _toplu_baglam(request)
+    if toplu is not None and toplu.async_db is not None:
+        yield toplu.async_db
+        return
+    
+    async with AsyncSessionLocal(info={"son_yazma": request.scope.get(SON_YAZMA_KAPSAMI)}) as db:
+        if request.method in OKUMA_METODLARI:
+            replika_sec(db.sync_session, async_mi=True)
+        yield db
+
+
+def _havuz_doluluk(havuz) -> dict:
+    if isinstance(havuz, QueuePool):
+        return {"kullanimda": havuz.checkedout(), "bosta": havuz.checkedin()}
+    return {}
+
+
+def havuz_durumu() -> dict:
+    """Bağlantı havuzlarının anlık doluluğu ve bekleme istatistikleri."""
+    durum = {
+        "havuz_boyutu": HAVUZ_AYARLARI.havuz_boyutu,
+        "tasma": HAVUZ_AYARLARI.tasma,
+        "threadpool_boyutu": HAVUZ_AYARLARI.threadpool_boyutu,
+    }
+    durum.update(_havuz_doluluk(engine.pool))
+    durum.update(havuz_istatistigi.ozet())
+    durum["async"] = {
+        "havuz_boyutu": HAVUZ_AYARLARI.async_havuz_boyutu,
+        "tasma": HAVUZ_AYARLARI.async_tasma,
+        **_havuz_doluluk(async_engine.pool),
+        **async_havuz_istatistigi.ozet(),
+    }
+    durum["replika_sayisi"] = len(REPLIKA_ENGINELERI)
+    return durum
+
+
 def tablolari_olustur():
     """
     Tum veritabani tablolarini olusturur.
     Modeller import edildikten sonra calistirilmalidir.
     """
     # Tum modelleri import et
-    from sunucu.modeller import arac, bakim, harcama, yakit_takibi, hatirlatici
+    from sunucu.modeller import arac, bakim, harcama, yakit_takibi, hatirlatici, aylik_ozet, yakit_istatistigi, yakit_anomalisi, istasyon_fiyat_endeksi, km_cizelgesi
     
     # Tablolari olustur
     Base.metadata.create_all(bind=engine)
@@ -2,27 +2,35 @@
 Araç Yönlendirici
 Araç ile ilgili API endpoint'lerini içerir.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from sunucu.veritabani import veritabani_baglantisi_al
-from sunucu.semalar.arac_sema import AracOlustur, AracGuncelle, AracYanit, AracOzet, KilometreGuncelle, AracDetayliYanit
-from sunucu.servisler import arac_servisi
-from sunucu.bagimliliklar.auth import mevcut_kullanici_al
+from typing import List, Optional
+from datetime import date
+from sunucu.veritabani import veritabani_baglantisi_al, async_veritabani_baglantisi_al
+from sunucu.sayfalama import sonraki_imleci_ekle
+from sunucu.semalar.arac_sema import (
+    AracOlustur, AracGuncelle, AracYanit, AracOzet, KilometreGuncelle, AracDetayliYanit,
+    KilometreTelemetrisi, TelemetriSonucu, KmCizelgesiYanit
+)
+from sunucu.servisler import arac_servisi, telemetri_servisi, km_cizelgesi_servisi
+from sunucu.bagimliliklar.auth import mevcut_kullanici_al, async_mevcut_kullanici_al, Kimlik
 from sunucu.bagimliliklar.sahiplik import arac_sahipligini_dogrula
-from sunucu.modeller.kullanici import Kullanicilar
 from sunucu.modeller.arac import Araclar
 
 
 # Router oluştur
 router = APIRouter()
 
+# Kilometre çizelgesi isteğinde sorgulanabilecek en fazla tarih + km
+EN_FAZLA_CIZELGE_SORGUSU = 1000
+
 
 @router.post("", response_model=AracYanit, status_code=201, summary="Yeni Araç Ekle")
 def arac_olustur(
     arac: AracOlustur,
     db: Session = Depends(veritabani_baglantisi_al),
-    # kullanici: Kullanicilar = Depends(mevcut_kullanici_al)  # GEÇİCİ DEVRE DIŞI
+    # kullanici: Kimlik = Depends(mevcut_kullanici_al)  # GEÇİCİ DEVRE DIŞI
 ):
     """
     Yeni bir araç kaydı oluşturur.
@@ -55,22 +63,27 @@ def arac_detayi_getir(
 
 
 @router.get("", response_model=List[AracOzet], summary="Tüm Araçları Listele")
-def araclari_listele(
+async def araclari_listele(
+    yanit: Response,
     atlama: int = Query(0, ge=0, description="Kaç kayıt atlanacak"),
     limit: int = Query(100, ge=1, le=500, description="Maksimum kayıt sayısı"),
     sadece_aktifler: bool = Query(True, description="Sadece aktif araçları göster"),
-    db: Session = Depends(veritabani_baglantisi_al),
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
+    imlec: Optional[str] = Query(None, description="Sonraki sayfa imleci (X-Next-Cursor)"),
+    db: AsyncSession = Depends(async_veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(async_mevcut_kullanici_al)
 ):
     """
     Kullanıcının tüm araçlarını listeler.
     Admin ise tüm sistemdeki araçları listeler.
     
-    - **atlama**: Pagination için atlanacak kayıt sayısı
+    - **atlama**: Pagination için atlanacak kayıt sayısı (geriye dönük uyumluluk)
     - **limit**: Döndürülecek maksimum kayıt sayısı
     - **sadece_aktifler**: True ise sadece aktif araçları getirir
+    - **imlec**: Önceki yanıtın `X-Next-Cursor` header'ındaki değer
     """
-    return arac_servisi.tum_araclari_getir(db, kullanici.id, atlama, limit, sadece_aktifler, kullanici.rol)
+    araclar = await db.run_sync(arac_servisi.tum_araclari_getir, kullanici.id, atlama, limit, sadece_aktifler, kullanici.rol, imlec)
+    sonraki_imleci_ekle(yanit, araclar, limit, tarihli=False)
+    return araclar
 
 
 @router.put("/{arac_id}", response_model=AracYanit, summary="Araç Bilgilerini Güncelle")
@@ -105,6 +118,52 @@ def kilometre_guncelle(
     return arac_servisi.arac_kilometre_guncelle(db, sahiplik_arac.id, km_bilgisi.km)
 
 
+@router.get("/{arac_id}/kilometre-cizelgesi", response_model=KmCizelgesiYanit, summary="Kilometre Zaman Çizelgesi")
+def kilometre_cizelgesi(
+    tarih: List[date] = Query([], description="Kilometresi istenen tarihler (tekrarlanabilir)"),
+    km: List[int] = Query([], description="Ulaşıldığı tarih istenen kilometreler (tekrarlanabilir)"),
+    sahiplik_arac: Araclar = Depends(arac_sahipligini_dogrula),
+    db: Session = Depends(veritabani_baglantisi_al)
+):
+    """
+    Aracın bakım ve yakıt kayıtlarından birleştirilmiş kilometre çizelgesi
+    üzerinde arama yapar. Sadece araç sahibi erişebilir.
+    
+    - **tarih**: Verilen tarihteki kilometre (kayıtlar arasında doğrusal tahmin)
+    - **km**: Verilen kilometreye ulaşılan tarih
+    
+    Örnek: `/araclar/5/kilometre-cizelgesi?tarih=2024-01-01&tarih=2024-07-01&km=50000`
+    """
+    if len(tarih) + len(km) > EN_FAZLA_CIZELGE_SORGUSU:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tek istekte en fazla {EN_FAZLA_CIZELGE_SORGUSU} tarih/km sorgulanabilir"
+        )
+    return km_cizelgesi_servisi.cizelge_sorgula(db, sahiplik_arac, tarih, km)
+
+
+@router.post("/kilometre/telemetri", response_model=TelemetriSonucu, status_code=202, summary="Kilometre Telemetrisi Gönder")
+async def kilometre_telemetrisi(
+    telemetri: KilometreTelemetrisi,
+    db: AsyncSession = Depends(async_veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(async_mevcut_kullanici_al)
+):
+    """
+    Takip cihazlarından gelen kilometre okumalarını toplu olarak alır.
+    Okumalar hemen yazılmaz: araç başına en büyük değer tamponda tutulur ve
+    birkaç saniyede bir tek UPDATE ile yazılır. Kilometre geriye gitmez;
+    mevcut değerden küçük okumalar yok sayılır.
+    
+    - **okumalar**: [{arac_id, km}, ...] (aynı araçtan birden fazla okuma olabilir)
+    """
+    okumalar = [(okuma.arac_id, okuma.km) for okuma in telemetri.okumalar]
+    tampondaki_arac = await db.run_sync(
+        telemetri_servisi.okumalari_tamponla, okumalar, kullanici.id, kullanici.rol
+    )
+    telemetri_servisi.kilometre_yazici.tampon_doldu_mu(tampondaki_arac)
+    return {"kabul_edilen": len(okumalar), "tampondaki_arac": tampondaki_arac}
+
+
 @router.delete("/{arac_id}", summary="Araç Sil")
 def arac_sil(
     sahiplik_arac: Araclar = Depends(arac_sahipligini_dogrula),
@@ -125,7 +184,7 @@ def arac_sil(
 def arac_sayisi(
     sadece_aktifler: bool = Query(True, description="Sadece aktif araçları say"),
     db: Session = Depends(veritabani_baglantisi_al),
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
+    kullanici: Kimlik = Depends(mevcut_kullanici_al)
 ):
     """
     Kullanıcının toplam araç sayısını döndürür.
@@ -139,8 +198,33 @@ def arac_sayisi(
 
 @router.get('/{arac_id}/detay', response_model=AracDetayliYanit)
 def arac_detay_getir_endpoint(
+    genislet: str = Query(
+        ",".join(arac_servisi.DETAY_KOLEKSIYONLARI),
+        description="Listesi döndürülecek koleksiyonlar (virgülle ayrılmış: bakimlar,harcamalar,yakitlar)"
+    ),
+    koleksiyon_limiti: int = Query(
+        arac_servisi.VARSAYILAN_KOLEKSIYON_LIMITI, ge=1, le=500,
+        description="Koleksiyon başına maksimum kayıt sayısı"
+    ),
     sahiplik_arac: Araclar = Depends(arac_sahipligini_dogrula),
     db: Session = Depends(veritabani_baglantisi_al)
 ):
-    """Araç detaylarını getirir. Sadece araç sahibi erişebilir."""
-    return arac_servisi.arac_detay_getir(db, sahiplik_arac.id)
+    """
+    Araç detaylarını ilişkili kayıtlarıyla birlikte getirir. Sadece araç sahibi erişebilir.
+    
+    - **genislet**: Listesi dönecek koleksiyonlar; diğerlerinin sadece `ozet` değeri döner
+    - **koleksiyon_limiti**: Her koleksiyondan en yeni kaç kaydın döneceği
+    
+    Adet ve toplam tutarlar limitten bağımsız olarak `ozet` alanında döner.
+    Limitin ötesindeki kayıtlar için ilgili liste endpoint'i (ör.
+    `GET /api/v1/bakimlar/arac/{arac_id}`) kullanılır ve yanıttaki
+    `X-Next-Cursor` değeri `imlec` parametresiyle gönderilerek sayfalanır.
+    """
+    secilenler = [k.strip() for k in genislet.split(",") if k.strip()]
+    gecersizler = [k for k in secilenler if k not in arac_servisi.DETAY_KOLEKSIYONLARI]
+    if gecersizler:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Geçersiz koleksiyon: {', '.join(gecersizler)}"
+        )
+    return arac_servisi.arac_detay_getir(db, sahiplik_arac, secilenler, koleksiyon_limiti)
@@ -14,7 +14,7 @@ from sunucu.semalar.kullanici_sema import (
     SifreDegistir
 )
 from sunucu.servisler import auth_servisi
-from sunucu.bagimliliklar.auth import mevcut_kullanici_al
+from sunucu.bagimliliklar.auth import mevcut_kullanici_kaydi_al
 from sunucu.modeller.kullanici import Kullanicilar
 
 router = APIRouter(prefix="/auth", tags=["Kimlik Doğrulama"])
@@ -82,7 +82,7 @@ def giris_yap(
         )
     
     # Token oluştur
-    access_token = auth_servisi.token_olustur({"sub": kullanici.email})
+    access_token = auth_servisi.kullanici_tokeni_olustur(kullanici)
     
     return {
         "access_token": access_token,
@@ -93,7 +93,7 @@ def giris_yap(
 
 @router.get("/me", response_model=KullaniciYanit, summary="Mevcut Kullanıcı Bilgileri")
 def mevcut_kullanici_getir(
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
+    kullanici: Kullanicilar = Depends(mevcut_kullanici_kaydi_al)
 ):
     """Giriş yapmış kullanıcının bilgilerini döndürür."""
     return kullanici
@@ -102,7 +102,7 @@ def mevcut_kullanici_getir(
 @router.put("/me", response_model=KullaniciYanit, summary="Bilgileri Güncelle")
 def bilgileri_guncelle(
     veri: KullaniciGuncelle,
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al),
+    kullanici: Kullanicilar = Depends(mevcut_kullanici_kaydi_al),
     db: Session = Depends(veritabani_baglantisi_al)
 ):
     """
@@ -115,7 +115,7 @@ def bilgileri_guncelle(
 @router.put("/sifre-degistir", status_code=status.HTTP_204_NO_CONTENT, summary="Şifre Değiştir")
 def sifre_degistir(
     veri: SifreDegistir,
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al),
+    kullanici: Kullanicilar = Depends(mevcut_kullanici_kaydi_al),
     db: Session = Depends(veritabani_baglantisi_al)
 ):
     """
@@ -2,15 +2,16 @@
 Bakım Yönlendirici
 Bakım kayıtları ile ilgili API endpoint'lerini içerir.
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from sunucu.veritabani import veritabani_baglantisi_al
+from typing import List, Optional
+from sunucu.veritabani import veritabani_baglantisi_al, async_veritabani_baglantisi_al
+from sunucu.sayfalama import sonraki_imleci_ekle
 from sunucu.semalar.bakim_sema import BakimOlustur, BakimGuncelle, BakimYanit, BakimOzet
 from sunucu.servisler import bakim_servisi
-from sunucu.bagimliliklar.auth import mevcut_kullanici_al
-from sunucu.bagimliliklar.sahiplik import arac_sahipligini_dogrula, bakim_sahipligini_dogrula
-from sunucu.modeller.kullanici import Kullanicilar
+from sunucu.bagimliliklar.auth import mevcut_kullanici_al, Kimlik
+from sunucu.bagimliliklar.sahiplik import arac_sahipligini_dogrula, async_arac_sahipligini_dogrula, bakim_sahipligini_dogrula
 from sunucu.modeller.bakim import Bakimlar
 from sunucu.modeller.arac import Araclar
 
@@ -23,7 +24,7 @@ router = APIRouter()
 def bakim_olustur(
     bakim: BakimOlustur,
     db: Session = Depends(veritabani_baglantisi_al),
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
+    kullanici: Kimlik = Depends(mevcut_kullanici_al)
 ):
     """
     Yeni bir bakım kaydı oluşturur.
@@ -56,22 +57,27 @@ def bakim_detayi_getir(
 
 
 @router.get("/arac/{arac_id}", response_model=List[BakimOzet], summary="Araç Bakımlarını Listele")
-def arac_bakimlari(
+async def arac_bakimlari(
+    yanit: Response,
     arac_id: int,
     atlama: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(veritabani_baglantisi_al),
-    sahiplik_arac: Araclar = Depends(arac_sahipligini_dogrula)
+    imlec: Optional[str] = Query(None, description="Sonraki sayfa imleci (X-Next-Cursor)"),
+    db: AsyncSession = Depends(async_veritabani_baglantisi_al),
+    sahiplik_arac: Araclar = Depends(async_arac_sahipligini_dogrula)
 ):
     """
     Belirli bir aracın tüm bakım kayıtlarını listeler.
     Sadece yetkili olunan araçlar için.
     
     - **arac_id**: Araç ID
-    - **atlama**: Pagination için atlanacak kayıt sayısı
+    - **atlama**: Pagination için atlanacak kayıt sayısı (geriye dönük uyumluluk)
     - **limit**: Maksimum kayıt sayısı
+    - **imlec**: Önceki yanıtın `X-Next-Cursor` header'ındaki değer
     """
-    return bakim_servisi.arac_bakimlari_getir(db, sahiplik_arac.id, atlama, limit)
+    kayitlar = await db.run_sync(bakim_servisi.arac_bakimlari_getir, sahiplik_arac.id, atlama, limit, imlec)
+    sonraki_imleci_ekle(yanit, kayitlar, limit)
+    return kayitlar
 
 
 @router.put("/{bakim_id}", response_model=BakimYanit, summary="Bakım Kaydını Güncelle")
@@ -2,15 +2,16 @@
 Harcama Yönlendirici
 Harcama kayıtları ile ilgili API endpoint'lerini içerir.
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from sunucu.veritabani import veritabani_baglantisi_al
+from sunucu.veritabani import veritabani_baglantisi_al, async_veritabani_baglantisi_al
+from sunucu.sayfalama import sonraki_imleci_ekle
 from sunucu.semalar.harcama_sema import HarcamaOlustur, HarcamaGuncelle, HarcamaYanit, HarcamaOzet
 from sunucu.servisler import harcama_servisi
-from sunucu.bagimliliklar.auth import mevcut_kullanici_al
-from sunucu.bagimliliklar.sahiplik import arac_sahipligini_dogrula, harcama_sahipligini_dogrula
-from sunucu.modeller.kullanici import Kullanicilar
+from sunucu.bagimliliklar.auth import mevcut_kullanici_al, Kimlik
+from sunucu.bagimliliklar.sahiplik import arac_sahipligini_dogrula, async_arac_sahipligini_dogrula, harcama_sahipligini_dogrula
 from sunucu.modeller.harcama import Harcamalar
 from sunucu.modeller.arac import Araclar
 
@@ -23,7 +24,7 @@ router = APIRouter()
 def harcama_olustur(
     harcama: HarcamaOlustur,
     db: Session = Depends(veritabani_baglantisi_al),
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
+    kullanici: Kimlik = Depends(mevcut_kullanici_al)
 ):
     """
     Yeni bir harcama kaydı oluşturur.
@@ -55,13 +56,15 @@ def harcama_detayi_getir(
 
 
 @router.get("/arac/{arac_id}", response_model=List[HarcamaYanit], summary="Araç Harcamalarını Listele")
-def arac_harcamalari(
+async def arac_harcamalari(
+    yanit: Response,
     arac_id: int,
     kategori: Optional[str] = Query(None, description="Kategori filtresi"),
     atlama: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(veritabani_baglantisi_al),
-    sahiplik_arac: Araclar = Depends(arac_sahipligini_dogrula)
+    imlec: Optional[str] = Query(None, description="Sonraki sayfa imleci (X-Next-Cursor)"),
+    db: AsyncSession = Depends(async_veritabani_baglantisi_al),
+    sahiplik_arac: Araclar = Depends(async_arac_sahipligini_dogrula)
 ):
     """
     Belirli bir aracın harcama kayıtlarını listeler.
@@ -69,10 +72,13 @@ def arac_harcamalari(
     
     - **arac_id**: Araç ID
     - **kategori**: Belirli bir kategoriye göre filtrele (opsiyonel)
-    - **atlama**: Pagination için atlanacak kayıt sayısı
+    - **atlama**: Pagination için atlanacak kayıt sayısı (geriye dönük uyumluluk)
     - **limit**: Maksimum kayıt sayısı
+    - **imlec**: Önceki yanıtın `X-Next-Cursor` header'ındaki değer
     """
-    return harcama_servisi.arac_harcamalari_getir(db, sahiplik_arac.id, kategori, atlama, limit)
+    kayitlar = await db.run_sync(harcama_servisi.arac_harcamalari_getir, sahiplik_arac.id, kategori, atlama, limit, imlec)
+    sonraki_imleci_ekle(yanit, kayitlar, limit)
+    return kayitlar
 
 
 @router.put("/{harcama_id}", response_model=HarcamaYanit, summary="Harcama Kaydını Güncelle")
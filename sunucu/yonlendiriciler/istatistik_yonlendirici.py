@@ -1,93 +1,180 @@
 """
 İstatistik Yönlendirici
 Grafik ve analiz endpoint'leri
+
+Endpoint'ler async'tir: sorgular AsyncSession üzerinden event loop'ta
+beklenir, threadpool'u meşgul etmez. Servis fonksiyonları sync kalır ve
+`db.run_sync` ile çağrılır.
+
+Sonuçlar kullanıcının veri versiyonuyla önbelleğe alınır (bkz.
+onbellek_servisi); tekrar eden isteklerde veritabanına gidilmez.
 """
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Callable, Optional
 
-from sunucu.veritabani import veritabani_baglantisi_al
+from sunucu.veritabani import async_veritabani_baglantisi_al
 from sunucu.servisler import istatistik_servisi
-from sunucu.bagimliliklar.auth import mevcut_kullanici_al
-from sunucu.bagimliliklar.sahiplik import arac_sahipligini_dogrula
-from sunucu.modeller.kullanici import Kullanicilar
+from sunucu.servisler.onbellek_servisi import istatistik_onbellegi, istatistik_anahtari
+from sunucu.bagimliliklar.auth import async_mevcut_kullanici_al, Kimlik
+from sunucu.bagimliliklar.sahiplik import async_arac_sahipligini_dogrula
+from sunucu.zaman_dilimleri import DILIMLER, DILIM_AY, AY_KATI_DILIMLER
 
 router = APIRouter(prefix="/istatistikler", tags=["istatistikler"])
 
+DILIM_ACIKLAMASI = "Gruplama dilimi: " + ", ".join(DILIMLER)
+
+
+def _dilimi_dogrula(dilim: str) -> None:
+    if dilim not in DILIMLER:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Geçersiz zaman dilimi: {dilim}"
+        )
+
+
+async def _onbellekli(
+    db: AsyncSession,
+    kullanici: Kimlik,
+    uc_nokta: str,
+    arac_id: Optional[int],
+    servis: Callable,
+    *parametreler
+):
+    """
+    Sonucu önbellekten döndürür; yoksa araç sahipliğini doğrulayıp servisten hesaplar.
+
+    Önbellekteki sonuç aynı kullanıcı için sahiplik doğrulanarak üretildiğinden
+    isabette kontrol tekrarlanmaz; araç değişiklikleri veri versiyonunu artırır.
+    Veri versiyonu her istekte birincil veritabanından tek primary key
+    sorgusuyla okunur. Önbelleğe girecek sonuç da birincilden hesaplanır;
+    gecikmeli bir replikadan hesaplansa yeni versiyonun anahtarına eski veri
+    yazılırdı.
+    """
+    anahtar = await db.run_sync(istatistik_anahtari, kullanici.id, kullanici.rol, uc_nokta, arac_id, *parametreler)
+    sonuc = istatistik_onbellegi.getir(anahtar)
+    if sonuc is None:
+        if arac_id:
+            await async_arac_sahipligini_dogrula(arac_id, db, kullanici)
+        db.sync_session.info["yapiskan"] = True
+        sonuc = await db.run_sync(servis, *parametreler)
+        istatistik_onbellegi.koy(anahtar, sonuc)
+    return sonuc
+
+
+@router.get("/ozet", summary="Gösterge Paneli Özeti")
+async def genel_ozet_getir(
+    ay_sayisi: int = Query(6, ge=1, le=24, description="Harcama trendi için geriye dönük ay sayısı"),
+    dilim: str = Query(DILIM_AY, description="Harcama trendi dilimi: " + ", ".join(AY_KATI_DILIMLER)),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Karşılaştırmada en pahalı N araç (boş bırakılırsa tümü)"),
+    db: AsyncSession = Depends(async_veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(async_mevcut_kullanici_al)
+):
+    """
+    Gösterge panelinin tüm widget'larını tek istekte döndürür:
+    aylık harcama trendi, kategori dağılımı, araç karşılaştırması ve araç sayısı.
+    
+    Dört ayrı endpoint çağrısının yerine geçer; veriler tek sorguda
+    (tek veritabanı round trip'i) hesaplanır.
+    """
+    if dilim not in AY_KATI_DILIMLER:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Özet için geçersiz zaman dilimi: {dilim}"
+        )
+    return await _onbellekli(
+        db, kullanici, "ozet", None,
+        istatistik_servisi.genel_ozet, kullanici.id, kullanici.rol, ay_sayisi, dilim, limit
+    )
+
 
 @router.get("/aylik-harcama", summary="Aylık Harcama Trendi")
-def aylik_harcama_getir(
+async def aylik_harcama_getir(
     arac_id: Optional[int] = Query(None, description="Araç ID (boş bırakılırsa tüm araçlar)"),
     ay_sayisi: int = Query(6, ge=1, le=24, description="Geriye dönük ay sayısı"),
-    db: Session = Depends(veritabani_baglantisi_al),
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
+    dilim: str = Query(DILIM_AY, description=DILIM_ACIKLAMASI),
+    db: AsyncSession = Depends(async_veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(async_mevcut_kullanici_al)
 ):
     """
-    Son N ayın aylık toplam harcamalarını döndürür.
-    Grafik için kullanılır.
+    Son N ayın toplam harcamalarını dilim bazında döndürür.
+    Grafik için kullanılır. Harcaması olmayan dilimler sıfır tutarla döner.
     """
-    # Eğer arac_id varsa, kullanıcının o araca yetkisi var mı kontrol et
+    _dilimi_dogrula(dilim)
+    # Eğer arac_id varsa, kullanıcının o araca yetkisi var mı kontrol edilir
     # Admin ise bypass edilir
-    if arac_id:
-        arac_sahipligini_dogrula(arac_id, db, kullanici)
-        
-    return istatistik_servisi.aylik_harcama_trendi(db, kullanici.id, arac_id, ay_sayisi, kullanici.rol)
+    return await _onbellekli(
+        db, kullanici, "aylik-harcama", arac_id,
+        istatistik_servisi.aylik_harcama_trendi, kullanici.id, arac_id, ay_sayisi, kullanici.rol, dilim
+    )
 
 
 @router.get("/kategori-dagilim", summary="Kategori Bazlı Harcama Dağılımı")
-def kategori_dagilim_getir(
+async def kategori_dagilim_getir(
     arac_id: Optional[int] = Query(None, description="Araç ID"),
-    db: Session = Depends(veritabani_baglantisi_al),
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
+    db: AsyncSession = Depends(async_veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(async_mevcut_kullanici_al)
 ):
     """
     Harcama kategorilerinin toplam tutarı ve yüzdelik dağırımı.
     Pasta grafik için kullanılır.
     """
-    if arac_id:
-        arac_sahipligini_dogrula(arac_id, db, kullanici)
-        
-    return istatistik_servisi.kategori_dagilimi(db, kullanici.id, arac_id, kullanici.rol)
+    return await _onbellekli(
+        db, kullanici, "kategori-dagilim", arac_id,
+        istatistik_servisi.kategori_dagilimi, kullanici.id, arac_id, kullanici.rol
+    )
 
 
 @router.get("/yakit-tuketim", summary="Yakıt Tüketim Analizi")
-def yakit_tuketim_getir(
+async def yakit_tuketim_getir(
     arac_id: int = Query(..., description="Araç ID"),
     ay_sayisi: int = Query(12, ge=1, le=24, description="Geriye dönük ay sayısı"),
-    db: Session = Depends(veritabani_baglantisi_al),
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
+    dilim: str = Query(DILIM_AY, description=DILIM_ACIKLAMASI),
+    db: AsyncSession = Depends(async_veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(async_mevcut_kullanici_al)
 ):
     """
-    Aylık yakıt tüketimi, toplam tutar ve ortalama fiyat.
+    Dilim bazında yakıt tüketimi, toplam tutar ve ortalama fiyat.
     Çizgi/sütun grafik için kullanılır.
     """
-    # Araç sahipliğini doğrula
-    arac_sahipligini_dogrula(arac_id, db, kullanici)
-    
-    return istatistik_servisi.yakit_tuketim_analizi(db, arac_id, ay_sayisi)
+    _dilimi_dogrula(dilim)
+    return await _onbellekli(
+        db, kullanici, "yakit-tuketim", arac_id,
+        istatistik_servisi.yakit_tuketim_analizi, arac_id, ay_sayisi, dilim
+    )
 
 
 @router.get("/arac-karsilastirma", summary="Araçlar Arası Maliyet Karşılaştırması")
-def arac_karsilastirma_getir(
-    db: Session = Depends(veritabani_baglantisi_al),
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
+async def arac_karsilastirma_getir(
+    limit: Optional[int] = Query(None, ge=1, le=500, description="En pahalı N araç (boş bırakılırsa tümü)"),
+    atlama: int = Query(0, ge=0, description="Kaç araç atlanacak"),
+    db: AsyncSession = Depends(async_veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(async_mevcut_kullanici_al)
 ):
     """
     Tüm araçların toplam maliyetlerini karşılaştırır.
     Sütun grafik için kullanılır.
+    
+    - **limit**: Toplam maliyete göre ilk N araç
+    - **atlama**: Pagination için atlanacak araç sayısı
     """
-    return istatistik_servisi.arac_karsilastirma(db, kullanici.id, kullanici.rol)
+    return await _onbellekli(
+        db, kullanici, "arac-karsilastirma", None,
+        istatistik_servisi.arac_karsilastirma, kullanici.id, kullanici.rol, limit, atlama
+    )
 
 
 @router.get("/bakim-takip/{arac_id}", summary="Bakım Takip Göstergesi")
-def bakim_takip_getir(
+async def bakim_takip_getir(
     arac_id: int,
-    db: Session = Depends(veritabani_baglantisi_al),
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
+    db: AsyncSession = Depends(async_veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(async_mevcut_kullanici_al)
 ):
     """
     Bakıma kalan kilometre ve oran bilgisi.
     Kadran (gauge) grafik için kullanılır.
     """
-    arac_sahipligini_dogrula(arac_id, db, kullanici)
-    return istatistik_servisi.bakim_takip_gostergesi(db, arac_id)
+    return await _onbellekli(
+        db, kullanici, "bakim-takip", arac_id,
+        istatistik_servisi.bakim_takip_gostergesi, arac_id
+    )
@@ -9,12 +9,13 @@ from typing import List
 from sunucu.veritabani import veritabani_baglantisi_al
 from sunucu.modeller.kullanici import Kullanicilar
 from sunucu.semalar.kullanici_sema import KullaniciYanit, AdminKullaniciOlustur
-from sunucu.bagimliliklar.auth import mevcut_kullanici_al
-from sunucu.servisler.auth_servisi import kullanici_kaydet, sifre_hashle
+from sunucu.bagimliliklar.auth import mevcut_kullanici_al, Kimlik
+from sunucu.servisler.auth_servisi import kullanici_kaydet, sifre_hashle, kullanici_onbellegini_temizle
+from sunucu.servisler import onbellek_servisi
 
 router = APIRouter(prefix="/kullanicilar", tags=["Kullanıcı Yönetimi (Admin)"])
 
-def admin_dogrula(kullanici: Kullanicilar = Depends(mevcut_kullanici_al)):
+def admin_dogrula(kullanici: Kimlik = Depends(mevcut_kullanici_al)):
     """Sadece 'admin' rolüne sahip kullanıcıların erişimine izin verir."""
     if kullanici.rol != "admin":
         raise HTTPException(
@@ -26,7 +27,7 @@ def admin_dogrula(kullanici: Kullanicilar = Depends(mevcut_kullanici_al)):
 @router.get("/", response_model=List[KullaniciYanit], summary="Tüm Kullanıcıları Listele")
 def kullanicilari_getir(
     db: Session = Depends(veritabani_baglantisi_al),
-    _: Kullanicilar = Depends(admin_dogrula)
+    _: Kimlik = Depends(admin_dogrula)
 ):
     """
     Sisteme kayıtlı tüm kullanıcıları listeler.
@@ -38,7 +39,7 @@ def kullanicilari_getir(
 def kullanici_ekle(
     yeni_kullanici: AdminKullaniciOlustur,
     db: Session = Depends(veritabani_baglantisi_al),
-    _: Kullanicilar = Depends(admin_dogrula)
+    _: Kimlik = Depends(admin_dogrula)
 ):
     """
     Yönetici tarafından yeni kullanıcı oluşturur.
@@ -73,7 +74,7 @@ def kullanici_ekle(
 def kullanici_sil(
     kullanici_id: int,
     db: Session = Depends(veritabani_baglantisi_al),
-    mevcut_admin: Kullanicilar = Depends(admin_dogrula)
+    mevcut_admin: Kimlik = Depends(admin_dogrula)
 ):
     """
     Belirtilen ID'ye sahip kullanıcıyı siler.
@@ -93,4 +94,8 @@ def kullanici_sil(
         )
         
     db.delete(kullanici)
+    # Silinen araçlar admin istatistiklerinden de düşmeli. Silinen satırın sayacı
+    # gideceği için filo versiyonu silmeyi yapan adminin sayacıyla ilerletilir
+    onbellek_servisi.degisiklik_kaydet(db, kullanici_id=mevcut_admin.id)
     db.commit()
+    kullanici_onbellegini_temizle(kullanici_id)
@@ -0,0 +1,152 @@
+"""
+Toplu İstek Yönlendirici
+Birden fazla GET isteğini tek HTTP isteğinde çalıştırır.
+
+Alt istekler ağ üzerinden değil, uygulamanın ASGI arayüzüne doğrudan
+gönderilir; her biri normal bir istekle aynı yönlendirme, doğrulama ve
+hata yanıtlarından geçer. Kimlik toplu istek için bir kez çözülür ve alt
+isteklere TopluIstekBaglami ile aktarılır. Sıralı modda alt istekler ortak
+session kullanır; aynı araç için tekrarlanan sahiplik kontrolleri session
+identity map'inden karşılanır.
+"""
+import asyncio
+import json
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from sunucu.ayarlar import ayarlar
+from sunucu.veritabani import async_veritabani_baglantisi_al, replika_sec, TOPLU_ISTEK_KAPSAMI, TopluIstekBaglami
+from sunucu.bagimliliklar.auth import async_mevcut_kullanici_al, Kimlik
+from sunucu.ara_katmanlar.cors import DISA_ACIK_HEADERLAR
+from sunucu.semalar.toplu_sema import AltIstek, AltYanit, TopluIstek, TopluYanit
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+API_ONEKI = "/api/v1/"
+TOPLU_YOL = "/api/v1/batch"
+
+# Alt isteğe aktarılmayan istek header'ları (gövde toplu isteğe aittir)
+AKTARILMAYAN_HEADERLAR = {b"content-length", b"content-type", b"transfer-encoding"}
+
+# Alt yanıtta döndürülen header'lar (tarayıcıda JS'in okuyabildikleri, örn. X-Next-Cursor)
+DONDURULEN_HEADERLAR = {h.strip().lower() for h in DISA_ACIK_HEADERLAR.split(",")}
+
+
+def _yolu_dogrula(alt: AltIstek) -> None:
+    yol = alt.yol.partition("?")[0]
+    if not yol.startswith(API_ONEKI) or yol.rstrip("/") == TOPLU_YOL:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Geçersiz alt istek yolu: {alt.yol}"
+        )
+
+
+async def _alt_istegi_calistir(request: Request, alt: AltIstek, baglam: TopluIstekBaglami) -> AltYanit:
+    """Alt isteği uygulamaya ASGI üzerinden gönderir ve yanıtını toplar."""
+    yol, _, sorgu = alt.yol.partition("?")
+    kapsam = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": yol,
+        "raw_path": yol.encode(),
+        "query_string": sorgu.encode(),
+        "headers": [(ad, deger) for ad, deger in request.scope["headers"] if ad not in AKTARILMAYAN_HEADERLAR],
+        TOPLU_ISTEK_KAPSAMI: baglam,
+    }
+
+    async def al():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    durum = 500
+    basliklar = {}
+    parcalar = []
+
+    async def gonder(mesaj):
+        nonlocal durum
+        if mesaj["type"] == "http.response.start":
+            durum = mesaj["status"]
+            basliklar.update((ad.decode().lower(), deger.decode()) for ad, deger in mesaj.get("headers", []))
+        elif mesaj["type"] == "http.response.body":
+            parcalar.append(mesaj.get("body", b""))
+
+    try:
+        await request.app(kapsam, al, gonder)
+    except Exception:
+        # Yakalanmayan hata 500 yanıtı gönderildikten sonra yeniden fırlatılır
+        logger.exception("Toplu istek alt isteği başarısız (%s)", alt.yol)
+        durum = 500
+
+    govde = b"".join(parcalar)
+    if basliklar.get("content-type", "").startswith("application/json") and govde:
+        govde = json.loads(govde)
+    else:
+        govde = govde.decode(errors="replace") or None
+
+    ek_basliklar = {ad: deger for ad, deger in basliklar.items() if ad in DONDURULEN_HEADERLAR}
+    return AltYanit(id=alt.id, yol=alt.yol, durum=durum, govde=govde, basliklar=ek_basliklar or None)
+
+
+@router.post("/batch", response_model=TopluYanit, summary="Toplu GET İsteği")
+async def toplu_istek(
+    toplu: TopluIstek,
+    request: Request,
+    db: AsyncSession = Depends(async_veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(async_mevcut_kullanici_al)
+):
+    """
+    Birden fazla GET isteğini tek istekte çalıştırır; yanıtlar aynı sırayla döner.
+
+    Token ve kullanıcı bir kez doğrulanır. Her alt isteğin kendi durum kodu
+    vardır; biri başarısız olsa da diğerleri çalışır.
+
+    - **istekler**: `/api/v1/` ile başlayan yollar (sorgu parametreleri dahil)
+    - **eszamanli**: False (varsayılan) ise alt istekler sırayla ve ortak
+      session ile çalışır. True ise birbirinden bağımsız alt istekler eş
+      zamanlı çalışır; session eş zamanlı kullanılamadığı için her biri kendi
+      session'ını açar.
+    """
+    if len(toplu.istekler) > ayarlar.TOPLU_ISTEK_LIMITI:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tek toplu istekte en fazla {ayarlar.TOPLU_ISTEK_LIMITI} alt istek olabilir"
+        )
+    for alt in toplu.istekler:
+        _yolu_dogrula(alt)
+
+    if toplu.eszamanli:
+        baglam = TopluIstekBaglami(kullanici, paylasimli=False)
+        sinir = asyncio.Semaphore(ayarlar.TOPLU_ISTEK_ESZAMANLILIGI)
+
+        async def sinirli(alt):
+            async with sinir:
+                return await _alt_istegi_calistir(request, alt, baglam)
+
+        return TopluYanit(yanitlar=await asyncio.gather(*(sinirli(alt) for alt in toplu.istekler)))
+
+    # Toplu isteğin kendisi POST'tur; alt isteklerin hepsi okuma olduğu için replika seçilebilir
+    replika_sec(db.sync_session, async_mi=True)
+    baglam = TopluIstekBaglami(kullanici, paylasimli=True, async_db=db)
+    yanitlar = []
+    try:
+        for alt in toplu.istekler:
+            yanit = await _alt_istegi_calistir(request, alt, baglam)
+            if yanit.durum >= 500:
+                # Hatalı alt istek ortak transaction'ı bozmuş olabilir
+                await db.rollback()
+                if baglam.sync_db is not None:
+                    await run_in_threadpool(baglam.sync_db.rollback)
+            yanitlar.append(yanit)
+    finally:
+        await run_in_threadpool(baglam.kapat)
+    return TopluYanit(yanitlar=yanitlar)
@@ -2,15 +2,25 @@
 Yakıt Yönlendirici
 Yakıt takip kayıtları ile ilgili API endpoint'lerini içerir.
 """
-from fastapi import APIRouter, Depends, Query
+import csv
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from sunucu.veritabani import veritabani_baglantisi_al
-from sunucu.semalar.yakit_sema import YakitOlustur, YakitGuncelle, YakitYanit, TuketimAnalizi, IstasyonAnalizi
-from sunucu.servisler import yakit_servisi
-from sunucu.bagimliliklar.auth import mevcut_kullanici_al
-from sunucu.bagimliliklar.sahiplik import arac_sahipligini_dogrula, yakit_sahipligini_dogrula
-from sunucu.modeller.kullanici import Kullanicilar
+from typing import List, Optional
+from sunucu.ayarlar import ayarlar
+from sunucu.veritabani import veritabani_baglantisi_al, async_veritabani_baglantisi_al
+from sunucu.sayfalama import sonraki_imleci_ekle
+from sunucu.semalar.yakit_sema import (
+    YakitOlustur, YakitGuncelle, YakitYanit, TuketimAnalizi, IstasyonAnalizi,
+    SegmentAnalizi, FiyatTrendi, FiloAracAnalizi, YakitAnomalisi, FiyatEndeksi,
+    YakitAktarimSonucu
+)
+from sunucu.servisler import (
+    yakit_servisi, yakit_analiz_servisi, anomali_servisi, fiyat_endeksi_servisi, yakit_aktarma_servisi
+)
+from sunucu.bagimliliklar.auth import mevcut_kullanici_al, Kimlik
+from sunucu.bagimliliklar.sahiplik import arac_sahipligini_dogrula, async_arac_sahipligini_dogrula, yakit_sahipligini_dogrula
 from sunucu.modeller.yakit_takibi import Yakit_Takibi as YakitKayitlari
 from sunucu.modeller.arac import Araclar
 
@@ -23,7 +33,7 @@ router = APIRouter()
 def yakit_kaydi_olustur(
     yakit: YakitOlustur,
     db: Session = Depends(veritabani_baglantisi_al),
-    kullanici: Kullanicilar = Depends(mevcut_kullanici_al)
+    kullanici: Kimlik = Depends(mevcut_kullanici_al)
 ):
     """
     Yeni bir yakıt kaydı oluşturur.
@@ -45,6 +55,34 @@ def yakit_kaydi_olustur(
     return yakit_servisi.yakit_kaydi_olustur(db, yakit)
 
 
+@router.post("/toplu-aktar", response_model=YakitAktarimSonucu, summary="Yakıt Kartı Dökümünü Toplu Aktar")
+def yakit_kartlarini_aktar(
+    dosya: UploadFile = File(..., description="CSV veya NDJSON döküm (isteğe bağlı gzip)"),
+    parca_boyutu: int = Query(ayarlar.ICE_AKTARMA_PARCA_BOYUTU, ge=1, le=10000, description="Tek INSERT ile yazılacak satır sayısı"),
+    db: Session = Depends(veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(mevcut_kullanici_al)
+):
+    """
+    Yakıt kartı sağlayıcısının işlem dökümünü tek istekte yakıt kayıtlarına aktarır.
+    Araçlar plaka ile eşleştirilir; sadece yetkili olunan araçlara kayıt eklenir.
+
+    - **dosya**: Başlıklı CSV (plaka, tarih, km, litre, fiyat, yakit_turu, ...) veya NDJSON
+    - **parca_boyutu**: Tek INSERT ile yazılacak satır sayısı
+
+    Aynı (araç, tarih, km, litre) ile kayıtlı işlemler atlanır; dosya tekrar
+    gönderildiğinde çift kayıt oluşmaz. Hatalı satırlar atlanır ve raporlanır.
+    """
+    try:
+        return yakit_aktarma_servisi.yakit_kartlarini_aktar(db, dosya.file, kullanici.id, kullanici.rol, parca_boyutu)
+    except (OSError, EOFError, UnicodeDecodeError, csv.Error) as e:
+        # Bozuk gzip, UTF-8 olmayan veya okunamayan dosya
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Dosya okunamadı: {str(e)}"
+        )
+
+
 @router.get("/{yakit_id}", response_model=YakitYanit, summary="Yakıt Kaydı Detaylarını Getir")
 def yakit_detayi_getir(
     yakit: YakitKayitlari = Depends(yakit_sahipligini_dogrula)
@@ -58,22 +96,27 @@ def yakit_detayi_getir(
 
 
 @router.get("/arac/{arac_id}", response_model=List[YakitYanit], summary="Araç Yakıt Kayıtlarını Listele")
-def arac_yakit_kayitlari(
+async def arac_yakit_kayitlari(
+    yanit: Response,
     arac_id: int,
     atlama: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(veritabani_baglantisi_al),
-    sahiplik_arac: Araclar = Depends(arac_sahipligini_dogrula)
+    imlec: Optional[str] = Query(None, description="Sonraki sayfa imleci (X-Next-Cursor)"),
+    db: AsyncSession = Depends(async_veritabani_baglantisi_al),
+    sahiplik_arac: Araclar = Depends(async_arac_sahipligini_dogrula)
 ):
     """
     Belirli bir aracın tüm yakıt kayıtlarını listeler.
     Sadece yetkili olunan araçlar için.
     
     - **arac_id**: Araç ID
-    - **atlama**: Pagination için atlanacak kayıt sayısı
+    - **atlama**: Pagination için atlanacak kayıt sayısı (geriye dönük uyumluluk)
     - **limit**: Maksimum kayıt sayısı
+    - **imlec**: Önceki yanıtın `X-Next-Cursor` header'ındaki değer
     """
-    return yakit_servisi.arac_yakit_kayitlari_getir(db, sahiplik_arac.id, atlama, limit)
+    kayitlar = await db.run_sync(yakit_servisi.arac_yakit_kayitlari_getir, sahiplik_arac.id, atlama, limit, imlec)
+    sonraki_imleci_ekle(yanit, kayitlar, limit)
+    return kayitlar
 
 
 @router.put("/{yakit_id}", response_model=YakitYanit, summary="Yakıt Kaydını Güncelle")
@@ -132,3 +175,105 @@ def istasyon_analiz(
     Returns: Her istasyonun ortalama fiyat ve toplam litre bilgisi
     """
     return yakit_servisi.istasyon_analizi(db, sahiplik_arac.id)
+
+
+@router.get("/arac/{arac_id}/segment-analizi", response_model=SegmentAnalizi, summary="Segment Bazlı Tüketim Analizi")
+def segment_analizi(
+    pencere: int = Query(5, ge=1, le=50, description="Hareketli ortalamadaki segment sayısı"),
+    sahiplik_arac: Araclar = Depends(arac_sahipligini_dogrula),
+    db: Session = Depends(veritabani_baglantisi_al)
+):
+    """
+    Aracın iki tam depo arasındaki her segmentinin tüketimini, hareketli
+    ortalamasını ve aykırı segmentleri döndürür.
+    
+    - **arac_id**: Araç ID
+    - **pencere**: Hareketli ortalamadaki segment sayısı
+    
+    Returns: Segmentler, ortalama ve medyan tüketim, aykırı segment sayısı
+    """
+    return yakit_analiz_servisi.segment_analizi(db, sahiplik_arac.id, pencere)
+
+
+@router.get("/arac/{arac_id}/fiyat-trendi", response_model=List[FiyatTrendi], summary="Yakıt Fiyat Trendi")
+def fiyat_trendi(
+    sahiplik_arac: Araclar = Depends(arac_sahipligini_dogrula),
+    db: Session = Depends(veritabani_baglantisi_al)
+):
+    """
+    Yakıt türü bazında aylık ortalama fiyatı, fiyat değişim eğilimini ve
+    fiyatı aykırı alımları döndürür.
+    
+    - **arac_id**: Araç ID
+    """
+    return yakit_analiz_servisi.fiyat_trendi(db, sahiplik_arac.id)
+
+
+@router.get("/filo/analiz", response_model=List[FiloAracAnalizi], summary="Filo Tüketim Analizi")
+def filo_analizi(
+    pencere: int = Query(5, ge=1, le=50, description="Hareketli ortalamadaki segment sayısı"),
+    db: Session = Depends(veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(mevcut_kullanici_al)
+):
+    """
+    Kullanıcının tüm araçlarının tüketim özetini döndürür.
+    Admin ise tüm filoyu kapsar.
+    
+    Returns: Araç başına ortalama/medyan tüketim, son hareketli ortalama, aykırı segment sayısı
+    """
+    return yakit_analiz_servisi.filo_analizi(db, kullanici.id, kullanici.rol, pencere)
+
+
+@router.get("/arac/{arac_id}/anomaliler", response_model=List[YakitAnomalisi], summary="Şüpheli Yakıt Kayıtları")
+def arac_anomalileri(
+    limit: int = Query(50, ge=1, le=500),
+    sahiplik_arac: Araclar = Depends(arac_sahipligini_dogrula),
+    db: Session = Depends(veritabani_baglantisi_al)
+):
+    """
+    Aracın eklenirken şüpheli bulunan yakıt kayıtlarını listeler (en yeni önce).
+    
+    - **arac_id**: Araç ID
+    - **limit**: Maksimum kayıt sayısı
+    
+    Türler: `tuketim` (ortalamadan sapan tüketim, olası hırsızlık veya km
+    hatası), `fiyat` (ortalamadan sapan litre fiyatı), `litre` (en büyük
+    dolumu belirgin şekilde aşan miktar)
+    """
+    return anomali_servisi.anomalileri_getir(db, arac_id=sahiplik_arac.id, limit=limit)
+
+
+@router.get("/filo/anomaliler", response_model=List[YakitAnomalisi], summary="Filo Şüpheli Yakıt Kayıtları")
+def filo_anomalileri(
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(mevcut_kullanici_al)
+):
+    """
+    Kullanıcının tüm araçlarının şüpheli yakıt kayıtlarını listeler (en yeni önce).
+    Admin ise tüm filoyu kapsar.
+    
+    - **limit**: Maksimum kayıt sayısı
+    """
+    return anomali_servisi.anomalileri_getir(db, kullanici_id=kullanici.id, kullanici_rol=kullanici.rol, limit=limit)
+
+
+@router.get("/filo/fiyat-endeksi", response_model=FiyatEndeksi, summary="Filo İstasyon Fiyat Endeksi")
+def filo_fiyat_endeksi(
+    yakit_turu: Optional[str] = Query(None, max_length=20, description="Sadece bu yakıt türü"),
+    hafta_sayisi: int = Query(12, ge=1, le=104, description="Kaç haftalık dönem"),
+    limit: int = Query(10, ge=1, le=100, description="Yakıt türü başına en ucuz istasyon sayısı"),
+    db: Session = Depends(veritabani_baglantisi_al),
+    kullanici: Kimlik = Depends(mevcut_kullanici_al)
+):
+    """
+    Kullanıcının tüm araçlarının alımlarına göre en ucuz istasyonları ve
+    haftalık fiyat trendini döndürür. Admin ise tüm filoyu kapsar.
+    
+    Haftalık istasyon endeksinden okunur; yanıt süresi kayıt sayısına bağlı değildir.
+    
+    - **yakit_turu**: Sadece bu yakıt türü (opsiyonel)
+    - **hafta_sayisi**: Dönem uzunluğu (hafta)
+    - **limit**: Yakıt türü başına en ucuz istasyon sayısı
+    """
+    return fiyat_endeksi_servisi.fiyat_endeksi(db, kullanici.id, kullanici.rol, yakit_turu, hafta_sayisi, limit)
@@ -0,0 +1,177 @@
+"""
+Zaman Dilimleri
+İstatistik sorguları için gün/hafta/ay/çeyrek/yıl bazında gruplama.
+
+- dilim_baslangici_ifadesi: tarih kolonunu dilimin ilk gününe (DATE) yuvarlar;
+  PostgreSQL, MySQL ve SQLite'ta yerel fonksiyonlara derlenir (GROUP BY için).
+- donem_araligi: takvime göre doğru [başlangıç, bitiş) aralığı. Filtre kolonun
+  kendisine uygulanır (kolon >= :baslangic AND kolon < :bitis), fonksiyon
+  içine alınmadığı için tarih index'leri kullanılabilir.
+- bos_dilimleri_doldur: sorgu sonucunda olmayan dilimleri Python'da sıfırla
+  doldurur; boş dilimler için ek sorgu gitmez.
+
+Haftalar ISO 8601'e göre pazartesi başlar.
+"""
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Date
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+DILIM_GUN = "gun"
+DILIM_HAFTA = "hafta"
+DILIM_AY = "ay"
+DILIM_CEYREK = "ceyrek"
+DILIM_YIL = "yil"
+
+DILIMLER = (DILIM_GUN, DILIM_HAFTA, DILIM_AY, DILIM_CEYREK, DILIM_YIL)
+
+# Aylık özet tablosundan okunabilen dilimler (ayın katları)
+AY_KATI_DILIMLER = {DILIM_AY: 1, DILIM_CEYREK: 3, DILIM_YIL: 12}
+
+
+def ay_ekle(tarih: date, ay: int) -> date:
+    """Tarihin ait olduğu ayın ilk gününe `ay` ay ekler (negatif olabilir)."""
+    yil, ay_indeksi = divmod(tarih.year * 12 + tarih.month - 1 + ay, 12)
+    return date(yil, ay_indeksi + 1, 1)
+
+
+def dilim_baslangici(tarih: date, dilim: str) -> date:
+    """Tarihin ait olduğu dilimin ilk günü."""
+    if dilim == DILIM_GUN:
+        return tarih
+    if dilim == DILIM_HAFTA:
+        return tarih - timedelta(days=tarih.weekday())
+    if dilim == DILIM_AY:
+        return date(tarih.year, tarih.month, 1)
+    if dilim == DILIM_CEYREK:
+        return date(tarih.year, tarih.month - (tarih.month - 1) % 3, 1)
+    return date(tarih.year, 1, 1)
+
+
+def sonraki_dilim(baslangic: date, dilim: str) -> date:
+    """Dilim başlangıcından bir sonraki dilimin başlangıcı."""
+    if dilim == DILIM_GUN:
+        return baslangic + timedelta(days=1)
+    if dilim == DILIM_HAFTA:
+        return baslangic + timedelta(days=7)
+    return ay_ekle(baslangic, AY_KATI_DILIMLER[dilim])
+
+
+def donem_araligi(dilim: str, ay_sayisi: int, bugun: Optional[date] = None) -> Tuple[date, date]:
+    """
+    İçinde bulunulan ay dahil son `ay_sayisi` takvim ayını kapsayan
+    [başlangıç, bitiş) aralığı. Sınırlar dilim başlangıçlarına genişletilir;
+    böylece ilk ve son dilim yarım kalmaz.
+    """
+    bugun = bugun or date.today()
+    baslangic = dilim_baslangici(ay_ekle(bugun, -(ay_sayisi - 1)), dilim)
+    bitis = sonraki_dilim(dilim_baslangici(bugun, dilim), dilim)
+    return baslangic, bitis
+
+
+def dilim_etiketi(baslangic: date, dilim: str) -> str:
+    """Grafik ekseni için dilim etiketi (2024-03-15, 2024-W11, 2024-03, 2024-Q1, 2024)."""
+    if dilim == DILIM_GUN:
+        return baslangic.isoformat()
+    if dilim == DILIM_HAFTA:
+        yil, hafta, _ = baslangic.isocalendar()
+        return f"{yil}-W{hafta:02d}"
+    if dilim == DILIM_AY:
+        return baslangic.strftime("%Y-%m")
+    if dilim == DILIM_CEYREK:
+        return f"{baslangic.year}-Q{(baslangic.month - 1) // 3 + 1}"
+    return str(baslangic.year)
+
+
+def bos_dilimleri_doldur(
+    degerler: Dict[date, dict],
+    baslangic: date,
+    bitis: date,
+    dilim: str,
+    bos_deger: Callable[[], dict]
+) -> List[dict]:
+    """
+    [başlangıç, bitiş) aralığındaki her dilim için bir satır döndürür.
+    Sorgudan gelmeyen dilimler `bos_deger()` ile doldurulur.
+
+    Her satır `donem` (etiket) ve `baslangic` (ISO tarih) alanlarını taşır;
+    aylık dilimlerde geriye dönük uyumluluk için `ay` alanı da eklenir.
+    """
+    satirlar = []
+    donem = baslangic
+    while donem < bitis:
+        etiket = dilim_etiketi(donem, dilim)
+        satir = {"donem": etiket, "baslangic": donem.isoformat()}
+        if dilim == DILIM_AY:
+            satir["ay"] = etiket
+        satir.update(degerler.get(donem) or bos_deger())
+        satirlar.append(satir)
+        donem = sonraki_dilim(donem, dilim)
+    return satirlar
+
+
+class dilim_baslangici_ifadesi(FunctionElement):
+    """
+    Tarih kolonunu dilimin ilk gününe yuvarlayan SQL ifadesi (DATE döner).
+
+    Sadece SELECT/GROUP BY'da kullanılmalıdır; filtreler için kolonun
+    kendisi donem_araligi sınırlarıyla karşılaştırılmalıdır.
+    """
+
+    type = Date()
+    name = "dilim_baslangici"
+    inherit_cache = True
+    _traverse_internals = FunctionElement._traverse_internals + [("dilim", InternalTraversal.dp_string)]
+
+    def __init__(self, kolon, dilim: str):
+        if dilim not in DILIMLER:
+            raise ValueError(f"Geçersiz zaman dilimi: {dilim}")
+        self.dilim = dilim
+        super().__init__(kolon)
+
+
+_POSTGRESQL_ALANLARI = {DILIM_HAFTA: "week", DILIM_AY: "month", DILIM_CEYREK: "quarter", DILIM_YIL: "year"}
+
+
+@compiles(dilim_baslangici_ifadesi)
+def _postgresql_dilim(element, compiler, **kw):
+    # PostgreSQL ve date_trunc destekleyen diğer lehçeler
+    kolon = compiler.process(element.clauses, **kw)
+    if element.dilim == DILIM_GUN:
+        return f"CAST({kolon} AS DATE)"
+    return f"CAST(date_trunc('{_POSTGRESQL_ALANLARI[element.dilim]}', {kolon}) AS DATE)"
+
+
+@compiles(dilim_baslangici_ifadesi, "mysql")
+def _mysql_dilim(element, compiler, **kw):
+    kolon = compiler.process(element.clauses, **kw)
+    if element.dilim == DILIM_GUN:
+        return f"DATE({kolon})"
+    if element.dilim == DILIM_HAFTA:
+        return f"DATE_SUB(DATE({kolon}), INTERVAL WEEKDAY({kolon}) DAY)"
+    if element.dilim == DILIM_AY:
+        return f"DATE_SUB(DATE({kolon}), INTERVAL DAYOFMONTH({kolon}) - 1 DAY)"
+    if element.dilim == DILIM_CEYREK:
+        return f"DATE_ADD(MAKEDATE(YEAR({kolon}), 1), INTERVAL (QUARTER({kolon}) - 1) * 3 MONTH)"
+    return f"MAKEDATE(YEAR({kolon}), 1)"
+
+
+@compiles(dilim_baslangici_ifadesi, "sqlite")
+def _sqlite_dilim(element, compiler, **kw):
+    kolon = compiler.process(element.clauses, **kw)
+    if element.dilim == DILIM_GUN:
+        return f"date({kolon})"
+    if element.dilim == DILIM_HAFTA:
+        # 6 gün geri gidip ilk pazartesiye ilerlemek haftanın pazartesisini verir
+        return f"date({kolon}, '-6 days', 'weekday 1')"
+    if element.dilim == DILIM_AY:
+        return f"date({kolon}, 'start of month')"
+    if element.dilim == DILIM_CEYREK:
+        return (
+            f"date({kolon}, 'start of month', "
+            f"'-' || ((CAST(strftime('%m', {kolon}) AS INTEGER) - 1) % 3) || ' months')"
+        )
+    return f"date({kolon}, 'start of year')"
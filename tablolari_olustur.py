@@ -10,6 +10,11 @@ from sunucu.modeller.bakim import Bakimlar
 from sunucu.modeller.harcama import Harcamalar
 from sunucu.modeller.yakit_takibi import Yakit_Takibi
 from sunucu.modeller.hatirlatici import Hatirlaticilar
+from sunucu.modeller.aylik_ozet import AylikOzetler
+from sunucu.modeller.yakit_istatistigi import YakitIstatistikleri, YakitFiyatIstatistikleri
+from sunucu.modeller.yakit_anomalisi import YakitAnomalileri
+from sunucu.modeller.istasyon_fiyat_endeksi import IstasyonFiyatEndeksi
+from sunucu.modeller.km_cizelgesi import KmCizelgeleri
 
 print("🔨 Veritabanı tabloları oluşturuluyor...")
 print(f"   Bağlantı: {engine.url}")
@@ -0,0 +1,133 @@
+"""
+Kilometre Telemetrisi Yük Testi
+POST /api/v1/araclar/kilometre/telemetri endpoint'ine eş zamanlı istemcilerle
+okuma paketleri gönderir; okuma/saniye ve istek gecikmesini ölçer.
+
+Okumalar kullanıcının araçlarına dağıtılır, her araç için kilometre artarak
+gönderilir. Test bitince bir boşaltma aralığı beklenir ve araçların
+kilometresinin gönderilen en büyük değere ulaştığı kontrol edilir (yazma
+yolu da doğrulanır). Tek worker ile çalıştırılmalıdır:
+
+    uvicorn sunucu.ana:uygulama --workers 1
+
+Kullanım:
+    python telemetri_yuk_testi.py [--adres http://localhost:8000] [--eszamanli 8] [--paket 1000]
+                                  [--sure 10] [--hedef 10000] (--token TOKEN | --email EMAIL --sifre SIFRE)
+
+Gereksinim: pip install httpx
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+import httpx
+
+from yuk_testi import token_al, yuzdelik
+
+
+async def araclari_al(istemci: httpx.AsyncClient) -> list:
+    yanit = await istemci.get("/api/v1/araclar", params={"limit": 500})
+    yanit.raise_for_status()
+    return [arac["id"] for arac in yanit.json()]
+
+
+async def sanal_cihaz(istemci, arac_idleri, kilometreler, paket, bitis, sureler, sayac):
+    """Süre dolana kadar rastgele araçlar için okuma paketleri gönderen tek bir istemci."""
+    while time.perf_counter() < bitis:
+        okumalar = []
+        for arac_id in random.choices(arac_idleri, k=paket):
+            kilometreler[arac_id] += random.randint(0, 3)
+            okumalar.append({"arac_id": arac_id, "km": kilometreler[arac_id]})
+
+        baslangic = time.perf_counter()
+        try:
+            yanit = await istemci.post("/api/v1/araclar/kilometre/telemetri", json={"okumalar": okumalar})
+            basarili = yanit.status_code == 202
+        except httpx.HTTPError:
+            basarili = False
+        if basarili:
+            sureler.append(time.perf_counter() - baslangic)
+            sayac["okuma"] += len(okumalar)
+        else:
+            sayac["hata"] += 1
+
+
+async def yuk_testi(args) -> bool:
+    limitler = httpx.Limits(max_connections=args.eszamanli, max_keepalive_connections=args.eszamanli)
+    async with httpx.AsyncClient(base_url=args.adres, limits=limitler, timeout=httpx.Timeout(60)) as istemci:
+        token = args.token or await token_al(istemci, args.email, args.sifre)
+        istemci.headers["Authorization"] = f"Bearer {token}"
+
+        arac_idleri = await araclari_al(istemci)
+        if not arac_idleri:
+            print("❌ Kullanıcının aracı yok")
+            return False
+        kilometreler = {}
+        for arac_id in arac_idleri:
+            yanit = await istemci.get(f"/api/v1/araclar/{arac_id}")
+            kilometreler[arac_id] = (yanit.json().get("km") or 0) + 1
+
+        sureler = []
+        sayac = {"okuma": 0, "hata": 0}
+        print(f"🚀 {args.eszamanli} eş zamanlı istemci, {args.paket} okuma/istek, {len(arac_idleri)} araç, {args.sure} sn")
+        baslangic = time.perf_counter()
+        bitis = baslangic + args.sure
+        await asyncio.gather(*(
+            sanal_cihaz(istemci, arac_idleri, kilometreler, args.paket, bitis, sureler, sayac)
+            for _ in range(args.eszamanli)
+        ))
+        test_suresi = time.perf_counter() - baslangic
+
+        sirali = sorted(sureler)
+        okuma_saniye = sayac["okuma"] / test_suresi
+        print(f"\n{'okuma/sn':>10} {'istek/sn':>9} {'p50 ms':>8} {'p99 ms':>8} {'hata':>6}")
+        print(
+            f"{okuma_saniye:>10.0f} {len(sirali) / test_suresi:>9.1f} "
+            f"{yuzdelik(sirali, 0.50) * 1000:>8.1f} {yuzdelik(sirali, 0.99) * 1000:>8.1f} {sayac['hata']:>6}"
+        )
+
+        # Son aralığın okumaları yazılsın
+        await asyncio.sleep(args.bekleme)
+        saglik = (await istemci.get("/health")).json().get("kilometre_telemetrisi", {})
+        print(f"🗄️  Tampon: {saglik}")
+
+        geride_kalan = 0
+        for arac_id in arac_idleri:
+            yanit = await istemci.get(f"/api/v1/araclar/{arac_id}")
+            if yanit.json().get("km") != kilometreler[arac_id]:
+                geride_kalan += 1
+        if geride_kalan:
+            print(f"❌ {geride_kalan} aracın kilometresi son okumaya ulaşmadı")
+            return False
+        print("✅ Tüm araçların kilometresi son okumaya eşit")
+
+    if okuma_saniye < args.hedef:
+        print(f"❌ Hedefin altında: {okuma_saniye:.0f} < {args.hedef} okuma/sn")
+        return False
+    print(f"✅ Hedef karşılandı: {okuma_saniye:.0f} >= {args.hedef} okuma/sn")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kilometre telemetrisi yük testi")
+    parser.add_argument("--adres", default="http://localhost:8000")
+    parser.add_argument("--eszamanli", type=int, default=8, help="Eş zamanlı istemci sayısı")
+    parser.add_argument("--paket", type=int, default=1000, help="İstek başına okuma sayısı")
+    parser.add_argument("--sure", type=float, default=10, help="Test süresi (saniye)")
+    parser.add_argument("--hedef", type=int, default=10000, help="Beklenen en düşük okuma/saniye")
+    parser.add_argument("--bekleme", type=float, default=3, help="Test sonrası yazma için beklenen süre (saniye)")
+    parser.add_argument("--token")
+    parser.add_argument("--email")
+    parser.add_argument("--sifre")
+    args = parser.parse_args()
+
+    if not args.token and not (args.email and args.sifre):
+        parser.error("--token veya --email ile --sifre verilmelidir")
+
+    sys.exit(0 if asyncio.run(yuk_testi(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
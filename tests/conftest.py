@@ -0,0 +1,77 @@
+"""
+Test Ortak Ayarları
+Testler bellek içi SQLite üzerinde çalışır; MySQL/PostgreSQL gerekmez.
+Sorgu sayısı testleri için çalıştırılan SQL ifadeleri sayılır.
+"""
+import os
+from contextlib import contextmanager
+
+# sunucu.ayarlar import edilmeden önce ayarlanmalı
+os.environ.setdefault("SECRET_KEY", "test-anahtari-" + "x" * 32)
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import sunucu.modeller  # noqa: F401  (tabloların metadata'ya eklenmesi için)
+from sunucu.modeller.kullanici import Kullanicilar
+from sunucu.veritabani import Base
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    oturum = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield oturum
+    finally:
+        oturum.close()
+
+
+@pytest.fixture
+def sorgu_sayaci(engine):
+    """
+    `with sorgu_sayaci() as sorgular:` bloğunda çalışan SQL ifadelerini toplar.
+    Async engine'ler de sayılacaksa `sorgu_sayaci(async_engine.sync_engine)`.
+    """
+
+    @contextmanager
+    def say(*ek_engineler):
+        sorgular = []
+        engineler = (engine, *ek_engineler)
+
+        def kaydet(conn, cursor, statement, parameters, context, executemany):
+            sorgular.append(statement)
+
+        for hedef in engineler:
+            event.listen(hedef, "before_cursor_execute", kaydet)
+        try:
+            yield sorgular
+        finally:
+            for hedef in engineler:
+                event.remove(hedef, "before_cursor_execute", kaydet)
+
+    return say
+
+
+@pytest.fixture
+def kullanici_olustur(db):
+    def olustur(email: str, rol: str = "kullanici") -> Kullanicilar:
+        kullanici = Kullanicilar(email=email, ad_soyad="Test Kullanıcı", sifre_hash="x", rol=rol)
+        db.add(kullanici)
+        db.commit()
+        return kullanici
+
+    return olustur
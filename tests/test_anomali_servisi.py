@@ -0,0 +1,146 @@
+"""
+Yakıt anomali puanlama testleri
+Litre fiyatı yakıt türü başına ayrı istatistikle puanlanmalı. Düzenlenen ve
+silinen kayıtlar istatistiklerden çıkarılmalı; düzeltilen kaydın anomalisi kalmamalı.
+"""
+import statistics
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from sunucu.modeller import Araclar, Yakit_Takibi, YakitFiyatIstatistikleri, YakitIstatistikleri
+from sunucu.modeller.yakit_anomalisi import ANOMALI_FIYAT, ANOMALI_LITRE, YakitAnomalileri
+from sunucu.semalar.yakit_sema import YakitGuncelle, YakitOlustur
+from sunucu.servisler import yakit_servisi
+from sunucu.servisler.anomali_servisi import istatistikleri_yeniden_olustur, yakit_kayitlarini_puanla
+
+FIYATLAR = {"Benzin": Decimal("42.50"), "LPG": Decimal("21.30")}
+
+
+@pytest.fixture
+def arac_id(db, kullanici_olustur) -> int:
+    kullanici = kullanici_olustur("lpg@test.com")
+    arac = Araclar(kullanici_id=kullanici.id, plaka="34LPG001", marka="Fiat", model="Egea")
+    db.add(arac)
+    db.commit()
+    return arac.id
+
+
+def yakit_kayitlari(db, arac_id: int, turler, fiyat=None):
+    kayitlar = []
+    for i, yakit_turu in enumerate(turler):
+        birim_fiyat = fiyat if fiyat is not None else FIYATLAR[yakit_turu]
+        kayitlar.append(Yakit_Takibi(
+            arac_id=arac_id, tarih=date(2025, 1, 1) + timedelta(days=i), km=1000 * (i + 1),
+            litre=Decimal(40), fiyat=birim_fiyat, toplam_tutar=birim_fiyat * 40,
+            yakit_turu=yakit_turu, tam_depo=False,
+        ))
+    db.add_all(kayitlar)
+    db.flush()
+    return kayitlar
+
+
+def test_farkli_yakit_turleri_birbirini_anomali_yapmaz(db, arac_id):
+    kayitlar = yakit_kayitlari(db, arac_id, ["Benzin", "LPG"] * 8)
+
+    anomaliler = yakit_kayitlarini_puanla(db, arac_id, kayitlar)
+
+    assert [a for a in anomaliler if a.tur == ANOMALI_FIYAT] == []
+    ortalamalar = {
+        s.yakit_turu: round(s.ortalama, 2)
+        for s in db.query(YakitFiyatIstatistikleri).filter(YakitFiyatIstatistikleri.arac_id == arac_id)
+    }
+    assert ortalamalar == {"Benzin": 42.5, "LPG": 21.3}
+
+
+def test_fiyat_kendi_yakit_turune_gore_puanlanir(db, arac_id):
+    yakit_kayitlarini_puanla(db, arac_id, yakit_kayitlari(db, arac_id, ["Benzin", "LPG"] * 8))
+
+    # LPG fiyatına yakın Benzin kaydı, Benzin ortalamasına göre şüphelidir
+    anomaliler = yakit_kayitlarini_puanla(db, arac_id, yakit_kayitlari(db, arac_id, ["Benzin"], Decimal("21.30")))
+
+    assert [(a.tur, a.beklenen) for a in anomaliler] == [(ANOMALI_FIYAT, Decimal("42.50"))]
+
+
+def test_yeniden_olusturma_artimli_ile_ayni(db, arac_id):
+    yakit_kayitlarini_puanla(db, arac_id, yakit_kayitlari(db, arac_id, ["Benzin", "LPG", "LPG"] * 4))
+    db.commit()
+    artimli = sorted((s.yakit_turu, s.adet, round(s.ortalama, 6)) for s in db.query(YakitFiyatIstatistikleri))
+
+    istatistikleri_yeniden_olustur(db)
+
+    yeniden = sorted((s.yakit_turu, s.adet, round(s.ortalama, 6)) for s in db.query(YakitFiyatIstatistikleri))
+    assert yeniden == artimli == [("Benzin", 4, 42.5), ("LPG", 8, 21.3)]
+
+
+def dolumlar(db, arac_id: int, litreler, fiyatlar=None):
+    """Yakıt kayıtlarını servis üzerinden (istatistikler ve puanlama dahil) ekler"""
+    fiyatlar = fiyatlar or [Decimal("42.50")] * len(litreler)
+    return [
+        yakit_servisi.yakit_kaydi_olustur(db, YakitOlustur(
+            arac_id=arac_id, tarih=date(2025, 1, 1) + timedelta(days=i), km=1000 * (i + 1),
+            litre=Decimal(litre), fiyat=fiyat, toplam_tutar=Decimal(litre) * fiyat, yakit_turu="Benzin",
+        )).id
+        for i, (litre, fiyat) in enumerate(zip(litreler, fiyatlar))
+    ]
+
+
+def istatistik(db, arac_id: int) -> YakitIstatistikleri:
+    db.expire_all()
+    return db.get(YakitIstatistikleri, arac_id)
+
+
+def kayit_anomalileri(db, yakit_id: int):
+    return db.query(YakitAnomalileri).filter(YakitAnomalileri.yakit_id == yakit_id).all()
+
+
+def test_duzeltilen_dolum_en_buyuk_dolumdan_cikar(db, arac_id):
+    # İkinci dolum hatalı (500 L); henüz yeterli örnek olmadığı için en büyük dolum olur
+    idler = dolumlar(db, arac_id, [40, 500, 40, 40, 40, 40])
+    assert istatistik(db, arac_id).en_buyuk_litre == Decimal(500)
+
+    yakit_servisi.yakit_kaydi_guncelle(db, idler[1], YakitGuncelle(litre=Decimal(42)))
+
+    assert istatistik(db, arac_id).en_buyuk_litre == Decimal(42)
+    assert istatistik(db, arac_id).dolum_adet == 6
+    yeni = dolumlar(db, arac_id, [100])[0]
+    assert [a.tur for a in kayit_anomalileri(db, yeni)] == [ANOMALI_LITRE]
+
+
+def test_silinen_dolum_istatistikten_cikar(db, arac_id):
+    idler = dolumlar(db, arac_id, [40, 500, 40, 40, 40, 40])
+
+    yakit_servisi.yakit_kaydi_sil(db, idler[1])
+
+    sonuc = istatistik(db, arac_id)
+    assert sonuc.en_buyuk_litre == Decimal(40)
+    assert sonuc.dolum_adet == 5
+
+
+def test_silinen_fiyat_welford_ile_cikarilir(db, arac_id):
+    fiyatlar = [Decimal("42.50"), Decimal("43.10"), Decimal("41.90"), Decimal("44.00")]
+    idler = dolumlar(db, arac_id, [40] * 4, fiyatlar)
+
+    yakit_servisi.yakit_kaydi_sil(db, idler[3])
+
+    kalan = [float(f) for f in fiyatlar[:3]]
+    db.expire_all()
+    fiyat_istatistigi = db.get(YakitFiyatIstatistikleri, (arac_id, "Benzin"))
+    assert fiyat_istatistigi.adet == 3
+    assert fiyat_istatistigi.ortalama == pytest.approx(statistics.mean(kalan))
+    assert fiyat_istatistigi.m2 == pytest.approx(statistics.variance(kalan) * 2)
+
+
+def test_duzeltilen_kaydin_anomalisi_silinir(db, arac_id):
+    # Litre fiyatı 42.50 yerine 4.25 girilmiş
+    idler = dolumlar(db, arac_id, [40] * 7, [Decimal("42.50")] * 6 + [Decimal("4.25")])
+    assert [a.tur for a in kayit_anomalileri(db, idler[6])] == [ANOMALI_FIYAT]
+
+    yakit_servisi.yakit_kaydi_guncelle(db, idler[6], YakitGuncelle(fiyat=Decimal("42.50")))
+
+    assert kayit_anomalileri(db, idler[6]) == []
+    db.expire_all()
+    fiyat_istatistigi = db.get(YakitFiyatIstatistikleri, (arac_id, "Benzin"))
+    assert fiyat_istatistigi.adet == 7
+    assert fiyat_istatistigi.ortalama == pytest.approx(42.5, abs=0.01)
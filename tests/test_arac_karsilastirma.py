@@ -0,0 +1,67 @@
+"""
+arac_karsilastirma sorgu sayısı testleri
+Karşılaştırma araç başına sorgu atmamalı; filo büyüdükçe sorgu sayısı sabit kalmalı.
+"""
+from decimal import Decimal
+
+import pytest
+
+from sunucu.modeller import Araclar
+from sunucu.servisler.istatistik_servisi import arac_karsilastirma
+
+N = 5
+
+
+def filo_olustur(db, kullanici, arac_sayisi: int, baslangic: int = 0) -> None:
+    for i in range(baslangic, baslangic + arac_sayisi):
+        db.add(Araclar(
+            kullanici_id=kullanici.id,
+            plaka=f"{kullanici.id}TST{i:04d}",
+            marka="Fiat",
+            model="Egea",
+            yil=2020,
+            toplam_harcama=Decimal(100 + i),
+            toplam_yakit_maliyeti=Decimal(200 + i),
+            toplam_bakim_maliyeti=Decimal(50 + i),
+        ))
+    db.commit()
+
+
+def karsilastirma_sorgu_sayisi(db, sorgu_sayaci, kullanici) -> int:
+    kullanici_id, rol = kullanici.id, kullanici.rol
+    db.expire_all()
+    with sorgu_sayaci() as sorgular:
+        sonuclar = arac_karsilastirma(db, kullanici_id, rol)
+    beklenen = db.query(Araclar)
+    if rol != "admin":
+        beklenen = beklenen.filter(Araclar.kullanici_id == kullanici_id)
+    assert len(sonuclar) == beklenen.count()
+    return len(sorgular)
+
+
+@pytest.mark.parametrize("rol", ["kullanici", "admin"])
+def test_sorgu_sayisi_filo_boyutundan_bagimsiz(db, sorgu_sayaci, kullanici_olustur, rol):
+    kullanici = kullanici_olustur("filo@test.com", rol)
+    # Admin dışındaki kullanıcının araçları sonuca girmemeli
+    filo_olustur(db, kullanici_olustur("diger@test.com"), N)
+
+    filo_olustur(db, kullanici, N)
+    kucuk_filo = karsilastirma_sorgu_sayisi(db, sorgu_sayaci, kullanici)
+
+    filo_olustur(db, kullanici, 9 * N, baslangic=N)
+    buyuk_filo = karsilastirma_sorgu_sayisi(db, sorgu_sayaci, kullanici)
+
+    assert kucuk_filo == buyuk_filo == 1
+
+
+def test_siralama_ve_sayfalama(db, kullanici_olustur):
+    kullanici = kullanici_olustur("sayfa@test.com")
+    filo_olustur(db, kullanici, N)
+
+    tumu = arac_karsilastirma(db, kullanici.id, kullanici.rol)
+    assert len(tumu) == N
+    toplamlar = [arac["toplam"] for arac in tumu]
+    assert toplamlar == sorted(toplamlar, reverse=True)
+
+    sayfa = arac_karsilastirma(db, kullanici.id, kullanici.rol, limit=2, atlama=1)
+    assert [arac["plaka"] for arac in sayfa] == [arac["plaka"] for arac in tumu[1:3]]
@@ -0,0 +1,127 @@
+"""
+Veri versiyonu testleri
+Versiyon veritabanında tutulur; bir session'daki yazma, başka bir
+session'dan (başka bir worker'dan) okunan anahtarı da değiştirmeli.
+Yazmalar sadece sahiplerin satırını güncellemeli, admin satırlarına dokunmamalı.
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from sunucu.modeller import Araclar
+from sunucu.semalar.harcama_sema import HarcamaOlustur
+from sunucu.servisler import harcama_servisi
+from sunucu.servisler.onbellek_servisi import degisiklik_kaydet, istatistik_anahtari, veri_versiyonu
+
+
+def admin_anahtari(db, admin_id: int) -> tuple:
+    anahtar = istatistik_anahtari(db, admin_id, "admin", "ozet", None)
+    db.rollback()
+    return anahtar
+
+
+@pytest.fixture
+def diger_worker(engine):
+    """Aynı veritabanına bağlı, ayrı bir session (başka bir worker gibi)"""
+    oturum = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield oturum
+    finally:
+        oturum.close()
+
+
+@pytest.fixture
+def filo(db, kullanici_olustur):
+    sahip = kullanici_olustur("sahip@test.com")
+    diger = kullanici_olustur("diger@test.com")
+    admin = kullanici_olustur("admin@test.com", "admin")
+    arac = Araclar(kullanici_id=sahip.id, plaka="34TST001", marka="Fiat", model="Egea")
+    diger_arac = Araclar(kullanici_id=diger.id, plaka="34TST002", marka="Fiat", model="Egea")
+    db.add_all([arac, diger_arac])
+    db.commit()
+    return sahip.id, diger.id, admin.id, arac.id, diger_arac.id
+
+
+def harcama_ekle(db, arac_id: int) -> None:
+    harcama_servisi.harcama_olustur(db, HarcamaOlustur(
+        arac_id=arac_id, kategori="Sigorta", tarih=date(2025, 1, 1), tutar=Decimal(1500)
+    ))
+
+
+def test_yazma_diger_worker_anahtarini_degistirir(db, diger_worker, filo):
+    sahip_id, _, _, arac_id, _ = filo
+    onceki = istatistik_anahtari(diger_worker, sahip_id, "kullanici", "ozet", None)
+    diger_worker.rollback()
+
+    harcama_ekle(db, arac_id)
+
+    sonraki = istatistik_anahtari(diger_worker, sahip_id, "kullanici", "ozet", None)
+    assert onceki != sonraki
+
+
+def test_sadece_sahip_artirilir(db, filo):
+    sahip_id, diger_id, admin_id, arac_id, _ = filo
+    onceki = {k: veri_versiyonu(db, k) for k in (sahip_id, diger_id, admin_id)}
+
+    harcama_ekle(db, arac_id)
+
+    assert veri_versiyonu(db, sahip_id) > onceki[sahip_id]
+    assert veri_versiyonu(db, admin_id) == onceki[admin_id]
+    assert veri_versiyonu(db, diger_id) == onceki[diger_id]
+
+
+def test_iki_sahibin_yazmasi_admin_satirlarina_dokunmaz(db, diger_worker, sorgu_sayaci, filo):
+    sahip_id, diger_id, admin_id, arac_id, diger_arac_id = filo
+    admin_versiyonu = veri_versiyonu(db, admin_id)
+    anahtarlar = [admin_anahtari(diger_worker, admin_id)]
+
+    # İki worker, iki farklı sahibin aracına yazar
+    with sorgu_sayaci() as sorgular:
+        harcama_ekle(db, arac_id)
+        anahtarlar.append(admin_anahtari(diger_worker, admin_id))
+        harcama_ekle(diger_worker, diger_arac_id)
+        anahtarlar.append(admin_anahtari(db, admin_id))
+
+    guncellemeler = [s for s in sorgular if s.startswith("UPDATE kullanicilar")]
+    assert len(guncellemeler) == 2
+    assert all("WHERE kullanicilar.id IN" in s and "rol" not in s for s in guncellemeler)
+    assert veri_versiyonu(db, admin_id) == admin_versiyonu
+    # Admin anahtarı (filo versiyonu) her yazmada değişir
+    assert len(set(anahtarlar)) == 3
+
+
+def test_filo_versiyonu_en_buyuk_olmayan_sahibin_yazmasiyla_da_ilerler(db, filo):
+    sahip_id, diger_id, admin_id, arac_id, diger_arac_id = filo
+    for _ in range(3):
+        harcama_ekle(db, arac_id)
+    assert veri_versiyonu(db, diger_id) < veri_versiyonu(db, sahip_id)
+    onceki = admin_anahtari(db, admin_id)
+
+    harcama_ekle(db, diger_arac_id)
+
+    assert admin_anahtari(db, admin_id) != onceki
+    assert veri_versiyonu(db, diger_id) > veri_versiyonu(db, sahip_id)
+
+
+def test_rollback_versiyonu_degistirmez(db, filo):
+    sahip_id, _, admin_id, arac_id, _ = filo
+    onceki = veri_versiyonu(db, sahip_id), veri_versiyonu(db, admin_id)
+
+    degisiklik_kaydet(db, arac_id=arac_id)
+    db.rollback()
+    db.commit()
+
+    assert (veri_versiyonu(db, sahip_id), veri_versiyonu(db, admin_id)) == onceki
+
+
+@pytest.mark.parametrize("rol", ["kullanici", "admin"])
+def test_versiyon_tek_sorguda_okunur(db, sorgu_sayaci, filo, rol):
+    kullanici_id = filo[2] if rol == "admin" else filo[0]
+    db.expire_all()
+
+    with sorgu_sayaci() as sorgular:
+        istatistik_anahtari(db, kullanici_id, rol, "ozet", None)
+
+    assert len(sorgular) == 1
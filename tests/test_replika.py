@@ -0,0 +1,172 @@
+"""
+Replika yönlendirmesi testleri
+Replika, şeması olan ama verisi boş ayrı bir veritabanıdır; okumanın nereye
+gittiği dönen veriden anlaşılır. Yazma sonrası yapışkanlık istemcinin geri
+gönderdiği imzalı son yazma değeriyle taşındığı için yazmayı ve okumayı
+ayrı istemciler (ayrı worker'lar gibi) yapar.
+"""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
+
+import sunucu.veritabani as veritabani
+from sunucu.ana import uygulama
+from sunucu.ara_katmanlar.son_yazma import SonYazmaAraKatmani
+from sunucu.modeller import Araclar
+from sunucu.servisler.auth_servisi import kullanici_durumu_getir, kullanici_onbellegi, kullanici_tokeni_olustur
+from sunucu.servisler.onbellek_servisi import istatistik_anahtari, istatistik_onbellegi
+from sunucu.veritabani import (
+    SON_YAZMA_COOKIE,
+    SON_YAZMA_HEADER,
+    Base,
+    SonYazmaIzi,
+    YonlendirmeliSession,
+    replika_sec,
+    son_yazma_coz,
+    son_yazma_imzala,
+)
+
+YAPISKANLIK_SURESI = 5
+
+
+def dosya_engine(yol):
+    engine = create_engine(f"sqlite:///{yol}", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = dosya_engine(tmp_path / "birincil.db")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def replika(tmp_path, monkeypatch):
+    """Boş replika; uygulamanın session fabrikaları birincil + bu replika ile çalışır"""
+    engine = dosya_engine(tmp_path / "replika.db")
+    async_replika = create_async_engine(f"sqlite+aiosqlite:///{engine.url.database}", poolclass=NullPool)
+    monkeypatch.setattr(veritabani, "REPLIKA_ENGINELERI", [(engine, async_replika)])
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def uygulama_veritabani(engine, replika, monkeypatch):
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{engine.url.database}", poolclass=NullPool)
+    monkeypatch.setattr(
+        veritabani, "SessionLocal",
+        sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=YonlendirmeliSession)
+    )
+    monkeypatch.setattr(
+        veritabani, "AsyncSessionLocal",
+        async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False, sync_session_class=YonlendirmeliSession)
+    )
+    kullanici_onbellegi.temizle()
+    istatistik_onbellegi.temizle()
+    yield
+    kullanici_onbellegi.temizle()
+    istatistik_onbellegi.temizle()
+
+
+def worker() -> TestClient:
+    """Süreç belleğinde yapışkanlık tutulmadığı için her istemci ayrı bir worker gibidir"""
+    return TestClient(SonYazmaAraKatmani(uygulama, yapiskanlik_suresi=YAPISKANLIK_SURESI))
+
+
+@pytest.fixture
+def arac_sahibi(db, kullanici_olustur):
+    sahip = kullanici_olustur("sahip@test.com")
+    arac = Araclar(kullanici_id=sahip.id, plaka="34TST001", marka="Fiat", model="Egea", yil=2020)
+    db.add(arac)
+    db.commit()
+    kullanici_durumu_getir(db, sahip.id)
+    return sahip, arac.id, {"Authorization": f"Bearer {kullanici_tokeni_olustur(sahip)}"}
+
+
+def test_son_yazma_imzasi_dogrulanir():
+    deger = son_yazma_imzala(7, 1_700_000_000.25)
+
+    assert son_yazma_coz(deger) == (7, 1_700_000_000.25)
+    assert son_yazma_coz("8" + deger[1:]) is None
+    assert son_yazma_coz(deger[:-1] + ("0" if deger[-1] != "0" else "1")) is None
+    assert son_yazma_coz("bozuk") is None
+
+
+def test_yapiskanlik_kullaniciya_ve_sureye_bagli():
+    assert SonYazmaIzi(son_yazma_imzala(7, time.time())).yapiskan_mi(7)
+    assert not SonYazmaIzi(son_yazma_imzala(7, time.time())).yapiskan_mi(8)
+    assert not SonYazmaIzi(son_yazma_imzala(7, time.time() - YAPISKANLIK_SURESI - 1)).yapiskan_mi(7)
+    assert not SonYazmaIzi().yapiskan_mi(7)
+
+
+def test_yazma_sonrasi_baska_workerdaki_okuma_birincilden(uygulama_veritabani, arac_sahibi):
+    _, arac_id, basliklar = arac_sahibi
+    yazan, okuyan = worker(), worker()
+
+    # Yazmadan önce okuma replikaya gider (replika boş)
+    assert okuyan.get(f"/api/v1/araclar/{arac_id}", headers=basliklar).status_code == 404
+
+    yanit = yazan.put(f"/api/v1/araclar/{arac_id}", json={"km": 1500}, headers=basliklar)
+    assert yanit.status_code == 200, yanit.text
+    son_yazma = yanit.headers[SON_YAZMA_HEADER]
+    assert yanit.cookies[SON_YAZMA_COOKIE] == son_yazma
+
+    # Header ile (farklı origin) ve cookie ile başka worker'da birincilden okunur
+    yanit = okuyan.get(f"/api/v1/araclar/{arac_id}", headers={**basliklar, SON_YAZMA_HEADER: son_yazma})
+    assert yanit.status_code == 200, yanit.text
+    assert yanit.json()["km"] == 1500
+
+    okuyan.cookies.set(SON_YAZMA_COOKIE, son_yazma)
+    assert okuyan.get(f"/api/v1/araclar/{arac_id}", headers=basliklar).status_code == 200
+
+
+def test_okuma_istegi_son_yazma_degeri_uretmez(uygulama_veritabani, arac_sahibi):
+    _, arac_id, basliklar = arac_sahibi
+
+    yanit = worker().get(f"/api/v1/araclar/{arac_id}", headers=basliklar)
+
+    assert SON_YAZMA_HEADER not in yanit.headers
+    assert "set-cookie" not in yanit.headers
+
+
+def test_baska_kullanicinin_son_yazma_degeri_yapistirmaz(uygulama_veritabani, arac_sahibi):
+    sahip, arac_id, basliklar = arac_sahibi
+    basliklar = {**basliklar, SON_YAZMA_HEADER: son_yazma_imzala(sahip.id + 1, time.time())}
+
+    assert worker().get(f"/api/v1/araclar/{arac_id}", headers=basliklar).status_code == 404
+
+
+@pytest.mark.parametrize("rol", ["kullanici", "admin"])
+def test_veri_versiyonu_birincilden_okunur(engine, replika, db, sorgu_sayaci, kullanici_olustur, rol):
+    kullanici = kullanici_olustur("versiyon@test.com", rol)
+    kullanici.veri_versiyonu = 3
+    db.commit()
+
+    oturum = sessionmaker(bind=engine, class_=YonlendirmeliSession)()
+    replika_sec(oturum)
+    oturum.info["kullanici_id"] = kullanici.id
+    try:
+        with sorgu_sayaci(replika) as sorgular:
+            anahtar = istatistik_anahtari(oturum, kullanici.id, rol, "ozet")
+    finally:
+        oturum.close()
+
+    assert anahtar[4] == 3
+    assert len(sorgular) == 1
+
+
+def test_istatistik_onbellegi_birincilden_doldurulur(uygulama_veritabani, arac_sahibi):
+    """Yazma yapmamış kullanıcının önbelleğe girecek sonucu da boş replikadan hesaplanmaz"""
+    _, _, basliklar = arac_sahibi
+
+    yanit = worker().get("/api/v1/istatistikler/arac-karsilastirma", headers=basliklar)
+
+    assert yanit.status_code == 200, yanit.text
+    assert [satir["plaka"] for satir in yanit.json()] == ["34TST001"]
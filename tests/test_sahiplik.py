@@ -0,0 +1,315 @@
+"""
+Kayıt sahipliği doğrulama testleri
+Bakım, harcama ve yakıt kaydı sahipliği her durumda tek sorguda doğrulanmalı.
+Route testleri isteğin tamamında (kimlik + sahiplik + endpoint) çalışan
+sorguları sayar; yönetici için sahibe göre ek sorgu olmamalı.
+"""
+import asyncio
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
+
+from sunucu.ana import uygulama
+from sunucu.bagimliliklar.auth import Kimlik
+from sunucu.bagimliliklar.sahiplik import (
+    arac_sahipligini_dogrula,
+    async_arac_sahipligini_dogrula,
+    bakim_sahipligini_dogrula,
+    harcama_sahipligini_dogrula,
+    yakit_sahipligini_dogrula,
+)
+from sunucu.modeller import Araclar, Bakimlar, Harcamalar, Yakit_Takibi
+from sunucu.servisler.auth_servisi import kullanici_durumu_getir, kullanici_onbellegi, kullanici_tokeni_olustur
+from sunucu.veritabani import (
+    Base,
+    YonlendirmeliSession,
+    async_veritabani_baglantisi_al,
+    veritabani_baglantisi_al,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Async route'lar aynı veriyi görsün diye bu modülde veritabanı dosyada tutulur"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'sahiplik.db'}",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def async_engine(engine):
+    return create_async_engine(f"sqlite+aiosqlite:///{engine.url.database}", poolclass=NullPool)
+
+
+def bakim_olustur(arac_id: int) -> Bakimlar:
+    return Bakimlar(arac_id=arac_id, bakim_turu="Yag Degisimi", tarih=date(2025, 1, 1), km=10000, tutar=Decimal(500))
+
+
+def harcama_olustur(arac_id: int) -> Harcamalar:
+    return Harcamalar(arac_id=arac_id, kategori="Sigorta", tarih=date(2025, 1, 1), tutar=Decimal(1500))
+
+
+def yakit_olustur(arac_id: int) -> Yakit_Takibi:
+    return Yakit_Takibi(
+        arac_id=arac_id, tarih=date(2025, 1, 1), km=10000, litre=Decimal(40),
+        fiyat=Decimal("42.50"), toplam_tutar=Decimal(1700), yakit_turu="Benzin",
+    )
+
+
+KAYIT_TURLERI = [
+    pytest.param(bakim_sahipligini_dogrula, bakim_olustur, id="bakim"),
+    pytest.param(harcama_sahipligini_dogrula, harcama_olustur, id="harcama"),
+    pytest.param(yakit_sahipligini_dogrula, yakit_olustur, id="yakit"),
+]
+
+
+@pytest.fixture
+def kayit_sahibi(db, kullanici_olustur):
+    """Kendi aracına bağlı tek kaydı olan kullanıcı"""
+    sahip = kullanici_olustur("sahip@test.com")
+    arac = Araclar(kullanici_id=sahip.id, plaka="34TST001", marka="Fiat", model="Egea", yil=2020)
+    db.add(arac)
+    db.commit()
+    return sahip, arac.id
+
+
+def kayit_ekle(db, olustur, arac_id: int) -> int:
+    kayit = olustur(arac_id)
+    db.add(kayit)
+    db.commit()
+    kayit_id = kayit.id
+    # Kayıt identity map'ten değil veritabanından okunsun
+    db.expunge_all()
+    return kayit_id
+
+
+@pytest.mark.parametrize("dogrula, olustur", KAYIT_TURLERI)
+def test_sahibi_tek_sorguda_dogrulanir(db, sorgu_sayaci, kayit_sahibi, dogrula, olustur):
+    sahip, arac_id = kayit_sahibi
+    kimlik = Kimlik(id=sahip.id, email=sahip.email, rol=sahip.rol)
+    kayit_id = kayit_ekle(db, olustur, arac_id)
+
+    with sorgu_sayaci() as sorgular:
+        kayit = dogrula(kayit_id, db, kimlik)
+
+    assert kayit.id == kayit_id
+    assert len(sorgular) == 1
+
+
+@pytest.mark.parametrize("dogrula, olustur", KAYIT_TURLERI)
+def test_admin_tek_sorguda_dogrulanir(db, sorgu_sayaci, kullanici_olustur, kayit_sahibi, dogrula, olustur):
+    admin = kullanici_olustur("admin@test.com", "admin")
+    kimlik = Kimlik(id=admin.id, email=admin.email, rol=admin.rol)
+    _, arac_id = kayit_sahibi
+    kayit_id = kayit_ekle(db, olustur, arac_id)
+
+    with sorgu_sayaci() as sorgular:
+        kayit = dogrula(kayit_id, db, kimlik)
+
+    assert kayit.id == kayit_id
+    assert len(sorgular) == 1
+    assert "araclar" not in sorgular[0]
+
+
+@pytest.mark.parametrize("dogrula, olustur", KAYIT_TURLERI)
+def test_baska_kullanici_tek_sorguda_reddedilir(db, sorgu_sayaci, kullanici_olustur, kayit_sahibi, dogrula, olustur):
+    yabanci = kullanici_olustur("yabanci@test.com")
+    kimlik = Kimlik(id=yabanci.id, email=yabanci.email, rol=yabanci.rol)
+    _, arac_id = kayit_sahibi
+    kayit_id = kayit_ekle(db, olustur, arac_id)
+
+    with sorgu_sayaci() as sorgular, pytest.raises(HTTPException) as hata:
+        dogrula(kayit_id, db, kimlik)
+
+    assert hata.value.status_code == 403
+    assert len(sorgular) == 1
+
+
+@pytest.mark.parametrize("rol", ["kullanici", "admin"])
+@pytest.mark.parametrize("dogrula, olustur", KAYIT_TURLERI)
+def test_olmayan_kayit_tek_sorguda_bulunamaz(db, sorgu_sayaci, kullanici_olustur, dogrula, olustur, rol):
+    kullanici = kullanici_olustur("kullanici@test.com", rol)
+    kimlik = Kimlik(id=kullanici.id, email=kullanici.email, rol=kullanici.rol)
+
+    with sorgu_sayaci() as sorgular, pytest.raises(HTTPException) as hata:
+        dogrula(999, db, kimlik)
+
+    assert hata.value.status_code == 404
+    assert len(sorgular) == 1
+
+
+def kimlik_al(kullanici) -> Kimlik:
+    return Kimlik(id=kullanici.id, email=kullanici.email, rol=kullanici.rol)
+
+
+def test_arac_sahipligi_session_icinde_bir_kez_okunur(db, sorgu_sayaci, kayit_sahibi):
+    sahip, arac_id = kayit_sahibi
+    kimlik = kimlik_al(sahip)
+    db.expunge_all()
+
+    with sorgu_sayaci() as sorgular:
+        ilk = arac_sahipligini_dogrula(arac_id, db, kimlik)
+    assert len(sorgular) == 1
+    assert db.info["yuklenen_araclar"][arac_id] is ilk
+
+    # Toplu istekteki sonraki alt istek aynı session'ı kullanır
+    del ilk
+    with sorgu_sayaci() as sorgular:
+        ikinci = arac_sahipligini_dogrula(arac_id, db, kimlik)
+    assert ikinci.id == arac_id
+    assert sorgular == []
+
+
+def test_arac_sahipligi_baska_kullaniciyi_reddeder(db, sorgu_sayaci, kullanici_olustur, kayit_sahibi):
+    yabanci = kimlik_al(kullanici_olustur("yabanci@test.com"))
+    _, arac_id = kayit_sahibi
+    db.expunge_all()
+
+    with sorgu_sayaci() as sorgular, pytest.raises(HTTPException) as hata:
+        arac_sahipligini_dogrula(arac_id, db, yabanci)
+
+    assert hata.value.status_code == 403
+    assert len(sorgular) == 1
+
+
+@pytest.mark.parametrize("rol", ["kullanici", "admin"])
+def test_async_arac_sahipligi_tek_sorguda_dogrulanir(db, sorgu_sayaci, async_engine, kullanici_olustur, kayit_sahibi, rol):
+    sahip, arac_id = kayit_sahibi
+    kimlik = kimlik_al(sahip if rol == "kullanici" else kullanici_olustur("admin@test.com", "admin"))
+
+    async def dogrula_iki_kez():
+        async with async_sessionmaker(async_engine)() as oturum:
+            with sorgu_sayaci(async_engine.sync_engine) as ilk:
+                await async_arac_sahipligini_dogrula(arac_id, oturum, kimlik)
+            with sorgu_sayaci(async_engine.sync_engine) as ikinci:
+                arac = await async_arac_sahipligini_dogrula(arac_id, oturum, kimlik)
+            assert oturum.sync_session.info["yuklenen_araclar"][arac_id] is arac
+            return ilk, ikinci
+
+    ilk, ikinci = asyncio.run(dogrula_iki_kez())
+    assert len(ilk) == 1
+    assert ikinci == []
+
+
+@pytest.fixture
+def istemci(engine, async_engine):
+    """Uygulamayı test veritabanına bağlanan TestClient"""
+    oturum_fabrikasi = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=YonlendirmeliSession)
+    async_oturum_fabrikasi = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False, sync_session_class=YonlendirmeliSession
+    )
+
+    def veritabani():
+        oturum = oturum_fabrikasi()
+        try:
+            yield oturum
+        finally:
+            oturum.close()
+
+    async def async_veritabani():
+        async with async_oturum_fabrikasi() as oturum:
+            yield oturum
+
+    uygulama.dependency_overrides[veritabani_baglantisi_al] = veritabani
+    uygulama.dependency_overrides[async_veritabani_baglantisi_al] = async_veritabani
+    kullanici_onbellegi.temizle()
+    try:
+        yield TestClient(uygulama)
+    finally:
+        uygulama.dependency_overrides.clear()
+        kullanici_onbellegi.temizle()
+
+
+def yetki_basligi(db, kullanici) -> dict:
+    """Token üretir ve kimlik önbelleğini ısıtır; sayılan sorgular sadece sahiplik ve endpoint'e ait olur"""
+    kullanici_durumu_getir(db, kullanici.id)
+    return {"Authorization": f"Bearer {kullanici_tokeni_olustur(kullanici)}"}
+
+
+@pytest.fixture
+def istek_sahipleri(db, kullanici_olustur, kayit_sahibi):
+    """rol -> (kullanıcı, aracın id'si); yönetici başkasının aracına erişir"""
+    sahip, arac_id = kayit_sahibi
+    admin = kullanici_olustur("admin@test.com", "admin")
+    return {"kullanici": sahip, "admin": admin}, arac_id
+
+
+KAYIT_ROUTELARI = [
+    pytest.param("/api/v1/bakimlar", bakim_olustur, id="bakim"),
+    pytest.param("/api/v1/harcamalar", harcama_olustur, id="harcama"),
+    pytest.param("/api/v1/yakit", yakit_olustur, id="yakit"),
+]
+
+
+@pytest.mark.parametrize("rol", ["kullanici", "admin"])
+@pytest.mark.parametrize("onek, olustur", KAYIT_ROUTELARI)
+def test_kayit_routelari_tek_sorgu_calistirir(db, sorgu_sayaci, istemci, istek_sahipleri, onek, olustur, rol):
+    kullanicilar, arac_id = istek_sahipleri
+    basliklar = yetki_basligi(db, kullanicilar[rol])
+    kayit_id = kayit_ekle(db, olustur, arac_id)
+
+    with sorgu_sayaci() as sorgular:
+        yanit = istemci.get(f"{onek}/{kayit_id}", headers=basliklar)
+
+    assert yanit.status_code == 200, yanit.text
+    assert yanit.json()["id"] == kayit_id
+    assert len(sorgular) == 1
+    if rol == "admin":
+        assert "araclar" not in sorgular[0]
+
+
+@pytest.mark.parametrize("onek, olustur", KAYIT_ROUTELARI)
+def test_kayit_routelari_baska_kullaniciyi_reddeder(db, sorgu_sayaci, istemci, kullanici_olustur, kayit_sahibi, onek, olustur):
+    basliklar = yetki_basligi(db, kullanici_olustur("yabanci@test.com"))
+    _, arac_id = kayit_sahibi
+    kayit_id = kayit_ekle(db, olustur, arac_id)
+
+    with sorgu_sayaci() as sorgular:
+        yanit = istemci.get(f"{onek}/{kayit_id}", headers=basliklar)
+
+    assert yanit.status_code == 403
+    assert len(sorgular) == 1
+
+
+@pytest.mark.parametrize("rol", ["kullanici", "admin"])
+def test_arac_routeu_tek_sorgu_calistirir(db, sorgu_sayaci, istemci, istek_sahipleri, rol):
+    kullanicilar, arac_id = istek_sahipleri
+    basliklar = yetki_basligi(db, kullanicilar[rol])
+
+    with sorgu_sayaci() as sorgular:
+        yanit = istemci.get(f"/api/v1/araclar/{arac_id}", headers=basliklar)
+
+    assert yanit.status_code == 200, yanit.text
+    assert yanit.json()["id"] == arac_id
+    assert len(sorgular) == 1
+
+
+@pytest.mark.parametrize("rol", ["kullanici", "admin"])
+@pytest.mark.parametrize("onek, olustur", KAYIT_ROUTELARI)
+def test_async_liste_routelari_araci_bir_kez_okur(
+    db, sorgu_sayaci, async_engine, istemci, istek_sahipleri, onek, olustur, rol
+):
+    kullanicilar, arac_id = istek_sahipleri
+    basliklar = yetki_basligi(db, kullanicilar[rol])
+    kayit_id = kayit_ekle(db, olustur, arac_id)
+
+    with sorgu_sayaci(async_engine.sync_engine) as sorgular:
+        yanit = istemci.get(f"{onek}/arac/{arac_id}", headers=basliklar)
+
+    assert yanit.status_code == 200, yanit.text
+    assert [kayit["id"] for kayit in yanit.json()] == [kayit_id]
+    # Sahiplik için araç satırı + endpoint'in liste sorgusu
+    assert len(sorgular) == 2
+    assert sum("FROM araclar" in sorgu for sorgu in sorgular) == 1
@@ -0,0 +1,40 @@
+"""
+Ortak yazma yardımcıları testleri (satir_yoksa_ekle, toplamlari_artir)
+"""
+from datetime import date
+from decimal import Decimal
+
+from sunucu.modeller import Araclar, AylikOzetler, KmCizelgeleri
+from sunucu.veritabani import satir_yoksa_ekle, toplamlari_artir
+
+
+def arac_olustur(db, kullanici_olustur) -> int:
+    kullanici = kullanici_olustur("arac@test.com")
+    arac = Araclar(kullanici_id=kullanici.id, plaka="34TST001", marka="Fiat", model="Egea")
+    db.add(arac)
+    db.commit()
+    return arac.id
+
+
+def test_satir_yoksa_ekle_mevcut_satiri_degistirmez(db, kullanici_olustur):
+    arac_id = arac_olustur(db, kullanici_olustur)
+
+    satir_yoksa_ekle(db, KmCizelgeleri, {"arac_id": arac_id, "nokta_sayisi": 3, "noktalar": b"x"}, ["arac_id"])
+    satir_yoksa_ekle(db, KmCizelgeleri, {"arac_id": arac_id, "nokta_sayisi": 0, "noktalar": b""}, ["arac_id"])
+
+    satirlar = db.query(KmCizelgeleri).all()
+    assert [(s.arac_id, s.nokta_sayisi) for s in satirlar] == [(arac_id, 3)]
+
+
+def test_toplamlari_artir_olusturur_ve_toplar(db, kullanici_olustur, sorgu_sayaci):
+    arac_id = arac_olustur(db, kullanici_olustur)
+    anahtar = {"arac_id": arac_id, "ay": date(2025, 1, 1), "tur": "harcama", "kategori": "Sigorta"}
+
+    with sorgu_sayaci() as sorgular:
+        toplamlari_artir(db, AylikOzetler, anahtar, {"toplam_tutar": Decimal("100.50"), "toplam_litre": Decimal(0), "adet": 1})
+        toplamlari_artir(db, AylikOzetler, anahtar, {"toplam_tutar": Decimal("20.25"), "toplam_litre": Decimal(0), "adet": 1})
+        toplamlari_artir(db, AylikOzetler, anahtar, {"toplam_tutar": Decimal("-100.50"), "toplam_litre": Decimal(0), "adet": -1})
+
+    assert len(sorgular) == 3
+    satir = db.query(AylikOzetler).one()
+    assert (satir.toplam_tutar, satir.adet) == (Decimal("20.25"), 1)
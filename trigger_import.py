@@ -1,23 +1,38 @@
 import requests
+import gzip
 import json
 
+KAYNAK_DOSYA = 'data_export.json'
+NDJSON_DOSYA = 'data_export.ndjson.gz'
+
+# Üst tablolar, kendilerine referans veren tablolardan önce yazılmalı
+TABLO_SIRASI = ['kullanicilar', 'araclar', 'bakimlar', 'harcamalar', 'yakit_takibi', 'hatirlaticilar']
+
 print("🚀 Import başlatılıyor...")
 
-# JSON dosyasını oku
-with open('data_export.json', 'r', encoding='utf-8') as f:
+# JSON dökümünü endpoint'in beklediği gzip'li NDJSON formatına çevir
+with open(KAYNAK_DOSYA, 'r', encoding='utf-8') as f:
     data = json.load(f)
 
 print(f"📦 {len(data.get('kullanicilar', []))} kullanıcı, {len(data.get('araclar', []))} araç bulundu")
 
+with gzip.open(NDJSON_DOSYA, 'wt', encoding='utf-8') as f:
+    for tablo in TABLO_SIRASI:
+        for kayit in data.get(tablo, []):
+            f.write(json.dumps({"tablo": tablo, **kayit}, ensure_ascii=False) + "\n")
+
+print(f"🗜️ {NDJSON_DOSYA} oluşturuldu")
+
 try:
-    response = requests.post(
-        'https://arac-takip-backend.onrender.com/api/v1/admin/import-data',
-        json=data,  # JSON'u body'de gönder
-        timeout=60
-    )
-    
+    with open(NDJSON_DOSYA, 'rb') as f:
+        response = requests.post(
+            'https://arac-takip-backend.onrender.com/api/v1/admin/import-data',
+            files={'dosya': (NDJSON_DOSYA, f, 'application/gzip')},  # Dosya olarak gönder
+            timeout=300
+        )
+
     print(f"\n📊 Status Code: {response.status_code}")
-    
+
     if response.status_code == 200:
         print("\n✅ BAŞARILI!")
         result = response.json()
@@ -25,6 +40,6 @@ try:
     else:
         print(f"\n❌ HATA: {response.status_code}")
         print(response.text)
-        
+
 except Exception as e:
     print(f"\n❌ Exception: {e}")
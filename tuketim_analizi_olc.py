@@ -0,0 +1,138 @@
+"""
+Tüketim Analizi Ölçüm Script'i
+`yakit_servisi.ortalama_tuketim_hesapla`nın aggregate sorgulu sürümünü,
+tüm kayıtları ORM nesnesi olarak yükleyip Python'da toplayan önceki
+sürümle karşılaştırır: süre (p50) ve Python bellek tepe değeri.
+
+Her kayıt sayısı için geçici bir araç ve yakıt kayıtları transaction içinde
+oluşturulur; ölçümden sonra rollback edilir, veritabanında iz bırakmaz.
+İki sürümün sonuçlarının (Decimal) birebir aynı olduğu da kontrol edilir.
+
+Kullanım:
+    python tuketim_analizi_olc.py [--kayit-sayilari 10000 100000] [--tekrar 5]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import and_, insert
+
+from sunucu.veritabani import SessionLocal
+from sunucu.modeller.kullanici import Kullanicilar
+from sunucu.modeller.arac import Araclar
+from sunucu.modeller.yakit_takibi import Yakit_Takibi
+from sunucu.semalar.yakit_sema import TuketimAnalizi
+from sunucu.servisler.yakit_servisi import ortalama_tuketim_hesapla
+
+PARCA_BOYUTU = 5000
+
+
+def onceki_surum(db, arac_id: int) -> TuketimAnalizi:
+    """Karşılaştırma için: kayıtları yükleyip Python'da toplayan önceki sürüm."""
+    kayitlar = db.query(Yakit_Takibi).filter(
+        and_(
+            Yakit_Takibi.arac_id == arac_id,
+            Yakit_Takibi.silinmis_mi == False
+        )
+    ).order_by(Yakit_Takibi.km).all()
+
+    if not kayitlar:
+        return TuketimAnalizi(
+            ortalama_tuketim=Decimal("0"), toplam_yakit=Decimal("0"),
+            toplam_harcama=Decimal("0"), toplam_mesafe=0, kayit_sayisi=0
+        )
+
+    toplam_yakit = sum(k.litre for k in kayitlar)
+    toplam_harcama = sum(k.toplam_tutar for k in kayitlar)
+    toplam_mesafe = kayitlar[-1].km - kayitlar[0].km
+    ortalama_tuketim = (toplam_yakit * 100) / toplam_mesafe if toplam_mesafe > 0 else Decimal("0")
+
+    return TuketimAnalizi(
+        ortalama_tuketim=Decimal(str(round(ortalama_tuketim, 2))),
+        toplam_yakit=Decimal(str(toplam_yakit)),
+        toplam_harcama=Decimal(str(toplam_harcama)),
+        toplam_mesafe=toplam_mesafe,
+        kayit_sayisi=len(kayitlar)
+    )
+
+
+def gecici_arac_olustur(db, kullanici_id: int, kayit_sayisi: int) -> int:
+    arac = Araclar(
+        kullanici_id=kullanici_id, plaka=f"OLCUM{kayit_sayisi}", marka="Olcum", model="Olcum", km=0
+    )
+    db.add(arac)
+    db.flush()
+
+    baslangic = date(2000, 1, 1)
+    for parca in range(0, kayit_sayisi, PARCA_BOYUTU):
+        db.execute(insert(Yakit_Takibi), [
+            {
+                "arac_id": arac.id,
+                "tarih": baslangic + timedelta(days=i // 4),
+                "km": i * 150,
+                "litre": Decimal("35.17") + i % 13,
+                "fiyat": Decimal("42.39"),
+                "toplam_tutar": ((Decimal("35.17") + i % 13) * Decimal("42.39")).quantize(Decimal("0.01")),
+                "yakit_turu": "Benzin",
+                "tam_depo": i % 3 == 0,
+                "silinmis_mi": False,
+            }
+            for i in range(parca, min(parca + PARCA_BOYUTU, kayit_sayisi))
+        ])
+    return arac.id
+
+
+def olc(db, fonksiyon, arac_id: int, tekrar: int):
+    sureler = []
+    for _ in range(tekrar):
+        db.expunge_all()
+        baslangic = time.perf_counter()
+        sonuc = fonksiyon(db, arac_id)
+        sureler.append(time.perf_counter() - baslangic)
+
+    db.expunge_all()
+    tracemalloc.start()
+    fonksiyon(db, arac_id)
+    _, tepe = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.expunge_all()
+
+    return sonuc, sorted(sureler)[len(sureler) // 2] * 1000, tepe / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tüketim analizi: aggregate sorgu ve ORM yükleme karşılaştırması")
+    parser.add_argument("--kayit-sayilari", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--tekrar", type=int, default=5)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        kullanici = db.query(Kullanicilar.id).first()
+        if kullanici is None:
+            print("❌ Geçici araç için en az bir kullanıcı gerekli")
+            sys.exit(1)
+
+        print(f"{'kayıt':>8} {'sürüm':<10} {'p50 ms':>9} {'bellek MB':>10}")
+        for kayit_sayisi in args.kayit_sayilari:
+            arac_id = gecici_arac_olustur(db, kullanici.id, kayit_sayisi)
+            eski, eski_ms, eski_mb = olc(db, onceki_surum, arac_id, args.tekrar)
+            yeni, yeni_ms, yeni_mb = olc(db, ortalama_tuketim_hesapla, arac_id, args.tekrar)
+            db.rollback()
+
+            print(f"{kayit_sayisi:>8} {'önceki':<10} {eski_ms:>9.1f} {eski_mb:>10.2f}")
+            print(f"{kayit_sayisi:>8} {'aggregate':<10} {yeni_ms:>9.1f} {yeni_mb:>10.2f}")
+            if eski != yeni:
+                print(f"❌ Sonuçlar farklı: {eski} != {yeni}")
+                sys.exit(1)
+        print("✅ Sonuçlar birebir aynı")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
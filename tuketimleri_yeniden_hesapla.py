@@ -0,0 +1,35 @@
+"""
+Yakıt Tüketimi Yeniden Hesaplama Script'i
+Yakıt kayıtlarının ortalama tüketimini (tam depodan tam depoya segmentler,
+kısmi dolumlar dahil) ham kayıtlardan yeniden hesaplar. Eski hesaplamayla
+yazılmış veya elle düzeltilmiş kayıtları onarmak için kullanılır.
+
+Kullanım:
+    python tuketimleri_yeniden_hesapla.py              # Tüm araçlar
+    python tuketimleri_yeniden_hesapla.py --arac-id 7  # Tek araç
+"""
+import argparse
+from sunucu.veritabani import SessionLocal
+from sunucu.servisler.tuketim_servisi import arac_tuketimlerini_yeniden_hesapla, tum_tuketimleri_yeniden_hesapla
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yakıt tüketimlerini yeniden hesaplar")
+    parser.add_argument("--arac-id", type=int, help="Sadece bu aracı hesapla")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print("🔨 Yakıt tüketimleri yeniden hesaplanıyor...")
+        if args.arac_id:
+            guncellenen = arac_tuketimlerini_yeniden_hesapla(db, args.arac_id)
+            db.commit()
+        else:
+            guncellenen = tum_tuketimleri_yeniden_hesapla(db)
+        print(f"✅ {guncellenen} kaydın tüketimi güncellendi")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
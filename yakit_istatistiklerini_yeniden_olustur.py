@@ -0,0 +1,27 @@
+"""
+Yakıt İstatistikleri Yeniden Oluşturma Script'i
+yakit_istatistikleri (araç başına Welford ortalama/varyans ve en büyük
+dolum) ve yakit_fiyat_istatistikleri (araç ve yakıt türü başına litre
+fiyatı) tablolarını silinmemiş yakıt kayıtlarından yeniden hesaplar.
+Tablolar ilk oluşturulduğunda ve kayıtlar toplu düzenlendiğinde/silindiğinde
+çalıştırılır; anomali kayıtlarına dokunmaz.
+
+Kullanım:
+    python yakit_istatistiklerini_yeniden_olustur.py
+"""
+from sunucu.veritabani import SessionLocal
+from sunucu.servisler.anomali_servisi import istatistikleri_yeniden_olustur
+
+
+def main():
+    db = SessionLocal()
+    try:
+        print("🔨 Yakıt istatistikleri yeniden oluşturuluyor...")
+        arac_sayisi = istatistikleri_yeniden_olustur(db)
+        print(f"✅ {arac_sayisi} aracın istatistiği yazıldı")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Yük Testi Script'i
+Okuma ağırlıklı endpoint'lere (listeler ve istatistikler) çok sayıda eş
+zamanlı istemciyle istek atar; throughput ve gecikme yüzdeliklerini ölçer.
+
+Sync ve async session yolunu karşılaştırmak için aynı test iki sürüme karşı
+çalıştırılır ve sonuçlar karşılaştırılır:
+
+    # Async yol öncesi sürüm (sync endpoint'ler)
+    python yuk_testi.py --email a@b.com --sifre ... --kaydet sync.json
+    # Async endpoint'li sürüm
+    python yuk_testi.py --email a@b.com --sifre ... --karsilastir sync.json
+
+Kullanım:
+    python yuk_testi.py [--adres http://localhost:8000] [--eszamanli 500] [--sure 30]
+                        (--token TOKEN | --email EMAIL --sifre SIFRE) [--arac-id 1]
+                        [--kaydet sonuc.json] [--karsilastir onceki.json]
+
+Gereksinim: pip install httpx
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import defaultdict
+
+import httpx
+
+YOLLAR = [
+    "/api/v1/araclar",
+    "/api/v1/bakimlar/arac/{arac_id}",
+    "/api/v1/harcamalar/arac/{arac_id}",
+    "/api/v1/yakit/arac/{arac_id}",
+    "/api/v1/istatistikler/aylik-harcama?arac_id={arac_id}",
+    "/api/v1/istatistikler/kategori-dagilim",
+    "/api/v1/istatistikler/yakit-tuketim?arac_id={arac_id}",
+    "/api/v1/istatistikler/arac-karsilastirma",
+    "/api/v1/istatistikler/bakim-takip/{arac_id}",
+]
+
+
+def yuzdelik(sirali: list, oran: float) -> float:
+    """Sıralı listede en yakın sıra yöntemiyle yüzdelik değeri."""
+    if not sirali:
+        return 0.0
+    return sirali[min(len(sirali) - 1, max(0, math.ceil(oran * len(sirali)) - 1))]
+
+
+def ozetle(sureler: list, hatalar: int, test_suresi: float) -> dict:
+    sirali = sorted(sureler)
+    return {
+        "istek": len(sirali),
+        "hata": hatalar,
+        "istek_saniye": round(len(sirali) / test_suresi, 1),
+        "p50_ms": round(yuzdelik(sirali, 0.50) * 1000, 1),
+        "p95_ms": round(yuzdelik(sirali, 0.95) * 1000, 1),
+        "p99_ms": round(yuzdelik(sirali, 0.99) * 1000, 1),
+    }
+
+
+async def token_al(istemci: httpx.AsyncClient, email: str, sifre: str) -> str:
+    yanit = await istemci.post("/api/v1/auth/giris", json={"email": email, "sifre": sifre})
+    yanit.raise_for_status()
+    return yanit.json()["access_token"]
+
+
+async def sanal_istemci(istemci, yollar, bitis, baslangic_sirasi, sureler, hatalar):
+    """Süre dolana kadar yolları sırayla isteyen tek bir istemci."""
+    sira = baslangic_sirasi
+    while time.perf_counter() < bitis:
+        yol = yollar[sira % len(yollar)]
+        sira += 1
+        baslangic = time.perf_counter()
+        try:
+            yanit = await istemci.get(yol)
+            basarili = yanit.status_code < 400
+        except httpx.HTTPError:
+            basarili = False
+        sure = time.perf_counter() - baslangic
+        if basarili:
+            sureler[yol].append(sure)
+        else:
+            hatalar[yol] += 1
+
+
+async def yuk_testi(args) -> dict:
+    limitler = httpx.Limits(max_connections=args.eszamanli, max_keepalive_connections=args.eszamanli)
+    zaman_asimi = httpx.Timeout(args.zaman_asimi)
+    async with httpx.AsyncClient(base_url=args.adres, limits=limitler, timeout=zaman_asimi) as istemci:
+        token = args.token or await token_al(istemci, args.email, args.sifre)
+        istemci.headers["Authorization"] = f"Bearer {token}"
+        yollar = [yol.format(arac_id=args.arac_id) for yol in YOLLAR]
+
+        # Isınma: bağlantı havuzları ve önbellekler doldurulur
+        for yol in yollar:
+            (await istemci.get(yol)).raise_for_status()
+
+        sureler = defaultdict(list)
+        hatalar = defaultdict(int)
+        print(f"🚀 {args.eszamanli} eş zamanlı istemci, {args.sure} sn, {len(yollar)} endpoint")
+        baslangic = time.perf_counter()
+        bitis = baslangic + args.sure
+        await asyncio.gather(*(
+            sanal_istemci(istemci, yollar, bitis, i, sureler, hatalar)
+            for i in range(args.eszamanli)
+        ))
+        test_suresi = time.perf_counter() - baslangic
+
+    sonuc = {"toplam": ozetle([s for l in sureler.values() for s in l], sum(hatalar.values()), test_suresi)}
+    for yol in yollar:
+        sonuc[yol] = ozetle(sureler[yol], hatalar[yol], test_suresi)
+    return sonuc
+
+
+def yazdir(sonuc: dict, onceki: dict = None):
+    print(f"\n{'endpoint':<55} {'istek/sn':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'hata':>6}")
+    for ad, o in sonuc.items():
+        print(f"{ad:<55} {o['istek_saniye']:>9} {o['p50_ms']:>8} {o['p95_ms']:>8} {o['p99_ms']:>8} {o['hata']:>6}")
+        if onceki and ad in onceki:
+            e = onceki[ad]
+            print(
+                f"{'  (önceki)':<55} {e['istek_saniye']:>9} {e['p50_ms']:>8} {e['p95_ms']:>8} {e['p99_ms']:>8} {e['hata']:>6}"
+            )
+
+    if onceki and "toplam" in onceki:
+        yeni, eski = sonuc["toplam"], onceki["toplam"]
+        if eski["istek_saniye"] and eski["p99_ms"]:
+            print(
+                f"\n📊 Throughput: {yeni['istek_saniye'] / eski['istek_saniye']:.2f}x, "
+                f"p99: {eski['p99_ms']} ms → {yeni['p99_ms']} ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Okuma endpoint'leri için yük testi")
+    parser.add_argument("--adres", default="http://localhost:8000")
+    parser.add_argument("--eszamanli", type=int, default=500, help="Eş zamanlı istemci sayısı")
+    parser.add_argument("--sure", type=float, default=30, help="Test süresi (saniye)")
+    parser.add_argument("--zaman-asimi", type=float, default=60, help="İstek zaman aşımı (saniye)")
+    parser.add_argument("--token")
+    parser.add_argument("--email")
+    parser.add_argument("--sifre")
+    parser.add_argument("--arac-id", type=int, default=1)
+    parser.add_argument("--kaydet", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--karsilastir", help="Karşılaştırılacak önceki sonuç dosyası")
+    args = parser.parse_args()
+
+    if not args.token and not (args.email and args.sifre):
+        parser.error("--token veya --email ile --sifre verilmelidir")
+
+    sonuc = asyncio.run(yuk_testi(args))
+
+    onceki = None
+    if args.karsilastir:
+        with open(args.karsilastir, "r", encoding="utf-8") as f:
+            onceki = json.load(f)
+    yazdir(sonuc, onceki)
+
+    if args.kaydet:
+        with open(args.kaydet, "w", encoding="utf-8") as f:
+            json.dump(sonuc, f, ensure_ascii=False, indent=2)
+        print(f"💾 Sonuçlar {args.kaydet} dosyasına yazıldı")
+
+
+if __name__ == "__main__":
+    main()